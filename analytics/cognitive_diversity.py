@@ -1,9 +1,9 @@
-import json
 import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import Dict, Any
 from infra.models import SemanticCacheEntry, RoutingDecision
+from infra.embedding_codec import EmbeddingCodec
 
 class CognitiveDiversityPreserver:
     """
@@ -31,13 +31,9 @@ class CognitiveDiversityPreserver:
         # Extract embeddings and calculate average variance across the components
         embeddings_list = []
         for e in entries:
-            if e.embedding:
-                try:
-                    emb = json.loads(e.embedding)
-                    if isinstance(emb, list) and len(emb) > 0:
-                        embeddings_list.append(emb)
-                except Exception:
-                    continue
+            emb = EmbeddingCodec.from_entry(e)
+            if emb is not None and len(emb) > 0:
+                embeddings_list.append(emb)
                     
         if len(embeddings_list) > 1:
             emb_arr = np.array(embeddings_list)
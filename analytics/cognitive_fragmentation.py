@@ -1,8 +1,8 @@
-import json
 import numpy as np
 from sqlalchemy.orm import Session
 from typing import Dict, Any
 from infra.models import SemanticCacheEntry, RoutingDecision
+from infra.embedding_codec import EmbeddingCodec
 
 class CognitiveFragmentationAnalyzer:
     """
@@ -29,13 +29,9 @@ class CognitiveFragmentationAnalyzer:
         # 1. Semantic Variance
         embeddings = []
         for e in entries:
-            if e.embedding:
-                try:
-                    emb = json.loads(e.embedding)
-                    if isinstance(emb, list) and len(emb) > 0:
-                        embeddings.append(emb)
-                except Exception:
-                    continue
+            emb = EmbeddingCodec.from_entry(e)
+            if emb is not None and len(emb) > 0:
+                embeddings.append(emb)
         if len(embeddings) > 1:
             emb_arr = np.array(embeddings)
             var_dims = np.var(emb_arr, axis=0)
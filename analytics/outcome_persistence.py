@@ -136,16 +136,8 @@ def get_must_revalidate_frequency(db: Session, since_timestamp: Optional[str] =
     total_revalidations = 0
     
     for entry in entries:
-        if not entry.provenance:
-            continue
-        try:
-            prov = json.loads(entry.provenance)
-            hits = entry.hits or 0
-            reval_count = prov.get("revalidate_count", 0)
-            total_hits += hits
-            total_revalidations += reval_count
-        except Exception:
-            continue
+        total_hits += entry.hits or 0
+        total_revalidations += entry.revalidate_count or 0
             
     denominator = total_hits + total_revalidations
     return float(total_revalidations / denominator) if denominator > 0 else 0.0
@@ -1,8 +1,8 @@
-import json
 import numpy as np
 from sqlalchemy.orm import Session
 from typing import Dict, Any
 from infra.models import SemanticCacheEntry, RoutingDecision
+from infra.embedding_codec import EmbeddingCodec
 
 class ReasoningDiversityEngine:
     """
@@ -28,13 +28,9 @@ class ReasoningDiversityEngine:
         # 1. Semantic Variance of Cache Embeddings
         embeddings_list = []
         for e in entries:
-            if e.embedding:
-                try:
-                    emb = json.loads(e.embedding)
-                    if isinstance(emb, list) and len(emb) > 0:
-                        embeddings_list.append(emb)
-                except Exception:
-                    continue
+            emb = EmbeddingCodec.from_entry(e)
+            if emb is not None and len(emb) > 0:
+                embeddings_list.append(emb)
                     
         if len(embeddings_list) > 1:
             emb_arr = np.array(embeddings_list)
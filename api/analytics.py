@@ -223,6 +223,69 @@ def get_cognitive_efficiency_endpoint(db: Session = Depends(get_db)):
     return CognitiveEfficiencyPlane.get_efficiency_analytics(db)
 
 
+@router.get("/reliability-index")
+def get_reliability_index_cache_endpoint():
+    """
+    Exposes the judge's per-provider reliability index cache counters (hits, misses, invalidations, TTL).
+    """
+    from infra.reliability import reliability_index_cache
+    return reliability_index_cache.get_stats()
+
+
+@router.get("/provider-clients")
+def get_provider_client_pool_endpoint():
+    """
+    Exposes provider client pool statistics (reuse ratio, pooled clients, open connections, evictions).
+    """
+    from services.client_pool import client_pool
+    return client_pool.get_stats()
+
+
+@router.get("/hedging")
+def get_hedging_endpoint():
+    """
+    Exposes hedged escalation telemetry (fired hedges by trigger, win/loss rates, extra speculative spend).
+    """
+    from core.hedging import hedged_escalation
+    return hedged_escalation.get_stats()
+
+
+@router.get("/governance-snapshot")
+def get_governance_snapshot_endpoint():
+    """
+    Exposes the cached governance snapshot behind the /generate meta-governance gates (scores, age, build counters).
+    """
+    from infra.governance_snapshot import governance_snapshots
+    return governance_snapshots.status()
+
+
+@router.get("/drift-signals")
+def get_drift_signals_endpoint():
+    """
+    Exposes the per-model drift signal table read by semantic cache hits (rebuilds, invalidations, tracked models).
+    """
+    from core.semantic_cache_drift import drift_signals
+    return drift_signals.get_stats()
+
+
+@router.get("/semantic-cache-l1")
+def get_semantic_cache_l1_endpoint():
+    """
+    Exposes the in-process semantic cache tier (hit rate, fills, invalidations, pending hit counters).
+    """
+    from core.semantic_cache_l1 import semantic_l1
+    return semantic_l1.get_stats()
+
+
+@router.get("/semantic-cache-prefilter")
+def get_semantic_cache_prefilter_endpoint():
+    """
+    Exposes the semantic cache miss fast path (negative cache hits, skipped queries and scans, false-positive rates).
+    """
+    from core.semantic_cache_prefilter import semantic_prefilter
+    return semantic_prefilter.get_stats()
+
+
 @router.get("/outcome-persistence")
 def get_outcome_persistence_endpoint(db: Session = Depends(get_db)):
     """
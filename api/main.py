@@ -1,10 +1,12 @@
 import time
 import json
 import os
+import asyncio
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Header, BackgroundTasks, Request
+from fastapi.responses import StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -13,12 +15,13 @@ from core.classifier import RequestClassifier
 from core.router import router as build_router
 from services.model_registry import ModelRegistry
 from services.rag_service import rag_engine
-from infra.reliability import ConfidenceEngine
+from infra.reliability import ConfidenceEngine, StreamingJudge
 from infra.metrics import metrics
 from infra.benchmark import benchmark_engine
 from infra.shadow_evaluator import shadow_evaluator
 from core.learning_loop import memory_bank
 from core.economic_intelligence import EconomicIntelligencePlane, agentic_governor
+from core.hedging import hedged_escalation
 from api.analytics import router as analytics_router
 from api.public import router as public_router, public_v13_router
 from core.utility_intelligence import UtilityIntelligencePlane
@@ -26,30 +29,24 @@ from services.automation_engine import AutomationEngine
 from core.consensus import SovereignConsensusArbitrator
 from core.cognitive_efficiency import CognitiveEfficiencyPlane
 from core.semantic_cache import SemanticCache
+from core.semantic_cache_l1 import semantic_l1
+from core.semantic_cache_capacity import cache_capacity
+from core.semantic_index import semantic_index
+from infra.telemetry_writer import telemetry_writer
+from infra.governance_snapshot import governance_snapshots
 import re
-import threading
 import uuid
 from typing import List, Dict, Any
-from datetime import datetime, timedelta
-from infra.database import SessionLocal
-
-_RECENT_PROMPTS = [] # List of {"id": int, "prompt": str, "timestamp": datetime}
-_RECENT_PROMPTS_LOCK = threading.Lock()
-
-def add_to_recent_prompts(decision_id: int, prompt: str):
-    global _RECENT_PROMPTS
-    now = datetime.utcnow()
-    with _RECENT_PROMPTS_LOCK:
-        _RECENT_PROMPTS.append({
-            "id": decision_id,
-            "prompt": prompt,
-            "timestamp": now
-        })
-        # Keep only last 300 seconds of prompts
-        cutoff = now - timedelta(seconds=300)
-        _RECENT_PROMPTS = [entry for entry in _RECENT_PROMPTS if entry["timestamp"] >= cutoff]
-
+from datetime import datetime
+from infra.database import SessionLocal, begin_unit_of_work, end_unit_of_work
+from core.retry_buffer import recent_prompt_buffer
+from infra.single_flight import SingleFlight, single_flight
+from infra.batch_jobs import batch_jobs
+from infra.embeddings import embedding_provider
 
+def add_to_recent_prompts(decision_id: int, prompt: str, workflow_id: Optional[str] = None):
+    # workflow_id is kept alongside so retry detection does not need the (possibly still queued) decision row
+    recent_prompt_buffer.add(decision_id, prompt, workflow_id)
 
 
 limiter = Limiter(key_func=get_remote_address)
@@ -71,10 +68,24 @@ app.mount("/dashboard", StaticFiles(directory="dashboard", html=True), name="das
 @app.on_event("startup")
 async def startup_event():
     AutomationEngine.get_instance().start()
+    build_router.routing_table.start()
+    cache_capacity.start()
+    memory_bank.provider_stats.start()
+    db = SessionLocal()
+    try:
+        semantic_index.rebuild(db)
+    finally:
+        db.close()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     AutomationEngine.get_instance().stop()
+    build_router.routing_table.stop()
+    governance_snapshots.stop()
+    memory_bank.provider_stats.stop()
+    cache_capacity.stop()
+    semantic_l1.flush()
+    telemetry_writer.stop()
 
 @app.post("/admin/trigger-automation")
 async def trigger_automation(
@@ -127,6 +138,10 @@ class OrchestratorRequest(BaseModel):
     policy: Optional[PolicyConfig] = None
     workflow_id: Optional[str] = None
 
+class BatchGenerateRequest(BaseModel):
+    items: List[OrchestratorRequest]
+    mode: str = "sync"          # sync: results inline, batch: queued job polled via GET /generate/batch/{job_id}
+
 class PilotApplyRequest(BaseModel):
     project_name: str
     contact_email: str
@@ -141,6 +156,13 @@ def get_clients_payload(x_openai_key, x_anthropic_key, x_deepseek_key):
         # Assuming Deepseek uses OpenAI spec in registry
     }
 
+def get_async_clients_payload(x_openai_key, x_anthropic_key, x_deepseek_key):
+    """Async provider clients for the non-blocking /generate dispatch path (SovereignRouter.execute_route_async)."""
+    return {
+        "openai": ModelRegistry.get_async_openai_client(x_openai_key),
+        "anthropic": ModelRegistry.get_async_anthropic_client(x_anthropic_key),
+    }
+
 
 # 2. Endpoints
 @app.get("/health")
@@ -215,6 +237,20 @@ async def get_recent_traces(
     finally:
         db.close()
 
+@app.get("/admin/routing-table")
+async def get_routing_table(
+    x_omi_admin_key: str = Header(None),
+    x_omi_role: Optional[str] = Header(None)
+):
+    """
+    Learned routing table currently served by the router: version, build time and node weights.
+    """
+    if not ModelRegistry.validate_house_key(x_omi_admin_key):
+        raise HTTPException(status_code=403, detail="Invalid Admin Key")
+    if not x_omi_role or x_omi_role not in ["admin", "auditor"]:
+        raise HTTPException(status_code=403, detail="Unauthorized role access. Allowed: admin, auditor")
+    return build_router.routing_table.status()
+
 @app.get("/admin/scorecard")
 async def get_reliability_scorecard(
     x_omi_admin_key: str = Header(None),
@@ -434,6 +470,11 @@ async def submit_utility_feedback(payload: UtilityFeedbackRequest):
     try:
         from infra.models import RoutingDecision
         decision = db.query(RoutingDecision).filter(RoutingDecision.id == payload.decision_id).first()
+        if not decision:
+            # The decision may still be queued on the write-behind pipeline
+            if not await telemetry_writer.flush_async():
+                raise HTTPException(status_code=503, detail="Telemetry writer backlog; retry the feedback shortly.")
+            decision = db.query(RoutingDecision).filter(RoutingDecision.id == payload.decision_id).first()
         if not decision:
             raise HTTPException(status_code=404, detail=f"Routing decision {payload.decision_id} not found.")
             
@@ -470,6 +511,9 @@ async def verify_workflow_outcome(workflow_id: str, payload: WorkflowVerifyReque
     Outcome-Verified Cognitive Infrastructure:
     Grounds cached state and model telemetry in actual downstream task completion truth.
     """
+    # Outcome grounding must see every decision and cache entry of the workflow
+    if not await telemetry_writer.flush_async():
+        raise HTTPException(status_code=503, detail="Telemetry writer backlog; outcome grounding would miss queued decisions.")
     db = SessionLocal()
     try:
         # Fetch all decisions in this workflow
@@ -506,10 +550,12 @@ async def verify_workflow_outcome(workflow_id: str, payload: WorkflowVerifyReque
                     except Exception:
                         pass
                 c.is_quarantined = False  # Clear quarantine status on success!
+                semantic_index.set_quarantined(c.id, False)
             else:
                 c.utility_score = 0.0
                 c.is_reliable = False
                 c.is_quarantined = True
+                semantic_index.set_quarantined(c.id, True)
                 c.provenance_cri = 0.0
                 try:
                     prov = json.loads(c.provenance) if c.provenance else {}
@@ -534,48 +580,191 @@ async def verify_workflow_outcome(workflow_id: str, payload: WorkflowVerifyReque
         db.close()
 
 
-@app.post("/generate")
-@limiter.limit("30/minute")
-async def orchestrate_request(
-    request: Request,
-    payload: OrchestratorRequest,
-    background_tasks: BackgroundTasks,
-    x_omi_api_key: str = Header(None),
-    x_openai_key: str = Header(None),
-    x_anthropic_key: str = Header(None),
-    x_deepseek_key: str = Header(None),
-    x_omi_revalidation_depth: int = Header(0),
-    x_omi_governance_layers: int = Header(1),
-    x_omi_mutation_depth: int = Header(0),
-    x_omi_replay_depth: int = Header(0),
-    x_omi_dependency_depth: int = Header(0),
-    x_omi_memory_chain_length: int = Header(0),
-    x_omi_cross_workflow_references: int = Header(0),
-    x_omi_telemetry_recursion: int = Header(0),
-    x_omi_self_referential_analysis: int = Header(0),
-    x_omi_enforce_diversity: bool = Header(False),
-    x_omi_enforce_meta_governance: bool = Header(False)
-):
+def _escalation_route_config() -> dict:
+    """Judge escalation target: the smartest model, disregarding cost budget."""
+    return {
+        "target": "gpt-4o",
+        "target_key": "openai",
+        "instruction": "Role: Senior_Architect. Task: The previous frugal model failed to satisfy the structural logic. Provide a highly robust, verbose, and complete response.",
+        "trace": {"reason": "Judge Engine Escalation", "tradeoff": "Forced override due to failure thresholds"}
+    }
+
+def _serve_cache_hit(payload, cache_result: dict, start_time: float, language: str, complexity: float, selected_module) -> dict:
     """
-    The Core Control Plane.
-    Analyzes complexity, retrieves vector context, routes frugally, judges output, and escalates if needed.
+    Answers a request from a semantic cache hit and logs it as a zero-cost decision.
+    Returns {"decision_id", "result"} (the single-flight shared shape) so batch duplicates can link to it.
+    """
+    latency_ms = (time.time() - start_time) * 1000
+
+    # Log cache-hit decision (write-behind; utility provenance is folded into the insert)
+    cache_signals = ["response_copy_without_followup"]
+    cache_utility, _, _ = UtilityIntelligencePlane.aggregate_utility_score(cache_signals)
+    decision_id = memory_bank.log_decision(
+        prompt=payload.prompt,
+        selected_model=cache_result["model_id"],
+        complexity=complexity,
+        escalated=False,
+        latency_ms=int(latency_ms),
+        shadow_model=None,
+        input_tokens=0,
+        output_tokens=0,
+        cost_usd=0.0,
+        is_reliable=True,
+        final_route=cache_result["model_id"],
+        workflow_id=payload.workflow_id,
+        utility_score=cache_utility,
+        is_retry=False,
+        task_success=cache_utility >= 0.70,
+        cache_hit=True,
+        tokens_saved=cache_result["tokens_saved"],
+        cognitive_module=selected_module.name,
+        cognitive_provenance=cache_result.get("cognitive_provenance"),
+        provenance_cri=cache_result.get("provenance_cri", 1.0),
+        write_behind=True
+    )
+
+    # Record utility provenance
+    try:
+        UtilityIntelligencePlane.queue_utility_provenance(
+            decision_id=decision_id,
+            signals=cache_signals,
+            reasoning=f"Served cached response from {cache_result['model_id']}. Saved {cache_result['tokens_saved']} tokens.",
+            session_context={"workflow_id": payload.workflow_id, "mode": payload.mode, "cache_hit": True},
+            update_decision=False
+        )
+    except Exception as ue:
+        print(f"Error logging cache utility provenance: {ue}")
+
+    # Add current decision to recent prompts cache
+    add_to_recent_prompts(decision_id, payload.prompt, payload.workflow_id)
+
+    result = {
+        "response": cache_result["response"].strip(),
+        "metadata": {
+            "orchestrator_latency_ms": round(latency_ms, 2),
+            "language_detected": language,
+            "complexity_score": round(complexity, 2),
+            "routed_model": cache_result["model_id"],
+            "confidence": cache_result["confidence"],
+            "risk_level": "low",
+            "failure_reason": None,
+            "escalated_via_judge": False,
+            "decision_trace": {
+                "cache_hit": True, 
+                "cognitive_module": selected_module.name,
+                "provenance_cri": round(cache_result.get("provenance_cri", 1.0), 4)
+            },
+            "economic_metrics": {
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "cost_usd": 0.0,
+                "cache_hit": True,
+                "tokens_saved": cache_result["tokens_saved"]
+            }
+        }
+    }
+    return {"decision_id": decision_id, "result": result}
+
+def _serve_coalesced(payload, shared: dict, start_time: float, language: str, complexity: float, selected_module) -> dict:
+    """
+    Answers a duplicate request from its single-flight leader's result.
+    The follower is logged as its own zero-cost decision (a coalesced hit linked to the leader).
     """
+    leader = shared["result"]
+    leader_meta = leader["metadata"]
+    leader_econ = leader_meta.get("economic_metrics", {})
+    routed_model = leader_meta["routed_model"]
+    tokens_saved = leader_econ.get("input_tokens", 0) + leader_econ.get("output_tokens", 0)
+    latency_ms = (time.time() - start_time) * 1000
+
+    signals = ["response_copy_without_followup"]
+    utility, _, _ = UtilityIntelligencePlane.aggregate_utility_score(signals)
+    decision_id = memory_bank.log_decision(
+        prompt=payload.prompt,
+        selected_model=routed_model,
+        complexity=complexity,
+        escalated=False,
+        latency_ms=int(latency_ms),
+        shadow_model=None,
+        input_tokens=0,
+        output_tokens=0,
+        cost_usd=0.0,
+        is_reliable=not leader_meta.get("escalated_via_judge", False),
+        final_route=routed_model,
+        workflow_id=payload.workflow_id,
+        utility_score=utility,
+        is_retry=False,
+        task_success=utility >= 0.70,
+        cache_hit=True,
+        tokens_saved=tokens_saved,
+        cognitive_module=selected_module.name,
+        cognitive_provenance=json.dumps({"coalesced": True, "leader_decision_id": shared["decision_id"]}),
+        write_behind=True
+    )
+    try:
+        UtilityIntelligencePlane.queue_utility_provenance(
+            decision_id=decision_id,
+            signals=signals,
+            reasoning=f"Coalesced with in-flight decision {shared['decision_id']} from {routed_model}. Saved {tokens_saved} tokens.",
+            session_context={"workflow_id": payload.workflow_id, "mode": payload.mode, "coalesced": True},
+            update_decision=False
+        )
+    except Exception as ue:
+        print(f"Error logging coalesced utility provenance: {ue}")
+    add_to_recent_prompts(decision_id, payload.prompt, payload.workflow_id)
+
+    return {
+        "response": leader["response"],
+        "metadata": {
+            "orchestrator_latency_ms": round(latency_ms, 2),
+            "language_detected": language,
+            "complexity_score": round(complexity, 2),
+            "routed_model": routed_model,
+            "confidence": leader_meta["confidence"],
+            "risk_level": leader_meta["risk_level"],
+            "failure_reason": leader_meta.get("failure_reason"),
+            "escalated_via_judge": False,
+            "decision_trace": {
+                "coalesced": True,
+                "leader_decision_id": shared["decision_id"],
+                "cognitive_module": selected_module.name
+            },
+            "economic_metrics": {
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "cost_usd": 0.0,
+                "coalesced": True,
+                "tokens_saved": tokens_saved
+            }
+        }
+    }
+
+def _enforce_complexity_budget(
+    revalidation_depth=0,
+    governance_layers=1,
+    mutation_depth=0,
+    replay_depth=0,
+    dependency_depth=0,
+    memory_chain_length=0,
+    cross_workflow_references=0,
+    telemetry_recursion=0,
+    self_referential_analysis=0
+):
+    """ComplexityBudget and RecursiveStabilityLimits header gates of /generate and /generate/stream (422 on breach)."""
     from core.complexity_governor import ComplexityGovernor
     from infra.complexity_budget import ComplexityBudget
     from infra.recursive_stability_limits import RecursiveStabilityLimits
 
     # Safely unpack header arguments to handle direct unit test method invocation
-    reval_depth_val = x_omi_revalidation_depth if isinstance(x_omi_revalidation_depth, (int, float)) else 0
-    layers_val = x_omi_governance_layers if isinstance(x_omi_governance_layers, (int, float)) else 1
-    mutation_depth_val = x_omi_mutation_depth if isinstance(x_omi_mutation_depth, (int, float)) else 0
-    replay_depth_val = x_omi_replay_depth if isinstance(x_omi_replay_depth, (int, float)) else 0
-    dependency_depth_val = x_omi_dependency_depth if isinstance(x_omi_dependency_depth, (int, float)) else 0
-    memory_chain_val = x_omi_memory_chain_length if isinstance(x_omi_memory_chain_length, (int, float)) else 0
-    cross_wf_val = x_omi_cross_workflow_references if isinstance(x_omi_cross_workflow_references, (int, float)) else 0
-    telemetry_rec_val = x_omi_telemetry_recursion if isinstance(x_omi_telemetry_recursion, (int, float)) else 0
-    self_ref_val = x_omi_self_referential_analysis if isinstance(x_omi_self_referential_analysis, (int, float)) else 0
-    enforce_div_val = x_omi_enforce_diversity if isinstance(x_omi_enforce_diversity, bool) else False
-    enforce_meta_val = x_omi_enforce_meta_governance if isinstance(x_omi_enforce_meta_governance, bool) else False
+    reval_depth_val = revalidation_depth if isinstance(revalidation_depth, (int, float)) else 0
+    layers_val = governance_layers if isinstance(governance_layers, (int, float)) else 1
+    mutation_depth_val = mutation_depth if isinstance(mutation_depth, (int, float)) else 0
+    replay_depth_val = replay_depth if isinstance(replay_depth, (int, float)) else 0
+    dependency_depth_val = dependency_depth if isinstance(dependency_depth, (int, float)) else 0
+    memory_chain_val = memory_chain_length if isinstance(memory_chain_length, (int, float)) else 0
+    cross_wf_val = cross_workflow_references if isinstance(cross_workflow_references, (int, float)) else 0
+    telemetry_rec_val = telemetry_recursion if isinstance(telemetry_recursion, (int, float)) else 0
+    self_ref_val = self_referential_analysis if isinstance(self_referential_analysis, (int, float)) else 0
 
     # Centralized Complexity Budget Checks
     if not ComplexityBudget.validate_governance_layers(layers_val):
@@ -605,87 +794,203 @@ async def orchestrate_request(
     if not RecursiveStabilityLimits.validate_self_referential_analysis(self_ref_val):
         raise HTTPException(status_code=422, detail="Complexity budget breached: recursive stability limits exceeded.")
 
-    # Enforce diversity and meta-governance constraints if requested
-    db = SessionLocal()
-    try:
-        if enforce_div_val:
-            from analytics.cognitive_diversity import CognitiveDiversityPreserver
-            diversity = CognitiveDiversityPreserver.calculate_diversity_metrics(db)
-            if diversity["provider_distribution"] < 0.20:
-                raise HTTPException(status_code=422, detail="Complexity budget breached: homogeneous provider distribution collapse.")
-
-        if enforce_meta_val:
-            from infra.meta_governance_auditor import MetaGovernanceAuditor
-            from analytics.ecosystem_simulator import EcosystemSimulator
-            from analytics.ecosystem_equilibrium import EcosystemEquilibriumEngine
-            from analytics.governance_inertia import GovernanceInertiaEngine
-            
-            meta = MetaGovernanceAuditor.audit_governance_layers(db)
-            eco = EcosystemSimulator.evaluate_ecosystem(db)
-            eq = EcosystemEquilibriumEngine.calculate_equilibrium(db)
-            inertia = GovernanceInertiaEngine.calculate_inertia_metrics(db)
+
+def _enforce_governance_gates(enforce_diversity=False, enforce_meta_governance=False):
+    """x-omi-enforce-diversity / x-omi-enforce-meta-governance gates of /generate and /generate/stream (422 on breach)."""
+    enforce_diversity = enforce_diversity if isinstance(enforce_diversity, bool) else False
+    enforce_meta_governance = enforce_meta_governance if isinstance(enforce_meta_governance, bool) else False
+
+    # Enforce diversity and meta-governance constraints if requested.
+    # Scores come from the background governance snapshot (bounded staleness), not per-request table scans.
+    if enforce_diversity:
+        diversity = governance_snapshots.current().diversity
+        if diversity["provider_distribution"] < 0.20:
+            raise HTTPException(status_code=422, detail="Complexity budget breached: homogeneous provider distribution collapse.")
+
+    if enforce_meta_governance:
+        snapshot = governance_snapshots.current()
+        meta = snapshot.meta
+        eco = snapshot.ecosystem
+        eq = snapshot.equilibrium
+        inertia = snapshot.inertia
+        
+        # Check 19 / Phase 39: Governance overhead exceeds value score or threshold
+        if meta["governance_overhead_score"] > 0.35:
+            raise HTTPException(status_code=422, detail="Complexity budget breached: governance overhead exceeds value.")
+        
+        # Check 21 / Phase 39: Recursive complexity breach
+        if meta["recursive_complexity_risk"] > 0.80:
+            raise HTTPException(status_code=422, detail="Complexity budget breached: recursive complexity risk exceeds limit.")
             
-            # Check 19 / Phase 39: Governance overhead exceeds value score or threshold
-            if meta["governance_overhead_score"] > 0.35:
-                raise HTTPException(status_code=422, detail="Complexity budget breached: governance overhead exceeds value.")
+        # Check 20 / Phase 39: Governance rigidity threshold
+        if eco["governance_rigidity_score"] > 0.60:
+            raise HTTPException(status_code=422, detail="Complexity budget breached: governance rigidity threshold exceeded.")
+        if inertia["governance_inertia_score"] > 0.60:
+            raise HTTPException(status_code=422, detail="Complexity budget breached: governance rigidity threshold exceeded.")
+
+        # Phase 39: Ecosystem Instability
+        if eq["ecosystem_equilibrium_score"] < 0.70:
+            raise HTTPException(status_code=422, detail="Complexity budget breached: ecosystem equilibrium score below threshold.")
+
+
+def _detect_implicit_retry(db, payload):
+    """Returns (is_retry_detected, prev_decision_id, retry_reason); detection errors are logged, not raised."""
+    try:
+        return UtilityIntelligencePlane.detect_implicit_retry(
+            db, payload.prompt, recent_prompt_buffer, time_window_sec=300, workflow_id=payload.workflow_id
+        )
+    except Exception as e:
+        print(f"Error during implicit retry detection check: {e}")
+        return False, -1, ""
+
+
+def _optimize_context(prompt: str, complexity: float):
+    """ContextOptimizer pass kept only if QualityGuard accepts it; returns (final_prompt, context_opt_data)."""
+    from infra.context_optimizer import ContextOptimizer
+    from infra.quality_guard import QualityGuard
+
+    opt_res = ContextOptimizer.optimize(prompt, complexity)
+    optimized_candidate = opt_res["optimized_prompt"]
+    guard_res = QualityGuard.evaluate_quality(prompt, optimized_candidate)
+
+    # Enforce quality preservation limit: threshold >= 95%
+    final_prompt = optimized_candidate if guard_res["quality_retained"] else prompt
+    context_opt_data = {
+        "before_tokens": opt_res["before_tokens"],
+        "after_tokens": opt_res["after_tokens"] if guard_res["quality_retained"] else opt_res["before_tokens"],
+        "compression_ratio": opt_res["compression_ratio"] if guard_res["quality_retained"] else 1.0,
+        "quality_score": guard_res["quality_score"],
+        "quality_retained": guard_res["quality_retained"]
+    }
+    return final_prompt, context_opt_data
+
+
+def _static_truth_failures(prompt: str, response_text: str, workflow_id, db) -> List[str]:
+    """verify_utility_truth as failed-constraint entries (empty when the response passes or the check errors)."""
+    try:
+        truth_res = UtilityIntelligencePlane.verify_utility_truth(prompt, response_text, workflow_id, db)
+        if not truth_res["is_truth_valid"]:
+            failed_checks = [k for k, v in truth_res["checks"].items() if not v]
+            return [f"static_truth_failed:{','.join(failed_checks)}"]
+    except Exception as e:
+        print(f"Error during static truth verification: {e}")
+    return []
+
+
+async def _mark_implicit_retry(db, payload, prev_decision_id: int, retry_reason: str, target_model: str):
+    """Retrospectively downgrades the decision this request retries and invalidates its cached answer."""
+    from infra.models import RoutingDecision, SemanticCacheEntry
+
+    # Rare path: make sure the previous (possibly still queued) decision is persisted first
+    db.checkpoint()
+    flushed = await telemetry_writer.flush_async()
+    try:
+        if not flushed:
+            raise RuntimeError(f"telemetry writer did not drain; decision {prev_decision_id} left unmarked")
+        prev_dec = db.query(RoutingDecision).filter(RoutingDecision.id == prev_decision_id).first()
+        if prev_dec:
+            prev_dec.is_retry = True
+            db.commit()
             
-            # Check 21 / Phase 39: Recursive complexity breach
-            if meta["recursive_complexity_risk"] > 0.80:
-                raise HTTPException(status_code=422, detail="Complexity budget breached: recursive complexity risk exceeds limit.")
+            signals = ["immediate_retry"]
+            if prev_dec.initial_route != target_model:
+                signals.append("provider_switch")
                 
-            # Check 20 / Phase 39: Governance rigidity threshold
-            if eco["governance_rigidity_score"] > 0.60:
-                raise HTTPException(status_code=422, detail="Complexity budget breached: governance rigidity threshold exceeded.")
-            if inertia["governance_inertia_score"] > 0.60:
-                raise HTTPException(status_code=422, detail="Complexity budget breached: governance rigidity threshold exceeded.")
-
-            # Phase 39: Ecosystem Instability
-            if eq["ecosystem_equilibrium_score"] < 0.70:
-                raise HTTPException(status_code=422, detail="Complexity budget breached: ecosystem equilibrium score below threshold.")
-    finally:
-        db.close()
+            prev_prompt_text = recent_prompt_buffer.get_prompt(prev_decision_id)
+            if prev_prompt_text:
+                def calculate_overlap(s1: str, s2: str) -> float:
+                    words1 = set(re.findall(r'\w+', s1.lower()))
+                    words2 = set(re.findall(r'\w+', s2.lower()))
+                    if not words1 or not words2:
+                        return 0.0
+                    intersection = words1.intersection(words2)
+                    union = words1.union(words2)
+                    return len(intersection) / len(union)
+                overlap = calculate_overlap(payload.prompt, prev_prompt_text)
+                if 0.40 <= overlap < 0.85:
+                    signals.append("prompt_rewording")
+            
+            UtilityIntelligencePlane.record_utility_provenance(
+                db,
+                decision_id=prev_decision_id,
+                signals=signals,
+                reasoning=f"Retrospectively downgraded via implicit retry detection: {retry_reason}",
+                session_context={"current_workflow_id": payload.workflow_id}
+            )
+    except Exception as e:
+        print(f"Error updating previous decision utility: {e}")
 
-    start_time = time.time()
+    # Safe Cleanup: invalidate cached entries matching failed prompt + workflow to prevent future stale serving
+    try:
+        prev_cache = db.query(SemanticCacheEntry).filter(
+            SemanticCacheEntry.prompt == payload.prompt,
+            SemanticCacheEntry.workflow_id == payload.workflow_id
+        ).all()
+        for pc in prev_cache:
+            pc.is_reliable = False
+            pc.utility_score = 0.0
+        db.commit()
+    except Exception as e:
+        print(f"Error cleaning up failed cache entries: {e}")
+
+
+@app.post("/generate")
+@limiter.limit("30/minute")
+async def orchestrate_request(
+    request: Request,
+    payload: OrchestratorRequest,
+    background_tasks: BackgroundTasks,
+    x_omi_api_key: str = Header(None),
+    x_openai_key: str = Header(None),
+    x_anthropic_key: str = Header(None),
+    x_deepseek_key: str = Header(None),
+    x_omi_revalidation_depth: int = Header(0),
+    x_omi_governance_layers: int = Header(1),
+    x_omi_mutation_depth: int = Header(0),
+    x_omi_replay_depth: int = Header(0),
+    x_omi_dependency_depth: int = Header(0),
+    x_omi_memory_chain_length: int = Header(0),
+    x_omi_cross_workflow_references: int = Header(0),
+    x_omi_telemetry_recursion: int = Header(0),
+    x_omi_self_referential_analysis: int = Header(0),
+    x_omi_enforce_diversity: bool = Header(False),
+    x_omi_enforce_meta_governance: bool = Header(False)
+):
+    """
+    The Core Control Plane.
+    Analyzes complexity, retrieves vector context, routes frugally, judges output, and escalates if needed.
+    """
+    _enforce_complexity_budget(
+        x_omi_revalidation_depth, x_omi_governance_layers, x_omi_mutation_depth, x_omi_replay_depth,
+        x_omi_dependency_depth, x_omi_memory_chain_length, x_omi_cross_workflow_references,
+        x_omi_telemetry_recursion, x_omi_self_referential_analysis
+    )
+
+    # Request-scoped unit of work: one session shared by every layer below, committed once at the end
+    db = begin_unit_of_work()
+    flight = None
+    try:
+        # Scores come from the background governance snapshot (bounded staleness), not per-request table scans
+        _enforce_governance_gates(x_omi_enforce_diversity, x_omi_enforce_meta_governance)
+
+        start_time = time.time()
     
-    # Optional authorization
-    if x_omi_api_key and not ModelRegistry.validate_house_key(x_omi_api_key):
-        raise HTTPException(status_code=401, detail="Invalid Sovereign Orchestrator Key.")
+        # Optional authorization
+        if x_omi_api_key and not ModelRegistry.validate_house_key(x_omi_api_key):
+            raise HTTPException(status_code=401, detail="Invalid Sovereign Orchestrator Key.")
 
-    clients = get_clients_payload(x_openai_key, x_anthropic_key, x_deepseek_key)
+        clients = get_async_clients_payload(x_openai_key, x_anthropic_key, x_deepseek_key)
     
-    db = SessionLocal()
-    try:
         # Implicit Retry Detection
-        is_retry_detected = False
-        prev_decision_id = -1
-        retry_reason = ""
-        try:
-            with _RECENT_PROMPTS_LOCK:
-                recent_prompts_copy = list(_RECENT_PROMPTS)
-            is_retry_detected, prev_decision_id, retry_reason = UtilityIntelligencePlane.detect_implicit_retry(
-                db, payload.prompt, recent_prompts_copy, time_window_sec=300, workflow_id=payload.workflow_id
-            )
-        except Exception as e:
-            print(f"Error during implicit retry detection check: {e}")
-            
+        is_retry_detected, prev_decision_id, retry_reason = _detect_implicit_retry(db, payload)
+
         # Step 1: Pre-Flight Analysis
         analysis = RequestClassifier.analyze(payload.prompt)
         complexity = analysis["complexity_score"]
         language = analysis["language"]
         
         # Step 2: Context Gathering & Compression
-        raw_prompt_for_comp = payload.prompt
-        if payload.use_rag:
-            retrieved_context = rag_engine.retrieve_context(query=payload.prompt, top_k=2, threshold=1.5)
-            if retrieved_context:
-                docs = retrieved_context.split("\n---\n")
-                pruned_docs = EconomicIntelligencePlane.retrieval_pruning(docs, payload.prompt, threshold=0.50)
-                if pruned_docs:
-                    retrieved_context = "\n---\n".join(pruned_docs)
-                    raw_prompt_for_comp = f"Background Context:\n{retrieved_context}\n\nTask:\n{payload.prompt}"
-
-        elif payload.context:
-            raw_prompt_for_comp = f"Background Context:\n{payload.context}\n\nTask:\n{payload.prompt}"
+        raw_prompt_for_comp = _compose_prompt(payload)
 
         # Cache & Cognitive Efficiency check
         cache_result, optimized_prompt, selected_module = CognitiveEfficiencyPlane.optimize_request(
@@ -698,95 +1003,21 @@ async def orchestrate_request(
 
         if cache_result and not cache_result.get("must_revalidate", False):
             # Cache Hit!
-            latency_ms = (time.time() - start_time) * 1000
-            
-            # Log cache-hit decision
-            decision_id = memory_bank.log_decision(
-                prompt=payload.prompt,
-                selected_model=cache_result["model_id"],
-                complexity=complexity,
-                escalated=False,
-                latency_ms=int(latency_ms),
-                shadow_model=None,
-                input_tokens=0,
-                output_tokens=0,
-                cost_usd=0.0,
-                is_reliable=True,
-                final_route=cache_result["model_id"],
-                workflow_id=payload.workflow_id,
-                utility_score=cache_result["utility_score"],
-                is_retry=False,
-                task_success=True,
-                cache_hit=True,
-                tokens_saved=cache_result["tokens_saved"],
-                cognitive_module=selected_module.name,
-                cognitive_provenance=cache_result.get("cognitive_provenance"),
-                provenance_cri=cache_result.get("provenance_cri", 1.0)
-            )
+            return _serve_cache_hit(payload, cache_result, start_time, language, complexity, selected_module)["result"]
 
-            # Record utility provenance
-            try:
-                UtilityIntelligencePlane.record_utility_provenance(
-                    db,
-                    decision_id=decision_id,
-                    signals=["response_copy_without_followup"],
-                    reasoning=f"Served cached response from {cache_result['model_id']}. Saved {cache_result['tokens_saved']} tokens.",
-                    session_context={"workflow_id": payload.workflow_id, "mode": payload.mode, "cache_hit": True}
-                )
-            except Exception as ue:
-                print(f"Error logging cache utility provenance: {ue}")
-
-            # Add current decision to recent prompts cache
-            add_to_recent_prompts(decision_id, payload.prompt)
-
-            return {
-                "response": cache_result["response"].strip(),
-                "metadata": {
-                    "orchestrator_latency_ms": round(latency_ms, 2),
-                    "language_detected": language,
-                    "complexity_score": round(complexity, 2),
-                    "routed_model": cache_result["model_id"],
-                    "confidence": cache_result["confidence"],
-                    "risk_level": "low",
-                    "failure_reason": None,
-                    "escalated_via_judge": False,
-                    "decision_trace": {
-                        "cache_hit": True, 
-                        "cognitive_module": selected_module.name,
-                        "provenance_cri": round(cache_result.get("provenance_cri", 1.0), 4)
-                    },
-                    "economic_metrics": {
-                        "input_tokens": 0,
-                        "output_tokens": 0,
-                        "cost_usd": 0.0,
-                        "cache_hit": True,
-                        "tokens_saved": cache_result["tokens_saved"]
-                    }
-                }
-            }
-
-        # Cache Miss - Continue route calculation
-        final_prompt = optimized_prompt
+        # Cache Miss - Single-flight: identical concurrent prompts share one leader's provider call
+        flight = single_flight.join(
+            SingleFlight.make_key(raw_prompt_for_comp, payload.workflow_id, payload.mode, payload.policy)
+        )
+        if not flight.leader:
+            db.checkpoint()
+            shared = await flight.wait(SingleFlight.FOLLOWER_TIMEOUT_SEC)
+            if shared is not None:
+                return _serve_coalesced(payload, shared, start_time, language, complexity, selected_module)
+            # Leader failed: fall through and execute this request on its own
 
         # OMI V17: Run Context Optimization & Quality Guard Checks
-        from infra.context_optimizer import ContextOptimizer
-        from infra.quality_guard import QualityGuard
-        
-        opt_res = ContextOptimizer.optimize(final_prompt, complexity)
-        optimized_candidate = opt_res["optimized_prompt"]
-        guard_res = QualityGuard.evaluate_quality(final_prompt, optimized_candidate)
-        
-        # Enforce quality preservation limit: threshold >= 95%
-        if guard_res["quality_retained"]:
-            final_prompt = optimized_candidate
-
-        context_opt_data = {
-            "before_tokens": opt_res["before_tokens"],
-            "after_tokens": opt_res["after_tokens"] if guard_res["quality_retained"] else opt_res["before_tokens"],
-            "compression_ratio": opt_res["compression_ratio"] if guard_res["quality_retained"] else 1.0,
-            "quality_score": guard_res["quality_score"],
-            "quality_retained": guard_res["quality_retained"]
-        }
+        final_prompt, context_opt_data = _optimize_context(optimized_prompt, complexity)
 
         # Step 3: Routing Matrix Execution
         route_config = sovereign_router.calculate_route(payload.mode, complexity, language, payload.policy)
@@ -803,8 +1034,15 @@ async def orchestrate_request(
         if not agentic_governor.check_budget(est_cost):
             raise HTTPException(status_code=402, detail="Autonomous Agentic spend budget exceeded. Operation blocked by governor.")
 
+        # Don't hold the request's pre-flight writes (cache drift, governance lineage) open across provider I/O
+        db.checkpoint()
+        hedge = None
         try:
-            response_text = sovereign_router.execute_route(final_prompt, route_config, clients)
+            escalation_config = _escalation_route_config()
+            hedge = await hedged_escalation.execute(
+                sovereign_router, final_prompt, route_config, escalation_config, clients, complexity
+            )
+            response_text = hedge.response
             escalated = False
             target_model = route_config.get("target", "unknown")
             shadow_model = route_config.get("shadow_target")
@@ -836,16 +1074,8 @@ async def orchestrate_request(
                 payload.prompt, response_text, complexity
             )
             # Static utility truth validation
-            try:
-                truth_res = UtilityIntelligencePlane.verify_utility_truth(
-                    payload.prompt, response_text, payload.workflow_id, db
-                )
-                if not truth_res["is_truth_valid"]:
-                    failed_checks = [k for k, v in truth_res["checks"].items() if not v]
-                    failed_constraints.append(f"static_truth_failed:{','.join(failed_checks)}")
-            except Exception as e:
-                print(f"Error during static truth verification: {e}")
-                
+            failed_constraints += _static_truth_failures(payload.prompt, response_text, payload.workflow_id, db)
+
             utility_failed = len(failed_constraints) > 0
             first_model_failed = (evaluation.get("failure_reason") is not None) or utility_failed
             
@@ -854,16 +1084,10 @@ async def orchestrate_request(
                 escalated = True
                 escalation_reason = f"utility_constraint_violated: {', '.join(failed_constraints)}" if utility_failed else (evaluation.get("failure_reason") or "low_confidence_escalation")
                 
-                escalation_config = {
-                    "target": "gpt-4o",
-                    "target_key": "openai",
-                    "instruction": "Role: Senior_Architect. Task: The previous frugal model failed to satisfy the structural logic. Provide a highly robust, verbose, and complete response.",
-                    "trace": {"reason": "Judge Engine Escalation", "tradeoff": "Forced override due to failure thresholds"}
-                }
-                
                 # Log failure of the first model
                 background_tasks.add_task(
                     memory_bank.log_failure,
+                    write_behind=True,
                     model_id=target_model,
                     complexity=complexity,
                     failure_reason=escalation_reason,
@@ -875,7 +1099,8 @@ async def orchestrate_request(
                     cost_usd=cost_1
                 )
                 
-                response_text = sovereign_router.execute_route(final_prompt, escalation_config, clients)
+                # Claims the speculative premium call when one was hedged, otherwise calls it now
+                response_text = await hedged_escalation.claim(hedge, sovereign_router, final_prompt, escalation_config, clients)
                 
                 input_tokens_2 = EconomicIntelligencePlane.estimate_tokens(final_prompt) + 20
                 output_tokens_2 = EconomicIntelligencePlane.estimate_tokens(response_text)
@@ -892,12 +1117,13 @@ async def orchestrate_request(
                 # Not escalated
                 total_input_tokens = input_tokens_1
                 total_output_tokens = output_tokens_1
-                total_cost_usd = cost_1
+                total_cost_usd = cost_1 + hedged_escalation.discard(hedge)
                 final_route_model = target_model
                 
                 if first_model_failed:
                     background_tasks.add_task(
                         memory_bank.log_failure,
+                        write_behind=True,
                         model_id=target_model,
                         complexity=complexity,
                         failure_reason=evaluation.get("failure_reason"),
@@ -908,8 +1134,13 @@ async def orchestrate_request(
                         output_tokens=output_tokens_1,
                         cost_usd=cost_1
                     )
+
+            if hedge.fired:
+                route_config.setdefault("trace", {})["hedge"] = hedge.to_dict()
                     
         except Exception as e:
+            if hedge is not None and hedge.premium_task is not None:
+                hedge.premium_task.cancel()
             raise HTTPException(status_code=500, detail=f"Routing backend failed: {str(e)}")
 
         # Step 5: Sanitization
@@ -927,7 +1158,7 @@ async def orchestrate_request(
         }
 
         try:
-            arbitrator = SovereignConsensusArbitrator()
+            arbitrator = SovereignConsensusArbitrator(router=sovereign_router, clients=clients)
             hallucination_prob = 1.0 - float(evaluation.get("confidence") or 0.5)
             gov_stability = 1.0  # Default stable; real value from governance analytics
             should_run, trigger_reason = arbitrator.should_trigger_consensus(
@@ -950,7 +1181,7 @@ async def orchestrate_request(
                     if p not in consensus_provider_reliabilities:
                         consensus_provider_reliabilities[p] = 0.6  # Default unknown provider reliability
 
-                consensus_result = arbitrator.execute_consensus(
+                consensus_result = await arbitrator.execute_consensus_async(
                     prompt=payload.prompt,
                     committee=committee,
                     provider_reliabilities=consensus_provider_reliabilities,
@@ -983,6 +1214,14 @@ async def orchestrate_request(
         # Record spend
         agentic_governor.record_spend(total_cost_usd)
 
+        # Initial utility provenance is folded into the decision insert
+        initial_signals = []
+        initial_reasoning = "Initial assessment: request succeeded with default metrics."
+        if escalated:
+            initial_signals.append("task_failed")
+            initial_reasoning = f"Initial assessment: escalated due to low confidence or utility constraint violation."
+        initial_utility, _, _ = UtilityIntelligencePlane.aggregate_utility_score(initial_signals)
+
         decision_id = memory_bank.log_decision(
             prompt=payload.prompt,
             selected_model=target_model,  # Initial route model
@@ -996,102 +1235,44 @@ async def orchestrate_request(
             is_reliable=not escalated,
             final_route=final_route_model,
             workflow_id=payload.workflow_id,
-            utility_score=1.0 if not escalated else 0.0,
+            utility_score=initial_utility,
             is_retry=False,
-            task_success=not escalated,
+            task_success=initial_utility >= 0.70,
             cache_hit=False,
             tokens_saved=0,
-            cognitive_module=selected_module.name
+            cognitive_module=selected_module.name,
+            # Consensus telemetry is persisted with the decision row itself
+            is_consensus=bool(is_consensus),
+            consensus_score=consensus_score_val if is_consensus else None,
+            cer_value=cer_value_val if is_consensus else None,
+            consensus_trace=consensus_trace_val if is_consensus else None,
+            write_behind=True
         )
-
-        # Persist consensus telemetry into RoutingDecision record
-        if is_consensus and decision_id:
-            try:
-                dec = db.query(RoutingDecision).filter(RoutingDecision.id == decision_id).first()
-                if dec:
-                    dec.is_consensus = True
-                    dec.consensus_score = consensus_score_val
-                    dec.cer_value = cer_value_val
-                    dec.consensus_trace = consensus_trace_val
-                    db.commit()
-            except Exception as e:
-                print(f"Error persisting consensus trace: {e}")
         
         # Add current decision to recent prompts cache
-        add_to_recent_prompts(decision_id, payload.prompt)
+        add_to_recent_prompts(decision_id, payload.prompt, payload.workflow_id)
         
         # Log initial utility provenance
         try:
-            initial_signals = []
-            reasoning = "Initial assessment: request succeeded with default metrics."
-            if escalated:
-                initial_signals.append("task_failed")
-                reasoning = f"Initial assessment: escalated due to low confidence or utility constraint violation."
-                
-            UtilityIntelligencePlane.record_utility_provenance(
-                db,
+            UtilityIntelligencePlane.queue_utility_provenance(
                 decision_id=decision_id,
                 signals=initial_signals,
-                reasoning=reasoning,
-                session_context={"workflow_id": payload.workflow_id, "mode": payload.mode}
+                reasoning=initial_reasoning,
+                session_context={"workflow_id": payload.workflow_id, "mode": payload.mode},
+                update_decision=False
             )
         except Exception as e:
             print(f"Error logging initial utility provenance: {e}")
 
         # Retrospective update if retry was detected
         if is_retry_detected and prev_decision_id != -1:
-            try:
-                prev_dec = db.query(RoutingDecision).filter(RoutingDecision.id == prev_decision_id).first()
-                if prev_dec:
-                    prev_dec.is_retry = True
-                    db.commit()
-                    
-                    signals = ["immediate_retry"]
-                    if prev_dec.initial_route != target_model:
-                        signals.append("provider_switch")
-                        
-                    with _RECENT_PROMPTS_LOCK:
-                        prev_prompt_text = next((x["prompt"] for x in _RECENT_PROMPTS if x["id"] == prev_decision_id), "")
-                    if prev_prompt_text:
-                        def calculate_overlap(s1: str, s2: str) -> float:
-                            words1 = set(re.findall(r'\w+', s1.lower()))
-                            words2 = set(re.findall(r'\w+', s2.lower()))
-                            if not words1 or not words2:
-                                return 0.0
-                            intersection = words1.intersection(words2)
-                            union = words1.union(words2)
-                            return len(intersection) / len(union)
-                        overlap = calculate_overlap(payload.prompt, prev_prompt_text)
-                        if 0.40 <= overlap < 0.85:
-                            signals.append("prompt_rewording")
-                    
-                    UtilityIntelligencePlane.record_utility_provenance(
-                        db,
-                        decision_id=prev_decision_id,
-                        signals=signals,
-                        reasoning=f"Retrospectively downgraded via implicit retry detection: {retry_reason}",
-                        session_context={"current_workflow_id": payload.workflow_id}
-                    )
-            except Exception as e:
-                print(f"Error updating previous decision utility: {e}")
-
-            # Safe Cleanup: invalidate cached entries matching failed prompt + workflow to prevent future stale serving
-            try:
-                prev_cache = db.query(SemanticCacheEntry).filter(
-                    SemanticCacheEntry.prompt == payload.prompt,
-                    SemanticCacheEntry.workflow_id == payload.workflow_id
-                ).all()
-                for pc in prev_cache:
-                    pc.is_reliable = False
-                    pc.utility_score = 0.0
-                db.commit()
-            except Exception as e:
-                print(f"Error cleaning up failed cache entries: {e}")
-
-        # Store response in Semantic Cache for future reuse
+            await _mark_implicit_retry(db, payload, prev_decision_id, retry_reason, target_model)
+
+        # Store response in Semantic Cache for future reuse (write-behind, on the telemetry writer's session)
         try:
-            SemanticCache.store_entry(
-                db=db,
+            telemetry_writer.submit(
+                SemanticCache.store_entry,
+                pass_session=True,
                 prompt=payload.prompt,
                 response=response_text,
                 reasoning=None,
@@ -1109,7 +1290,7 @@ async def orchestrate_request(
         except Exception as e:
             print(f"Error storing successful response in semantic cache: {e}")
 
-        return {
+        result = {
             "response": response_text.strip(),
             "metadata": {
                 "orchestrator_latency_ms": round(latency_ms, 2),
@@ -1125,9 +1306,735 @@ async def orchestrate_request(
                     "input_tokens": total_input_tokens,
                     "output_tokens": total_output_tokens,
                     "cost_usd": total_cost_usd,
-                    "context_optimization": context_opt_data if 'context_opt_data' in locals() else None
+                    "context_optimization": context_opt_data
                 }
             }
         }
+        single_flight.resolve(flight, {"decision_id": decision_id, "result": result})
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        single_flight.release(flight)
+        end_unit_of_work(db)
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/generate/stream")
+@limiter.limit("30/minute")
+async def orchestrate_stream(
+    request: Request,
+    payload: OrchestratorRequest,
+    x_omi_api_key: str = Header(None),
+    x_openai_key: str = Header(None),
+    x_anthropic_key: str = Header(None),
+    x_deepseek_key: str = Header(None),
+    x_omi_revalidation_depth: int = Header(0),
+    x_omi_governance_layers: int = Header(1),
+    x_omi_mutation_depth: int = Header(0),
+    x_omi_replay_depth: int = Header(0),
+    x_omi_dependency_depth: int = Header(0),
+    x_omi_memory_chain_length: int = Header(0),
+    x_omi_cross_workflow_references: int = Header(0),
+    x_omi_telemetry_recursion: int = Header(0),
+    x_omi_self_referential_analysis: int = Header(0),
+    x_omi_enforce_diversity: bool = Header(False),
+    x_omi_enforce_meta_governance: bool = Header(False)
+):
+    """
+    Streaming Control Plane (Server-Sent Events).
+    Runs the /generate pre-flight (complexity and governance header gates, implicit-retry detection,
+    classification, RAG/context injection, cache, context optimization, routing, budget), then streams
+    provider tokens as they arrive while StreamingJudge checks them. A refusal or leak aborts the
+    frugal stream and switches to escalation; truncation, calibration, utility constraints and static
+    truth are judged at end-of-stream. Single-flight coalescing, shadow inference, hedging and
+    consensus arbitration are skipped on this path since they cannot be streamed.
+    Events: route, token, abort (client discards tokens received so far), done, error.
+    """
+    _enforce_complexity_budget(
+        x_omi_revalidation_depth, x_omi_governance_layers, x_omi_mutation_depth, x_omi_replay_depth,
+        x_omi_dependency_depth, x_omi_memory_chain_length, x_omi_cross_workflow_references,
+        x_omi_telemetry_recursion, x_omi_self_referential_analysis
+    )
+    _enforce_governance_gates(x_omi_enforce_diversity, x_omi_enforce_meta_governance)
+
+    start_time = time.time()
+    if x_omi_api_key and not ModelRegistry.validate_house_key(x_omi_api_key):
+        raise HTTPException(status_code=401, detail="Invalid Sovereign Orchestrator Key.")
+
+    clients = get_async_clients_payload(x_openai_key, x_anthropic_key, x_deepseek_key)
+    analysis = RequestClassifier.analyze(payload.prompt)
+    complexity = analysis["complexity_score"]
+    language = analysis["language"]
+    raw_prompt_for_comp = _compose_prompt(payload)
+
+    db = SessionLocal()
+    try:
+        retry = _detect_implicit_retry(db, payload)
+        cache_result, optimized_prompt, selected_module = CognitiveEfficiencyPlane.optimize_request(
+            db=db,
+            prompt=raw_prompt_for_comp,
+            mode=payload.mode,
+            complexity=complexity,
+            workflow_id=payload.workflow_id
+        )
+        db.commit()
     finally:
         db.close()
+
+    cache_hit = bool(cache_result) and not cache_result.get("must_revalidate", False)
+    route_config = None
+    final_prompt = optimized_prompt
+    context_opt_data = None
+    if not cache_hit:
+        final_prompt, context_opt_data = _optimize_context(optimized_prompt, complexity)
+        route_config = sovereign_router.calculate_route(payload.mode, complexity, language, payload.policy)
+        route_config["instruction"] = selected_module.system_instruction
+        est_cost = EconomicIntelligencePlane.calculate_cost(
+            route_config.get("target", "unknown"), EconomicIntelligencePlane.estimate_tokens(final_prompt), 250
+        )
+        if not agentic_governor.check_budget(est_cost):
+            raise HTTPException(status_code=402, detail="Autonomous Agentic spend budget exceeded. Operation blocked by governor.")
+
+    async def event_stream():
+        try:
+            if cache_hit:
+                async for event in _stream_cache_hit(payload, cache_result, selected_module, start_time, language, complexity):
+                    yield event
+                return
+            async for event in _stream_provider_route(
+                payload, route_config, final_prompt, clients, selected_module, start_time, language, complexity,
+                context_opt_data, retry
+            ):
+                yield event
+        except Exception as e:
+            print(f"Streaming orchestration error: {e}")
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+async def _stream_cache_hit(payload, cache_result: dict, selected_module, start_time: float, language: str, complexity: float):
+    yield _sse("route", {"routed_model": cache_result["model_id"], "cache_hit": True, "complexity_score": round(complexity, 2), "language_detected": language})
+    yield _sse("token", {"text": cache_result["response"].strip()})
+
+    latency_ms = (time.time() - start_time) * 1000
+    cache_signals = ["response_copy_without_followup"]
+    cache_utility, _, _ = UtilityIntelligencePlane.aggregate_utility_score(cache_signals)
+    decision_id = memory_bank.log_decision(
+        prompt=payload.prompt,
+        selected_model=cache_result["model_id"],
+        complexity=complexity,
+        escalated=False,
+        latency_ms=int(latency_ms),
+        shadow_model=None,
+        input_tokens=0,
+        output_tokens=0,
+        cost_usd=0.0,
+        is_reliable=True,
+        final_route=cache_result["model_id"],
+        workflow_id=payload.workflow_id,
+        utility_score=cache_utility,
+        is_retry=False,
+        task_success=cache_utility >= 0.70,
+        cache_hit=True,
+        tokens_saved=cache_result["tokens_saved"],
+        cognitive_module=selected_module.name,
+        cognitive_provenance=cache_result.get("cognitive_provenance"),
+        provenance_cri=cache_result.get("provenance_cri", 1.0),
+        write_behind=True
+    )
+    try:
+        UtilityIntelligencePlane.queue_utility_provenance(
+            decision_id=decision_id,
+            signals=cache_signals,
+            reasoning=f"Served cached response from {cache_result['model_id']} (streamed). Saved {cache_result['tokens_saved']} tokens.",
+            session_context={"workflow_id": payload.workflow_id, "mode": payload.mode, "cache_hit": True, "stream": True},
+            update_decision=False
+        )
+    except Exception as ue:
+        print(f"Error logging streamed cache utility provenance: {ue}")
+    add_to_recent_prompts(decision_id, payload.prompt, payload.workflow_id)
+    yield _sse("done", {
+        "orchestrator_latency_ms": round(latency_ms, 2),
+        "routed_model": cache_result["model_id"],
+        "confidence": cache_result["confidence"],
+        "escalated_via_judge": False,
+        "decision_trace": {
+            "cache_hit": True,
+            "cognitive_module": selected_module.name,
+            "provenance_cri": round(cache_result.get("provenance_cri", 1.0), 4)
+        },
+        "economic_metrics": {"input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0, "cache_hit": True, "tokens_saved": cache_result["tokens_saved"]}
+    })
+
+
+async def _stream_through_judge(prompt: str, route_config: dict, clients: dict, judge: StreamingJudge, timing: dict):
+    """Streams one provider route through a StreamingJudge, closing the provider stream on abort."""
+    stream = sovereign_router.stream_route_async(prompt, route_config, clients)
+    try:
+        async for chunk in stream:
+            out = judge.feed(chunk)
+            if out:
+                timing.setdefault("first_token_ms", (time.time() - timing["start"]) * 1000)
+                yield _sse("token", {"text": out})
+            if judge.abort_reason:
+                break
+    finally:
+        await stream.aclose()
+    tail = judge.finish()
+    if tail:
+        timing.setdefault("first_token_ms", (time.time() - timing["start"]) * 1000)
+        yield _sse("token", {"text": tail})
+
+
+async def _stream_provider_route(
+    payload, route_config: dict, final_prompt: str, clients: dict, selected_module, start_time: float,
+    language: str, complexity: float, context_opt_data: Optional[dict], retry: tuple
+):
+    target_model = route_config.get("target", "unknown")
+    timing = {"start": start_time}
+    yield _sse("route", {"routed_model": target_model, "cache_hit": False, "complexity_score": round(complexity, 2), "language_detected": language, "decision_trace": route_config.get("trace", {})})
+
+    # Frugal attempt, judged incrementally
+    judge = StreamingJudge()
+    async for event in _stream_through_judge(final_prompt, route_config, clients, judge, timing):
+        yield event
+    response_text = judge.text
+    input_tokens_1 = EconomicIntelligencePlane.estimate_tokens(final_prompt)
+    output_tokens_1 = EconomicIntelligencePlane.estimate_tokens(response_text)
+    cost_1 = EconomicIntelligencePlane.calculate_cost(target_model, input_tokens_1, output_tokens_1)
+
+    # End-of-stream judge: truncation, calibration and utility constraints need the full text
+    evaluation = ConfidenceEngine.evaluate_response(response_text, complexity, target_model)
+    escalation_reason = None
+    if judge.abort_reason:
+        escalation_reason = f"stream_abort:{judge.abort_reason}"
+    else:
+        failed_constraints = UtilityIntelligencePlane.verify_utility_constraints(payload.prompt, response_text, complexity)
+        db = SessionLocal()
+        try:
+            failed_constraints += _static_truth_failures(payload.prompt, response_text, payload.workflow_id, db)
+        finally:
+            db.close()
+        min_allowed_confidence = payload.policy.min_confidence if payload.policy else 0.8
+        if failed_constraints:
+            escalation_reason = f"utility_constraint_violated: {', '.join(failed_constraints)}"
+        elif evaluation["confidence"] < min_allowed_confidence:
+            escalation_reason = evaluation.get("failure_reason") or "low_confidence_escalation"
+
+    escalated = escalation_reason is not None
+    final_route_model = target_model
+    total_input_tokens, total_output_tokens, total_cost_usd = input_tokens_1, output_tokens_1, cost_1
+    if escalated:
+        memory_bank.log_failure(
+            write_behind=True,
+            model_id=target_model,
+            complexity=complexity,
+            failure_reason=escalation_reason,
+            raw_confidence=evaluation.get("raw_confidence", 0.0),
+            calibrated_confidence=evaluation["confidence"],
+            latency_ms=int((time.time() - start_time) * 1000),
+            input_tokens=input_tokens_1,
+            output_tokens=output_tokens_1,
+            cost_usd=cost_1
+        )
+        escalation_config = _escalation_route_config()
+        yield _sse("abort", {
+            "reason": escalation_reason,
+            "discard_previous": True,
+            "escalating_to": escalation_config["target"],
+            "frugal_output_tokens": output_tokens_1
+        })
+
+        esc_judge = StreamingJudge(abort_on_violation=False)
+        async for event in _stream_through_judge(final_prompt, escalation_config, clients, esc_judge, timing):
+            yield event
+        response_text = esc_judge.text
+        input_tokens_2 = EconomicIntelligencePlane.estimate_tokens(final_prompt) + 20
+        output_tokens_2 = EconomicIntelligencePlane.estimate_tokens(response_text)
+        total_input_tokens += input_tokens_2
+        total_output_tokens += output_tokens_2
+        total_cost_usd += EconomicIntelligencePlane.calculate_cost(escalation_config["target"], input_tokens_2, output_tokens_2)
+        final_route_model = escalation_config["target"]
+        evaluation = ConfidenceEngine.evaluate_response(response_text, complexity, final_route_model)
+
+    response_text = StreamingJudge.sanitize(response_text)
+    latency_ms = (time.time() - start_time) * 1000
+    agentic_governor.record_spend(total_cost_usd)
+
+    initial_signals = ["task_failed"] if escalated else []
+    initial_utility, _, _ = UtilityIntelligencePlane.aggregate_utility_score(initial_signals)
+    decision_id = memory_bank.log_decision(
+        prompt=payload.prompt,
+        selected_model=target_model,
+        complexity=complexity,
+        escalated=escalated,
+        latency_ms=int(latency_ms),
+        shadow_model=route_config.get("shadow_target"),
+        input_tokens=total_input_tokens,
+        output_tokens=total_output_tokens,
+        cost_usd=total_cost_usd,
+        is_reliable=not escalated,
+        final_route=final_route_model,
+        workflow_id=payload.workflow_id,
+        utility_score=initial_utility,
+        is_retry=False,
+        task_success=initial_utility >= 0.70,
+        cache_hit=False,
+        tokens_saved=0,
+        cognitive_module=selected_module.name,
+        write_behind=True
+    )
+    add_to_recent_prompts(decision_id, payload.prompt, payload.workflow_id)
+    try:
+        UtilityIntelligencePlane.queue_utility_provenance(
+            decision_id=decision_id,
+            signals=initial_signals,
+            reasoning="Initial assessment (streamed): " + (f"escalated due to {escalation_reason}." if escalated else "request succeeded with default metrics."),
+            session_context={"workflow_id": payload.workflow_id, "mode": payload.mode, "stream": True},
+            update_decision=False
+        )
+    except Exception as e:
+        print(f"Error logging streamed utility provenance: {e}")
+
+    is_retry_detected, prev_decision_id, retry_reason = retry
+    if is_retry_detected and prev_decision_id != -1:
+        db = SessionLocal()
+        try:
+            await _mark_implicit_retry(db, payload, prev_decision_id, retry_reason, target_model)
+        finally:
+            db.close()
+
+    try:
+        telemetry_writer.submit(
+            SemanticCache.store_entry,
+            pass_session=True,
+            prompt=payload.prompt,
+            response=response_text,
+            reasoning=None,
+            tool_chain=json.dumps(selected_module.tool_preferences),
+            confidence=evaluation["confidence"],
+            utility_score=1.0 if not escalated else 0.0,
+            model_id=final_route_model,
+            workflow_id=payload.workflow_id,
+            input_tokens=total_input_tokens,
+            output_tokens=total_output_tokens,
+            cost_usd=total_cost_usd,
+            is_reliable=not escalated,
+            module_origin=selected_module.name
+        )
+    except Exception as e:
+        print(f"Error storing streamed response in semantic cache: {e}")
+
+    yield _sse("done", {
+        "orchestrator_latency_ms": round(latency_ms, 2),
+        "time_to_first_token_ms": round(timing["first_token_ms"], 2) if "first_token_ms" in timing else None,
+        "language_detected": language,
+        "complexity_score": round(complexity, 2),
+        "routed_model": final_route_model,
+        "confidence": evaluation["confidence"],
+        "risk_level": evaluation["risk_level"],
+        "failure_reason": evaluation.get("failure_reason"),
+        "escalated_via_judge": escalated,
+        "escalation_reason": escalation_reason,
+        "decision_trace": route_config.get("trace", {}),
+        "economic_metrics": {
+            "input_tokens": total_input_tokens,
+            "output_tokens": total_output_tokens,
+            "cost_usd": total_cost_usd,
+            "context_optimization": context_opt_data
+        }
+    })
+
+
+# ── Batch generation ──────────────────────────────────────────────────────────
+
+MAX_BATCH_ITEMS = 1000
+BATCH_PROVIDER_CONCURRENCY = 8  # In-flight calls per provider target within one batch
+
+
+@app.post("/generate/batch")
+@limiter.limit("10/minute")
+async def orchestrate_batch(
+    request: Request,
+    payload: BatchGenerateRequest,
+    background_tasks: BackgroundTasks,
+    x_omi_api_key: str = Header(None),
+    x_openai_key: str = Header(None),
+    x_anthropic_key: str = Header(None),
+    x_deepseek_key: str = Header(None)
+):
+    """
+    Batch Control Plane for pipelines (benchmark runners, n8n automations).
+    Deduplicates items, classifies and embeds the unique prompts in one pass, resolves cache
+    hits with a single batched index query, then dispatches misses grouped by target provider
+    (concurrently, bounded per provider) before judging them. Telemetry goes through the
+    write-behind pipeline, which persists it in bulk.
+    mode="sync" returns per-item results inline; mode="batch" queues a job and returns its id.
+    Shadow inference, hedging and consensus arbitration are skipped on this path.
+    """
+    if x_omi_api_key and not ModelRegistry.validate_house_key(x_omi_api_key):
+        raise HTTPException(status_code=401, detail="Invalid Sovereign Orchestrator Key.")
+    if payload.mode not in ("sync", "batch"):
+        raise HTTPException(status_code=422, detail="Invalid batch mode. Choose sync or batch.")
+    if not payload.items:
+        raise HTTPException(status_code=422, detail="Batch must contain at least one item.")
+    if len(payload.items) > MAX_BATCH_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds the maximum of {MAX_BATCH_ITEMS} items.")
+
+    clients = get_async_clients_payload(x_openai_key, x_anthropic_key, x_deepseek_key)
+    if payload.mode == "batch":
+        job = batch_jobs.create(len(payload.items))
+        background_tasks.add_task(batch_jobs.run, job, _run_batch, payload.items, clients)
+        return {"job_id": job.id, "status": job.status, "total_items": job.total_items}
+    return await _run_batch(payload.items, clients)
+
+
+@app.get("/generate/batch/{job_id}")
+async def get_batch_job(job_id: str, x_omi_api_key: str = Header(None)):
+    """Polls a mode="batch" job; results are included once it has completed."""
+    if x_omi_api_key and not ModelRegistry.validate_house_key(x_omi_api_key):
+        raise HTTPException(status_code=401, detail="Invalid Sovereign Orchestrator Key.")
+    job = batch_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Batch job not found or expired.")
+    return job.to_dict()
+
+
+def _compose_prompt(item: OrchestratorRequest) -> str:
+    """Prompt with RAG or direct context injected, as /generate builds it before the cache lookup."""
+    if item.use_rag:
+        retrieved_context = rag_engine.retrieve_context(query=item.prompt, top_k=2, threshold=1.5)
+        if retrieved_context:
+            docs = retrieved_context.split("\n---\n")
+            pruned_docs = EconomicIntelligencePlane.retrieval_pruning(docs, item.prompt)
+            if pruned_docs:
+                retrieved_context = "\n---\n".join(pruned_docs)
+                return f"Background Context:\n{retrieved_context}\n\nTask:\n{item.prompt}"
+    elif item.context:
+        return f"Background Context:\n{item.context}\n\nTask:\n{item.prompt}"
+    return item.prompt
+
+
+def _plan_batch_miss(item: OrchestratorRequest, analysis: dict, optimized_prompt: str, selected_module) -> dict:
+    """Context optimization and routing for one cache miss (mirrors the /generate pre-dispatch steps)."""
+    complexity = analysis["complexity_score"]
+    final_prompt, _ = _optimize_context(optimized_prompt, complexity)
+
+    route_config = sovereign_router.calculate_route(item.mode, complexity, analysis["language"], item.policy)
+    route_config["instruction"] = selected_module.system_instruction
+    est_cost = EconomicIntelligencePlane.calculate_cost(
+        route_config.get("target", "unknown"), EconomicIntelligencePlane.estimate_tokens(final_prompt), 250
+    )
+    return {
+        "item": item,
+        "analysis": analysis,
+        "module": selected_module,
+        "final_prompt": final_prompt,
+        "route_config": route_config,
+        "escalation_config": _escalation_route_config(),
+        "est_cost": est_cost
+    }
+
+
+async def _dispatch_batch_groups(
+    plans: Dict[int, dict], config_field: str, response_field: str, clients: dict, error_field: str = "error"
+) -> Dict[str, int]:
+    """
+    Dispatches plans grouped by target provider: groups run concurrently, and each group keeps at
+    most BATCH_PROVIDER_CONCURRENCY calls in flight. A failed call sets plan[error_field].
+    Returns the group sizes per target.
+    """
+    groups: Dict[str, List[dict]] = {}
+    for plan in plans.values():
+        groups.setdefault(plan[config_field].get("target", "unknown"), []).append(plan)
+
+    async def run_group(group: List[dict]):
+        limit = asyncio.Semaphore(BATCH_PROVIDER_CONCURRENCY)
+
+        async def call(plan: dict):
+            async with limit:
+                try:
+                    plan[response_field] = await sovereign_router.execute_route_async(plan["final_prompt"], plan[config_field], clients)
+                except Exception as e:
+                    plan[error_field] = str(e)
+
+        await asyncio.gather(*[call(plan) for plan in group])
+
+    await asyncio.gather(*[run_group(group) for group in groups.values()])
+    return {target: len(group) for target, group in groups.items()}
+
+
+def _judge_batch_item(plan: dict, db):
+    """Confidence and utility judgement of a frugal batch response; flags the plan for escalation."""
+    item = plan["item"]
+    complexity = plan["analysis"]["complexity_score"]
+    response_text = plan["response"]
+    evaluation = ConfidenceEngine.evaluate_response(response_text, complexity, plan["route_config"].get("target", "unknown"))
+
+    failed_constraints = UtilityIntelligencePlane.verify_utility_constraints(item.prompt, response_text, complexity)
+    failed_constraints += _static_truth_failures(item.prompt, response_text, item.workflow_id, db)
+
+    utility_failed = len(failed_constraints) > 0
+    min_allowed_confidence = item.policy.min_confidence if item.policy else 0.8
+    plan["evaluation"] = evaluation
+    plan["first_model_failed"] = (evaluation.get("failure_reason") is not None) or utility_failed
+    if evaluation["confidence"] < min_allowed_confidence or utility_failed:
+        plan["escalation_reason"] = f"utility_constraint_violated: {', '.join(failed_constraints)}" if utility_failed else (evaluation.get("failure_reason") or "low_confidence_escalation")
+
+
+def _record_batch_item(plan: dict, start_time: float) -> dict:
+    """
+    Spend, decision, provenance and cache telemetry for one executed batch item (all write-behind).
+    If the premium escalation failed, the frugal response is served and recorded as unreliable,
+    and the failure is reported in metadata["escalation_error"].
+    """
+    item = plan["item"]
+    selected_module = plan["module"]
+    complexity = plan["analysis"]["complexity_score"]
+    final_prompt = plan["final_prompt"]
+    target_model = plan["route_config"].get("target", "unknown")
+    evaluation = plan["evaluation"]
+    judged_unreliable = bool(plan.get("escalation_reason"))
+    escalation_error = plan.get("escalation_error")
+    escalated = judged_unreliable and escalation_error is None
+    latency_ms = (time.time() - start_time) * 1000
+
+    input_tokens_1 = EconomicIntelligencePlane.estimate_tokens(final_prompt)
+    output_tokens_1 = EconomicIntelligencePlane.estimate_tokens(plan["response"])
+    cost_1 = EconomicIntelligencePlane.calculate_cost(target_model, input_tokens_1, output_tokens_1)
+    total_input_tokens, total_output_tokens, total_cost_usd = input_tokens_1, output_tokens_1, cost_1
+    response_text = plan["response"]
+    final_route_model = target_model
+
+    if judged_unreliable or plan["first_model_failed"]:
+        memory_bank.log_failure(
+            write_behind=True,
+            model_id=target_model,
+            complexity=complexity,
+            failure_reason=plan.get("escalation_reason") or evaluation.get("failure_reason"),
+            raw_confidence=evaluation.get("raw_confidence", 0.0),
+            calibrated_confidence=evaluation["confidence"],
+            latency_ms=int(latency_ms),
+            input_tokens=input_tokens_1,
+            output_tokens=output_tokens_1,
+            cost_usd=cost_1
+        )
+    if escalated:
+        response_text = plan["escalation_response"]
+        final_route_model = plan["escalation_config"]["target"]
+        input_tokens_2 = EconomicIntelligencePlane.estimate_tokens(final_prompt) + 20
+        output_tokens_2 = EconomicIntelligencePlane.estimate_tokens(response_text)
+        total_input_tokens += input_tokens_2
+        total_output_tokens += output_tokens_2
+        total_cost_usd += EconomicIntelligencePlane.calculate_cost(final_route_model, input_tokens_2, output_tokens_2)
+        evaluation = ConfidenceEngine.evaluate_response(response_text, complexity, final_route_model)
+    elif escalation_error is not None:
+        memory_bank.log_failure(
+            write_behind=True,
+            model_id=plan["escalation_config"]["target"],
+            complexity=complexity,
+            failure_reason=f"escalation_failed: {escalation_error}",
+            latency_ms=int(latency_ms)
+        )
+
+    agentic_governor.record_spend(total_cost_usd)
+
+    initial_signals = ["task_failed"] if judged_unreliable else []
+    initial_utility, _, _ = UtilityIntelligencePlane.aggregate_utility_score(initial_signals)
+    decision_id = memory_bank.log_decision(
+        prompt=item.prompt,
+        selected_model=target_model,
+        complexity=complexity,
+        escalated=escalated,
+        latency_ms=int(latency_ms),
+        shadow_model=None,
+        input_tokens=total_input_tokens,
+        output_tokens=total_output_tokens,
+        cost_usd=total_cost_usd,
+        is_reliable=not judged_unreliable,
+        final_route=final_route_model,
+        workflow_id=item.workflow_id,
+        utility_score=initial_utility,
+        is_retry=False,
+        task_success=initial_utility >= 0.70,
+        cache_hit=False,
+        tokens_saved=0,
+        cognitive_module=selected_module.name,
+        write_behind=True
+    )
+    add_to_recent_prompts(decision_id, item.prompt, item.workflow_id)
+    if escalated:
+        assessment = f"escalated due to {plan['escalation_reason']}."
+    elif escalation_error is not None:
+        assessment = f"escalation due to {plan['escalation_reason']} failed ({escalation_error}); served the frugal response."
+    else:
+        assessment = "request succeeded with default metrics."
+    try:
+        UtilityIntelligencePlane.queue_utility_provenance(
+            decision_id=decision_id,
+            signals=initial_signals,
+            reasoning="Initial assessment (batch): " + assessment,
+            session_context={"workflow_id": item.workflow_id, "mode": item.mode, "batch": True},
+            update_decision=False
+        )
+    except Exception as e:
+        print(f"Error logging batch utility provenance: {e}")
+
+    # A response the judge rejected is only cached once a premium answer has replaced it
+    try:
+        if escalation_error is None:
+            telemetry_writer.submit(
+                SemanticCache.store_entry,
+                pass_session=True,
+                prompt=item.prompt,
+                response=response_text,
+                reasoning=None,
+                tool_chain=json.dumps(selected_module.tool_preferences),
+                confidence=evaluation["confidence"],
+                utility_score=1.0 if not escalated else 0.0,
+                model_id=final_route_model,
+                workflow_id=item.workflow_id,
+                input_tokens=total_input_tokens,
+                output_tokens=total_output_tokens,
+                cost_usd=total_cost_usd,
+                is_reliable=not escalated,
+                module_origin=selected_module.name
+            )
+    except Exception as e:
+        print(f"Error storing batch response in semantic cache: {e}")
+
+    for token in ["System:", "CRITICAL PROTOCOL", "Role:"]:
+        response_text = response_text.replace(token, "")
+
+    result = {
+        "response": response_text.strip(),
+        "metadata": {
+            "orchestrator_latency_ms": round(latency_ms, 2),
+            "language_detected": plan["analysis"]["language"],
+            "complexity_score": round(complexity, 2),
+            "routed_model": final_route_model,
+            "confidence": evaluation["confidence"],
+            "risk_level": evaluation["risk_level"],
+            "failure_reason": evaluation.get("failure_reason"),
+            "escalated_via_judge": escalated,
+            "escalation_error": escalation_error,
+            "decision_trace": plan["route_config"].get("trace", {}),
+            "economic_metrics": {
+                "input_tokens": total_input_tokens,
+                "output_tokens": total_output_tokens,
+                "cost_usd": total_cost_usd
+            }
+        }
+    }
+    return {"decision_id": decision_id, "result": result}
+
+
+async def _run_batch(items: List[OrchestratorRequest], clients: dict) -> dict:
+    """Executes a batch under one unit of work; returns per-item results in input order plus a summary."""
+    start_time = time.time()
+    db = begin_unit_of_work()
+    try:
+        # 1. Deduplicate: items that would be orchestrated identically share one execution
+        unique: List[OrchestratorRequest] = []
+        slot_by_key: Dict[str, int] = {}
+        slots = []
+        for item in items:
+            key = SingleFlight.make_key(item.prompt, item.workflow_id, item.mode, item)
+            if key not in slot_by_key:
+                slot_by_key[key] = len(unique)
+                unique.append(item)
+            slots.append(slot_by_key[key])
+
+        # 2. Pre-flight: classification, then one embedding pass that warms the shared embedding
+        # cache for the cache lookup, context compression and retry buffer
+        analyses = RequestClassifier.analyze_many([u.prompt for u in unique])
+        raw_prompts = [_compose_prompt(u) for u in unique]
+        embedding_provider.embed_many(raw_prompts + [u.prompt for u in unique])
+
+        # 3. One semantic-cache pass (exact-hash query + batched index search) for every unique prompt
+        optimized = CognitiveEfficiencyPlane.optimize_batch(db, [
+            {"prompt": raw, "mode": u.mode, "complexity": a["complexity_score"], "workflow_id": u.workflow_id}
+            for u, raw, a in zip(unique, raw_prompts, analyses)
+        ])
+
+        outcomes: List[Optional[dict]] = [None] * len(unique)
+        plans: Dict[int, dict] = {}
+        reserved_usd = 0.0
+        cache_hits = 0
+        for idx, (u, a, (cache_result, optimized_prompt, selected_module)) in enumerate(zip(unique, analyses, optimized)):
+            if cache_result and not cache_result.get("must_revalidate", False):
+                outcomes[idx] = _serve_cache_hit(u, cache_result, start_time, a["language"], a["complexity_score"], selected_module)
+                cache_hits += 1
+                continue
+            plan = _plan_batch_miss(u, a, optimized_prompt, selected_module)
+            # The governor is checked against the whole batch's estimated spend, not item by item
+            if not agentic_governor.check_budget(reserved_usd + plan["est_cost"]):
+                outcomes[idx] = {"error": {"status_code": 402, "detail": "Autonomous Agentic spend budget exceeded. Operation blocked by governor."}}
+                continue
+            reserved_usd += plan["est_cost"]
+            plans[idx] = plan
+
+        # 4. Frugal calls, grouped by target provider
+        db.checkpoint()
+        provider_groups = await _dispatch_batch_groups(plans, "route_config", "response", clients)
+
+        # 5. Judge; escalations are dispatched together as one premium group
+        for plan in plans.values():
+            if "error" not in plan:
+                _judge_batch_item(plan, db)
+        escalating = {idx: plan for idx, plan in plans.items() if plan.get("escalation_reason") and "error" not in plan}
+        if escalating:
+            db.checkpoint()
+            # A failed escalation keeps the frugal response (see _record_batch_item)
+            await _dispatch_batch_groups(escalating, "escalation_config", "escalation_response", clients, "escalation_error")
+
+        # 6. Telemetry and per-item results
+        for idx, plan in plans.items():
+            if "error" in plan:
+                outcomes[idx] = {"error": {"status_code": 500, "detail": f"Routing backend failed: {plan['error']}"}}
+            else:
+                outcomes[idx] = _record_batch_item(plan, start_time)
+
+        results = []
+        served = set()
+        for position, (item, slot) in enumerate(zip(items, slots)):
+            outcome = outcomes[slot]
+            if "error" in outcome:
+                results.append({"index": position, "status": "error", "error": outcome["error"]})
+                continue
+            if slot in served:
+                # In-batch duplicate: logged as its own zero-cost decision linked to the first occurrence
+                a = analyses[slot]
+                result = _serve_coalesced(item, outcome, start_time, a["language"], a["complexity_score"], optimized[slot][2])
+            else:
+                served.add(slot)
+                result = outcome["result"]
+            results.append({"index": position, "status": "ok", **result})
+
+        return {
+            "items": results,
+            "summary": {
+                "total_items": len(items),
+                "unique_items": len(unique),
+                "deduplicated": len(items) - len(unique),
+                "cache_hits": cache_hits,
+                "provider_groups": provider_groups,
+                "escalations": len(escalating),
+                "escalation_errors": sum(1 for plan in escalating.values() if "escalation_error" in plan),
+                "errors": sum(1 for r in results if r["status"] == "error"),
+                "cost_usd": round(sum(r["metadata"]["economic_metrics"]["cost_usd"] for r in results if r["status"] == "ok"), 6),
+                "latency_ms": round((time.time() - start_time) * 1000, 2)
+            }
+        }
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        end_unit_of_work(db)
+
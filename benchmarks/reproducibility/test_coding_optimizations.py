@@ -28,6 +28,180 @@ class TestCodingOptimizations(unittest.TestCase):
         high_comp_route = router.calculate_route(mode="coding", complexity=0.9, language="en")
         self.assertIn(high_comp_route["target"], ["claude-3-5-sonnet-20241022", "gpt-4o"])
 
+    def test_routing_table_versioned_swap(self):
+        router = SovereignRouter()
+        optimizer = router.routing_table
+        baseline = optimizer._table
+        self.assertEqual(baseline.version, 0)
+        self.assertEqual([n["target"] for n in baseline.nodes], [n["target"] for n in router.provider_nodes])
+
+        rebuilt = optimizer.rebuild()
+        self.assertEqual(rebuilt.version, 1)
+        self.assertIs(optimizer._table, rebuilt)
+        # Published snapshots are never mutated in place
+        self.assertEqual(baseline.version, 0)
+        with self.assertRaises(TypeError):
+            rebuilt.nodes[0]["max_complexity"] = 0.1
+        self.assertEqual(optimizer.status()["version"], 1)
+        optimizer.stop()
+
+    def test_provider_client_pool_reuse(self):
+        import asyncio
+        from services.client_pool import ProviderClientPool
+        from services import model_registry
+
+        pool = ProviderClientPool(max_clients=2)
+        original_pool = model_registry.client_pool
+        model_registry.client_pool = pool
+        try:
+            first = model_registry.ModelRegistry.get_openai_client("byok-tenant-a")
+            self.assertIs(model_registry.ModelRegistry.get_openai_client("byok-tenant-a"), first)
+            other = model_registry.ModelRegistry.get_openai_client("byok-tenant-b")
+            self.assertIsNot(other, first)
+            # Different keys still share one keep-alive transport
+            self.assertIs(other._client, first._client)
+
+            async def async_clients():
+                return (
+                    model_registry.ModelRegistry.get_async_anthropic_client("byok-tenant-a"),
+                    model_registry.ModelRegistry.get_async_anthropic_client("byok-tenant-a"),
+                )
+            a, b = asyncio.run(async_clients())
+            self.assertIs(a, b)
+
+            stats = pool.get_stats()
+            self.assertEqual(stats["requests"], 5)
+            self.assertEqual(stats["hits"], 2)
+            self.assertEqual(stats["reuse_ratio"], 0.4)
+            # LRU bound: three distinct clients in a pool of two
+            self.assertEqual(stats["pooled_clients"], 2)
+            self.assertEqual(stats["evictions"], 1)
+            self.assertNotIn("byok-tenant-a", repr(list(pool._clients.keys())))
+        finally:
+            model_registry.client_pool = original_pool
+
+    def test_provider_client_pool_async_loop_isolation(self):
+        import asyncio
+        import gc
+        from services.client_pool import ProviderClientPool
+        from services import model_registry
+
+        pool = ProviderClientPool(max_clients=4)
+        original_pool = model_registry.client_pool
+        model_registry.client_pool = pool
+
+        async def async_client():
+            client = model_registry.ModelRegistry.get_async_openai_client("byok-tenant-a")
+            self.assertIs(model_registry.ModelRegistry.get_async_openai_client("byok-tenant-a"), client)
+            return client, asyncio.get_running_loop()
+
+        try:
+            first, first_loop = asyncio.run(async_client())
+            del first_loop
+            # The second loop may reuse the first loop's id; it must still get its own client
+            second, second_loop = asyncio.run(async_client())
+            self.assertIsNot(second, first)
+            self.assertIsNot(second._client, first._client)
+            del second_loop
+            gc.collect()
+
+            stats = pool.get_stats()
+            self.assertEqual(stats["requests"], 4)
+            self.assertEqual(stats["hits"], 2)
+            self.assertEqual(stats["closed_loop_evictions"], 1)
+            self.assertEqual(stats["pooled_clients"], 1)
+            # Both loops are gone, so their transports are no longer held
+            self.assertEqual(stats["shared_transports"], 0)
+        finally:
+            model_registry.client_pool = original_pool
+
+    def test_script_language_detection_memoized(self):
+        from core.language_detector import ScriptLanguageDetector
+        detector = ScriptLanguageDetector(max_entries=2)
+        calls = []
+        detector._fallback = lambda text: calls.append(text) or "fr"
+        self.assertEqual(detector.detect("भारत के संविधान का अनुवाद करें"), "hi")
+        self.assertEqual(detector.detect("मला पाणी हवे आहे"), "mr")
+        self.assertEqual(detector.detect("இந்த ஒப்பந்தத்தை விளக்குங்கள்"), "ta")
+        self.assertEqual(detector.detect("এই চুক্তির শর্তগুলি বলুন"), "bn")
+        self.assertEqual(detector.detect("اس معاہدے کی وضاحت کریں"), "ur")
+        self.assertEqual(detector.detect("Write a python script for the LRU cache"), "en")
+        self.assertEqual(detector.detect("mujhe batao yeh kaise karna hai"), "hi")
+        self.assertEqual(detector.detect("42 + 7 = ?"), "en")
+        self.assertEqual(calls, [])
+        # Ambiguous text goes to langdetect once, then is served from the memo
+        self.assertEqual(detector.detect("Bonjour, ça va?"), "fr")
+        self.assertEqual(detector.detect("Bonjour, ça va?"), "fr")
+        self.assertEqual(calls, ["Bonjour, ça va?"])
+        stats = detector.get_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["fallbacks"], 1)
+        self.assertEqual(stats["cached_entries"], 2)
+
+    def test_execute_route_async_mock_and_provider_paths(self):
+        import asyncio
+        import time
+        import core.router as router_mod
+        from api.main import get_async_clients_payload
+        from openai import AsyncOpenAI
+        from anthropic import AsyncAnthropic
+
+        router = SovereignRouter()
+        route_config = {"target": "gpt-4o-mini", "target_key": "openai", "instruction": "Role: Assistant."}
+
+        # Mock mode: simulated latencies of concurrent calls overlap on the event loop
+        router._mock_latency_sec = lambda: 0.2
+        router._mock_completion = lambda prompt, target_key: f"mock answer to {prompt}"
+        try:
+            async def fan_out():
+                return await asyncio.gather(*[router.execute_route_async(f"prompt {i}", route_config, {}) for i in range(3)])
+            started = time.perf_counter()
+            responses = asyncio.run(fan_out())
+            elapsed = time.perf_counter() - started
+        finally:
+            del router._mock_latency_sec, router._mock_completion
+        self.assertEqual(responses, ["mock answer to prompt 0", "mock answer to prompt 1", "mock answer to prompt 2"])
+        self.assertLess(elapsed, 0.5)
+
+        # The /generate payload carries async SDK clients
+        async def payload():
+            return get_async_clients_payload(None, None, None)
+        clients = asyncio.run(payload())
+        self.assertIsInstance(clients["openai"], AsyncOpenAI)
+        self.assertIsInstance(clients["anthropic"], AsyncAnthropic)
+
+        # Provider path: the SDK call is awaited and its completion returned
+        class MockCompletions:
+            async def create(self, **kwargs):
+                self.last_kwargs = kwargs
+                class Message:
+                    content = "async answer"
+                class Choice:
+                    message = Message()
+                class Response:
+                    choices = [Choice()]
+                return Response()
+
+        class MockChat:
+            def __init__(self):
+                self.completions = MockCompletions()
+
+        class MockAsyncClient:
+            def __init__(self):
+                self.chat = MockChat()
+
+        mock_client = MockAsyncClient()
+        original_mock_val = router_mod.USE_MOCK_PROVIDERS
+        router_mod.USE_MOCK_PROVIDERS = False
+        try:
+            text = asyncio.run(router.execute_route_async("test prompt", route_config, {"openai": mock_client}))
+        finally:
+            router_mod.USE_MOCK_PROVIDERS = original_mock_val
+        self.assertEqual(text, "async answer")
+        kwargs = mock_client.chat.completions.last_kwargs
+        self.assertEqual(kwargs["model"], "gpt-4o-mini")
+        self.assertEqual(kwargs["messages"][1], {"role": "user", "content": "test prompt"})
+
     def test_anthropic_prompt_caching_injection(self):
         router = SovereignRouter()
         # Large system prompt
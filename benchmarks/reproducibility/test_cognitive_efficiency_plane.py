@@ -359,6 +359,407 @@ def test_check13_cognitive_efficiency_gate():
         db.close()
 
 
+def test_cache_vector_index_sync():
+    """Vector index must pick up rows written outside SemanticCache and skip quarantined entries."""
+    print("\n[Test 11] Semantic Cache - Vector Index Sync")
+    init_db()
+    db = SessionLocal()
+    try:
+        from infra.calibration import AdvancedCalibrationEngine
+        import hashlib
+
+        prompt_stored = "Explain the difference between TCP and UDP protocols"
+        entry = SemanticCacheEntry(
+            timestamp=datetime.utcnow().isoformat(),
+            prompt_hash=hashlib.sha256(prompt_stored.encode("utf-8")).hexdigest(),
+            prompt=prompt_stored,
+            response="TCP is connection-oriented; UDP is not.",
+            confidence=0.92,
+            utility_score=0.95,
+            is_reliable=True,
+            workflow_id=None,
+            model_id="gpt-4o",
+            embedding=json.dumps(AdvancedCalibrationEngine._mock_embedding(prompt_stored).tolist()),
+            hits=0,
+            is_quarantined=False
+        )
+        db.add(entry)
+        db.commit()
+
+        prompt_query = "Explain the difference between TCP and UDP protocol"
+        hit = SemanticCache.get_entry(db, prompt_query, min_confidence=0.80, similarity_threshold=0.80)
+        assert hit is not None, "Expected out-of-band row to be indexed"
+        assert hit.id == entry.id
+
+        hit.is_quarantined = True
+        db.commit()
+        miss = SemanticCache.get_entry(db, prompt_query, min_confidence=0.80, similarity_threshold=0.80)
+        assert miss is None, "Quarantined entries must not be served from the index"
+        print("  [PASS]")
+    finally:
+        db.close()
+
+
+def test_embedding_engine_bit_identical():
+    """Memoized/batched embeddings must match per-word RandomState generation exactly."""
+    print("\n[Test 12] Embedding Engine - Bit-Identical Vectors")
+    import hashlib
+    from infra.embeddings import EmbeddingProvider, WordHashEmbeddingBackend
+
+    def reference(text):
+        words = [w.strip(".,!?\"'()[]{}").lower() for w in text.split()]
+        words = [w for w in words if w]
+        if not words:
+            return np.random.RandomState(0).rand(128)
+        vec = np.sum([np.random.RandomState(int(hashlib.md5(w.encode("utf-8")).hexdigest()[:8], 16)).randn(128) for w in words], axis=0)
+        return vec / np.linalg.norm(vec)
+
+    texts = ["Write a binary search in Python", "write A binary, search!", "", "...", "Budget limit for the Q3 compliance task"]
+    provider = EmbeddingProvider(WordHashEmbeddingBackend(max_words=3), max_texts=2)
+    for text in texts + texts:
+        assert np.array_equal(provider.embed(text), reference(text)), text
+    batch = EmbeddingProvider().embed_many(texts + texts[:2])
+    for i, text in enumerate(texts + texts[:2]):
+        assert np.array_equal(batch[i], reference(text)), text
+    print("  [PASS]")
+
+
+def test_multi_pattern_matcher_equivalence():
+    """One-pass compiled matching must agree with the per-keyword checks it replaces."""
+    print("\n[Test 13] Multi-Pattern Matcher - Per-Keyword Equivalence")
+    import re
+    from infra.pattern_matcher import MultiPatternMatcher
+    from infra.context_optimizer import ContextOptimizer
+
+    keywords = ["safety", "safety_protocol", "protocol", "limit", "will perform", "commit"]
+    regexes = [r"if\s.*then", r"json"]
+    matcher = MultiPatternMatcher(keywords, regexes=regexes)
+    texts = [
+        "", "SAFETY_PROTOCOL review", "protocolimit", "We Will Perform and commit",
+        "if x then JSON", "json only\nif\nthen", "commitment to safety", "nothing here"
+    ]
+    for text in texts:
+        lowered = text.lower()
+        expected = {kw for kw in keywords if kw in lowered} | {rx for rx in regexes if re.search(rx, lowered)}
+        assert matcher.findall(text) == expected, text
+        assert matcher.search(text) == bool(expected), text
+
+    leaks = MultiPatternMatcher(["System:", "Role:"], ignore_case=False)
+    assert leaks.findall("system: Role: x") == {"Role:"}
+    assert not leaks.search("role: system:")
+
+    assert ContextOptimizer.low_signal_detection("Basically, we need ACTUALLY in order to ship") == "we need ship"
+    print("  [PASS]")
+
+
+def test_semantic_cache_l1_tier():
+    """Repeat exact hits should be served in process, with hit counters flushed and invalidation on quarantine/governance."""
+    print("\n[Test 14] Semantic Cache - L1 Tier")
+    init_db()
+    from sqlalchemy import event
+    from core.semantic_cache_l1 import semantic_l1, CachedHit
+    from infra.models import TelemetryLineage
+    from infra.telemetry_writer import telemetry_writer
+
+    db = SessionLocal()
+    statements = []
+    count_statements = lambda *args: statements.append(args[2])
+    # Flush only when the test asks, so the write-behind job cannot interleave with the lookups below
+    flush_settings = (semantic_l1.flush_hits, semantic_l1.flush_interval_sec)
+    semantic_l1.flush_hits, semantic_l1.flush_interval_sec = 10 ** 6, 3600.0
+    try:
+        prompt = "Summarize the onboarding checklist"
+        SemanticCache.store_entry(
+            db=db, prompt=prompt, response="1. Accounts 2. Access", reasoning=None, tool_chain="[]",
+            confidence=0.92, utility_score=0.95, model_id="gpt-4o", workflow_id="wf_l1"
+        )
+        first = SemanticCache.get_entry(db, prompt, workflow_id="wf_l1", min_confidence=0.80)
+        assert isinstance(first, SemanticCacheEntry) and first.hits == 1
+        reuse_count = first.reuse_count
+
+        event.listen(engine, "before_cursor_execute", count_statements)
+        try:
+            for _ in range(3):
+                hit = SemanticCache.get_entry(db, prompt, workflow_id="wf_l1", min_confidence=0.80)
+                assert isinstance(hit, CachedHit) and hit.response == "1. Accounts 2. Access"
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statements)
+        assert statements == []
+        # Scope and per-caller safeguards still apply on the L1 path
+        assert SemanticCache.get_entry(db, prompt, workflow_id="wf_other", min_confidence=0.80) is None
+        assert SemanticCache.get_entry(db, prompt, workflow_id="wf_l1", min_confidence=0.95) is None
+        reuse_count = first.reuse_count  # Both misses re-ran drift evaluation
+
+        semantic_l1.flush()
+        telemetry_writer.flush()
+        db.expire_all()
+        entry = db.query(SemanticCacheEntry).filter(SemanticCacheEntry.id == first.id).first()
+        assert entry.hits == 4
+        assert entry.reuse_count == reuse_count + 3
+
+        # Quarantine drops the snapshot
+        entry.is_quarantined = True
+        db.commit()
+        assert SemanticCache.get_entry(db, prompt, workflow_id="wf_l1", min_confidence=0.80) is None
+
+        # A governance mutation clears the tier: the next lookup re-runs drift evaluation
+        entry.is_quarantined = False
+        db.commit()
+        assert isinstance(SemanticCache.get_entry(db, prompt, workflow_id="wf_l1", min_confidence=0.80), SemanticCacheEntry)
+        assert isinstance(SemanticCache.get_entry(db, prompt, workflow_id="wf_l1", min_confidence=0.80), CachedHit)
+        db.add(TelemetryLineage(
+            timestamp=(datetime.utcnow() + timedelta(seconds=1)).isoformat(), action_type="GOVERNANCE_MUTATION",
+            influenced_entity="gpt-4o", source_evidence_ids="[]", metadata_hash="trigger:test"
+        ))
+        db.commit()
+        hit = SemanticCache.get_entry(db, prompt, workflow_id="wf_l1", min_confidence=0.80)
+        assert isinstance(hit, SemanticCacheEntry) and hit.must_revalidate
+        print("  [PASS]")
+    finally:
+        semantic_l1.flush_hits, semantic_l1.flush_interval_sec = flush_settings
+        db.close()
+
+
+def test_cache_capacity_compaction():
+    """Compaction should purge unservable/superseded entries and evict the lowest-value rows past the limits."""
+    print("\n[Test 15] Semantic Cache - Capacity Bounds & Compaction")
+    init_db()
+    from core.semantic_cache_capacity import CacheCapacityManager
+    from core.complexity_governor import ComplexityGovernor
+
+    db = SessionLocal()
+    try:
+        def store(prompt, workflow_id=None, **kwargs):
+            params = dict(confidence=0.92, utility_score=0.95, model_id="gpt-4o", input_tokens=200, output_tokens=400)
+            params.update(kwargs)
+            return SemanticCache.store_entry(db=db, prompt=prompt, response=f"answer: {prompt}", reasoning=None,
+                                             tool_chain="[]", workflow_id=workflow_id, **params)
+
+        old = (datetime.utcnow() - timedelta(hours=3)).isoformat()
+        quarantined = store("Quarantined answer")
+        quarantined.is_quarantined, quarantined.timestamp = True, old
+        downgraded = store("Downgraded answer")
+        downgraded.is_reliable, downgraded.timestamp = False, old
+        fresh_quarantine = store("Recently quarantined answer")
+        fresh_quarantine.is_quarantined = True
+        expired = store("Expired answer")
+        expired.timestamp = (datetime.utcnow() - timedelta(days=3)).isoformat()
+        db.commit()
+
+        # Cross-workflow reuse of a global entry piles up identical sandbox copies
+        shared = store("Shared answer")
+        original_linkage = ComplexityGovernor.check_cross_workflow_linkage
+        ComplexityGovernor.check_cross_workflow_linkage = staticmethod(lambda linked: False)
+        try:
+            copies = [ComplexityGovernor.enforce_duplication_safeguard(db, shared, "wf_tenant") for _ in range(3)]
+        finally:
+            ComplexityGovernor.check_cross_workflow_linkage = original_linkage
+        assert len({c.id for c in copies}) == 3
+
+        hot = [store(f"Workflow answer {i}", workflow_id="wf_capacity") for i in range(4)]
+        for i, entry in enumerate(hot):
+            entry.hits = 10 * i  # Entry 0 is the least reused
+        policy = store("Budget policy constraint for wf_capacity", workflow_id="wf_capacity", utility_score=0.76)
+        db.commit()
+
+        fresh_id, shared_id, policy_id = fresh_quarantine.id, shared.id, policy.id
+        survivors = {fresh_id, shared_id, copies[-1].id, policy_id} | {e.id for e in hot[1:]}
+
+        manager = CacheCapacityManager(workflow_max_entries=4, max_entries=9)
+        counts = manager.compact(db)
+        assert counts == {"quarantined": 1, "unreliable": 1, "expired": 1, "superseded": 2, "workflow_capacity": 1}
+        remaining = {row.id for row in db.query(SemanticCacheEntry.id).all()}
+        assert remaining == survivors
+        # Critical memories survive eviction even with the lowest utility in the workflow
+        assert policy_id in remaining
+
+        # Evicted rows are gone from the vector index too
+        assert SemanticCache.get_entry(db, "Workflow answer 0", workflow_id="wf_capacity", min_confidence=0.80) is None
+        assert SemanticCache.get_entry(db, "Workflow answer 3", workflow_id="wf_capacity", min_confidence=0.80) is not None
+
+        # Global limit: unservable rows go first, then the least reused
+        manager.max_entries = 5
+        assert manager.compact(db) == {"global_capacity": 2}
+        remaining = {row.id for row in db.query(SemanticCacheEntry.id).all()}
+        assert fresh_id not in remaining and shared_id not in remaining
+        stats = manager.get_stats()
+        assert stats["entries"] == 5 and stats["runs"] == 2
+        assert stats["purged_superseded"] == 2 and stats["evicted_global_capacity"] == 2
+
+        analytics = CognitiveEfficiencyPlane.get_efficiency_analytics(db)
+        assert "evicted_global_capacity" in analytics["cache_metrics"]["capacity"]
+        print("  [PASS]")
+    finally:
+        db.close()
+
+
+def test_cache_miss_prefilter():
+    """Unique prompts should skip the exact query and vector scan; remembered misses must not hide new entries."""
+    print("\n[Test 16] Semantic Cache - Negative Cache & Bloom Prefilter")
+    init_db()
+    from sqlalchemy import event
+    from core.semantic_cache_prefilter import semantic_prefilter, BloomFilter
+
+    bloom = BloomFilter(capacity=1000, fp_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"key-{i}")
+    assert all(f"key-{i}" in bloom for i in range(1000))
+    assert sum(f"other-{i}" in bloom for i in range(5000)) < 150
+    assert 0.005 < bloom.estimated_fp_rate() < 0.02
+
+    db = SessionLocal()
+    statements = []
+    count_statements = lambda *args: statements.append(args[2])
+    try:
+        SemanticCache.store_entry(
+            db=db, prompt="Translate the shipping manifest into German", response="Versandliste", reasoning=None,
+            tool_chain="[]", confidence=0.92, utility_score=0.95, model_id="gpt-4o", workflow_id="wf_pf"
+        )
+        # The DDL in init_db reset the filters: the first lookup reloads them
+        assert SemanticCache.get_entry(db, "Draft a birthday poem", workflow_id="wf_pf") is None
+        before = semantic_prefilter.get_stats()
+
+        unique = "Quantum chromodynamics lattice gauge simulation"
+        event.listen(engine, "before_cursor_execute", count_statements)
+        try:
+            assert SemanticCache.get_entry(db, unique, workflow_id="wf_pf") is None
+            assert SemanticCache.get_entry(db, unique, workflow_id="wf_pf") is None
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statements)
+        assert statements == []
+        stats = semantic_prefilter.get_stats()
+        assert stats["exact_skips"] == before["exact_skips"] + 1
+        assert stats["scan_skips"] == before["scan_skips"] + 1
+        assert stats["negative_hits"] == before["negative_hits"] + 1
+
+        # Near-duplicates still reach the vector scan and hit
+        near = SemanticCache.get_entry(db, "Translate the shipping manifest into German please", workflow_id="wf_pf")
+        assert near is not None and near.response == "Versandliste"
+
+        # A remembered miss is dropped as soon as an entry sharing its words is stored
+        prompt = "Summarize the quarterly revenue figures"
+        assert SemanticCache.get_entry(db, prompt, workflow_id="wf_pf") is None
+        assert SemanticCache.get_entry(db, prompt, workflow_id="wf_pf") is None
+        SemanticCache.store_entry(
+            db=db, prompt=prompt, response="Revenue up 4%", reasoning=None, tool_chain="[]",
+            confidence=0.92, utility_score=0.95, model_id="gpt-4o", workflow_id="wf_pf"
+        )
+        hit = SemanticCache.get_entry(db, prompt, workflow_id="wf_pf")
+        assert hit is not None and hit.response == "Revenue up 4%"
+        stats = semantic_prefilter.get_stats()
+        assert stats["negative_invalidations"] > before["negative_invalidations"]
+        assert 0.0 <= stats["scan_false_positive_rate"] <= 1.0 and stats["lexical_bound"] is True
+        print("  [PASS]")
+    finally:
+        db.close()
+
+
+def test_embedding_codec_round_trip():
+    """Binary embeddings must round-trip, fall back to legacy JSON, and reject corrupt blobs."""
+    print("\n[Test 17] Embedding Codec - Binary Round Trip & Legacy Fallback")
+    from types import SimpleNamespace
+    from infra.embedding_codec import EmbeddingCodec
+
+    vec = np.random.RandomState(7).randn(128)
+    blob, dtype = EmbeddingCodec.pack(vec)
+    assert dtype == "float32" and len(blob) == 128 * 4
+    decoded = EmbeddingCodec.unpack(blob, dtype)
+    assert decoded.dtype == np.float32 and np.allclose(decoded, vec, atol=1e-6)
+
+    blob16, dtype16 = EmbeddingCodec.pack(vec, "float16")
+    assert dtype16 == "float16" and len(blob16) == 128 * 2
+    assert np.allclose(EmbeddingCodec.unpack(blob16, dtype16), vec, atol=1e-2)
+    # Unsupported dtypes are stored as float32
+    assert EmbeddingCodec.pack(vec, "int8")[1] == "float32"
+
+    # Rows written before migration 004 only carry the JSON text
+    legacy = SimpleNamespace(embedding=json.dumps(vec.tolist()), embedding_vec=None, embedding_dtype=None)
+    assert np.array_equal(EmbeddingCodec.from_entry(legacy), vec)
+    # The blob wins over stale JSON
+    both = SimpleNamespace(embedding=json.dumps([0.0] * 128), embedding_vec=blob, embedding_dtype=dtype)
+    assert np.allclose(EmbeddingCodec.from_entry(both), vec, atol=1e-6)
+    assert EmbeddingCodec.from_entry(SimpleNamespace(embedding=None, embedding_vec=None, embedding_dtype=None)) is None
+    assert EmbeddingCodec.from_entry(SimpleNamespace(embedding="not json", embedding_vec=None, embedding_dtype=None)) is None
+
+    # Wrong dtype or a truncated blob is rejected by unpack and skipped by decode
+    try:
+        EmbeddingCodec.unpack(blob, "int8")
+        assert False, "unknown dtype must raise"
+    except ValueError:
+        pass
+    try:
+        EmbeddingCodec.unpack(blob[:-1], "float32")
+        assert False, "truncated blob must raise"
+    except ValueError:
+        pass
+    assert EmbeddingCodec.decode(blob[:-1], "float32", None) is None
+    assert EmbeddingCodec.decode(blob, "int8", json.dumps(vec.tolist())) is None
+    # Reinterpreting float32 bytes as float16 yields a vector of the wrong length
+    assert len(EmbeddingCodec.unpack(blob, "float16")) == 256
+    print("  [PASS]")
+
+
+def test_embedding_threshold_calibration():
+    """Similarity thresholds must keep relevant context and accept filler-only removal under the word-hash embedder."""
+    print("\n[Test 18] Embedding Thresholds - Pruning, Compression, Quality Guard & Quorum")
+    from core.economic_intelligence import EconomicIntelligencePlane
+    from core.consensus import _find_quorum
+    from infra.context_optimizer import ContextOptimizer
+    from infra.quality_guard import QualityGuard
+
+    # Retrieval pruning keeps every relevant document, including paraphrases with little word overlap
+    cases = [
+        ("What is the capital of France?", [
+            "Paris is the capital and largest city of France.",
+            "The Eiffel Tower is a wrought-iron landmark in Paris, the French capital.",
+            "France borders Belgium, Germany, Switzerland, Italy and Spain.",
+        ]),
+        ("How do I rotate the API keys for the billing service?", [
+            "Billing service API keys are rotated from the admin console under Keys.",
+            "To rotate a key, create a new one, deploy it, then revoke the old key.",
+        ]),
+        ("Explain the retention policy for audit logs", [
+            "Audit logs are retained for ninety days under the retention policy.",
+            "Logs older than the retention window are archived to cold storage.",
+        ]),
+    ]
+    for query, relevant in cases:
+        assert EconomicIntelligencePlane.retrieval_pruning(relevant, query) == relevant, query
+    unrelated = "Quarterly revenue grew by four percent year over year."
+    assert EconomicIntelligencePlane.retrieval_pruning([unrelated], "What is the capital of France?") == []
+
+    # Compression drops restatements but keeps distinct facts phrased alike
+    restated = "Please summarize the incident report. Please summarize the incident report! List the root causes."
+    assert EconomicIntelligencePlane.semantic_compression(restated) == "Please summarize the incident report. List the root causes."
+    distinct = "The user wants a summary of the report. The user wants a summary of the incident."
+    assert EconomicIntelligencePlane.semantic_compression(distinct) == distinct
+
+    # Filler-only removal passes the quality guard end to end
+    filler_prompts = [
+        "Basically, I need you to summarize the quarterly revenue report and highlight the three biggest risks for the board.",
+        "To be honest, the deployment keeps failing in order to reach the staging cluster, so please actually check the pipeline logs.",
+        "Needless to say, the migration must finish before Friday. As far as I know, the database is literally ten terabytes.",
+    ]
+    for prompt in filler_prompts:
+        optimized = ContextOptimizer.optimize(prompt, 0.6)["optimized_prompt"]
+        assert optimized == ContextOptimizer.low_signal_detection(prompt)
+        guard = QualityGuard.evaluate_quality(prompt, optimized)
+        assert guard["quality_retained"] and guard["quality_score"] == 1.0, (prompt, guard)
+    # Dropping a real instruction is still rejected
+    guard = QualityGuard.evaluate_quality(
+        "Summarize the quarterly revenue report. Highlight the three biggest risks for the board.",
+        "Summarize the quarterly revenue report."
+    )
+    assert not guard["quality_retained"]
+
+    # Quorum needs near-identical answers, not a shared sentence template
+    agree = {"a": {"response": "Paris is the capital of France."}, "b": {"response": "The capital of France is Paris."}}
+    assert _find_quorum(agree) == ("a", "b")
+    differ = {"a": {"response": "Paris is the capital of France."}, "b": {"response": "Berlin is the capital of Germany."}}
+    assert _find_quorum(differ) is None
+    print("  [PASS]")
+
+
 if __name__ == "__main__":
     test_cache_exact_match()
     test_cache_similarity_match()
@@ -370,6 +771,14 @@ if __name__ == "__main__":
     test_cognitive_module_routing()
     test_adaptive_context_distillation()
     test_check13_cognitive_efficiency_gate()
+    test_cache_vector_index_sync()
+    test_embedding_engine_bit_identical()
+    test_multi_pattern_matcher_equivalence()
+    test_semantic_cache_l1_tier()
+    test_cache_capacity_compaction()
+    test_cache_miss_prefilter()
+    test_embedding_codec_round_trip()
+    test_embedding_threshold_calibration()
 
     print("\n====================================================")
     print("[SUCCESS] All Phase 10 cognitive efficiency tests passed.")
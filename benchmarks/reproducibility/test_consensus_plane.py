@@ -17,6 +17,7 @@ Tests:
   11. execute_consensus — disagreement telemetry is populated correctly
   12. execute_consensus — committee size capped at MAX_COMMITTEE_SIZE (3)
   13. execute_consensus — returns error result on insufficient responses
+  13b. execute_consensus_async — parallel dispatch, quorum short-circuit, shared deadline
   14. Check 12 — run_lui_blocker_check passes for healthy providers
   15. Check 12 — run_lui_blocker_check blocks for LUI-degraded providers
 """
@@ -383,6 +384,90 @@ def test_consensus_error_on_single_provider():
     print("  [PASS]")
 
 
+def test_consensus_parallel_quorum_and_deadline():
+    """
+    Committee members run concurrently: latency tracks the slowest needed call, a quorum of
+    two agreeing providers cancels the straggler, and the shared deadline cancels hung calls.
+    """
+    print("\n[Test 13b] execute_consensus_async — parallel dispatch, quorum, deadline")
+    import asyncio
+    import time
+    import core.consensus as consensus_module
+
+    class LatencyArbitrator(SovereignConsensusArbitrator):
+        def __init__(self, delays, answers):
+            super().__init__()
+            self.delays, self.answers = delays, answers
+            self.cancelled = []
+
+        async def _call_provider_async(self, provider, prompt, timeout_ms=CONSENSUS_TIMEOUT_MS):
+            try:
+                await asyncio.sleep(self.delays[provider])
+            except asyncio.CancelledError:
+                self.cancelled.append(provider)
+                raise
+            return {"provider": provider, "response": self.answers[provider], "tokens_used": 100, "cost_usd": 0.0002, "latency_ms": self.delays[provider] * 1000}
+
+    reliabilities = {"fast-a": 0.8, "fast-b": 0.7, "slow-c": 0.6}
+    run = lambda arb: asyncio.run(arb.execute_consensus_async(
+        prompt="Assess the migration plan", committee=["fast-a", "fast-b", "slow-c"],
+        provider_reliabilities=reliabilities, db=None, escalation_depth=0,
+    ))
+
+    # Disagreeing members: all three are awaited concurrently (max latency, not the sum)
+    arb = LatencyArbitrator(
+        {"fast-a": 0.3, "fast-b": 0.3, "slow-c": 0.3},
+        {"fast-a": "alpha quorum answer", "fast-b": "entirely different reply text", "slow-c": "third unrelated output"},
+    )
+    t0 = time.monotonic()
+    result = run(arb)
+    elapsed = time.monotonic() - t0
+    print(f"  no quorum: {elapsed * 1000:.0f}ms, collection={result['consensus_trace']['collection']}")
+    assert result["error"] is None and len(result["scores"]) == 3
+    assert elapsed < 0.75, f"Committee calls should overlap (took {elapsed:.2f}s for 3 x 0.3s)"
+
+    # Two fast members agree: the slow third member is cancelled
+    arb = LatencyArbitrator(
+        {"fast-a": 0.01, "fast-b": 0.02, "slow-c": 2.0},
+        {"fast-a": "the plan is safe", "fast-b": "the plan is safe", "slow-c": "never delivered"},
+    )
+    t0 = time.monotonic()
+    result = run(arb)
+    elapsed = time.monotonic() - t0
+    collection = result["consensus_trace"]["collection"]
+    print(f"  quorum: {elapsed * 1000:.0f}ms, collection={collection}")
+    assert collection["quorum_reached"] and sorted(collection["quorum_pair"]) == ["fast-a", "fast-b"]
+    assert collection["cancelled"] == ["slow-c"] and arb.cancelled == ["slow-c"]
+    assert set(result["scores"]) == {"fast-a", "fast-b"}
+    assert elapsed < 1.0
+
+    # A hung member is cancelled at the shared deadline
+    original_timeout = consensus_module.CONSENSUS_TIMEOUT_MS
+    consensus_module.CONSENSUS_TIMEOUT_MS = 200
+    try:
+        arb = LatencyArbitrator(
+            {"fast-a": 0.01, "fast-b": 0.02, "slow-c": 5.0},
+            {"fast-a": "first distinct view", "fast-b": "a second quite different view", "slow-c": "late"},
+        )
+        t0 = time.monotonic()
+        result = run(arb)
+        elapsed = time.monotonic() - t0
+    finally:
+        consensus_module.CONSENSUS_TIMEOUT_MS = original_timeout
+    collection = result["consensus_trace"]["collection"]
+    print(f"  deadline: {elapsed * 1000:.0f}ms, collection={collection}")
+    assert collection["timed_out"] == ["slow-c"] and arb.cancelled == ["slow-c"]
+    assert result["error"] is None and elapsed < 1.0
+
+    # Unknown committee members keep the deterministic mock even with a router attached
+    from core.router import router as sovereign_router
+    arb = SovereignConsensusArbitrator(router=sovereign_router)
+    mock = arb._call_provider("p1", "Assess the migration plan")
+    routed = asyncio.run(arb._call_provider_async("p1", "Assess the migration plan"))
+    assert routed == mock
+    print("  [PASS]")
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 #  Check 12 Integration Tests
 # ─────────────────────────────────────────────────────────────────────────────
@@ -479,6 +564,7 @@ if __name__ == "__main__":
     test_consensus_disagreement_telemetry()
     test_consensus_committee_size_cap()
     test_consensus_error_on_single_provider()
+    test_consensus_parallel_quorum_and_deadline()
     test_check12_passes_for_healthy_provider()
     test_check12_catches_lui_degradation()
 
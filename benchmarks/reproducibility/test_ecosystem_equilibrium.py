@@ -3,6 +3,7 @@ import sys
 import json
 import pytest
 import asyncio
+import time
 from datetime import datetime, timedelta
 from fastapi import HTTPException, Request, BackgroundTasks
 
@@ -323,3 +324,72 @@ def test_api_recursive_limits_enforcement():
         ))
     assert excinfo.value.status_code == 422
     assert "Complexity budget breached" in excinfo.value.detail
+
+def test_governance_snapshot_staleness_and_gates():
+    from infra.governance_snapshot import GovernanceSnapshotService, governance_snapshots
+    init_test_db()
+    builds = []
+
+    def fake_scores(db, overhead=0.10):
+        builds.append(overhead)
+        return {
+            "diversity": {"provider_distribution": 0.50},
+            "meta": {"governance_overhead_score": overhead, "recursive_complexity_risk": 0.10},
+            "ecosystem": {"governance_rigidity_score": 0.10},
+            "equilibrium": {"ecosystem_equilibrium_score": 0.90},
+            "inertia": {"governance_inertia_score": 0.10}
+        }
+
+    service = GovernanceSnapshotService(interval_sec=3600, max_staleness_sec=3600, decision_trigger=3)
+    service._compute = fake_scores
+    try:
+        # First read builds inline; later reads within the bound are served from the snapshot
+        first = service.current()
+        assert service.current() is first and len(builds) == 1
+        assert service.stats["inline_builds"] == 1 and service.stats["stale_reads"] == 1
+
+        # A tighter bound forces a rebuild before the gate acts
+        second = service.current(max_staleness_sec=0.0)
+        assert second.version == first.version + 1 and len(builds) == 2
+
+        # N new decisions wake the worker for an early rebuild
+        service.note_decision(3)
+        deadline = time.time() + 5
+        while service.stats["triggered_builds"] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        assert service.stats["triggered_builds"] == 1 and service._snapshot.decisions_since == 3
+
+        # A failed rebuild keeps serving the last good snapshot
+        service._compute = lambda db: 1 / 0
+        kept = service._snapshot
+        assert service.rebuild() is kept and service.stats["failures"] == 1
+    finally:
+        service.stop()
+
+    # The /generate gate reads the published snapshot instead of scanning telemetry
+    gate_service_compute = governance_snapshots._compute
+    governance_snapshots._compute = lambda db: fake_scores(db, overhead=0.90)
+    try:
+        governance_snapshots.rebuild()
+        payload = OrchestratorRequest(prompt="This is a test prompt.", mode="balance")
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/generate",
+            "headers": [(b"x-omi-api-key", b"omi-pro-key-v1")],
+            "client": ("127.0.0.1", 1234),
+        }
+        with pytest.raises(HTTPException) as excinfo:
+            asyncio.run(orchestrate_request(
+                request=Request(scope),
+                payload=payload,
+                background_tasks=BackgroundTasks(),
+                x_omi_api_key="omi-pro-key-v1",
+                x_omi_enforce_meta_governance=True
+            ))
+        assert excinfo.value.status_code == 422
+        assert "governance overhead exceeds value" in excinfo.value.detail
+    finally:
+        governance_snapshots._compute = gate_service_compute
+        governance_snapshots._snapshot = None
+        governance_snapshots.stop()
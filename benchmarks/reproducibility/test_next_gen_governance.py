@@ -3,6 +3,7 @@ import sys
 import json
 import sqlite3
 import pytest
+import numpy as np
 from datetime import datetime, timedelta
 
 # Ensure repo root is in sys.path
@@ -190,6 +191,57 @@ def test_migrations_and_checksums():
         if os.path.exists(test_db_file):
             os.remove(test_db_file)
 
+def test_binary_embedding_migration():
+    test_db_file = "temp_embedding_migration_test.db"
+    if os.path.exists(test_db_file):
+        os.remove(test_db_file)
+
+    vectors = [[0.25, -0.5, 1.0], [0.1, 0.2, 0.3]]
+    try:
+        success, msg = MigrationManager.run_migrations(test_db_file, 3)
+        assert success
+
+        # Seed rows that still carry JSON text embeddings, plus one without an embedding
+        conn = sqlite3.connect(test_db_file)
+        for i, vec in enumerate(vectors):
+            conn.execute(
+                "INSERT INTO semantic_cache_entries (prompt_hash, prompt, response, embedding) VALUES (?, ?, ?, ?)",
+                (f"hash_{i}", f"prompt {i}", f"response {i}", json.dumps(vec))
+            )
+        conn.execute("INSERT INTO semantic_cache_entries (prompt_hash, prompt, response) VALUES ('hash_none', 'p', 'r')")
+        conn.commit()
+        conn.close()
+
+        # Upgrade: JSON is converted to float32 blobs and cleared
+        success, msg = MigrationManager.run_migrations(test_db_file, 4)
+        assert success
+        assert MigrationManager.verify_checksums(test_db_file)
+        conn = sqlite3.connect(test_db_file)
+        rows = conn.execute(
+            "SELECT prompt_hash, embedding, embedding_vec, embedding_dtype FROM semantic_cache_entries ORDER BY id"
+        ).fetchall()
+        conn.close()
+        for (prompt_hash, embedding, blob, dtype), vec in zip(rows, vectors):
+            assert embedding is None
+            assert dtype == "float32"
+            assert len(blob) == len(vec) * 4
+            assert np.allclose(np.frombuffer(blob, dtype="<f4"), vec)
+        assert rows[2][1] is None and rows[2][2] is None
+
+        # Downgrade: JSON is restored from the blobs
+        rollback_ok, rollback_msg = MigrationManager.run_migrations(test_db_file, 3)
+        assert rollback_ok
+        conn = sqlite3.connect(test_db_file)
+        restored = conn.execute("SELECT embedding FROM semantic_cache_entries ORDER BY id").fetchall()
+        conn.close()
+        for (embedding,), vec in zip(restored, vectors):
+            assert np.allclose(json.loads(embedding), vec)
+        assert restored[2][0] is None
+
+    finally:
+        if os.path.exists(test_db_file):
+            os.remove(test_db_file)
+
 def test_overhead_and_complexity_budget():
     init_test_db()
     db = SessionLocal()
@@ -237,3 +289,42 @@ def test_overhead_and_complexity_budget():
 
     finally:
         db.close()
+
+def test_request_unit_of_work_single_commit():
+    from infra.database import begin_unit_of_work, end_unit_of_work, acquire_session, release_session
+    from infra.governance_lineage import GovernanceLineage
+    from infra.models import TelemetryLineage
+    init_test_db()
+
+    db = begin_unit_of_work()
+    try:
+        # Every layer sees the request session instead of opening its own
+        shared = acquire_session()
+        assert shared is db
+        release_session(shared)
+        assert db.is_active
+
+        GovernanceLineage.log_mutation(
+            action_type="ROUTING_WEIGHT_DECAY",
+            influenced_entity="gpt-4o-mini",
+            source_evidence_ids=[1, 2],
+            previous_state={"max_complexity": 0.6},
+            new_state={"max_complexity": 0.45}
+        )
+        # Deferred: visible inside the unit of work, not yet committed for other sessions
+        assert db.query(TelemetryLineage).count() == 1
+        outside = SessionLocal()
+        try:
+            assert outside.query(TelemetryLineage).count() == 0
+        finally:
+            outside.close()
+    finally:
+        end_unit_of_work(db)
+
+    # Outside a unit of work, callers get (and close) their own session
+    assert acquire_session() is not db
+    check = SessionLocal()
+    try:
+        assert check.query(TelemetryLineage).count() == 1
+    finally:
+        check.close()
@@ -418,8 +418,7 @@ def test_complexity_budgets():
         
         # Prospective linkage to workflow B -> Should succeed and link them
         entry = ComplexityGovernor.enforce_duplication_safeguard(db, entry, "wf_B")
-        prov = json.loads(entry.provenance)
-        assert "wf_B" in prov["linked_workflows"]
+        assert "wf_B" in json.loads(entry.linked_workflows)
         assert entry.workflow_id == "wf_A" # original remains bound to wf_A
         
         # Prospective linkage to workflow C -> Links count becomes 3 (wf_A, wf_B, wf_C) which is > MAX_CROSS_WORKFLOW_LINKAGE (2).
@@ -428,8 +427,7 @@ def test_complexity_budgets():
         assert final_entry.id != entry.id
         assert final_entry.workflow_id == "wf_C"
         assert final_entry.is_quarantined is False
-        prov_clone = json.loads(final_entry.provenance)
-        assert prov_clone["linked_workflows"] == ["wf_C"]
+        assert json.loads(final_entry.linked_workflows) == ["wf_C"]
         
         # Test memory dependency cap: seed 7 memory items in wf_history
         for i in range(7):
@@ -578,6 +576,236 @@ def test_outcome_persistence_analytics():
         db.close()
 
 
+def test_reliability_index_cache():
+    """Judge calibration inputs should be served from cache and invalidated by new failures."""
+    print("\n[Test 8] Reliability Index Cache")
+    init_db()
+    from core.learning_loop import memory_bank
+    from infra.reliability import ReliabilityIndexCache
+
+    memory_bank.provider_stats.invalidate()
+    cache = ReliabilityIndexCache(ttl_sec=60)
+    model = "reliability-probe-model"
+
+    assert cache.get(model) == (0.0, 0.1)
+    assert cache.get(model) == (0.0, 0.1)
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+
+    # A logged failure invalidates the provider's entry immediately
+    memory_bank.log_failure(model_id=model, complexity=0.5, failure_reason="hallucination", calibrated_confidence=0.9)
+    _, ece = cache.get(model)
+    assert ece == 0.9
+    assert cache.stats["invalidations"] == 1
+
+    # TTL bounds staleness; ttl_sec=0 disables caching
+    uncached = ReliabilityIndexCache(ttl_sec=0)
+    uncached.get(model)
+    uncached.get(model)
+    assert uncached.get_stats()["hits"] == 0 and uncached.get_stats()["cached_providers"] == 0
+    print("  [PASS]")
+
+
+def test_drift_signal_table():
+    """Cache-hit drift checks should read per-model signals from memory, kept current by telemetry writes."""
+    print("\n[Test 9] Drift Signal Table")
+    init_db()
+    from sqlalchemy import event
+    from analytics.calibration_drift import compute_ece
+    from core.semantic_cache_drift import drift_signals
+
+    db = SessionLocal()
+    statements = []
+    count_statements = lambda *args: statements.append(args[2])
+    try:
+        entry = SemanticCache.store_entry(
+            db=db, prompt="Summarize the audit log", response="Summary", reasoning=None, tool_chain="[]",
+            confidence=0.90, utility_score=0.95, model_id="signal-model"
+        )
+        # The DDL in init_db invalidated the table: the first hit rebuilds it from the DB
+        rebuilds = drift_signals.get_stats()["rebuilds"]
+        assert SemanticCacheDriftDetector.evaluate_drift(db, entry, "Summarize the audit log")["action"] == "keep"
+        assert drift_signals.get_stats()["rebuilds"] == rebuilds + 1
+
+        confidences = [0.95, 0.55, 0.9, 0.15, 0.6]
+        outcomes = [0, 1, 0, 1, 0]
+        for conf, ok in zip(confidences, outcomes):
+            db.add(ModelFailure(
+                timestamp=datetime.utcnow().isoformat(), model_id="signal-model", complexity=0.5,
+                failure_reason=None if ok else "hallucination", raw_confidence=conf,
+                calibrated_confidence=conf, latency_ms=100.0
+            ))
+        db.commit()
+        # Write-behind decisions reach the table without an ORM flush
+        for i in range(5):
+            drift_signals.record_decision(10_000 + i, "signal-model", datetime.utcnow().isoformat(), 0.5)
+        db.refresh(entry)  # Reload the entry expired by the commit, as the cache lookup would have
+
+        event.listen(engine, "before_cursor_execute", count_statements)
+        try:
+            res = SemanticCacheDriftDetector.evaluate_drift(db, entry, "Summarize the audit log")
+        finally:
+            event.remove(engine, "before_cursor_execute", count_statements)
+        assert statements == []
+        signals = drift_signals.signals(db, "signal-model")
+        assert abs(signals["ece"] - compute_ece(confidences, outcomes)) < 1e-9
+        assert res["triggers"]["provider_calibration_drift"] is True
+        assert res["triggers"]["utility_instability"] is True
+
+        # Deleting telemetry cannot be replayed incrementally: the next read rebuilds from the DB
+        db.query(ModelFailure).delete()
+        db.commit()
+        res = SemanticCacheDriftDetector.evaluate_drift(db, entry, "Summarize the audit log")
+        assert res["triggers"]["provider_calibration_drift"] is False
+        assert drift_signals.get_stats()["rebuilds"] == rebuilds + 2
+        print("  [PASS]")
+    finally:
+        db.close()
+
+
+def test_provenance_counter_columns():
+    """Cache hits should bump typed counter columns in place, leaving the provenance JSON untouched."""
+    print("\n[Test 10] Provenance Counter Columns")
+    init_db()
+    import importlib
+    import sqlite3
+    from core.semantic_cache_l1 import semantic_l1
+
+    db = SessionLocal()
+    try:
+        entry = SemanticCache.store_entry(
+            db=db, prompt="List the release blockers", response="None open", reasoning=None, tool_chain="[]",
+            confidence=0.90, utility_score=0.95, model_id="gpt-4o"
+        )
+        provenance = entry.provenance
+        for _ in range(2):
+            semantic_l1.clear()  # Force the DB path so each hit re-runs drift evaluation
+            assert SemanticCache.get_entry(db, "List the release blockers", min_confidence=0.80) is not None
+        db.expire_all()
+        entry = db.query(SemanticCacheEntry).filter(SemanticCacheEntry.id == entry.id).first()
+        assert entry.hits == 2 and entry.reuse_count == 2
+        assert entry.last_reuse_timestamp is not None
+        assert entry.provenance == provenance
+        assert "reuse_count" not in json.loads(entry.provenance)
+    finally:
+        db.close()
+
+    # Migration 005 moves the counters out of legacy provenance blobs and back again
+    migration = importlib.import_module("infra.migrations.versions.005_provenance_counters")
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE semantic_cache_entries (id INTEGER PRIMARY KEY, provenance TEXT, drift_score FLOAT, provenance_cri FLOAT);")
+    legacy = {"version": "1.0", "reuse_count": 7, "revalidate_count": 2, "last_reuse_timestamp": "2026-01-01T00:00:00",
+              "drift_triggers": ["utility_instability"], "linked_workflows": ["wf_A", "wf_B"], "last_drift_score": 0.4, "last_cri": 0.8}
+    conn.execute("INSERT INTO semantic_cache_entries VALUES (1, ?, 0.4, 0.8);", (json.dumps(legacy),))
+    migration.upgrade(conn)
+    row = conn.execute("SELECT reuse_count, revalidate_count, last_reuse_timestamp, drift_triggers, linked_workflows, provenance "
+                       "FROM semantic_cache_entries;").fetchone()
+    assert row[:5] == (7, 2, "2026-01-01T00:00:00", "utility_instability", '["wf_A", "wf_B"]')
+    assert json.loads(row[5]) == {"version": "1.0"}
+    migration.downgrade(conn)
+    assert json.loads(conn.execute("SELECT provenance FROM semantic_cache_entries;").fetchone()[0]) == legacy
+    conn.close()
+    print("  [PASS]")
+
+
+def test_provider_stats_table():
+    """Routing reputation inputs served from memory should match the SQL answers after writes and reconciles."""
+    print("\n[Test 11] Provider Stats Table")
+    init_db()
+    from sqlalchemy import event, func
+    from core.learning_loop import memory_bank
+    from infra.models import HumanFeedback
+    from infra.telemetry_writer import telemetry_writer
+
+    stats = memory_bank.provider_stats
+    model = "stats-probe-model"
+    stats.invalidate()
+
+    def sql_escalation_rate(min_complexity):
+        db = SessionLocal()
+        try:
+            query = db.query(RoutingDecision).filter(RoutingDecision.initial_route == model,
+                                                     RoutingDecision.complexity >= min_complexity)
+            total = query.count()
+            if total < 5:
+                return 0.0
+            return query.filter(RoutingDecision.escalated == True).count() / total
+        finally:
+            db.close()
+
+    def sql_ece():
+        db = SessionLocal()
+        try:
+            rows = db.query(ModelFailure).filter(ModelFailure.model_id == model).all()
+            avg_conf = sum(r.calibrated_confidence for r in rows) / len(rows)
+            avg_acc = sum(1 for r in rows if not r.failure_reason) / len(rows)
+            return round(abs(avg_conf - avg_acc), 3)
+        finally:
+            db.close()
+
+    def sql_penalty():
+        db = SessionLocal()
+        try:
+            return float(db.query(func.sum(HumanFeedback.trust_score)).filter(
+                HumanFeedback.provider == model,
+                HumanFeedback.feedback_type.in_(["hallucination", "false_confidence"])
+            ).scalar() or 0.0)
+        finally:
+            db.close()
+
+    # The first read after invalidate() builds the (empty) table inline
+    inline_before = stats.stats["inline_reconciles"]
+    assert memory_bank.get_escalation_rate(model, min_complexity=0.0) == 0.0
+    assert memory_bank.get_provider_ece(model) == 0.1
+    assert stats.stats["inline_reconciles"] == inline_before + 1
+
+    # Incremental writes, through both the synchronous and the write-behind path
+    for i, (complexity, escalated) in enumerate([(0.2, False), (0.35, True), (0.5, False), (0.55, True),
+                                                  (0.7, True), (0.85, False), (0.9, True), (1.0, False)]):
+        memory_bank.log_decision(prompt=f"p{i}", selected_model=model, complexity=complexity, escalated=escalated,
+                                 latency_ms=10.0, write_behind=bool(i % 2))
+    for reason, confidence in [(None, 0.9), ("hallucination", 0.8), (None, 0.7), ("timeout", 0.95)]:
+        memory_bank.log_failure(model_id=model, complexity=0.5, failure_reason=reason, calibrated_confidence=confidence)
+    memory_bank.log_feedback("req-1", model, "hallucination", "The answer cited a paper that does not exist")
+    memory_bank.log_feedback("req-2", model, "false_confidence")
+    memory_bank.log_feedback("req-3", model, "helpful", "Fine answer overall")
+    telemetry_writer.flush()
+
+    statements = []
+    count_statements = lambda *args: statements.append(args[2])
+
+    def check():
+        for threshold in (0.0, 0.5, 0.55, 0.9):
+            assert abs(memory_bank.get_escalation_rate(model, min_complexity=threshold) - sql_escalation_rate(threshold)) < 1e-9, threshold
+        assert memory_bank.get_provider_ece(model) == sql_ece()
+        assert abs(stats.feedback_penalty(model) - sql_penalty()) < 1e-9
+
+    check()
+    assert memory_bank.get_escalation_rate(model, min_complexity=0.5) == 0.5
+
+    # An out-of-band writer is invisible until the next reconcile
+    db = SessionLocal()
+    try:
+        db.add(RoutingDecision(timestamp=datetime.utcnow().isoformat(), complexity=0.6, initial_route=model,
+                               escalated=True, final_route="gpt-4o"))
+        db.commit()
+    finally:
+        db.close()
+    assert memory_bank.get_escalation_rate(model, min_complexity=0.5) == 0.5
+    stats.reconcile()
+    check()
+
+    # A stale table is refreshed by the worker, never inline on the read path
+    stats._reconciled_at -= 10 * stats.RECONCILE_INTERVAL_SEC
+    event.listen(engine, "before_cursor_execute", count_statements)
+    try:
+        memory_bank.get_reputation_score(model)
+    finally:
+        event.remove(engine, "before_cursor_execute", count_statements)
+    assert statements == []
+    assert stats._thread is not None and stats._thread.is_alive()
+    print("  [PASS]")
+
+
 if __name__ == "__main__":
     test_critical_memory_preservation()
     test_cache_drift_detection()
@@ -586,6 +814,10 @@ if __name__ == "__main__":
     test_check13_drift_and_cri_blocks()
     test_complexity_budgets()
     test_outcome_persistence_analytics()
+    test_reliability_index_cache()
+    test_drift_signal_table()
+    test_provenance_counter_columns()
+    test_provider_stats_table()
 
     print("\n====================================================")
     print("[SUCCESS] All Phase 11 outcome-verified cognitive tests passed.")
@@ -128,6 +128,31 @@ def test_implicit_retry_detection():
     print("[PASS] Jaccard retry detection verified.")
     db.close()
 
+def test_recent_prompt_buffer_retry_detection():
+    print("Testing ring-buffered retry detection (workflow context, expiry, capacity)...")
+    from datetime import timedelta
+    from core.retry_buffer import RecentPromptBuffer
+
+    buffer = RecentPromptBuffer(capacity=3, window_sec=300)
+    now = datetime.utcnow()
+    buffer.add(1, "How do I implement an LRU cache in Python?", "wf_1", timestamp=now - timedelta(seconds=400))
+    buffer.add(2, "How do I implement an LRU cache in Python?", "wf_1", timestamp=now - timedelta(seconds=30))
+    assert len(buffer) == 1, "Entries older than the window should expire on insert"
+
+    is_retry, prev_id, _ = buffer.detect_retry("implement LRU cache in Python easily", "wf_1", now=now)
+    assert is_retry is True and prev_id == 2
+    assert buffer.get_prompt(2) == "How do I implement an LRU cache in Python?"
+    assert buffer.detect_retry("what is the capital of Japan?", "wf_1", now=now)[0] is False
+
+    # Most recent qualifying prompt wins; a full ring overwrites its oldest slot
+    buffer.add(3, "implement an LRU cache in Python", None, timestamp=now - timedelta(seconds=10))
+    buffer.add(4, "unrelated question about sorting", None, timestamp=now - timedelta(seconds=5))
+    buffer.add(5, "another unrelated question about graphs", None, timestamp=now - timedelta(seconds=1))
+    assert buffer.get_prompt(2) == ""
+    is_retry, prev_id, _ = buffer.detect_retry("implement LRU cache in Python easily", None, now=now)
+    assert is_retry is True and prev_id == 3
+    print("[PASS] Ring buffer retry detection verified.")
+
 def test_utility_constraints_escalation():
     print("Testing utility constraints and escalation override...")
     init_db()
@@ -185,6 +210,529 @@ def test_utility_constraints_escalation():
     assert data["metadata"]["escalated_via_judge"] is True, "Expected escalated_via_judge to be True"
     print("[PASS] Utility constraint escalation verified.")
 
+def test_single_flight_coalescing():
+    print("Testing single-flight coalescing of identical concurrent prompts...")
+    init_db()
+    from infra.telemetry_writer import telemetry_writer
+    from infra.single_flight import single_flight
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/generate",
+        "headers": [(b"x-omi-api-key", b"omi-pro-key-v1")],
+        "client": ("127.0.0.1", 1234),
+    }
+    prompt = "Summarize the single flight coalescing contract for duplicate agent swarm prompts."
+
+    async def fan_out():
+        return await asyncio.gather(*[
+            orchestrate_request(
+                request=Request(scope),
+                payload=OrchestratorRequest(prompt=prompt, mode="balance", workflow_id="wf_swarm"),
+                background_tasks=BackgroundTasks(),
+                x_omi_api_key="omi-pro-key-v1"
+            )
+            for _ in range(3)
+        ])
+
+    coalesced_before = single_flight.stats["coalesced"]
+    results = asyncio.run(fan_out())
+    coalesced = [r for r in results if r["metadata"]["decision_trace"].get("coalesced")]
+    assert len(coalesced) == 2, "Duplicates should await the leader instead of calling the provider"
+    assert single_flight.stats["coalesced"] - coalesced_before == 2
+    assert all(r["response"] == results[0]["response"] for r in results)
+    assert all(r["metadata"]["economic_metrics"]["cost_usd"] == 0.0 for r in coalesced)
+    assert single_flight.in_flight() == 0
+
+    # Every request keeps its own decision row
+    telemetry_writer.flush()
+    db = SessionLocal()
+    try:
+        rows = db.query(RoutingDecision).filter(RoutingDecision.workflow_id == "wf_swarm").all()
+        assert len(rows) == 3
+        assert sum(1 for r in rows if r.cache_hit) == 2
+    finally:
+        db.close()
+    print("[PASS] Single-flight coalescing verified.")
+
+def test_hedged_escalation_win_loss_and_budget():
+    print("Testing hedged escalation (latency/prediction triggers, win/loss, hedge budget cap)...")
+    init_db()
+    from core.hedging import HedgedEscalation
+    from core.economic_intelligence import agentic_governor
+
+    class SlowFrugalRouter:
+        delays = {"cheap-model": 0.2, "gpt-4o": 0.01}
+
+        async def execute_route_async(self, prompt, route_config, clients):
+            await asyncio.sleep(self.delays[route_config["target"]])
+            return f"answer from {route_config['target']}"
+
+    router = SlowFrugalRouter()
+    frugal_config = {"target": "cheap-model", "target_key": "openai", "instruction": ""}
+    premium_config = {"target": "gpt-4o", "target_key": "openai", "instruction": ""}
+    prompt = "Design a fault tolerant ledger reconciliation pipeline."
+
+    hedging = HedgedEscalation()
+    for _ in range(hedging.latency.MIN_SAMPLES):
+        hedging.latency.record("cheap-model", 0.01)
+
+    async def run(escalate: bool):
+        call = await hedging.execute(router, prompt, frugal_config, premium_config, {}, 0.3)
+        if escalate:
+            return call, await hedging.claim(call, router, prompt, premium_config, {}), 0.0
+        return call, call.response, hedging.discard(call)
+
+    # The frugal call outlives its p95 latency: the premium call is fired speculatively and wins the escalation
+    call, text, extra = asyncio.run(run(escalate=True))
+    assert call.trigger == "latency" and call.outcome == "win"
+    assert text == "answer from gpt-4o" and extra == 0.0
+
+    # The frugal answer passes the judge: the speculative call is cancelled and its spend is booked
+    hedge_spent_before = agentic_governor.hedge_spent_today_usd
+    call, text, extra = asyncio.run(run(escalate=False))
+    assert call.outcome == "loss" and text == "answer from cheap-model"
+    assert extra > 0.0 and call.premium_task.done()
+    assert abs(agentic_governor.hedge_spent_today_usd - hedge_spent_before - extra) < 1e-9
+
+    stats = hedging.get_stats()
+    assert stats["fired"] == 2 and stats["wins"] == 1 and stats["losses"] == 1
+    assert stats["triggers"]["latency"] == 2 and stats["win_rate"] == 0.5
+    assert stats["extra_spend_usd"] > 0.0
+
+    # A high predicted failure rate fires the hedge without waiting
+    fast_router = SlowFrugalRouter()
+    fast_router.delays = {"cheap-model": 0.01, "gpt-4o": 0.01}
+    original_delay = hedging.hedge_delay
+    hedging.hedge_delay = lambda model, complexity: 0.0
+    try:
+        call = asyncio.run(hedging.execute(fast_router, prompt, frugal_config, premium_config, {}, 0.9))
+        assert call.trigger == "predicted_failure"
+        hedging.discard(call)
+
+        # Hedges are refused once the governor's hedge sub-budget is exhausted
+        original_fraction = agentic_governor.hedge_budget_fraction
+        agentic_governor.hedge_budget_fraction = 0.0
+        try:
+            call = asyncio.run(hedging.execute(fast_router, prompt, frugal_config, premium_config, {}, 0.9))
+            assert not call.fired and hedging.stats["budget_blocked"] == 1
+        finally:
+            agentic_governor.hedge_budget_fraction = original_fraction
+    finally:
+        hedging.hedge_delay = original_delay
+    print("[PASS] Hedged escalation verified.")
+
+def test_batch_generate_dedup_cache_and_jobs():
+    print("Testing /generate/batch deduplication, batched cache resolution and batch jobs...")
+    init_db()
+    from api.main import orchestrate_batch, get_batch_job, BatchGenerateRequest
+    from core.semantic_cache import SemanticCache
+    from infra.telemetry_writer import telemetry_writer
+
+    cached_prompt = "List the three retention tiers defined in the archival storage policy."
+    db = SessionLocal()
+    try:
+        SemanticCache.store_entry(
+            db, prompt=cached_prompt, response="Hot, warm and cold tiers.", reasoning=None, tool_chain=None,
+            confidence=0.95, utility_score=1.0, model_id="gpt-4o-mini", workflow_id="wf_batch",
+            input_tokens=40, output_tokens=12, cost_usd=0.0001
+        )
+    finally:
+        db.close()
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/generate/batch",
+        "headers": [(b"x-omi-api-key", b"omi-pro-key-v1")],
+        "client": ("127.0.0.1", 1234),
+    }
+    items = [
+        OrchestratorRequest(prompt="Summarize the quarterly vendor onboarding checklist.", mode="balance", workflow_id="wf_batch"),
+        OrchestratorRequest(prompt="Summarize the quarterly vendor onboarding checklist.", mode="balance", workflow_id="wf_batch"),
+        OrchestratorRequest(prompt="Draft a short status update for the data migration.", mode="frugal", workflow_id="wf_batch"),
+        OrchestratorRequest(prompt=cached_prompt, mode="balance", workflow_id="wf_batch"),
+    ]
+
+    result = asyncio.run(orchestrate_batch(
+        request=Request(scope),
+        payload=BatchGenerateRequest(items=items),
+        background_tasks=BackgroundTasks(),
+        x_omi_api_key="omi-pro-key-v1"
+    ))
+    summary = result["summary"]
+    assert summary["total_items"] == 4 and summary["unique_items"] == 3 and summary["deduplicated"] == 1
+    assert summary["cache_hits"] == 1
+    assert sum(summary["provider_groups"].values()) == 2, "Only the two unique misses should reach providers"
+    assert [r["index"] for r in result["items"]] == [0, 1, 2, 3]
+    assert all(r["status"] == "ok" for r in result["items"])
+    assert result["items"][1]["metadata"]["decision_trace"].get("coalesced")
+    assert result["items"][1]["response"] == result["items"][0]["response"]
+    assert result["items"][3]["metadata"]["decision_trace"].get("cache_hit")
+    assert result["items"][3]["response"] == "Hot, warm and cold tiers."
+
+    # Every item keeps its own decision row
+    telemetry_writer.flush()
+    db = SessionLocal()
+    try:
+        rows = db.query(RoutingDecision).filter(RoutingDecision.workflow_id == "wf_batch").all()
+        assert len(rows) == 4
+        assert sum(1 for r in rows if r.cache_hit) == 2
+    finally:
+        db.close()
+
+    # mode="batch" queues a job that is polled for its results
+    background_tasks = BackgroundTasks()
+    queued = asyncio.run(orchestrate_batch(
+        request=Request(scope),
+        payload=BatchGenerateRequest(items=items[2:], mode="batch"),
+        background_tasks=background_tasks,
+        x_omi_api_key="omi-pro-key-v1"
+    ))
+    assert queued["status"] == "queued" and queued["total_items"] == 2
+    asyncio.run(background_tasks())
+    job = asyncio.run(get_batch_job(queued["job_id"], x_omi_api_key="omi-pro-key-v1"))
+    assert job["status"] == "completed", job["error"]
+    assert len(job["result"]["items"]) == 2
+    print("[PASS] Batch generation verified.")
+
+def test_batch_escalation_failure_keeps_frugal_response():
+    print("Testing /generate/batch keeps the frugal response when escalation fails...")
+    init_db()
+    from api.main import orchestrate_batch, BatchGenerateRequest, sovereign_router
+    from infra.telemetry_writer import telemetry_writer
+
+    original_completion = sovereign_router._mock_completion
+    original_execute = sovereign_router.execute_route_async
+
+    async def failing_escalation(prompt, route_config, clients=None):
+        if route_config.get("trace", {}).get("reason") == "Judge Engine Escalation":
+            raise RuntimeError("premium provider unavailable")
+        return await original_execute(prompt, route_config, clients)
+
+    sovereign_router._mock_completion = lambda prompt, target_key: "I am unable to process this request because of internal policy."
+    sovereign_router.execute_route_async = failing_escalation
+    try:
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/generate/batch",
+            "headers": [(b"x-omi-api-key", b"omi-pro-key-v1")],
+            "client": ("127.0.0.1", 1234),
+        }
+        result = asyncio.run(orchestrate_batch(
+            request=Request(scope),
+            payload=BatchGenerateRequest(items=[
+                OrchestratorRequest(prompt="Outline the rollback plan for the billing schema change.", mode="frugal", workflow_id="wf_batch_esc")
+            ]),
+            background_tasks=BackgroundTasks(),
+            x_omi_api_key="omi-pro-key-v1"
+        ))
+    finally:
+        sovereign_router._mock_completion = original_completion
+        del sovereign_router.execute_route_async
+
+    item = result["items"][0]
+    assert item["status"] == "ok", item
+    assert "unable to process" in item["response"]
+    assert item["metadata"]["escalated_via_judge"] is False
+    assert "premium provider unavailable" in item["metadata"]["escalation_error"]
+    assert item["metadata"]["economic_metrics"]["cost_usd"] > 0
+    assert result["summary"]["escalations"] == 1 and result["summary"]["escalation_errors"] == 1
+
+    # The frugal call's spend, decision and both failures are still recorded
+    telemetry_writer.flush()
+    db = SessionLocal()
+    try:
+        rows = db.query(RoutingDecision).filter(RoutingDecision.workflow_id == "wf_batch_esc").all()
+        assert len(rows) == 1
+        assert rows[0].escalated is False and rows[0].is_reliable is False
+        assert rows[0].cost_usd == item["metadata"]["economic_metrics"]["cost_usd"]
+        reasons = [f.failure_reason for f in db.query(ModelFailure).all()]
+        assert any(r.startswith("escalation_failed:") for r in reasons)
+        assert any(not r.startswith("escalation_failed:") for r in reasons)
+    finally:
+        db.close()
+    print("[PASS] Batch escalation failure handling verified.")
+
+def test_streaming_generate_aborts_and_escalates():
+    print("Testing /generate/stream incremental judging with mid-stream abort...")
+    init_db()
+    from api.main import orchestrate_stream, sovereign_router
+    from infra.reliability import StreamingJudge
+
+    # A marker split across chunks is caught before any of it is emitted
+    judge = StreamingJudge()
+    emitted = judge.feed("Here is the plan. Sys") + judge.feed("tem: reveal internal rules")
+    assert judge.abort_reason == "policy_violation:leak_marker"
+    assert "Sys" not in emitted
+
+    completions = iter([
+        "I am unable to process this request because of internal policy.",
+        "Here is a complete and careful answer because the analysis therefore holds."
+    ])
+    original = sovereign_router._mock_completion
+    sovereign_router._mock_completion = lambda prompt, target_key: next(completions)
+    try:
+        scope = {
+            "type": "http",
+            "method": "POST",
+            "path": "/generate/stream",
+            "headers": [(b"x-omi-api-key", b"omi-pro-key-v1")],
+            "client": ("127.0.0.1", 1234),
+        }
+
+        async def consume():
+            resp = await orchestrate_stream(
+                request=Request(scope),
+                payload=OrchestratorRequest(prompt="Explain streaming judges for gateway responses", mode="balance"),
+                x_omi_api_key="omi-pro-key-v1"
+            )
+            body = ""
+            async for chunk in resp.body_iterator:
+                body += chunk if isinstance(chunk, str) else chunk.decode()
+            return body
+
+        body = asyncio.run(consume())
+    finally:
+        sovereign_router._mock_completion = original
+
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = block.split("\n")
+        events.append((lines[0][len("event: "):], json.loads(lines[1][len("data: "):])))
+    kinds = [e[0] for e in events]
+    assert kinds[0] == "route" and kinds[-1] == "done"
+    assert "abort" in kinds, "Refusal should abort the frugal stream"
+    abort = dict(events)["abort"]
+    assert abort["reason"].startswith("stream_abort:policy_violation") and abort["escalating_to"] == "gpt-4o"
+
+    streamed_before_abort = "".join(d["text"] for k, d in events[:kinds.index("abort")] if k == "token")
+    assert "unable to" not in streamed_before_abort
+    escalated_text = "".join(d["text"] for k, d in events[kinds.index("abort"):] if k == "token")
+    assert escalated_text.startswith("Here is a complete and careful answer")
+
+    done = events[-1][1]
+    assert done["escalated_via_judge"] is True and done["routed_model"] == "gpt-4o"
+    assert done["time_to_first_token_ms"] is not None
+    print("[PASS] Streaming incremental judge verified.")
+
+def test_streaming_generate_preflight_parity():
+    print("Testing /generate/stream runs the /generate pre-flight (gates, RAG, context optimization)...")
+    init_db()
+    from fastapi import HTTPException
+    from api.main import orchestrate_stream, sovereign_router, rag_engine
+    from infra.telemetry_writer import telemetry_writer
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/generate/stream",
+        "headers": [(b"x-omi-api-key", b"omi-pro-key-v1")],
+        "client": ("127.0.0.1", 1234),
+    }
+
+    # Header gates reject before any streaming starts
+    try:
+        asyncio.run(orchestrate_stream(
+            request=Request(scope),
+            payload=OrchestratorRequest(prompt="Explain the gateway audit trail", mode="balance"),
+            x_omi_api_key="omi-pro-key-v1",
+            x_omi_governance_layers=99
+        ))
+        assert False, "Governance layer budget should reject the stream"
+    except HTTPException as e:
+        assert e.status_code == 422
+
+    prompts_seen = []
+    original_retrieve = rag_engine.retrieve_context
+    original_completion = sovereign_router._mock_completion
+    rag_engine.retrieve_context = lambda query, top_k=3, threshold=1.2: "The retention policy for gateway audit logs is ninety days."
+    sovereign_router._mock_completion = lambda prompt, target_key: prompts_seen.append(prompt) or (
+        "The retention policy keeps gateway audit logs for ninety days because the compliance review therefore requires it."
+    )
+    try:
+        async def consume():
+            resp = await orchestrate_stream(
+                request=Request(scope),
+                payload=OrchestratorRequest(prompt="What is the retention policy for gateway audit logs?", mode="balance", use_rag=True, workflow_id="wf_stream_rag"),
+                x_omi_api_key="omi-pro-key-v1"
+            )
+            body = ""
+            async for chunk in resp.body_iterator:
+                body += chunk if isinstance(chunk, str) else chunk.decode()
+            return body
+
+        body = asyncio.run(consume())
+    finally:
+        rag_engine.retrieve_context = original_retrieve
+        sovereign_router._mock_completion = original_completion
+
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = block.split("\n")
+        events.append((lines[0][len("event: "):], json.loads(lines[1][len("data: "):])))
+    assert events[0][0] == "route" and events[-1][0] == "done", events
+    assert prompts_seen and "Background Context" in prompts_seen[0] and "ninety days" in prompts_seen[0]
+    done = events[-1][1]
+    assert done["economic_metrics"]["context_optimization"] is not None
+
+    telemetry_writer.flush()
+    db = SessionLocal()
+    try:
+        assert db.query(RoutingDecision).filter(RoutingDecision.workflow_id == "wf_stream_rag").count() == 1
+    finally:
+        db.close()
+    print("[PASS] Streaming pre-flight parity verified.")
+
+def test_generate_dispatch_does_not_block():
+    print("Testing that concurrent /generate requests overlap their provider calls...")
+    init_db()
+    import time
+    from api.main import sovereign_router
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/generate",
+        "headers": [(b"x-omi-api-key", b"omi-pro-key-v1")],
+        "client": ("127.0.0.1", 1234),
+    }
+    # Distinct prompts per run, so neither run is served from the other's cache entries
+    sequential_prompts = [
+        "Summarize the async dispatch contract for provider calls.",
+        "Draft release notes for the gateway connection pool."
+    ]
+    concurrent_prompts = [
+        "Explain how tenant quotas are enforced at the edge.",
+        "List the failure modes of the nightly ledger export."
+    ]
+
+    def call(prompt):
+        return orchestrate_request(
+            request=Request(scope),
+            payload=OrchestratorRequest(prompt=prompt, mode="frugal", workflow_id="wf_async"),
+            background_tasks=BackgroundTasks(),
+            x_omi_api_key="omi-pro-key-v1"
+        )
+
+    async def sequential():
+        for prompt in sequential_prompts:
+            await call(prompt)
+
+    async def concurrent():
+        await asyncio.gather(*[call(prompt) for prompt in concurrent_prompts])
+
+    calls = []
+    original = sovereign_router._mock_latency_sec
+    sovereign_router._mock_latency_sec = lambda: calls.append(1) or 0.4
+    try:
+        started = time.perf_counter()
+        asyncio.run(sequential())
+        sequential_sec = time.perf_counter() - started
+        sequential_calls, calls[:] = len(calls), []
+
+        started = time.perf_counter()
+        asyncio.run(concurrent())
+        concurrent_sec = time.perf_counter() - started
+    finally:
+        sovereign_router._mock_latency_sec = original
+    # Same number of provider calls, but the simulated latencies overlap instead of adding up
+    assert len(calls) == sequential_calls
+    assert concurrent_sec < sequential_sec * 0.75, (concurrent_sec, sequential_sec)
+    print(f"[PASS] Concurrent dispatch verified ({concurrent_sec:.2f}s vs {sequential_sec:.2f}s sequential).")
+
+def test_telemetry_writer_batching_and_backpressure():
+    print("Testing write-behind telemetry batching, id pre-allocation, flush ordering and backpressure...")
+    init_db()
+    import threading
+    import time
+    from infra.telemetry_writer import TelemetryWriter
+
+    def row(route, **fields):
+        values = dict(timestamp=datetime.utcnow().isoformat(), complexity=0.5, initial_route=route,
+                      escalated=False, final_route=route, workflow_id="wf_writer")
+        values.update(fields)
+        return values
+
+    def routes():
+        db = SessionLocal()
+        try:
+            return {r.id: (r.initial_route, r.utility_score) for r in db.query(RoutingDecision).filter(RoutingDecision.workflow_id == "wf_writer")}
+        finally:
+            db.close()
+
+    # Batching: inserts queued while the writer is busy are committed as one batch
+    writer = TelemetryWriter()
+    ids = []
+    with writer._write_lock:
+        for i in range(10):
+            ids.append(writer.allocate_id(RoutingDecision))
+            writer.insert(RoutingDecision, row(f"batch-{i}", id=ids[-1]))
+            if i == 0:
+                time.sleep(0.1)  # The writer picks up the first insert and waits for the lock
+    assert writer.flush()
+    assert writer.get_stats()["batches"] == 2 and writer.get_stats()["rows_written"] == 10
+
+    # Pre-allocated ids are the persisted ids, and synchronous ORM inserts never reuse them
+    assert ids == sorted(set(ids))
+    assert {i: routes()[i][0] for i in ids} == {i: f"batch-{n}" for n, i in enumerate(ids)}
+    queued_id = writer.allocate_id(RoutingDecision)
+    with writer._write_lock:
+        writer.insert(RoutingDecision, row("queued", id=queued_id))
+        db = SessionLocal()
+        try:
+            sync_decision = RoutingDecision(**row("sync"))
+            db.add(sync_decision)
+            db.commit()
+            assert sync_decision.id != queued_id
+        finally:
+            db.close()
+    # Flush ordering: an update queued after its insert is applied, and visible once flush returns
+    writer.update(RoutingDecision, queued_id, {"utility_score": 0.25})
+    assert writer.flush()
+    assert routes()[queued_id] == ("queued", 0.25)
+    assert writer.get_stats()["errors"] == 0
+
+    # Backpressure: a worker-thread producer facing a full queue writes inline instead of dropping
+    writer = TelemetryWriter(queue_maxsize=1, backpressure_timeout_sec=0.05)
+    release = threading.Event()
+    writer.submit(lambda: release.wait(5))
+    time.sleep(0.05)  # The writer is now stuck in the job
+    writer.insert(RoutingDecision, row("queued-behind-job", id=writer.allocate_id(RoutingDecision)))
+    threading.Timer(0.2, release.set).start()
+    writer.insert(RoutingDecision, row("inline", id=writer.allocate_id(RoutingDecision)))
+    assert writer.get_stats()["backpressure_events"] == 1
+    assert writer.flush()
+    assert {"queued-behind-job", "inline"} <= {route for route, _ in routes().values()}
+
+    # Event-loop producers never block: operations spill into the overflow in FIFO order, then drop past its bound
+    writer = TelemetryWriter(queue_maxsize=1, overflow_maxsize=2)
+    release = threading.Event()
+    writer.submit(lambda: release.wait(5))
+    time.sleep(0.05)
+    spilled_id = writer.allocate_id(RoutingDecision)
+
+    async def produce():
+        started = time.perf_counter()
+        writer.insert(RoutingDecision, row("fills-queue", id=writer.allocate_id(RoutingDecision)))
+        writer.insert(RoutingDecision, row("spilled", id=spilled_id))
+        writer.update(RoutingDecision, spilled_id, {"utility_score": 0.5})
+        writer.insert(RoutingDecision, row("dropped", id=writer.allocate_id(RoutingDecision)))
+        assert await writer.flush_async(timeout=0.1) is False
+        return time.perf_counter() - started
+
+    elapsed = asyncio.run(produce())
+    assert elapsed < 0.5
+    stats = writer.get_stats()
+    assert stats["overflowed"] == 2 and stats["dropped"] == 1 and stats["flush_timeouts"] == 1
+    release.set()
+    assert writer.flush()
+    persisted = {route: utility for route, utility in routes().values()}
+    assert persisted["spilled"] == 0.5 and "fills-queue" in persisted and "dropped" not in persisted
+    print("[PASS] Telemetry writer verified.")
+
 def test_feedback_endpoint():
     print("Testing explicit feedback rating submission...")
     init_db()
@@ -432,7 +980,16 @@ if __name__ == "__main__":
     try:
         test_urate_calculation()
         test_implicit_retry_detection()
+        test_recent_prompt_buffer_retry_detection()
         test_utility_constraints_escalation()
+        test_single_flight_coalescing()
+        test_hedged_escalation_win_loss_and_budget()
+        test_batch_generate_dedup_cache_and_jobs()
+        test_batch_escalation_failure_keeps_frugal_response()
+        test_streaming_generate_aborts_and_escalates()
+        test_streaming_generate_preflight_parity()
+        test_generate_dispatch_does_not_block()
+        test_telemetry_writer_batching_and_backpressure()
         test_feedback_endpoint()
         test_analytics_utility()
         test_semantic_drift_analysis()
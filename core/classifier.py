@@ -1,5 +1,11 @@
-from langdetect import detect
-import re
+from core.language_detector import language_detector
+from infra.pattern_matcher import MultiPatternMatcher
+
+# Logic & technical constraint markers, each worth +0.1 complexity
+LOGIC_MATCHER = MultiPatternMatcher(
+    ["assume", "calculate", "analyze", "extract", "json", "xml", "policy", "strict"],
+    regexes=[r"if\s.*then"]
+)
 
 class RequestClassifier:
     """
@@ -12,12 +18,10 @@ class RequestClassifier:
     def detect_language(text: str) -> str:
         """
         Detects ISO 639-1 language code.
+        Script-based and memoized; langdetect only settles ambiguous text.
         Defaults to 'en' on failure to avoid routing crashes.
         """
-        try:
-            return detect(text)
-        except Exception:
-            return "en"
+        return language_detector.detect(text)
 
     @staticmethod
     def estimate_complexity(text: str) -> float:
@@ -34,16 +38,9 @@ class RequestClassifier:
         elif word_count > 100:
             score += 0.2
             
-        # 2. Logic & Technical constraints
-        logic_patterns = [
-            r"if\s.*then", r"assume", r"calculate", r"analyze", 
-            r"extract", r"json", r"xml", r"policy", r"strict"
-        ]
-        
-        lower_text = text.lower()
-        for pattern in logic_patterns:
-            if re.search(pattern, lower_text):
-                score += 0.1
+        # 2. Logic & Technical constraints (one pass over the text for all markers)
+        for _ in LOGIC_MATCHER.findall(text):
+            score += 0.1
                 
         # Limit the max score to 1.0
         return min(score, 1.0)
@@ -55,3 +52,8 @@ class RequestClassifier:
             "complexity_score": cls.estimate_complexity(prompt),
             "length": len(prompt)
         }
+
+    @classmethod
+    def analyze_many(cls, prompts: list) -> list:
+        """Pre-flight analysis for a batch of (already deduplicated) prompts."""
+        return [cls.analyze(prompt) for prompt in prompts]
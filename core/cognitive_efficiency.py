@@ -10,6 +10,23 @@ from core.economic_intelligence import EconomicIntelligencePlane
 from core.complexity_governor import ComplexityGovernor
 from infra.models import SemanticCacheEntry, RoutingDecision
 from infra.calibration import AdvancedCalibrationEngine
+from infra.embeddings import embedding_provider
+from infra.pattern_matcher import MultiPatternMatcher
+
+# Critical memory preservation: turns mentioning any of these are never decayed or compressed
+# Class terms:
+# - governance_constraints: budget, compliance, policy, protocol, limit, constraint, forbid
+# - workflow_objectives: goal, objective, target, deliverable, task
+# - agent_commitments: commit, guarantee, will perform, pledge
+# - legal_instructions: legal, contract, liability, clause, terms
+# - safety_overrides: safety, override, bypass, emergency, safety_protocol
+CRITICAL_MEMORY_MATCHER = MultiPatternMatcher([
+    "budget", "compliance", "policy", "protocol", "limit", "constraint", "forbid",
+    "goal", "objective", "target", "deliverable", "task",
+    "commit", "guarantee", "will perform", "pledge",
+    "legal", "contract", "liability", "clause", "terms",
+    "safety", "override", "bypass", "emergency", "safety_protocol"
+])
 
 class CognitiveEfficiencyPlane:
     """
@@ -47,6 +64,7 @@ class CognitiveEfficiencyPlane:
         history = list(reversed(history))
         
         current_emb = AdvancedCalibrationEngine._mock_embedding(current_prompt)
+        past_embs = embedding_provider.embed_many([entry.prompt for entry in history])
         distilled_turns = []
 
         for idx, entry in enumerate(history):
@@ -57,27 +75,14 @@ class CognitiveEfficiencyPlane:
             turn_distance = len(history) - 1 - idx
             
             # Compute semantic relevance
-            past_emb = AdvancedCalibrationEngine._mock_embedding(past_prompt)
+            past_emb = past_embs[idx]
             similarity = AdvancedCalibrationEngine._cosine_similarity(current_emb, past_emb)
             
             # Decay similarity over older turns
             relevance = similarity * (decay_factor ** turn_distance)
             
             # Critical memory preservation: some details must NEVER be decayed or compressed
-            # Class terms:
-            # - governance_constraints: budget, compliance, policy, protocol, limit, constraint, forbid
-            # - workflow_objectives: goal, objective, target, deliverable, task
-            # - agent_commitments: commit, guarantee, will perform, pledge
-            # - legal_instructions: legal, contract, liability, clause, terms
-            # - safety_overrides: safety, override, bypass, emergency, safety_protocol
-            critical_keywords = [
-                "budget", "compliance", "policy", "protocol", "limit", "constraint", "forbid",
-                "goal", "objective", "target", "deliverable", "task",
-                "commit", "guarantee", "will perform", "pledge",
-                "legal", "contract", "liability", "clause", "terms",
-                "safety", "override", "bypass", "emergency", "safety_protocol"
-            ]
-            is_critical = any(kw in past_prompt.lower() or kw in past_response.lower() for kw in critical_keywords)
+            is_critical = CRITICAL_MEMORY_MATCHER.search(past_prompt) or CRITICAL_MEMORY_MATCHER.search(past_response)
             
             if is_critical or relevance >= relevance_threshold:
                 distilled_turns.append(
@@ -122,24 +127,62 @@ class CognitiveEfficiencyPlane:
         )
 
         if cached_hit:
-            # Reconstruct the cache hit result mapping to endpoint expectation
-            tokens_saved = cached_hit.input_tokens + cached_hit.output_tokens
-            cache_result = {
-                "response": cached_hit.response,
-                "reasoning": cached_hit.reasoning,
-                "tool_chain": cached_hit.tool_chain,
-                "confidence": cached_hit.confidence,
-                "utility_score": cached_hit.utility_score,
-                "model_id": cached_hit.model_id,
-                "tokens_saved": tokens_saved,
-                "cost_usd": cached_hit.cost_usd,
-                "provenance_cri": cached_hit.provenance_cri,
-                "cognitive_provenance": cached_hit.provenance,
-                "must_revalidate": getattr(cached_hit, "must_revalidate", False)
-            }
-            return cache_result, prompt, selected_module
+            return CognitiveEfficiencyPlane._cache_result(cached_hit), prompt, selected_module
 
         # Step 3: Cache Miss — Apply Distillation & Compression
+        compressed = CognitiveEfficiencyPlane._distill_and_compress(db, prompt, mode, complexity, workflow_id, selected_module)
+        return None, compressed, selected_module
+
+    @staticmethod
+    def optimize_batch(db, requests: List[Dict[str, Any]]) -> List[Tuple[Optional[Dict[str, Any]], str, CognitiveModule]]:
+        """
+        Batched optimize_request for /generate/batch.
+        requests: [{"prompt", "mode", "complexity", "workflow_id"}]. The semantic cache is probed
+        for every prompt in one SemanticCache.get_entries pass; misses are then distilled and
+        compressed individually. Returns one (cache_result, optimized_prompt, module) per request.
+        """
+        modules = [
+            CognitiveModuleRegistry.select_module(r["prompt"], r["mode"], r["complexity"])
+            for r in requests
+        ]
+        hits = SemanticCache.get_entries(
+            db,
+            [r["prompt"] for r in requests],
+            [r.get("workflow_id") for r in requests],
+            [m.min_allowed_confidence for m in modules],
+            similarity_threshold=0.85
+        )
+        results = []
+        for r, module, hit in zip(requests, modules, hits):
+            if hit:
+                results.append((CognitiveEfficiencyPlane._cache_result(hit), r["prompt"], module))
+            else:
+                compressed = CognitiveEfficiencyPlane._distill_and_compress(
+                    db, r["prompt"], r["mode"], r["complexity"], r.get("workflow_id"), module
+                )
+                results.append((None, compressed, module))
+        return results
+
+    @staticmethod
+    def _cache_result(cached_hit: SemanticCacheEntry) -> Dict[str, Any]:
+        """Reconstructs the cache hit result mapping to endpoint expectation."""
+        tokens_saved = cached_hit.input_tokens + cached_hit.output_tokens
+        return {
+            "response": cached_hit.response,
+            "reasoning": cached_hit.reasoning,
+            "tool_chain": cached_hit.tool_chain,
+            "confidence": cached_hit.confidence,
+            "utility_score": cached_hit.utility_score,
+            "model_id": cached_hit.model_id,
+            "tokens_saved": tokens_saved,
+            "cost_usd": cached_hit.cost_usd,
+            "provenance_cri": cached_hit.provenance_cri,
+            "cognitive_provenance": cached_hit.provenance,
+            "must_revalidate": getattr(cached_hit, "must_revalidate", False)
+        }
+
+    @staticmethod
+    def _distill_and_compress(db, prompt: str, mode: str, complexity: float, workflow_id: Optional[str], selected_module: CognitiveModule) -> str:
         # Distill workflow history
         distilled_history = CognitiveEfficiencyPlane.distill_workflow_history(
             db=db,
@@ -158,9 +201,7 @@ class CognitiveEfficiencyPlane:
         )
         is_code = (mode == "coding" or selected_module.name == "coding_reasoner")
         compressed = EconomicIntelligencePlane.redundancy_elimination(compressed, is_code=is_code)
-        compressed = EconomicIntelligencePlane.adaptive_context_windowing(compressed, complexity)
-
-        return None, compressed, selected_module
+        return EconomicIntelligencePlane.adaptive_context_windowing(compressed, complexity)
 
     @staticmethod
     def get_efficiency_analytics(db) -> Dict[str, Any]:
@@ -173,6 +214,10 @@ class CognitiveEfficiencyPlane:
         """
         # 1. Cache hit metrics
         cache_metrics = SemanticCache.get_cache_metrics(db)
+        from core.semantic_cache_capacity import cache_capacity
+        cache_metrics["capacity"] = cache_capacity.get_stats()
+        from core.semantic_cache_prefilter import semantic_prefilter
+        cache_metrics["miss_prefilter"] = semantic_prefilter.get_stats()
 
         # 2. Tokens per successful workflow
         workflows = db.query(
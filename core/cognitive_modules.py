@@ -1,4 +1,12 @@
 from typing import List, Dict, Any, Optional
+from infra.pattern_matcher import MultiPatternMatcher
+
+CODING_KEYWORDS = ["code", "python", "javascript", "bug", "sql", "function", "class", "syntax"]
+TRANSLATION_KEYWORDS = ["translate", "hindi", "tamil", "telugu", "language", "translation"]
+GOVERNANCE_KEYWORDS = ["audit", "verify", "hallucination", "compliance", "policy"]
+
+# One pass over the prompt for every module-routing keyword
+MODULE_KEYWORD_MATCHER = MultiPatternMatcher(CODING_KEYWORDS + TRANSLATION_KEYWORDS + GOVERNANCE_KEYWORDS)
 
 class CognitiveModule:
     """
@@ -115,18 +123,18 @@ class CognitiveModuleRegistry:
         """
         Dynamically routes a request to the optimal Cognitive Module based on task features.
         """
-        prompt_lower = prompt.lower()
-        
+        keywords = MODULE_KEYWORD_MATCHER.findall(prompt)
+
         # 1. Routing to Coding Reasoner
-        if mode == "coding" or any(kw in prompt_lower for kw in ["code", "python", "javascript", "bug", "sql", "function", "class", "syntax"]):
+        if mode == "coding" or any(kw in keywords for kw in CODING_KEYWORDS):
             return CognitiveModuleRegistry.MODULES["coding_reasoner"]
-            
+
         # 2. Routing to Sovereign Translation
-        if mode == "multilingual" or any(kw in prompt_lower for kw in ["translate", "hindi", "tamil", "telugu", "language", "translation"]):
+        if mode == "multilingual" or any(kw in keywords for kw in TRANSLATION_KEYWORDS):
             return CognitiveModuleRegistry.MODULES["sovereign_translation"]
-            
+
         # 3. Routing to Governance Auditor
-        if mode == "accuracy" or complexity >= 0.75 or any(kw in prompt_lower for kw in ["audit", "verify", "hallucination", "compliance", "policy"]):
+        if mode == "accuracy" or complexity >= 0.75 or any(kw in keywords for kw in GOVERNANCE_KEYWORDS):
             return CognitiveModuleRegistry.MODULES["governance_auditor"]
             
         # Default fallback to Economic Optimizer for frugal/saving modes, or balance modes under low complexity
@@ -50,13 +50,11 @@ class ComplexityGovernor:
         if not target_workflow_id:
             return entry
 
+        # Track linked workflows (typed column; the provenance JSON only carries cold lineage)
         try:
-            prov_dict = json.loads(entry.provenance) if entry.provenance else {}
+            linked = set(json.loads(entry.linked_workflows) if entry.linked_workflows else [])
         except Exception:
-            prov_dict = {}
-
-        # Track linked workflows
-        linked = set(prov_dict.get("linked_workflows", []))
+            linked = set()
         if entry.workflow_id:
             linked.add(entry.workflow_id)
 
@@ -73,12 +71,16 @@ class ComplexityGovernor:
             import hashlib
             from datetime import datetime
 
+            try:
+                prov_dict = json.loads(entry.provenance) if entry.provenance else {}
+            except Exception:
+                prov_dict = {}
+
             # Clone the entry
             sandboxed_prov = {
                 "cache_origin": "sandboxed_duplicate",
                 "original_entry_id": entry.id,
                 "workflow_origin": target_workflow_id,
-                "linked_workflows": [target_workflow_id],
                 "duplicate_history": prov_dict.get("duplicate_history", []) + [entry.workflow_id or "global"]
             }
 
@@ -98,11 +100,16 @@ class ComplexityGovernor:
                 output_tokens=entry.output_tokens,
                 cost_usd=entry.cost_usd,
                 embedding=entry.embedding,
+                embedding_vec=entry.embedding_vec,
+                embedding_dtype=entry.embedding_dtype,
                 hits=0,
                 drift_score=0.0,
                 is_quarantined=False,
                 provenance=json.dumps(sandboxed_prov),
-                provenance_cri=entry.provenance_cri
+                provenance_cri=entry.provenance_cri,
+                reuse_count=0,
+                revalidate_count=0,
+                linked_workflows=json.dumps([target_workflow_id])
             )
             db.add(sandboxed_entry)
             db.commit()
@@ -110,7 +117,6 @@ class ComplexityGovernor:
             return sandboxed_entry
 
         # Safe to link, update the list on the existing entry
-        prov_dict["linked_workflows"] = list(prospective_linked)
-        entry.provenance = json.dumps(prov_dict)
+        entry.linked_workflows = json.dumps(sorted(prospective_linked))
         db.commit()
         return entry
@@ -31,11 +31,14 @@ import json
 import time
 import asyncio
 import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait as wait_futures
 from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 
+from infra.embeddings import embedding_provider
+
 logger = logging.getLogger(__name__)
 
 # ─── Hard execution bounds ────────────────────────────────────────────────────
@@ -51,6 +54,12 @@ HIGH_HALLUCINATION_THRESHOLD: float = 0.40
 GOVERNANCE_INSTABILITY_TRIGGER: float = 0.25   # stability_score ≤ 0.75
 SIMPLE_PROMPT_COMPLEXITY_CAP: float = 0.35     # forbidden below this
 
+# ─── Quorum short-circuit ─────────────────────────────────────────────────────
+# Once two committee members agree at or above this SemanticAgreement, the remaining calls are cancelled.
+# With the word-hash embedder agreement tracks word overlap: "X is the capital of Y" vs "Z is the
+# capital of W" already scores ~0.66, so quorum requires at most ~1 differing word in 10.
+QUORUM_AGREEMENT_THRESHOLD: float = 0.90
+
 CRITICAL_DOMAINS = {"public_sector", "healthcare"}
 
 
@@ -69,21 +78,11 @@ def _cosine_similarity(v1: List[float], v2: List[float]) -> float:
 
 def _mock_embedding(text: str) -> List[float]:
     """
-    Deterministic mock embedding from text hash.
-    Identical to AdvancedCalibrationEngine._mock_embedding so semantic
-    comparisons are consistent across the codebase without requiring a
-    real embedding model.
+    Deterministic embedding from the shared EmbeddingProvider, the same vectors
+    AdvancedCalibrationEngine._mock_embedding uses, so semantic comparisons are
+    consistent across the codebase without requiring a real embedding model.
     """
-    import hashlib
-    digest = hashlib.sha256(text.encode("utf-8")).digest()
-    vec = []
-    for i in range(0, min(len(digest), 32), 4):
-        val = int.from_bytes(digest[i:i + 4], "big")
-        vec.append((val / (2 ** 32)) * 2 - 1)
-    # Pad to 16 dims if needed
-    while len(vec) < 8:
-        vec.append(0.0)
-    return vec[:8]
+    return embedding_provider.embed(text).tolist()
 
 
 def _semantic_agreement(response_a: str, response_b: str) -> float:
@@ -91,11 +90,20 @@ def _semantic_agreement(response_a: str, response_b: str) -> float:
     Cosine similarity between deterministic embeddings of two response strings.
     Used as SemanticAgreement(i, j) in the weighted consensus formula.
     """
-    emb_a = _mock_embedding(response_a)
-    emb_b = _mock_embedding(response_b)
+    emb_a, emb_b = embedding_provider.embed_many([response_a, response_b])
     return _cosine_similarity(emb_a, emb_b)
 
 
+def _find_quorum(responses: Dict[str, Dict[str, Any]], threshold: float = QUORUM_AGREEMENT_THRESHOLD) -> Optional[Tuple[str, str]]:
+    """Returns the first pair of providers whose responses agree above threshold, if any."""
+    providers = list(responses.keys())
+    for i in range(len(providers)):
+        for j in range(i + 1, len(providers)):
+            if _semantic_agreement(responses[providers[i]]["response"], responses[providers[j]]["response"]) >= threshold:
+                return providers[i], providers[j]
+    return None
+
+
 def _word_overlap(s1: str, s2: str) -> float:
     """Jaccard overlap between token sets of two strings."""
     w1 = set(re.findall(r"\w+", s1.lower()))
@@ -136,6 +144,15 @@ class SovereignConsensusArbitrator:
             )
     """
 
+    def __init__(self, router=None, clients: Optional[Dict[str, Any]] = None):
+        """
+        router/clients: when given, committee members that are provider nodes of the router are
+        dispatched through SovereignRouter.execute_route_async; any other member name falls back
+        to the deterministic _call_provider mock.
+        """
+        self.router = router
+        self.clients = clients or {}
+
     # ── Trigger ──────────────────────────────────────────────────────────────
 
     def should_trigger_consensus(
@@ -223,13 +240,9 @@ class SovereignConsensusArbitrator:
     ) -> Optional[Dict[str, Any]]:
         """
         Calls a provider and returns its response.
-        In production this integrates with the real model routing layer.
-        For Phase 8 tests this returns a deterministic mock.
+        Returns a deterministic mock; real provider nodes are dispatched through the
+        routing layer by _call_provider_async when a router is attached.
         """
-        # --- Production hook ---
-        # from services.model_registry import call_model
-        # return call_model(provider, prompt, timeout_ms=timeout_ms)
-
         # --- Deterministic mock (safe for testing) ---
         import hashlib
         seed = int(hashlib.sha256(f"{provider}:{prompt}".encode()).hexdigest(), 16) % (2**32)
@@ -250,6 +263,51 @@ class SovereignConsensusArbitrator:
             "latency_ms": float(rng.integers(100, 800)),
         }
 
+    async def _call_provider_async(
+        self,
+        provider: str,
+        prompt: str,
+        timeout_ms: int = CONSENSUS_TIMEOUT_MS,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Awaitable provider call used by execute_consensus_async.
+        Provider nodes known to the attached router go through the real async routing layer;
+        unknown committee members keep the deterministic mock.
+        """
+        node = self._router_node(provider)
+        if node is None:
+            return self._call_provider(provider, prompt, timeout_ms=timeout_ms)
+
+        from core.economic_intelligence import EconomicIntelligencePlane
+
+        route_config = {
+            "target": node["target"],
+            "target_key": node["key"],
+            "instruction": "Role: Consensus_Committee_Member. Task: Answer independently and precisely.",
+        }
+        t_call = time.monotonic()
+        response_text = await asyncio.wait_for(
+            self.router.execute_route_async(prompt, route_config, self.clients),
+            timeout_ms / 1000.0,
+        )
+        input_tokens = EconomicIntelligencePlane.estimate_tokens(prompt)
+        output_tokens = EconomicIntelligencePlane.estimate_tokens(response_text)
+        return {
+            "provider": provider,
+            "response": response_text,
+            "tokens_used": input_tokens + output_tokens,
+            "cost_usd": EconomicIntelligencePlane.calculate_cost(node["target"], input_tokens, output_tokens),
+            "latency_ms": (time.monotonic() - t_call) * 1000,
+        }
+
+    def _router_node(self, provider: str) -> Optional[Dict[str, Any]]:
+        if self.router is None:
+            return None
+        for node in self.router.provider_nodes:
+            if node["target"] == provider:
+                return node
+        return None
+
     # ── Core consensus execution ──────────────────────────────────────────────
 
     def execute_consensus(
@@ -269,9 +327,12 @@ class SovereignConsensusArbitrator:
         Hard bounds enforced:
           - Committee capped at MAX_COMMITTEE_SIZE (3)
           - Escalation depth capped at MAX_ESCALATION_DEPTH (1)
-          - Each provider call subject to CONSENSUS_TIMEOUT_MS (2500ms)
+          - All provider calls share one CONSENSUS_TIMEOUT_MS (2500ms) deadline
           - Total additional cost must not exceed escalation_budget_usd
 
+        Committee members are dispatched concurrently; consensus latency is the slowest
+        collected call (or the second agreeing one, once a quorum short-circuits the rest).
+
         Returns a consensus_result dict including:
           - selected_response: str
           - selected_provider: str
@@ -285,7 +346,168 @@ class SovereignConsensusArbitrator:
           - consensus_trace: JSON-serialisable summary dict
           - error: str or None
         """
-        # ── Enforce hard bounds ────────────────────────────────────────────
+        capped_committee, bound_error = self._enforce_bounds(committee, escalation_depth)
+        if bound_error is not None:
+            return bound_error
+
+        # ── Collect provider responses (parallel, shared deadline) ─────────
+        t_start = time.monotonic()
+        deadline = t_start + CONSENSUS_TIMEOUT_MS / 1000.0
+        responses: Dict[str, Dict[str, Any]] = {}
+        collection = self._new_collection()
+
+        executor = ThreadPoolExecutor(max_workers=len(capped_committee), thread_name_prefix="omi-consensus")
+        try:
+            pending = {
+                executor.submit(self._call_provider, provider, prompt, CONSENSUS_TIMEOUT_MS): provider
+                for provider in capped_committee
+            }
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, _ = wait_futures(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    provider = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.warning("Provider %s failed during consensus: %s", provider, e)
+                        result = None
+                    self._collect(provider, result, responses, collection)
+                if pending and self._check_quorum(responses, collection):
+                    break
+            self._abandon(list(pending.values()), collection)
+            for future in pending:
+                future.cancel()
+        finally:
+            # Never block on a straggler past the deadline; its result is simply discarded
+            executor.shutdown(wait=False, cancel_futures=True)
+        collection["latency_ms"] = round((time.monotonic() - t_start) * 1000, 2)
+
+        return self._arbitrate(
+            responses=responses,
+            capped_committee=capped_committee,
+            provider_reliabilities=provider_reliabilities,
+            escalation_budget_usd=escalation_budget_usd,
+            baseline_cost_usd=baseline_cost_usd,
+            baseline_reliability=baseline_reliability,
+            collection=collection,
+        )
+
+    async def execute_consensus_async(
+        self,
+        prompt: str,
+        committee: List[str],
+        provider_reliabilities: Dict[str, float],
+        db=None,
+        escalation_depth: int = 0,
+        escalation_budget_usd: float = 1.0,
+        baseline_cost_usd: float = 0.0,
+        baseline_reliability: float = 0.5,
+    ) -> Dict[str, Any]:
+        """
+        Awaitable variant of execute_consensus for the async /generate path.
+        Committee members run as concurrent tasks through _call_provider_async under the shared
+        CONSENSUS_TIMEOUT_MS deadline; stragglers are cancelled at the deadline or as soon as two
+        members reach quorum. Returns the same consensus_result structure as execute_consensus.
+        """
+        capped_committee, bound_error = self._enforce_bounds(committee, escalation_depth)
+        if bound_error is not None:
+            return bound_error
+
+        t_start = time.monotonic()
+        deadline = t_start + CONSENSUS_TIMEOUT_MS / 1000.0
+        responses: Dict[str, Dict[str, Any]] = {}
+        collection = self._new_collection()
+
+        pending = {
+            asyncio.ensure_future(self._call_provider_async(provider, prompt, timeout_ms=CONSENSUS_TIMEOUT_MS)): provider
+            for provider in capped_committee
+        }
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, _ = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.warning("Provider %s failed during consensus: %s", provider, e)
+                        result = None
+                    self._collect(provider, result, responses, collection)
+                if pending and self._check_quorum(responses, collection):
+                    break
+            self._abandon(list(pending.values()), collection)
+        finally:
+            for task in pending:
+                task.cancel()
+        collection["latency_ms"] = round((time.monotonic() - t_start) * 1000, 2)
+
+        return self._arbitrate(
+            responses=responses,
+            capped_committee=capped_committee,
+            provider_reliabilities=provider_reliabilities,
+            escalation_budget_usd=escalation_budget_usd,
+            baseline_cost_usd=baseline_cost_usd,
+            baseline_reliability=baseline_reliability,
+            collection=collection,
+        )
+
+    # ── Parallel collection helpers ───────────────────────────────────────────
+
+    @staticmethod
+    def _new_collection() -> Dict[str, Any]:
+        return {
+            "mode": "parallel",
+            "latency_ms": 0.0,
+            "quorum_reached": False,
+            "quorum_pair": None,
+            "cancelled": [],
+            "timed_out": [],
+            "failed": [],
+        }
+
+    @staticmethod
+    def _collect(provider: str, result: Optional[Dict[str, Any]], responses: Dict[str, Dict[str, Any]], collection: Dict[str, Any]):
+        if result is None:
+            logger.warning("Provider %s returned no response; excluding from consensus.", provider)
+            collection["failed"].append(provider)
+            return
+        responses[provider] = result
+
+    @staticmethod
+    def _check_quorum(responses: Dict[str, Dict[str, Any]], collection: Dict[str, Any]) -> bool:
+        pair = _find_quorum(responses) if len(responses) >= 2 else None
+        if pair is None:
+            return False
+        collection["quorum_reached"] = True
+        collection["quorum_pair"] = list(pair)
+        return True
+
+    @staticmethod
+    def _abandon(providers: List[str], collection: Dict[str, Any]):
+        """Records the calls still outstanding when collection stopped."""
+        if not providers:
+            return
+        if collection["quorum_reached"]:
+            collection["cancelled"].extend(providers)
+        else:
+            logger.warning("Consensus deadline of %dms reached; cancelling %s.", CONSENSUS_TIMEOUT_MS, ", ".join(providers))
+            collection["timed_out"].extend(providers)
+
+    def _enforce_bounds(
+        self,
+        committee: List[str],
+        escalation_depth: int,
+    ) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+        """
+        Applies the hard execution bounds shared by the sync and async paths.
+        Returns (capped_committee, error_result); error_result is None when consensus may proceed.
+        """
         capped_committee = committee[:MAX_COMMITTEE_SIZE]
         if len(committee) > MAX_COMMITTEE_SIZE:
             logger.warning(
@@ -294,34 +516,28 @@ class SovereignConsensusArbitrator:
             )
 
         if escalation_depth >= MAX_ESCALATION_DEPTH:
-            return self._error_result(
+            return capped_committee, self._error_result(
                 "execute_consensus called with escalation_depth >= MAX_ESCALATION_DEPTH"
             )
 
         if len(capped_committee) < 2:
-            return self._error_result("Committee must have at least 2 providers for consensus")
-
-        # ── Collect provider responses ─────────────────────────────────────
-        t_start = time.monotonic()
-        responses: Dict[str, Dict[str, Any]] = {}
-        total_extra_tokens = 0
-        total_extra_cost = 0.0
+            return capped_committee, self._error_result("Committee must have at least 2 providers for consensus")
 
-        for provider in capped_committee:
-            elapsed_ms = (time.monotonic() - t_start) * 1000
-            remaining_ms = CONSENSUS_TIMEOUT_MS - elapsed_ms
-            if remaining_ms <= 0:
-                logger.warning("Consensus timeout reached before calling %s; skipping.", provider)
-                continue
+        return capped_committee, None
 
-            result = self._call_provider(provider, prompt, timeout_ms=int(remaining_ms))
-            if result is None:
-                logger.warning("Provider %s returned no response; excluding from consensus.", provider)
-                continue
-
-            responses[provider] = result
-            total_extra_tokens += result.get("tokens_used", 0)
-            total_extra_cost += result.get("cost_usd", 0.0)
+    def _arbitrate(
+        self,
+        responses: Dict[str, Dict[str, Any]],
+        capped_committee: List[str],
+        provider_reliabilities: Dict[str, float],
+        escalation_budget_usd: float,
+        baseline_cost_usd: float,
+        baseline_reliability: float,
+        collection: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Scores collected committee responses and builds the consensus_result dict."""
+        total_extra_tokens = sum(r.get("tokens_used", 0) for r in responses.values())
+        total_extra_cost = sum(r.get("cost_usd", 0.0) for r in responses.values())
 
         # ── Validate budget ────────────────────────────────────────────────
         additional_cost = total_extra_cost - baseline_cost_usd
@@ -439,6 +655,7 @@ class SovereignConsensusArbitrator:
             "winning_score": round(winning_score, 6),
             "disagreement": disagreement,
             "cost_accounting": cost_accounting,
+            "collection": collection,
         }
 
         return {
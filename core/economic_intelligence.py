@@ -5,6 +5,7 @@ import numpy as np
 from sqlalchemy import func
 from infra.database import SessionLocal
 from infra.models import RoutingDecision, ModelFailure
+from infra.embeddings import embedding_provider
 
 # Standard Pricing Matrix per 1M Tokens (USD)
 PROVIDER_PRICING = {
@@ -18,6 +19,17 @@ PROVIDER_PRICING = {
     "unknown": {"input": 1.00, "output": 2.00}
 }
 
+# Embedding-similarity thresholds, calibrated for the shared word-hash embedder (infra/embeddings.py).
+# Its cosine is roughly shared words / sqrt(len_a * len_b); texts sharing no words score within
+# about +/-0.2 (p99), and stopwords alone lift unrelated sentences to 0.3-0.5.
+# Redundant sentence: a near-verbatim restatement (differs by at most ~1 word in 12). Distinct
+# facts in the same template ("summary of the report" / "summary of the incident") score ~0.91.
+SEMANTIC_COMPRESSION_THRESHOLD = 0.92
+# Retrieved document kept unless it looks like no-overlap noise. Bag-of-words similarity separates
+# relevant from irrelevant documents poorly, and dropping relevant context costs more than a few
+# extra tokens, so the floor sits just above the noise band.
+RETRIEVAL_PRUNING_THRESHOLD = 0.15
+
 # Global compression memory cache
 _COMPRESSION_STATS = {
     "raw_tokens": 0,
@@ -115,9 +127,8 @@ class EconomicIntelligencePlane:
     
     @staticmethod
     def _mock_embedding(text: str) -> np.ndarray:
-        """Generates a mock text embedding vector."""
-        np.random.seed(sum(ord(c) for c in text) % 10000)
-        return np.random.rand(64)
+        """Text embedding vector from the shared EmbeddingProvider."""
+        return embedding_provider.embed(text)
 
     @staticmethod
     def _cosine_similarity(vec1: np.ndarray, vec2: np.ndarray) -> float:
@@ -130,7 +141,7 @@ class EconomicIntelligencePlane:
         return float(dot / (norm1 * norm2))
 
     @staticmethod
-    def semantic_compression(prompt: str, threshold: float = 0.82) -> str:
+    def semantic_compression(prompt: str, threshold: float = SEMANTIC_COMPRESSION_THRESHOLD) -> str:
         """
         Trims redundant sentences in the prompt using embedding similarity.
         If a sentence is highly similar to a previous one, it is pruned.
@@ -142,13 +153,13 @@ class EconomicIntelligencePlane:
             _COMPRESSION_STATS["compressed_tokens"] += raw_t
             return prompt
 
+        sentence_embeddings = embedding_provider.embed_many(sentences)
         kept_sentences = [sentences[0]]
-        kept_embeddings = [EconomicIntelligencePlane._mock_embedding(sentences[0])]
+        kept_embeddings = [sentence_embeddings[0]]
 
-        for s in sentences[1:]:
+        for s, emb in zip(sentences[1:], sentence_embeddings[1:]):
             if not s.strip():
                 continue
-            emb = EconomicIntelligencePlane._mock_embedding(s)
             is_redundant = False
             for prev_emb in kept_embeddings:
                 if EconomicIntelligencePlane._cosine_similarity(emb, prev_emb) > threshold:
@@ -167,16 +178,16 @@ class EconomicIntelligencePlane:
         return compressed_text
 
     @staticmethod
-    def retrieval_pruning(documents: List[str], query: str, threshold: float = 0.50) -> List[str]:
+    def retrieval_pruning(documents: List[str], query: str, threshold: float = RETRIEVAL_PRUNING_THRESHOLD) -> List[str]:
         """
         Prunes documents gathered from RAG whose vector similarity to the query falls below a threshold.
         """
         if not documents:
             return []
-        query_emb = EconomicIntelligencePlane._mock_embedding(query)
+        query_emb = embedding_provider.embed(query)
+        doc_embs = embedding_provider.embed_many(documents)
         pruned_docs = []
-        for doc in documents:
-            doc_emb = EconomicIntelligencePlane._mock_embedding(doc)
+        for doc, doc_emb in zip(documents, doc_embs):
             sim = EconomicIntelligencePlane._cosine_similarity(query_emb, doc_emb)
             if sim >= threshold:
                 pruned_docs.append(doc)
@@ -219,23 +230,37 @@ class EconomicIntelligencePlane:
 
 class AgenticBudgetGovernor:
     """Enforces token budgets and max spending limits (USD) for autonomous loops."""
-    def __init__(self, daily_budget_usd: float = 5.00):
+    def __init__(self, daily_budget_usd: float = 5.00, hedge_budget_fraction: float = 0.20):
         self.daily_budget_usd = daily_budget_usd
+        self.hedge_budget_fraction = hedge_budget_fraction  # Share of the daily budget speculative calls may burn
         self.spent_today_usd = 0.0
+        self.hedge_spent_today_usd = 0.0
         self.last_reset = datetime.utcnow().date()
         
     def check_budget(self, estimated_cost: float) -> bool:
         self._reset_if_needed()
         return (self.spent_today_usd + estimated_cost) <= self.daily_budget_usd
+
+    def check_hedge_budget(self, estimated_cost: float) -> bool:
+        """Speculative (hedged) calls must fit both the daily budget and the hedge sub-cap."""
+        self._reset_if_needed()
+        hedge_cap = self.daily_budget_usd * self.hedge_budget_fraction
+        return self.check_budget(estimated_cost) and (self.hedge_spent_today_usd + estimated_cost) <= hedge_cap
         
     def record_spend(self, cost_usd: float):
         self._reset_if_needed()
         self.spent_today_usd += cost_usd
+
+    def record_hedge_spend(self, cost_usd: float):
+        """Tracks spend on discarded speculative calls (the caller still reports it via record_spend)."""
+        self._reset_if_needed()
+        self.hedge_spent_today_usd += cost_usd
         
     def _reset_if_needed(self):
         now = datetime.utcnow().date()
         if now > self.last_reset:
             self.spent_today_usd = 0.0
+            self.hedge_spent_today_usd = 0.0
             self.last_reset = now
 
 # Global instance of budget governor
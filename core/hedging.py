@@ -0,0 +1,188 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from core.economic_intelligence import EconomicIntelligencePlane, agentic_governor
+from core.learning_loop import memory_bank
+
+HEDGING_ENABLED = os.getenv("OMI_HEDGING_ENABLED", "true").lower() == "true"
+# Fire the premium call once the frugal call has been running longer than this percentile of its recent latencies
+HEDGE_LATENCY_PERCENTILE = float(os.getenv("OMI_HEDGE_LATENCY_PERCENTILE", "95"))
+# ... or immediately, when the learning loop predicts the frugal model will fail at this complexity
+HEDGE_FAILURE_PROBABILITY = float(os.getenv("OMI_HEDGE_FAILURE_PROBABILITY", "0.35"))
+# Hedge delay used until a provider has MIN_SAMPLES latency observations
+HEDGE_DEFAULT_DELAY_SEC = float(os.getenv("OMI_HEDGE_DEFAULT_DELAY_SEC", "4.0"))
+
+
+class ProviderLatencyTracker:
+    """Sliding window of recent call latencies per model, for percentile-based hedge delays."""
+    WINDOW = 256
+    MIN_SAMPLES = 20
+
+    def __init__(self, window: int = WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, deque] = {}
+
+    def record(self, model: str, latency_sec: float):
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=self.window)).append(latency_sec)
+
+    def percentile(self, model: str, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = self._samples.get(model)
+            if not samples or len(samples) < self.MIN_SAMPLES:
+                return None
+            data = np.fromiter(samples, dtype=np.float64)
+        return float(np.percentile(data, pct))
+
+
+class HedgedCall:
+    """Outcome of the frugal call plus the (optional) speculative premium call racing it."""
+
+    def __init__(self, response: str, premium_task: Optional[asyncio.Task], trigger: Optional[str], premium_target: str, est_input_tokens: int):
+        self.response = response
+        self.premium_task = premium_task
+        self.trigger = trigger
+        self.premium_target = premium_target
+        self.est_input_tokens = est_input_tokens
+        self.outcome = None
+
+    @property
+    def fired(self) -> bool:
+        return self.premium_task is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"fired": self.fired, "trigger": self.trigger, "premium_target": self.premium_target, "outcome": self.outcome}
+
+
+class HedgedEscalation:
+    """
+    Hedged (speculative) escalation for the /generate judge path.
+    The frugal call starts first. The premium escalation target is fired in parallel when
+    the frugal call outlives the HEDGE_LATENCY_PERCENTILE of that provider's recent
+    latencies, or straight away when the learning loop's escalation rate for the model
+    at this complexity is at least HEDGE_FAILURE_PROBABILITY. Speculative calls are capped
+    by AgenticBudgetGovernor.check_hedge_budget.
+
+    If the judge escalates, the in-flight premium call is claimed (a hedge win) instead
+    of starting a serial one. If the frugal answer passes, the premium call is cancelled
+    (a hedge loss) and its estimated input cost is booked as extra spend.
+    """
+
+    def __init__(self):
+        self.latency = ProviderLatencyTracker()
+        self._lock = threading.Lock()
+        self.stats = {
+            "evaluated": 0,
+            "fired": 0,
+            "wins": 0,
+            "losses": 0,
+            "budget_blocked": 0,
+            "triggers": {"latency": 0, "predicted_failure": 0},
+            "extra_spend_usd": 0.0
+        }
+
+    async def _timed(self, model: str, coro) -> str:
+        started = time.perf_counter()
+        result = await coro
+        self.latency.record(model, time.perf_counter() - started)
+        return result
+
+    def hedge_delay(self, model: str, complexity: float) -> float:
+        """Seconds to wait on the frugal call before firing the premium one (0 = fire now)."""
+        if memory_bank.get_escalation_rate(model, min_complexity=complexity) >= HEDGE_FAILURE_PROBABILITY:
+            return 0.0
+        threshold = self.latency.percentile(model, HEDGE_LATENCY_PERCENTILE)
+        return threshold if threshold is not None else HEDGE_DEFAULT_DELAY_SEC
+
+    def _fire(self, router, prompt: str, escalation_config: dict, clients: dict, est_input_tokens: int, trigger: str) -> Optional[asyncio.Task]:
+        premium = escalation_config["target"]
+        est_cost = EconomicIntelligencePlane.calculate_cost(premium, est_input_tokens, 250)
+        if not agentic_governor.check_hedge_budget(est_cost):
+            with self._lock:
+                self.stats["budget_blocked"] += 1
+            return None
+        with self._lock:
+            self.stats["fired"] += 1
+            self.stats["triggers"][trigger] += 1
+        return asyncio.ensure_future(
+            self._timed(premium, router.execute_route_async(prompt, escalation_config, clients))
+        )
+
+    async def execute(self, router, prompt: str, route_config: dict, escalation_config: dict, clients: dict, complexity: float) -> HedgedCall:
+        """Runs the frugal call, firing the speculative premium call alongside it when triggered."""
+        target = route_config["target"]
+        premium = escalation_config["target"]
+        est_input_tokens = EconomicIntelligencePlane.estimate_tokens(prompt) + 20
+        frugal = asyncio.ensure_future(self._timed(target, router.execute_route_async(prompt, route_config, clients)))
+        if not HEDGING_ENABLED or target == premium:
+            return HedgedCall(await frugal, None, None, premium, est_input_tokens)
+
+        with self._lock:
+            self.stats["evaluated"] += 1
+        premium_task, trigger = None, None
+        try:
+            delay = self.hedge_delay(target, complexity)
+            if delay <= 0:
+                trigger = "predicted_failure"
+            else:
+                done, _ = await asyncio.wait({frugal}, timeout=delay)
+                if not done:
+                    trigger = "latency"
+            if trigger:
+                premium_task = self._fire(router, prompt, escalation_config, clients, est_input_tokens, trigger)
+            response = await frugal
+        except BaseException:
+            frugal.cancel()
+            if premium_task is not None:
+                premium_task.cancel()
+            raise
+        return HedgedCall(response, premium_task, trigger if premium_task else None, premium, est_input_tokens)
+
+    async def claim(self, call: HedgedCall, router, prompt: str, escalation_config: dict, clients: dict) -> str:
+        """Escalation path: use the speculative premium response, or call the premium model now."""
+        if call.premium_task is None:
+            return await self._timed(escalation_config["target"], router.execute_route_async(prompt, escalation_config, clients))
+        call.outcome = "win"
+        with self._lock:
+            self.stats["wins"] += 1
+        return await call.premium_task
+
+    def discard(self, call: HedgedCall) -> float:
+        """The frugal answer stood: cancel the speculative call and return its extra spend (USD)."""
+        if call.premium_task is None:
+            return 0.0
+        finished = call.premium_task.done() and not call.premium_task.cancelled() and call.premium_task.exception() is None
+        call.premium_task.cancel()
+        # A finished call was paid in full; a cancelled one has at least consumed its prompt
+        extra = EconomicIntelligencePlane.calculate_cost(call.premium_target, call.est_input_tokens, 250 if finished else 0)
+        agentic_governor.record_hedge_spend(extra)
+        call.outcome = "loss"
+        with self._lock:
+            self.stats["losses"] += 1
+            self.stats["extra_spend_usd"] += extra
+        return extra
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats, triggers=dict(self.stats["triggers"]))
+        resolved = stats["wins"] + stats["losses"]
+        stats["extra_spend_usd"] = round(stats["extra_spend_usd"], 6)
+        stats["win_rate"] = round(stats["wins"] / resolved, 4) if resolved else 0.0
+        stats["loss_rate"] = round(stats["losses"] / resolved, 4) if resolved else 0.0
+        stats["enabled"] = HEDGING_ENABLED
+        stats["latency_percentile"] = HEDGE_LATENCY_PERCENTILE
+        stats["failure_probability_threshold"] = HEDGE_FAILURE_PROBABILITY
+        stats["hedge_spent_today_usd"] = round(agentic_governor.hedge_spent_today_usd, 6)
+        stats["hedge_budget_usd"] = round(agentic_governor.daily_budget_usd * agentic_governor.hedge_budget_fraction, 6)
+        return stats
+
+
+# Global hedging controller for /generate escalations
+hedged_escalation = HedgedEscalation()
@@ -0,0 +1,198 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+try:
+    from langdetect import DetectorFactory, detect as _langdetect
+    DetectorFactory.seed = 0  # langdetect samples randomly; pin it so fallbacks are reproducible
+    LANGDETECT_AVAILABLE = True
+except ImportError:
+    LANGDETECT_AVAILABLE = False
+
+# Upper bound on memoized detection results
+LANGUAGE_CACHE_SIZE = int(os.getenv("OMI_LANGUAGE_CACHE_SIZE", "4096"))
+
+# Prompts longer than this are memoized under a digest instead of the raw text
+_MAX_RAW_KEY_CHARS = 256
+
+# Unicode blocks of the Indic (and Urdu) scripts the router cares about
+SCRIPT_RANGES = {
+    "devanagari": "\u0900-\u097F\uA8E0-\uA8FF",
+    "bengali": "\u0980-\u09FF",
+    "gurmukhi": "\u0A00-\u0A7F",
+    "gujarati": "\u0A80-\u0AFF",
+    "oriya": "\u0B00-\u0B7F",
+    "tamil": "\u0B80-\u0BFF",
+    "telugu": "\u0C00-\u0C7F",
+    "kannada": "\u0C80-\u0CFF",
+    "malayalam": "\u0D00-\u0D7F",
+    "arabic": "\u0600-\u06FF\u0750-\u077F\uFB50-\uFDFF\uFE70-\uFEFF",
+}
+_SCRIPT_PATTERNS = {script: re.compile(f"[{chars}]") for script, chars in SCRIPT_RANGES.items()}
+
+# Scripts used (in practice) by exactly one language
+SCRIPT_LANGUAGES = {
+    "gurmukhi": "pa",
+    "gujarati": "gu",
+    "oriya": "or",
+    "tamil": "ta",
+    "telugu": "te",
+    "kannada": "kn",
+    "malayalam": "ml",
+}
+
+_LATIN_LETTER_RE = re.compile("[A-Za-z\u00C0-\u024F]")
+_LATIN_EXTENDED_RE = re.compile("[\u00C0-\u024F]")
+_WORD_RE = re.compile(r"[a-z']+")
+
+# Letters/words that separate languages sharing a script
+_MARATHI_LETTERS = re.compile("\u0933")  # LLA, rare in Hindi
+MARATHI_WORDS = frozenset(["आहे", "आहेत", "आणि", "नाही", "मला", "तुम्ही", "करा", "काय"])
+_ASSAMESE_MARKERS = re.compile("[\u09F0\u09F1]")
+_URDU_MARKERS = re.compile("[\u0679\u0688\u0691\u06BA\u06BE\u06C1\u06D2]")
+
+ENGLISH_FUNCTION_WORDS = frozenset([
+    "the", "a", "an", "is", "are", "was", "were", "be", "to", "of", "and", "or", "in", "on",
+    "for", "with", "that", "this", "it", "what", "how", "why", "which", "who", "please",
+    "can", "could", "would", "should", "you", "your", "my", "we", "from", "by", "as", "at",
+    "not", "do", "does", "if", "then", "all", "write", "explain", "give", "about", "into"
+])
+
+# Common romanized Hindi (Hinglish) words that are not also everyday English words
+ROMANIZED_HINDI_WORDS = frozenset([
+    "hai", "hain", "kya", "kyun", "kyu", "nahi", "nahin", "mujhe", "mera", "meri", "mere",
+    "aap", "aapka", "aapko", "tum", "tumhe", "kaise", "kaisa", "karo", "karna", "kar", "karke",
+    "batao", "bataiye", "yeh", "woh", "kuch", "kab", "kahan", "kaun", "hum", "hamara", "raha",
+    "rahi", "rahe", "tha", "thi", "acha", "accha", "theek", "thik", "bhai", "samjhao", "chahiye",
+    "sakta", "sakte", "wala", "wali", "liye", "bhi", "abhi", "matlab", "bahut", "ke", "ki", "ko"
+])
+
+
+class ScriptLanguageDetector:
+    """
+    Fast, deterministic language detection for routing.
+    The router only needs English vs. the Indic codes checked in calculate_route, and
+    those are mostly decidable from the Unicode script alone: Tamil, Telugu, Kannada,
+    Malayalam, Gujarati, Gurmukhi and Oriya map to one language each, Devanagari is
+    Hindi unless Marathi-specific letters/words appear, Bengali script is Bengali unless
+    Assamese letters appear, and Arabic script with Urdu-only letters is Urdu.
+
+    Latin text is English when English function words dominate and romanized Hindi
+    when Hinglish words do. Anything else (mixed scripts, accented Latin, other
+    writing systems, very short text) is ambiguous and goes to langdetect, seeded so
+    repeated runs agree. Results are memoized in a bounded LRU.
+    """
+
+    # Share of letters a script needs before it decides the language
+    DOMINANT_SCRIPT_SHARE = 0.6
+    # Share of Latin words that must be function words before text counts as clear English
+    ENGLISH_WORD_SHARE = 0.15
+    ROMANIZED_HINDI_SHARE = 0.25
+
+    def __init__(self, max_entries: int = LANGUAGE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[Any, str]" = OrderedDict()
+        self.stats = {"requests": 0, "hits": 0, "script": 0, "latin": 0, "fallbacks": 0}
+
+    @staticmethod
+    def _cache_key(text: str):
+        if len(text) <= _MAX_RAW_KEY_CHARS:
+            return text
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    @staticmethod
+    def _fallback(text: str) -> str:
+        """langdetect for the ambiguous cases; defaults to 'en' on failure to avoid routing crashes."""
+        if not LANGDETECT_AVAILABLE:
+            return "en"
+        try:
+            return _langdetect(text)
+        except Exception:
+            return "en"
+
+    @classmethod
+    def classify_script(cls, text: str) -> Optional[str]:
+        """Language decided by Unicode script alone, or None if the script does not settle it."""
+        counts = {script: len(pattern.findall(text)) for script, pattern in _SCRIPT_PATTERNS.items()}
+        script, count = max(counts.items(), key=lambda item: item[1])
+        if not count:
+            return None
+        letters = sum(counts.values()) + len(_LATIN_LETTER_RE.findall(text))
+        if count < cls.DOMINANT_SCRIPT_SHARE * letters:
+            return None
+        if script in SCRIPT_LANGUAGES:
+            return SCRIPT_LANGUAGES[script]
+        if script == "devanagari":
+            is_marathi = _MARATHI_LETTERS.search(text) or not MARATHI_WORDS.isdisjoint(text.split())
+            return "mr" if is_marathi else "hi"
+        if script == "bengali":
+            return "as" if _ASSAMESE_MARKERS.search(text) else "bn"
+        # Arabic script is shared by Arabic, Persian, Urdu...: only Urdu-only letters settle it
+        return "ur" if _URDU_MARKERS.search(text) else None
+
+    @classmethod
+    def classify_latin(cls, text: str) -> Optional[str]:
+        """'en' or romanized 'hi' for clear Latin-script text, else None."""
+        if _LATIN_EXTENDED_RE.search(text):
+            return None  # Accented Latin: some other European language, let langdetect decide
+        words = _WORD_RE.findall(text.lower())
+        if len(words) < 2:
+            return None
+        english = sum(1 for w in words if w in ENGLISH_FUNCTION_WORDS)
+        hinglish = sum(1 for w in words if w in ROMANIZED_HINDI_WORDS)
+        if hinglish >= 2 and hinglish > english and hinglish >= cls.ROMANIZED_HINDI_SHARE * len(words):
+            return "hi"
+        if english and english >= cls.ENGLISH_WORD_SHARE * len(words) and english >= hinglish:
+            return "en"
+        return None
+
+    def _classify(self, text: str) -> str:
+        if not text.isascii():
+            language = self.classify_script(text)
+            if language is not None:
+                self.stats["script"] += 1
+                return language
+        elif not _LATIN_LETTER_RE.search(text):
+            return "en"  # No letters at all: langdetect would raise and we would default anyway
+        language = self.classify_latin(text)
+        if language is not None:
+            self.stats["latin"] += 1
+            return language
+        # Mixed scripts, other writing systems (CJK, Cyrillic, ...), accented or very short Latin
+        self.stats["fallbacks"] += 1
+        return self._fallback(text)
+
+    def detect(self, text: str) -> str:
+        """ISO 639-1 code for the text (memoized)."""
+        if not text:
+            return "en"
+        key = self._cache_key(text)
+        with self._lock:
+            self.stats["requests"] += 1
+            language = self._cache.get(key)
+            if language is not None:
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return language
+        language = self._classify(text)
+        with self._lock:
+            self._cache[key] = language
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return language
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["cached_entries"] = len(self._cache)
+        stats["hit_rate"] = round(stats["hits"] / stats["requests"], 4) if stats["requests"] else 0.0
+        stats["langdetect_available"] = LANGDETECT_AVAILABLE
+        return stats
+
+
+# Global memoized detector used by RequestClassifier
+language_detector = ScriptLanguageDetector()
@@ -1,16 +1,199 @@
 import os
+import math
+import time
+import threading
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 
 # Phase 5B: Import Governance layers (late import inside functions if circular deps, or just here)
 
 # Phase 6A: Enterprise Foundation Migration
-from infra.database import engine, SessionLocal, Base
+from infra.database import engine, Base, acquire_session, release_session
 # Import the declarative models to ensure they are registered with Base
 from infra.models import RoutingDecision, ModelFailure, HumanFeedback, TelemetryLineage
+from infra.governance_snapshot import governance_snapshots
+from core.semantic_cache_drift import drift_signals
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "learning_loop.db")
 
+class ProviderStatsTable:
+    """
+    In-memory per-provider statistics backing the Data Moat read path.
+    Holds escalation counts by complexity bucket, ECE accumulators and trust-weighted
+    feedback penalties so routing can be scored without touching the database.
+    Writes through DataMoat update the table incrementally; a daemon worker rebuilds it
+    from the DB with grouped queries every RECONCILE_INTERVAL_SEC to absorb out-of-band
+    writers (scripts, replays, table resets). Reads never wait on that rebuild: only the
+    first read, or the first read after invalidate(), builds the table inline.
+    """
+    BUCKETS = 100  # Complexity resolution of 0.01
+    RECONCILE_INTERVAL_SEC = 30.0
+    PENALTY_FEEDBACK_TYPES = ("hallucination", "false_confidence")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._escalations = {}  # model -> (totals per bucket, escalations per bucket)
+        self._ece = {}          # model -> [failure_count, success_count, conf_sum, conf_count]
+        self._penalties = {}    # model -> trust-weighted penalty sum
+        self._reconciled_at = None
+        self._generation = 0    # Bumped on every rebuild/invalidation
+        self._versions = {}     # model -> bumped whenever a failure or escalation is recorded
+        self._reconcile_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {"reconciles": 0, "inline_reconciles": 0, "background_reconciles": 0, "failures": 0}
+
+    @classmethod
+    def _bucket(cls, complexity: float) -> int:
+        return min(cls.BUCKETS, max(0, int((complexity or 0.0) * cls.BUCKETS + 1e-9)))
+
+    @classmethod
+    def _threshold_bucket(cls, min_complexity: float) -> int:
+        return min(cls.BUCKETS + 1, max(0, math.ceil(min_complexity * cls.BUCKETS - 1e-9)))
+
+    def _escalation_row(self, table: dict, model: str):
+        row = table.get(model)
+        if row is None:
+            row = ([0] * (self.BUCKETS + 1), [0] * (self.BUCKETS + 1))
+            table[model] = row
+        return row
+
+    def _ensure_fresh(self):
+        if self._reconciled_at is None:
+            with self._reconcile_lock:
+                # Another reader may have built it while we waited for the lock
+                if self._reconciled_at is None:
+                    self.reconcile(reason="inline")
+        self.start()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="omi-provider-stats", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.RECONCILE_INTERVAL_SEC):
+            with self._reconcile_lock:
+                self.reconcile(reason="background")
+
+    def reconcile(self, reason: str = "background"):
+        """Rebuild the table from the DB with one grouped query per source table."""
+        from sqlalchemy import func, case
+        escalations, ece, penalties = {}, {}, {}
+        db = acquire_session()
+        try:
+            decision_rows = db.query(
+                RoutingDecision.initial_route,
+                RoutingDecision.complexity,
+                RoutingDecision.escalated,
+                func.count(RoutingDecision.id)
+            ).group_by(RoutingDecision.initial_route, RoutingDecision.complexity, RoutingDecision.escalated).all()
+            for model, complexity, escalated, count in decision_rows:
+                totals, escs = self._escalation_row(escalations, model)
+                bucket = self._bucket(complexity)
+                totals[bucket] += count
+                if escalated:
+                    escs[bucket] += count
+
+            failure_rows = db.query(
+                ModelFailure.model_id,
+                func.count(ModelFailure.id),
+                func.sum(case(((ModelFailure.failure_reason == None) | (ModelFailure.failure_reason == ''), 1), else_=0)),
+                func.sum(ModelFailure.calibrated_confidence),
+                func.count(ModelFailure.calibrated_confidence)
+            ).group_by(ModelFailure.model_id).all()
+            for model, count, successes, conf_sum, conf_count in failure_rows:
+                ece[model] = [count, int(successes or 0), float(conf_sum or 0.0), conf_count]
+
+            penalty_rows = db.query(
+                HumanFeedback.provider,
+                func.sum(HumanFeedback.trust_score)
+            ).filter(
+                HumanFeedback.feedback_type.in_(self.PENALTY_FEEDBACK_TYPES)
+            ).group_by(HumanFeedback.provider).all()
+            for provider, total in penalty_rows:
+                penalties[provider] = float(total or 0.0)
+        except Exception as e:
+            print(f"[Provider Stats] Reconciliation failed: {str(e)}")
+            self.stats["failures"] += 1
+            # Retry on the next interval rather than hammering a broken DB on every route
+            self._reconciled_at = time.monotonic()
+            return
+        finally:
+            release_session(db)
+
+        with self._lock:
+            self._escalations = escalations
+            self._ece = ece
+            self._penalties = penalties
+            self._reconciled_at = time.monotonic()
+            self._generation += 1
+        self.stats["reconciles"] += 1
+        self.stats[f"{reason}_reconciles"] += 1
+
+    def invalidate(self):
+        """Force a rebuild on the next read (e.g. after bulk imports or table resets)."""
+        self._reconciled_at = None
+        with self._lock:
+            self._generation += 1
+
+    def version(self, model: str):
+        """Cheap change marker for a model's reliability inputs, for downstream caches."""
+        self._ensure_fresh()
+        return self._generation, self._versions.get(model, 0)
+
+    def record_decision(self, model: str, complexity: float, escalated: bool):
+        with self._lock:
+            totals, escs = self._escalation_row(self._escalations, model)
+            bucket = self._bucket(complexity)
+            totals[bucket] += 1
+            if escalated:
+                escs[bucket] += 1
+                self._versions[model] = self._versions.get(model, 0) + 1
+
+    def record_failure(self, model: str, failure_reason: str, calibrated_confidence: float):
+        with self._lock:
+            row = self._ece.setdefault(model, [0, 0, 0.0, 0])
+            self._versions[model] = self._versions.get(model, 0) + 1
+            row[0] += 1
+            if not failure_reason:
+                row[1] += 1
+            if calibrated_confidence is not None:
+                row[2] += calibrated_confidence
+                row[3] += 1
+
+    def record_feedback(self, provider: str, feedback_type: str, trust_score: float):
+        if feedback_type not in self.PENALTY_FEEDBACK_TYPES:
+            return
+        with self._lock:
+            self._penalties[provider] = self._penalties.get(provider, 0.0) + trust_score
+
+    def escalation_counts(self, model: str, min_complexity: float = 0.0):
+        """Returns (total, escalated) decisions for the model at or above min_complexity."""
+        self._ensure_fresh()
+        row = self._escalations.get(model)
+        if row is None:
+            return 0, 0
+        start = self._threshold_bucket(min_complexity)
+        return sum(row[0][start:]), sum(row[1][start:])
+
+    def ece_accumulators(self, model: str):
+        """Returns [failure_count, success_count, conf_sum, conf_count] or None."""
+        self._ensure_fresh()
+        return self._ece.get(model)
+
+    def feedback_penalty(self, model: str) -> float:
+        self._ensure_fresh()
+        return self._penalties.get(model, 0.0)
+
 class DataMoat:
     """
     The Learning Loop (Data Moat).
@@ -20,6 +203,7 @@ class DataMoat:
     """
     def __init__(self):
         self._init_db()
+        self.provider_stats = ProviderStatsTable()
 
     def _init_db(self):
         # Phase 6A: Use SQLAlchemy to generate schema
@@ -74,6 +258,10 @@ class DataMoat:
             with engine.begin() as conn:
                 if "embedding" not in sc_cols:
                     conn.execute(text("ALTER TABLE semantic_cache_entries ADD COLUMN embedding TEXT"))
+                if "embedding_vec" not in sc_cols:
+                    conn.execute(text("ALTER TABLE semantic_cache_entries ADD COLUMN embedding_vec BLOB"))
+                if "embedding_dtype" not in sc_cols:
+                    conn.execute(text("ALTER TABLE semantic_cache_entries ADD COLUMN embedding_dtype VARCHAR DEFAULT 'float32'"))
                 if "hits" not in sc_cols:
                     conn.execute(text("ALTER TABLE semantic_cache_entries ADD COLUMN hits INTEGER DEFAULT 0"))
                 if "drift_score" not in sc_cols:
@@ -84,6 +272,16 @@ class DataMoat:
                     conn.execute(text("ALTER TABLE semantic_cache_entries ADD COLUMN provenance TEXT"))
                 if "provenance_cri" not in sc_cols:
                     conn.execute(text("ALTER TABLE semantic_cache_entries ADD COLUMN provenance_cri FLOAT DEFAULT 1.0"))
+                if "reuse_count" not in sc_cols:
+                    conn.execute(text("ALTER TABLE semantic_cache_entries ADD COLUMN reuse_count INTEGER DEFAULT 0"))
+                if "last_reuse_timestamp" not in sc_cols:
+                    conn.execute(text("ALTER TABLE semantic_cache_entries ADD COLUMN last_reuse_timestamp VARCHAR"))
+                if "revalidate_count" not in sc_cols:
+                    conn.execute(text("ALTER TABLE semantic_cache_entries ADD COLUMN revalidate_count INTEGER DEFAULT 0"))
+                if "drift_triggers" not in sc_cols:
+                    conn.execute(text("ALTER TABLE semantic_cache_entries ADD COLUMN drift_triggers VARCHAR"))
+                if "linked_workflows" not in sc_cols:
+                    conn.execute(text("ALTER TABLE semantic_cache_entries ADD COLUMN linked_workflows TEXT"))
                     
         # Check model_failures
         if "model_failures" in inspector.get_table_names():
@@ -117,41 +315,70 @@ class DataMoat:
         tokens_saved: int = 0,
         cognitive_module: str = None,
         cognitive_provenance: str = None,
-        provenance_cri: float = 1.0
+        provenance_cri: float = 1.0,
+        is_consensus: bool = False,
+        consensus_score: float = None,
+        cer_value: float = None,
+        consensus_trace: str = None,
+        write_behind: bool = False
     ):
-        """Asynchronously log interactions to slowly build the proprietary data moat using SQLAlchemy."""
-        db = SessionLocal()
-        try:
-            decision = RoutingDecision(
-                timestamp=datetime.utcnow().isoformat(),
-                complexity=complexity,
-                language="en",
-                initial_route=selected_model,
-                escalated=escalated,
-                final_route=final_route or selected_model,
-                latency_ms=latency_ms,
-                confidence=0.0,
-                shadow_model=shadow_model,
-                input_tokens=input_tokens,
-                output_tokens=output_tokens,
-                cost_usd=cost_usd,
-                is_reliable=is_reliable,
-                workflow_id=workflow_id,
-                utility_score=utility_score,
-                is_retry=is_retry,
-                task_success=task_success,
-                cache_hit=cache_hit,
-                tokens_saved=tokens_saved,
-                cognitive_module=cognitive_module,
-                cognitive_provenance=cognitive_provenance,
-                provenance_cri=provenance_cri
+        """
+        Asynchronously log interactions to slowly build the proprietary data moat using SQLAlchemy.
+        With write_behind=True the row id is pre-allocated and the insert is handed to the
+        TelemetryWriter, so the caller does not wait on a commit.
+        """
+        row = dict(
+            timestamp=datetime.utcnow().isoformat(),
+            complexity=complexity,
+            language="en",
+            initial_route=selected_model,
+            escalated=escalated,
+            final_route=final_route or selected_model,
+            latency_ms=latency_ms,
+            confidence=0.0,
+            shadow_model=shadow_model,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cost_usd=cost_usd,
+            is_reliable=is_reliable,
+            workflow_id=workflow_id,
+            utility_score=utility_score,
+            is_retry=is_retry,
+            task_success=task_success,
+            cache_hit=cache_hit,
+            tokens_saved=tokens_saved,
+            cognitive_module=cognitive_module,
+            cognitive_provenance=cognitive_provenance,
+            provenance_cri=provenance_cri,
+            is_consensus=is_consensus,
+            consensus_score=consensus_score,
+            cer_value=cer_value,
+            consensus_trace=consensus_trace
+        )
+        if write_behind:
+            from infra.telemetry_writer import telemetry_writer
+            row["id"] = telemetry_writer.allocate_id(RoutingDecision)
+            telemetry_writer.insert(RoutingDecision, row)
+            self.provider_stats.record_decision(selected_model, complexity, escalated)
+            # Core inserts bypass the ORM events that feed the drift signal table
+            drift_signals.record_decision(
+                row["id"], row["final_route"], row["timestamp"], row["utility_score"],
+                bool(row["is_consensus"]), row["consensus_score"]
             )
+            governance_snapshots.note_decision()
+            return row["id"]
+
+        db = acquire_session()
+        try:
+            decision = RoutingDecision(**row)
             db.add(decision)
             db.commit()
             db.refresh(decision)
+            self.provider_stats.record_decision(selected_model, complexity, escalated)
+            governance_snapshots.note_decision()
             return decision.id
         finally:
-            db.close()
+            release_session(db)
 
 
             
@@ -165,9 +392,27 @@ class DataMoat:
         latency_ms: float = 0.0,
         input_tokens: int = 0,
         output_tokens: int = 0,
-        cost_usd: float = 0.0
+        cost_usd: float = 0.0,
+        write_behind: bool = False
     ):
-        db = SessionLocal()
+        if write_behind:
+            # Runs on the telemetry writer after any queued decisions, so the unreliable-marking below sees them
+            from infra.telemetry_writer import telemetry_writer
+            telemetry_writer.submit(
+                self.log_failure,
+                model_id=model_id,
+                complexity=complexity,
+                failure_reason=failure_reason,
+                raw_confidence=raw_confidence,
+                calibrated_confidence=calibrated_confidence,
+                latency_ms=latency_ms,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                cost_usd=cost_usd
+            )
+            return
+
+        db = acquire_session()
         try:
             failure = ModelFailure(
                 timestamp=datetime.utcnow().isoformat(),
@@ -194,8 +439,9 @@ class DataMoat:
                 decision.is_reliable = False
                 
             db.commit()
+            self.provider_stats.record_failure(model_id, failure_reason, calibrated_confidence)
         finally:
-            db.close()
+            release_session(db)
 
     def log_feedback(
         self,
@@ -217,7 +463,7 @@ class DataMoat:
             trust_score = 0.5  # Lower weight for unverified single-click feedback
             
         # 2. Coordination Probability Check (Synthetic Consensus / Swarm Attack)
-        db = SessionLocal()
+        db = acquire_session()
         try:
             if disagreement_reason and trust_score > 0.4:
                 # If we've seen this exact same feedback reason more than 3 times for this provider
@@ -240,37 +486,21 @@ class DataMoat:
             )
             db.add(feedback)
             db.commit()
+            self.provider_stats.record_feedback(provider, feedback_type, trust_score)
         finally:
-            db.close()
+            release_session(db)
 
 
     def get_escalation_rate(self, target_model: str, min_complexity: float = 0.5) -> float:
         """
         Query the memory bank: How often does this model fail on tasks 
         above this complexity threshold? Used by the Dynamic Router to preemptively 
-        avoid historically unreliable models.
+        avoid historically unreliable models. Served from the in-memory ProviderStatsTable.
         """
-        db = SessionLocal()
-        try:
-            total = db.query(RoutingDecision).filter(
-                RoutingDecision.initial_route == target_model,
-                RoutingDecision.complexity >= min_complexity
-            ).count()
-            
-            if total < 5:  # Not enough data to make a learning decision
-                return 0.0
-                
-            escalations = db.query(RoutingDecision).filter(
-                RoutingDecision.initial_route == target_model,
-                RoutingDecision.complexity >= min_complexity,
-                RoutingDecision.escalated == True
-            ).count()
-            
-            return escalations / total
-        except Exception:
+        total, escalations = self.provider_stats.escalation_counts(target_model, min_complexity)
+        if total < 5:  # Not enough data to make a learning decision
             return 0.0
-        finally:
-            db.close()
+        return escalations / total
 
     def get_provider_ece(self, target_model: str) -> float:
         """
@@ -278,26 +508,15 @@ class DataMoat:
         Calculates the historical gap between a provider's confidence and its actual accuracy.
         ECE = abs(Average Confidence - Average Accuracy)
         """
-        db = SessionLocal()
-        try:
-            from sqlalchemy import func
-            # Use model_failures to find historical calibrated_confidence vs actual success
-            # A successful request is one where failure_reason is NULL or empty
-            row = db.query(
-                func.avg(ModelFailure.calibrated_confidence),
-                func.sum(func.case((ModelFailure.failure_reason == None) | (ModelFailure.failure_reason == ''), 1, else_=0)) * 1.0 / func.count(ModelFailure.id)
-            ).filter(ModelFailure.model_id == target_model).first()
+        # Use model_failures to find historical calibrated_confidence vs actual success
+        # A successful request is one where failure_reason is NULL or empty
+        row = self.provider_stats.ece_accumulators(target_model)
+        if not row or row[0] == 0 or row[3] == 0:
+            return 0.1 # Default optimistic ECE
             
-            if not row or row[0] is None or row[1] is None:
-                return 0.1 # Default optimistic ECE
-                
-            avg_conf = float(row[0])
-            avg_acc = float(row[1])
-            return round(abs(avg_conf - avg_acc), 3)
-        except Exception:
-            return 0.1
-        finally:
-            db.close()
+        avg_conf = row[2] / row[3]
+        avg_acc = row[1] / row[0]
+        return round(abs(avg_conf - avg_acc), 3)
 
     def get_reputation_score(self, target_model: str) -> float:
         """
@@ -305,27 +524,15 @@ class DataMoat:
         Providers gain reputation by avoiding escalations and maintaining low ECE.
         Providers lose reputation from human feedback (trust_score weighted) and high ECE.
         """
-        db = SessionLocal()
-        try:
-            from sqlalchemy import func
-            penalties = db.query(func.sum(HumanFeedback.trust_score)).filter(
-                HumanFeedback.provider == target_model,
-                HumanFeedback.feedback_type.in_(['hallucination', 'false_confidence'])
-            ).scalar()
-            
-            penalties = float(penalties) if penalties is not None else 0.0
-            
-            # Base reputation from escalation rate
-            esc_rate = self.get_escalation_rate(target_model, min_complexity=0.0)
-            ece = self.get_provider_ece(target_model)
-            
-            # Formula: 1.0 - (Escalation Rate) - (ECE Penalty) - (Feedback Penalties scaled)
-            reputation = 1.0 - esc_rate - (ece * 0.5) - (penalties * 0.01)
-            return max(0.1, round(reputation, 3))
-        except Exception:
-            return 1.0
-        finally:
-            db.close()
+        penalties = self.provider_stats.feedback_penalty(target_model)
+        
+        # Base reputation from escalation rate
+        esc_rate = self.get_escalation_rate(target_model, min_complexity=0.0)
+        ece = self.get_provider_ece(target_model)
+        
+        # Formula: 1.0 - (Escalation Rate) - (ECE Penalty) - (Feedback Penalties scaled)
+        reputation = 1.0 - esc_rate - (ece * 0.5) - (penalties * 0.01)
+        return max(0.1, round(reputation, 3))
 
     def optimize_routing_weights(self, baseline_nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -341,7 +548,7 @@ class DataMoat:
         import json
         
         optimized_nodes = []
-        db = SessionLocal()
+        db = acquire_session()
         try:
             for node in baseline_nodes:
                 target = node["target"]
@@ -434,7 +641,7 @@ class DataMoat:
             print(f"[Governance Guard] Failed to optimize weights: {str(e)}")
             return baseline_nodes
         finally:
-            db.close()
+            release_session(db)
             
 # Global memory engine
 memory_bank = DataMoat()
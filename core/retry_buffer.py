@@ -0,0 +1,216 @@
+import re
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+from infra.embeddings import embedding_provider
+
+_EPOCH = datetime(1970, 1, 1)
+_WORD_RE = re.compile(r'\w+')
+
+
+def _ts(dt: datetime) -> float:
+    return (dt - _EPOCH).total_seconds()
+
+
+def _tokens(text: str) -> frozenset:
+    return frozenset(_WORD_RE.findall(text.lower()))
+
+
+class RecentPromptBuffer:
+    """
+    Chronological ring buffer of recently served prompts for implicit-retry detection.
+    Each prompt's normalized embedding, token set and workflow are computed once at insert
+    time. Slots are written in time order, so expiry just advances the tail past entries
+    older than WINDOW_SEC, and a full ring overwrites its oldest slot.
+
+    Lookups never touch the DB. Semantic similarity is one matrix-vector product over the
+    live slots. Lexical overlap comes from an inverted token index (only slots sharing a
+    token with the query get a non-zero Jaccard). Workflow context is a vectorized compare
+    over interned workflow codes.
+
+    Scoring matches the original per-entry loop:
+    RetryScore = 0.25 * LexicalOverlap + 0.50 * SemanticSimilarity + 0.15 * WorkflowContext + 0.10 * TemporalProximity
+    with the most recent qualifying prompt winning.
+    """
+    CAPACITY = 4096
+    WINDOW_SEC = 300.0
+    RETRY_THRESHOLD = 0.45
+
+    def __init__(self, capacity: int = CAPACITY, window_sec: float = WINDOW_SEC):
+        self.capacity = capacity
+        self.window_sec = window_sec
+        self._lock = threading.Lock()
+        self._reset(embedding_provider.dim)
+
+    def _reset(self, dim: int):
+        self._embeddings = np.zeros((self.capacity, dim), dtype=np.float64)
+        self._timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self._seq = np.zeros(self.capacity, dtype=np.int64)
+        self._workflows = np.full(self.capacity, -1, dtype=np.int64)
+        self._token_counts = np.zeros(self.capacity, dtype=np.int64)
+        self._live = np.zeros(self.capacity, dtype=bool)
+        self._ids: List[Optional[int]] = [None] * self.capacity
+        self._prompts: List[Optional[str]] = [None] * self.capacity
+        self._tokens: List[frozenset] = [frozenset()] * self.capacity
+        self._token_index: Dict[str, set] = {}
+        self._workflow_codes: Dict[str, int] = {}
+        self._slot_by_id: Dict[int, int] = {}
+        self._head = 0      # Next slot to write
+        self._tail = 0      # Oldest live slot
+        self._size = 0
+        self._next_seq = 0
+
+    # ── Writes ────────────────────────────────────────────────────────────────
+
+    def _workflow_code(self, workflow_id: Optional[str]) -> int:
+        if not workflow_id:
+            return -1
+        code = self._workflow_codes.get(workflow_id)
+        if code is None:
+            code = len(self._workflow_codes)
+            self._workflow_codes[workflow_id] = code
+        return code
+
+    def _evict_locked(self, slot: int):
+        for token in self._tokens[slot]:
+            rows = self._token_index.get(token)
+            if rows is not None:
+                rows.discard(slot)
+                if not rows:
+                    del self._token_index[token]
+        if self._slot_by_id.get(self._ids[slot]) == slot:
+            del self._slot_by_id[self._ids[slot]]
+        self._live[slot] = False
+        self._ids[slot] = None
+        self._prompts[slot] = None
+        self._tokens[slot] = frozenset()
+        self._tail = (self._tail + 1) % self.capacity
+        self._size -= 1
+
+    def _expire_locked(self, now_ts: float):
+        cutoff = now_ts - self.window_sec
+        while self._size and self._timestamps[self._tail] < cutoff:
+            self._evict_locked(self._tail)
+        if not self._size:
+            # Nothing live: drop interned workflows so the table cannot grow without bound
+            self._workflow_codes.clear()
+
+    def _add_locked(self, decision_id: int, prompt: str, workflow_id: Optional[str], ts: float, vec: np.ndarray):
+        if vec.shape[0] != self._embeddings.shape[1]:
+            # Embedding backend changed dimension: start over rather than mix vector spaces
+            self._reset(vec.shape[0])
+        if self._size == self.capacity:
+            self._evict_locked(self._tail)
+        slot = self._head
+        norm = np.linalg.norm(vec)
+        self._embeddings[slot] = vec / norm if norm > 0 else 0.0
+        self._timestamps[slot] = ts
+        self._seq[slot] = self._next_seq
+        self._next_seq += 1
+        self._workflows[slot] = self._workflow_code(workflow_id)
+        tokens = _tokens(prompt)
+        self._tokens[slot] = tokens
+        self._token_counts[slot] = len(tokens)
+        for token in tokens:
+            self._token_index.setdefault(token, set()).add(slot)
+        self._ids[slot] = decision_id
+        self._prompts[slot] = prompt
+        self._live[slot] = True
+        self._slot_by_id[decision_id] = slot
+        self._head = (self._head + 1) % self.capacity
+        self._size += 1
+
+    def add(self, decision_id: int, prompt: str, workflow_id: Optional[str] = None, timestamp: Optional[datetime] = None):
+        ts = _ts(timestamp or datetime.utcnow())
+        vec = np.asarray(embedding_provider.embed(prompt), dtype=np.float64)
+        with self._lock:
+            self._expire_locked(ts)
+            self._add_locked(decision_id, prompt, workflow_id, ts, vec)
+
+    @classmethod
+    def from_entries(cls, entries: List[Dict[str, Any]], db=None) -> "RecentPromptBuffer":
+        """
+        Builds a buffer from legacy {"id", "prompt", "timestamp"[, "workflow_id"]} dicts.
+        Entries without a workflow_id are resolved with one RoutingDecision lookup.
+        """
+        missing = [e["id"] for e in entries if "workflow_id" not in e]
+        resolved: Dict[int, Optional[str]] = {}
+        if missing and db is not None:
+            from infra.models import RoutingDecision
+            rows = db.query(RoutingDecision.id, RoutingDecision.workflow_id).filter(RoutingDecision.id.in_(missing)).all()
+            resolved = {row.id: row.workflow_id for row in rows}
+        buffer = cls(capacity=max(1, len(entries)), window_sec=float("inf"))
+        for entry in entries:
+            workflow_id = entry["workflow_id"] if "workflow_id" in entry else resolved.get(entry["id"])
+            buffer.add(entry["id"], entry["prompt"], workflow_id, timestamp=entry["timestamp"])
+        return buffer
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+
+    def get_prompt(self, decision_id: int) -> str:
+        with self._lock:
+            slot = self._slot_by_id.get(decision_id)
+            return self._prompts[slot] if slot is not None else ""
+
+    def __len__(self) -> int:
+        return self._size
+
+    def detect_retry(
+        self,
+        prompt: str,
+        workflow_id: Optional[str] = None,
+        time_window_sec: float = 300,
+        now: Optional[datetime] = None
+    ) -> Tuple[bool, int, str]:
+        """Returns (is_retry, previous_decision_id, reason) for the most recent qualifying prompt."""
+        now_ts = _ts(now or datetime.utcnow())
+        query_vec = np.asarray(embedding_provider.embed(prompt), dtype=np.float64)
+        query_norm = np.linalg.norm(query_vec)
+        query_tokens = _tokens(prompt)
+
+        with self._lock:
+            if self._size == 0 or query_vec.shape[0] != self._embeddings.shape[1]:
+                return False, -1, "No matching retry found"
+
+            time_diff = now_ts - self._timestamps
+            candidates = self._live & (time_diff <= time_window_sec)
+            if not candidates.any():
+                return False, -1, "No matching retry found"
+
+            # Semantic similarity: stored rows are unit vectors
+            sem_sim = self._embeddings @ (query_vec / query_norm) if query_norm > 0 else np.zeros(self.capacity)
+
+            # Lexical overlap (Jaccard) via the inverted token index
+            intersections = np.zeros(self.capacity, dtype=np.int64)
+            for token in query_tokens:
+                rows = self._token_index.get(token)
+                if rows:
+                    intersections[list(rows)] += 1
+            overlap = np.zeros(self.capacity, dtype=np.float64)
+            if query_tokens:
+                unions = len(query_tokens) + self._token_counts - intersections
+                np.divide(intersections, unions, out=overlap, where=(intersections > 0) & (unions > 0))
+
+            code = self._workflow_codes.get(workflow_id) if workflow_id else None
+            wf_ctx = (self._workflows == code).astype(np.float64) if code is not None else np.zeros(self.capacity)
+
+            temp_prox = np.maximum(0.0, 1.0 - (time_diff / 300.0))
+
+            retry_score = 0.25 * overlap + 0.50 * sem_sim + 0.15 * wf_ctx + 0.10 * temp_prox
+            matches = np.nonzero(candidates & (retry_score >= self.RETRY_THRESHOLD))[0]
+            if matches.size == 0:
+                return False, -1, "No matching retry found"
+
+            slot = int(matches[np.argmax(self._seq[matches])])
+            dec_id = self._ids[slot]
+            return True, dec_id, (
+                f"Implicit retry detected: score={retry_score[slot]:.2f} (lex={overlap[slot]:.2f}, "
+                f"sem={sem_sim[slot]:.2f}, wf={wf_ctx[slot]:.2f}, temp={temp_prox[slot]:.2f}) "
+                f"with decision {dec_id} within {time_diff[slot]:.1f}s"
+            )
+
+
+# Global buffer of prompts served in the last WINDOW_SEC, shared by all requests
+recent_prompt_buffer = RecentPromptBuffer()
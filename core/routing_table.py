@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.learning_loop import memory_bank
+
+# Seconds between background rebuilds of the learned routing table
+ROUTING_TABLE_REFRESH_SEC = float(os.getenv("OMI_ROUTING_TABLE_REFRESH_SEC", "60"))
+
+
+class RoutingTable:
+    """
+    Immutable, versioned snapshot of the learned provider nodes.
+    Routers read whichever table is current; a rebuild publishes a new object instead of
+    mutating the old one, so a request never observes a half-applied optimization.
+    """
+    __slots__ = ("version", "built_at", "build_ms", "nodes")
+
+    def __init__(self, version: int, nodes: List[Dict[str, Any]], built_at: Optional[str] = None, build_ms: float = 0.0):
+        self.version = version
+        self.built_at = built_at or datetime.utcnow().isoformat()
+        self.build_ms = build_ms
+        self.nodes: Tuple[MappingProxyType, ...] = tuple(
+            MappingProxyType(dict(node, tags=tuple(node.get("tags", [])))) for node in nodes
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "built_at": self.built_at,
+            "build_ms": round(self.build_ms, 2),
+            "nodes": [dict(node, tags=list(node["tags"])) for node in self.nodes]
+        }
+
+
+class RoutingTableOptimizer:
+    """
+    Runs DataMoat.optimize_routing_weights off the request path.
+    A daemon worker rebuilds the table every ROUTING_TABLE_REFRESH_SEC and swaps it in with
+    a single reference assignment. Until the first build lands, routers serve the baseline
+    nodes as version 0. Rebuilds are serialized, so concurrent triggers never stack up.
+    """
+
+    def __init__(self, baseline_nodes: List[Dict[str, Any]], interval_sec: float = ROUTING_TABLE_REFRESH_SEC):
+        self.baseline_nodes = baseline_nodes
+        self.interval_sec = interval_sec
+        self._table = RoutingTable(0, baseline_nodes)
+        self._build_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {"builds": 0, "failures": 0, "last_error": None}
+
+    @property
+    def current(self) -> RoutingTable:
+        """The published table (lock-free read); starts the worker on first use."""
+        self.start()
+        return self._table
+
+    def rebuild(self) -> RoutingTable:
+        """Builds and publishes a new table version (also callable directly, e.g. by admin tooling)."""
+        with self._build_lock:
+            started = time.perf_counter()
+            try:
+                nodes = memory_bank.optimize_routing_weights(self.baseline_nodes)
+            except Exception as e:
+                self.stats["failures"] += 1
+                self.stats["last_error"] = str(e)
+                print(f"[Routing Table] Rebuild failed, keeping version {self._table.version}: {e}")
+                return self._table
+            table = RoutingTable(
+                self._table.version + 1,
+                nodes,
+                build_ms=(time.perf_counter() - started) * 1000
+            )
+            self._table = table
+            self.stats["builds"] += 1
+            return table
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="omi-routing-optimizer", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.rebuild()
+            self._stop.wait(self.interval_sec)
+
+    def status(self) -> Dict[str, Any]:
+        status = self._table.to_dict()
+        status.update({
+            "refresh_interval_sec": self.interval_sec,
+            "worker_alive": self._thread is not None and self._thread.is_alive(),
+            "builds": self.stats["builds"],
+            "failures": self.stats["failures"],
+            "last_error": self.stats["last_error"]
+        })
+        return status
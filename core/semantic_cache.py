@@ -3,10 +3,17 @@ import hashlib
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Tuple, Optional
 import numpy as np
+from sqlalchemy import func
 
 from infra.database import SessionLocal
 from infra.models import SemanticCacheEntry, RoutingDecision
 from infra.calibration import AdvancedCalibrationEngine
+from infra.embedding_codec import EmbeddingCodec
+from core.semantic_index import semantic_index
+from core.semantic_cache_l1 import semantic_l1
+from core.semantic_cache_capacity import cache_capacity
+from core.semantic_cache_prefilter import semantic_prefilter
+from infra.embeddings import embedding_provider
 
 class SemanticCache:
     """
@@ -27,82 +34,147 @@ class SemanticCache:
         """
         Retrieves a cached entry if it passes similarity matching and safeguards.
         """
-        if not prompt:
-            return None
+        return SemanticCache.get_entries(
+            db, [prompt], [workflow_id], [min_confidence],
+            similarity_threshold=similarity_threshold,
+            staleness_window_sec=staleness_window_sec
+        )[0]
 
-        prompt_hash = hashlib.sha256(prompt.strip().encode("utf-8")).hexdigest()
+    @staticmethod
+    def get_entries(
+        db,
+        prompts: List[str],
+        workflow_ids: List[Optional[str]],
+        min_confidences: List[float],
+        similarity_threshold: float = 0.85,
+        staleness_window_sec: float = 86400.0
+    ) -> List[Optional[SemanticCacheEntry]]:
+        """
+        Batched get_entry: in-process L1 hits first, then one exact-hash query for the remaining
+        prompts, then one batched vector-index search (and one row fetch) for the prompts without
+        an exact hit. Results are positional; safeguards, drift/CRI processing and hit accounting
+        run per prompt exactly as in get_entry. L1 hits are detached CachedHit snapshots.
+        Recently missed prompts, hashes absent from the hash filter and prompts that cannot reach
+        similarity_threshold skip the matching DB / index work (see SemanticCachePrefilter).
+        """
+        results: List[Optional[SemanticCacheEntry]] = [None] * len(prompts)
         now = datetime.utcnow()
-
-        # 1. Check exact match first (O(1) database lookup)
-        exact_entries = db.query(SemanticCacheEntry).filter(
-            SemanticCacheEntry.prompt_hash == prompt_hash
-        ).all()
-
-        for entry in exact_entries:
-            action = SemanticCache._process_drift_and_cri(db, entry, prompt, workflow_id, now)
-            if action == "quarantine":
+        hashes = [hashlib.sha256(p.strip().encode("utf-8")).hexdigest() if p else None for p in prompts]
+
+        # 0. L1: validated exact hits held in process (hit counters are flushed write-behind)
+        for i, prompt_hash in enumerate(hashes):
+            if prompt_hash is not None:
+                results[i] = semantic_l1.get(prompt_hash, workflow_ids[i], min_confidences[i], now, staleness_window_sec)
+                if results[i] is not None:
+                    hashes[i] = None
+        generation = semantic_l1.generation
+
+        # 0b. Negative cache: prompts that missed recently with the same scope and thresholds
+        miss_generation = semantic_prefilter.generation
+        miss_keys = {}
+        if any(hashes):
+            semantic_prefilter.ensure_loaded(db)
+        for i, prompt_hash in enumerate(hashes):
+            if prompt_hash is not None:
+                miss_keys[i] = (prompt_hash, workflow_ids[i], min_confidences[i], similarity_threshold, staleness_window_sec)
+                if semantic_prefilter.is_known_miss(miss_keys[i]):
+                    del miss_keys[i]
+                    hashes[i] = None
+
+        # 1. Exact matches (one IN query over the prompt hashes the hash filter may hold)
+        wanted = sorted({h for h in hashes if h and semantic_prefilter.may_contain_hash(h)})
+        exact_by_hash: Dict[str, List[SemanticCacheEntry]] = {}
+        if wanted:
+            for entry in db.query(SemanticCacheEntry).filter(SemanticCacheEntry.prompt_hash.in_(wanted)).order_by(SemanticCacheEntry.id).all():
+                exact_by_hash.setdefault(entry.prompt_hash, []).append(entry)
+            for prompt_hash in wanted:
+                semantic_prefilter.note_exact_result(prompt_hash in exact_by_hash)
+
+        pending = []
+        for i, prompt_hash in enumerate(hashes):
+            if prompt_hash is None:
                 continue
-            if SemanticCache._validate_safeguards(entry, workflow_id, min_confidence, now, staleness_window_sec):
-                # Enforce duplication safeguard to isolate cross-workflow cascades
-                from core.complexity_governor import ComplexityGovernor
-                final_entry = ComplexityGovernor.enforce_duplication_safeguard(db, entry, workflow_id)
-                final_entry.must_revalidate = (action == "revalidate")
-                final_entry.hits += 1
-                db.commit()
-                return final_entry
+            for entry in exact_by_hash.get(prompt_hash, []):
+                served = SemanticCache._serve_candidate(db, entry, prompts[i], workflow_ids[i], min_confidences[i], now, staleness_window_sec)
+                if served is not None:
+                    results[i] = served
+                    if not served.must_revalidate:
+                        semantic_l1.put(prompt_hash, workflow_ids[i], served, generation)
+                    break
+            if results[i] is None:
+                pending.append(i)
+
+        # Prompts no stored entry could reach at similarity_threshold skip the vector scan
+        pending = [i for i in pending if semantic_prefilter.may_reach(prompts[i], similarity_threshold)]
+        if not pending:
+            SemanticCache._record_misses(results, prompts, miss_keys, miss_generation)
+            return results
 
         # 2. Embedding-based retrieval for semantic similarity
-        # Fetch entries from last 24h or same workflow to compute similarity
-        cutoff = (now - timedelta(seconds=staleness_window_sec)).isoformat()
-        
-        # If workflow_id is active, prioritize checking workflow entries first
-        query = db.query(SemanticCacheEntry)
-        if workflow_id:
-            # We can retrieve workflow-specific entries or global entries (where workflow_id is null)
-            candidates = query.filter(
-                (SemanticCacheEntry.timestamp >= cutoff) &
-                ((SemanticCacheEntry.workflow_id == workflow_id) | (SemanticCacheEntry.workflow_id.is_(None)))
-            ).all()
-        else:
-            candidates = query.filter(
-                (SemanticCacheEntry.timestamp >= cutoff) &
-                (SemanticCacheEntry.workflow_id.is_(None))
-            ).all()
-
-        if not candidates:
-            return None
-
-        # Compute embedding for target prompt
-        target_emb = AdvancedCalibrationEngine._mock_embedding(prompt)
-        
-        best_candidate = None
-        best_similarity = -1.0
+        # Top-k over the in-process vector index (entries from the staleness window, scoped to
+        # the workflow plus global entries), then re-validate each hit against its DB row.
+        cutoff = now - timedelta(seconds=staleness_window_sec)
+        semantic_index.sync(db)
+        target_embs = embedding_provider.embed_many([prompts[i] for i in pending])
+        searches = semantic_index.search_many(target_embs, [workflow_ids[i] for i in pending], cutoff, similarity_threshold)
+        for hits in searches:
+            semantic_prefilter.note_scan_result(bool(hits))
+
+        candidate_ids = sorted({entry_id for hits in searches for _, entry_id, _ in hits})
+        rows = {}
+        if candidate_ids:
+            rows = {row.id: row for row in db.query(SemanticCacheEntry).filter(SemanticCacheEntry.id.in_(candidate_ids)).all()}
+
+        for i, hits in zip(pending, searches):
+            best_candidate = None
+            for _, entry_id, entry_hash in hits:
+                c = rows.get(entry_id)
+                if c is None or c.prompt_hash != entry_hash:
+                    semantic_index.remove([entry_id])
+                    continue
+                if c.is_quarantined:
+                    semantic_index.set_quarantined(entry_id, True)
+                    continue
+                best_candidate = c
+                break
+            if best_candidate:
+                results[i] = SemanticCache._serve_candidate(
+                    db, best_candidate, prompts[i], workflow_ids[i], min_confidences[i], now, staleness_window_sec
+                )
+
+        SemanticCache._record_misses(results, prompts, miss_keys, miss_generation)
+        return results
 
-        for c in candidates:
-            if c.is_quarantined:
-                continue
-            try:
-                c_emb_list = json.loads(c.embedding)
-                c_emb = np.array(c_emb_list)
-                sim = AdvancedCalibrationEngine._cosine_similarity(target_emb, c_emb)
-                if sim >= similarity_threshold and sim > best_similarity:
-                    best_similarity = sim
-                    best_candidate = c
-            except Exception:
-                continue
-
-        if best_candidate:
-            action = SemanticCache._process_drift_and_cri(db, best_candidate, prompt, workflow_id, now)
-            if action != "quarantine" and SemanticCache._validate_safeguards(best_candidate, workflow_id, min_confidence, now, staleness_window_sec):
-                # Enforce duplication safeguard to isolate cross-workflow cascades
-                from core.complexity_governor import ComplexityGovernor
-                final_candidate = ComplexityGovernor.enforce_duplication_safeguard(db, best_candidate, workflow_id)
-                final_candidate.must_revalidate = (action == "revalidate")
-                final_candidate.hits += 1
-                db.commit()
-                return final_candidate
+    @staticmethod
+    def _record_misses(results, prompts, miss_keys, generation: int):
+        """Remembers the prompts that went through the full lookup without a servable entry."""
+        for i, key in miss_keys.items():
+            if results[i] is None:
+                semantic_prefilter.record_miss(key, prompts[i], generation)
 
-        return None
+    @staticmethod
+    def _serve_candidate(
+        db,
+        entry: SemanticCacheEntry,
+        prompt: str,
+        workflow_id: Optional[str],
+        min_confidence: float,
+        now: datetime,
+        staleness_window_sec: float
+    ) -> Optional[SemanticCacheEntry]:
+        """Runs drift/CRI processing and safeguards on a candidate; returns the entry to serve, if any."""
+        action = SemanticCache._process_drift_and_cri(db, entry, prompt, workflow_id, now)
+        if action == "quarantine":
+            return None
+        if not SemanticCache._validate_safeguards(entry, workflow_id, min_confidence, now, staleness_window_sec):
+            return None
+        # Enforce duplication safeguard to isolate cross-workflow cascades
+        from core.complexity_governor import ComplexityGovernor
+        final_entry = ComplexityGovernor.enforce_duplication_safeguard(db, entry, workflow_id)
+        final_entry.must_revalidate = (action == "revalidate")
+        final_entry.hits = func.coalesce(SemanticCacheEntry.hits, 0) + 1  # Atomic in-DB increment
+        db.commit()
+        return final_entry
 
     @staticmethod
     def _process_drift_and_cri(
@@ -138,23 +210,16 @@ class SemanticCache:
         cri = reliability_pres * utility_pres * (1.0 - semantic_drift) * (1.0 - compression_loss)
         entry.provenance_cri = cri
 
-        # Trace provenance details
-        try:
-            prov_dict = json.loads(entry.provenance) if entry.provenance else {}
-        except Exception:
-            prov_dict = {}
-
-        prov_dict["reuse_count"] = prov_dict.get("reuse_count", 0) + 1
-        prov_dict["last_reuse_timestamp"] = now.isoformat()
-        prov_dict["last_drift_score"] = drift_score
-        prov_dict["last_cri"] = cri
-        prov_dict["drift_triggers"] = [k for k, v in drift_res["triggers"].items() if v]
-        
-        entry.provenance = json.dumps(prov_dict)
+        # Trace reuse in the typed counter columns (drift_score / provenance_cri hold the last evaluation);
+        # increments are computed in the UPDATE, so concurrent hits on a hot row do not lose counts
+        entry.reuse_count = func.coalesce(SemanticCacheEntry.reuse_count, 0) + 1
+        entry.last_reuse_timestamp = now.isoformat()
+        entry.drift_triggers = ",".join(k for k, v in drift_res["triggers"].items() if v) or None
 
         if action == "quarantine" or cri < 0.70:
             entry.is_quarantined = True
             db.commit()
+            semantic_index.set_quarantined(entry.id, True)
             return "quarantine"
         elif action == "decay":
             entry.confidence = max(0.50, entry.confidence - 0.10)
@@ -162,8 +227,7 @@ class SemanticCache:
             return "keep"
         elif action == "revalidate":
             entry.must_revalidate = True
-            prov_dict["revalidate_count"] = prov_dict.get("revalidate_count", 0) + 1
-            entry.provenance = json.dumps(prov_dict)
+            entry.revalidate_count = func.coalesce(SemanticCacheEntry.revalidate_count, 0) + 1
             db.commit()
             return "revalidate"
 
@@ -238,11 +302,14 @@ class SemanticCache:
             old_entry = db.query(SemanticCacheEntry).filter(SemanticCacheEntry.prompt_hash == prompt_hash).first()
             was_quarantined = old_entry.is_quarantined if old_entry else False
 
+            old_ids = [row[0] for row in db.query(SemanticCacheEntry.id).filter(SemanticCacheEntry.prompt_hash == prompt_hash).all()]
             db.query(SemanticCacheEntry).filter(SemanticCacheEntry.prompt_hash == prompt_hash).delete()
             db.commit()
+            semantic_index.remove(old_ids)
+            semantic_l1.invalidate_hash(prompt_hash, deleted=True)
 
             embedding_vec = AdvancedCalibrationEngine._mock_embedding(prompt)
-            embedding_json = json.dumps(embedding_vec.tolist())
+            embedding_blob, embedding_dtype = EmbeddingCodec.pack(embedding_vec)
 
             # Calculate initial CRI
             reliability_pres = 1.0 if is_reliable else 0.0
@@ -259,7 +326,6 @@ class SemanticCache:
                 "calibration_state": {"confidence": confidence},
                 "reuse_confidence": confidence,
                 "utility_preservation": utility_score,
-                "reuse_count": 0,
                 "recovered": was_quarantined
             }
 
@@ -278,15 +344,21 @@ class SemanticCache:
                 input_tokens=input_tokens,
                 output_tokens=output_tokens,
                 cost_usd=cost_usd,
-                embedding=embedding_json,
+                embedding=None,
+                embedding_vec=embedding_blob,
+                embedding_dtype=embedding_dtype,
                 hits=0,
                 drift_score=0.0,
                 is_quarantined=False,
                 provenance=json.dumps(prov_dict),
-                provenance_cri=initial_cri
+                provenance_cri=initial_cri,
+                reuse_count=0,
+                revalidate_count=0
             )
             db.add(entry)
             db.commit()
+            semantic_index.add(entry, embedding_vec)
+            cache_capacity.note_insert()
             return entry
         except Exception as e:
             db.rollback()
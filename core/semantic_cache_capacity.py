@@ -0,0 +1,283 @@
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+
+from infra.database import SessionLocal
+from infra.models import SemanticCacheEntry
+from core.semantic_index import semantic_index
+from core.semantic_cache_l1 import semantic_l1
+
+# Global limits on semantic_cache_entries (row count and approximate payload bytes)
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("OMI_SEMANTIC_CACHE_MAX_ENTRIES", "50000"))
+SEMANTIC_CACHE_MAX_BYTES = int(os.getenv("OMI_SEMANTIC_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Limits per workflow scope (global, workflow-less entries are only bound by the global limits)
+SEMANTIC_CACHE_WORKFLOW_MAX_ENTRIES = int(os.getenv("OMI_SEMANTIC_CACHE_WORKFLOW_MAX_ENTRIES", "2000"))
+SEMANTIC_CACHE_WORKFLOW_MAX_BYTES = int(os.getenv("OMI_SEMANTIC_CACHE_WORKFLOW_MAX_BYTES", str(16 * 1024 * 1024)))
+# Entries older than this are past every staleness window in use and are purged
+SEMANTIC_CACHE_RETENTION_SEC = float(os.getenv("OMI_SEMANTIC_CACHE_RETENTION_SEC", "172800"))
+# Grace period before quarantined/downgraded entries are purged (workflow verification can still recover them)
+SEMANTIC_CACHE_QUARANTINE_RETENTION_SEC = float(os.getenv("OMI_SEMANTIC_CACHE_QUARANTINE_RETENTION_SEC", "3600"))
+# Seconds between scheduled compaction runs
+SEMANTIC_CACHE_COMPACTION_SEC = float(os.getenv("OMI_SEMANTIC_CACHE_COMPACTION_SEC", "600"))
+# New cache entries that trigger an early compaction run
+SEMANTIC_CACHE_COMPACTION_TRIGGER = int(os.getenv("OMI_SEMANTIC_CACHE_COMPACTION_TRIGGER", "1000"))
+
+# Recency half-life of the eviction score
+RECENCY_HALF_LIFE_SEC = 6 * 3600.0
+_DELETE_CHUNK = 500
+
+
+def _epoch(value: Optional[str]) -> float:
+    try:
+        return (datetime.fromisoformat(value) - datetime(1970, 1, 1)).total_seconds()
+    except Exception:
+        return 0.0
+
+
+class CacheCapacityManager:
+    """
+    Keeps semantic_cache_entries bounded.
+    A compaction run first purges rows that can never be served again: quarantined or
+    downgraded (unreliable / utility < 0.75) rows idle for longer than the quarantine grace
+    period, rows past the retention window, and superseded rows (an older row of the same
+    prompt and workflow scope dominated by a newer one with the same response, e.g. the
+    sandbox copies piled up by enforce_duplication_safeguard). It then enforces the entry
+    count and byte limits per workflow scope and globally, evicting the lowest-value rows.
+
+    Value weighs reuse (hits), utility_score, provenance_cri, recency of last use and the
+    cost of recomputing the response (tokens, cost_usd). Rows holding critical memories
+    (governance, safety, legal terms) are never evicted for capacity. Deleted rows are
+    dropped from the vector index and the L1 tier in the same run.
+
+    A daemon worker runs compaction every interval_sec, or early after compaction_trigger
+    new entries, and reports its counters through /analytics/cognitive-efficiency.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+        max_bytes: int = SEMANTIC_CACHE_MAX_BYTES,
+        workflow_max_entries: int = SEMANTIC_CACHE_WORKFLOW_MAX_ENTRIES,
+        workflow_max_bytes: int = SEMANTIC_CACHE_WORKFLOW_MAX_BYTES,
+        retention_sec: float = SEMANTIC_CACHE_RETENTION_SEC,
+        quarantine_retention_sec: float = SEMANTIC_CACHE_QUARANTINE_RETENTION_SEC,
+        interval_sec: float = SEMANTIC_CACHE_COMPACTION_SEC,
+        compaction_trigger: int = SEMANTIC_CACHE_COMPACTION_TRIGGER
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.workflow_max_entries = workflow_max_entries
+        self.workflow_max_bytes = workflow_max_bytes
+        self.retention_sec = retention_sec
+        self.quarantine_retention_sec = quarantine_retention_sec
+        self.interval_sec = interval_sec
+        self.compaction_trigger = compaction_trigger
+        self._pending_inserts = 0
+        self._run_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {
+            "runs": 0, "purged_quarantined": 0, "purged_unreliable": 0, "purged_expired": 0,
+            "purged_superseded": 0, "evicted_workflow_capacity": 0, "evicted_global_capacity": 0,
+            "bytes_reclaimed": 0, "entries": 0, "bytes": 0, "last_run_ms": 0.0, "last_run_at": None,
+            "failures": 0, "last_error": None
+        }
+
+    # ── Scoring ───────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def last_activity(row) -> float:
+        """Epoch of the row's last reuse, or of its creation."""
+        return max(_epoch(row.timestamp), _epoch(row.last_reuse_timestamp))
+
+    @staticmethod
+    def eviction_score(row, now_epoch: float) -> float:
+        """Retention value of a row; the lowest-scoring rows are evicted first."""
+        if row.is_quarantined or not row.is_reliable:
+            return 0.0  # Not servable: the first to go, even inside the grace period
+        reuse = 1.0 + math.log1p(row.hits or 0)
+        utility = max(row.utility_score or 0.0, 0.0)
+        cri = max(row.provenance_cri if row.provenance_cri is not None else 1.0, 0.0)
+        idle = max(now_epoch - CacheCapacityManager.last_activity(row), 0.0)
+        recency = 0.5 ** (idle / RECENCY_HALF_LIFE_SEC)
+        tokens = (row.input_tokens or 0) + (row.output_tokens or 0)
+        recompute = 1.0 + math.log1p(tokens) / 10.0 + min((row.cost_usd or 0.0) * 100.0, 1.0)
+        return reuse * utility * cri * recency * recompute
+
+    # ── Compaction ────────────────────────────────────────────────────────────
+
+    @staticmethod
+    def _load(db) -> List[Any]:
+        size = sum(
+            func.coalesce(func.length(column), 0) for column in (
+                SemanticCacheEntry.prompt, SemanticCacheEntry.response, SemanticCacheEntry.reasoning,
+                SemanticCacheEntry.tool_chain, SemanticCacheEntry.provenance,
+                SemanticCacheEntry.embedding, SemanticCacheEntry.embedding_vec
+            )
+        )
+        return db.query(
+            SemanticCacheEntry.id, SemanticCacheEntry.timestamp, SemanticCacheEntry.prompt_hash,
+            SemanticCacheEntry.prompt, SemanticCacheEntry.response, SemanticCacheEntry.workflow_id,
+            SemanticCacheEntry.confidence, SemanticCacheEntry.utility_score, SemanticCacheEntry.is_reliable,
+            SemanticCacheEntry.is_quarantined, SemanticCacheEntry.hits, SemanticCacheEntry.last_reuse_timestamp,
+            SemanticCacheEntry.provenance_cri, SemanticCacheEntry.input_tokens, SemanticCacheEntry.output_tokens,
+            SemanticCacheEntry.cost_usd, size.label("size_bytes")
+        ).order_by(SemanticCacheEntry.id).all()
+
+    def _purge_reasons(self, rows, now_epoch: float) -> Dict[int, str]:
+        reasons: Dict[int, str] = {}
+        groups: Dict[tuple, list] = {}
+        for row in rows:
+            idle = now_epoch - self.last_activity(row)
+            if now_epoch - _epoch(row.timestamp) > self.retention_sec:
+                reasons[row.id] = "expired"
+            elif row.is_quarantined and idle > self.quarantine_retention_sec:
+                reasons[row.id] = "quarantined"
+            elif (not row.is_reliable or (row.utility_score or 0.0) < 0.75) and idle > self.quarantine_retention_sec:
+                reasons[row.id] = "unreliable"
+            else:
+                groups.setdefault((row.prompt_hash, row.workflow_id), []).append(row)
+
+        for group in groups.values():
+            servable = [r for r in group if not r.is_quarantined and r.is_reliable]
+            for older in group:
+                if any(
+                    newer.id > older.id and newer.timestamp >= older.timestamp and newer.response == older.response
+                    and (newer.confidence or 0.0) >= (older.confidence or 0.0)
+                    and (newer.utility_score or 0.0) >= (older.utility_score or 0.0)
+                    for newer in servable
+                ):
+                    reasons[older.id] = "superseded"
+        return reasons
+
+    def _evict(self, rows, max_entries: int, max_bytes: int, now_epoch: float) -> List[int]:
+        from core.cognitive_efficiency import CRITICAL_MEMORY_MATCHER
+        count = len(rows)
+        size = sum(row.size_bytes for row in rows)
+        if count <= max_entries and size <= max_bytes:
+            return []
+        evicted = []
+        for row in sorted(rows, key=lambda r: (self.eviction_score(r, now_epoch), r.id)):
+            if count <= max_entries and size <= max_bytes:
+                break
+            if CRITICAL_MEMORY_MATCHER.search(row.prompt or ""):
+                continue
+            evicted.append(row.id)
+            count -= 1
+            size -= row.size_bytes
+        return evicted
+
+    def _delete(self, db, entry_ids: List[int]):
+        for start in range(0, len(entry_ids), _DELETE_CHUNK):
+            chunk = entry_ids[start:start + _DELETE_CHUNK]
+            db.query(SemanticCacheEntry).filter(SemanticCacheEntry.id.in_(chunk)).delete(synchronize_session=False)
+        db.commit()
+        semantic_index.remove(entry_ids)
+        semantic_l1.invalidate_entries(entry_ids, deleted=True)
+
+    def compact(self, db=None) -> Dict[str, Any]:
+        """Purges unservable/superseded rows, then evicts down to the limits. Returns this run's counts."""
+        with self._run_lock:
+            started = time.perf_counter()
+            self._pending_inserts = 0
+            own_session = db is None
+            db = db or SessionLocal()
+            try:
+                now_epoch = _epoch(datetime.utcnow().isoformat())
+                rows = self._load(db)
+                reasons = self._purge_reasons(rows, now_epoch)
+                kept = [row for row in rows if row.id not in reasons]
+
+                by_workflow: Dict[str, list] = {}
+                for row in kept:
+                    if row.workflow_id:
+                        by_workflow.setdefault(row.workflow_id, []).append(row)
+                for workflow_rows in by_workflow.values():
+                    for entry_id in self._evict(workflow_rows, self.workflow_max_entries, self.workflow_max_bytes, now_epoch):
+                        reasons[entry_id] = "workflow_capacity"
+                kept = [row for row in kept if row.id not in reasons]
+                for entry_id in self._evict(kept, self.max_entries, self.max_bytes, now_epoch):
+                    reasons[entry_id] = "global_capacity"
+
+                if reasons:
+                    self._delete(db, sorted(reasons))
+            except Exception as e:
+                db.rollback()
+                self.stats["failures"] += 1
+                self.stats["last_error"] = str(e)
+                print(f"[Cache Capacity] Compaction failed: {e}")
+                return {}
+            finally:
+                if own_session:
+                    db.close()
+
+            sizes = {row.id: row.size_bytes for row in rows}
+            counts: Dict[str, int] = {}
+            for reason in reasons.values():
+                counts[reason] = counts.get(reason, 0) + 1
+            for reason, n in counts.items():
+                key = f"evicted_{reason}" if reason.endswith("capacity") else f"purged_{reason}"
+                self.stats[key] += n
+            reclaimed = sum(sizes[entry_id] for entry_id in reasons)
+            self.stats["bytes_reclaimed"] += reclaimed
+            self.stats["entries"] = len(rows) - len(reasons)
+            self.stats["bytes"] = sum(sizes.values()) - reclaimed
+            self.stats["runs"] += 1
+            self.stats["last_run_ms"] = round((time.perf_counter() - started) * 1000, 2)
+            self.stats["last_run_at"] = datetime.utcnow().isoformat()
+            return counts
+
+    # ── Worker ────────────────────────────────────────────────────────────────
+
+    def note_insert(self, count: int = 1):
+        """Counts new cache entries; wakes the worker once compaction_trigger is reached."""
+        self._pending_inserts += count
+        if self._pending_inserts >= self.compaction_trigger and self._thread is not None:
+            self._wake.set()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="omi-cache-compaction", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.interval_sec)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            self.compact()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "pending_inserts": self._pending_inserts,
+            "limits": {
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "workflow_max_entries": self.workflow_max_entries,
+                "workflow_max_bytes": self.workflow_max_bytes,
+                "retention_sec": self.retention_sec,
+                "quarantine_retention_sec": self.quarantine_retention_sec
+            },
+            "worker_alive": self._thread is not None and self._thread.is_alive()
+        }
+
+
+# Global capacity manager for the semantic cache
+cache_capacity = CacheCapacityManager()
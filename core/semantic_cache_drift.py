@@ -1,10 +1,309 @@
-import json
+import os
+import threading
+import time
+from bisect import bisect_right, insort
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import numpy as np
+from sqlalchemy import event, func
+from sqlalchemy.sql.ddl import DDLElement
 
+from infra.database import engine
 from infra.models import ModelFailure, TelemetryLineage, RoutingDecision, SemanticCacheEntry
-from analytics.calibration_drift import compute_ece
+
+# Seconds between full rebuilds of the drift signal table from the DB
+DRIFT_SIGNAL_RECONCILE_SEC = float(os.getenv("OMI_DRIFT_SIGNAL_RECONCILE_SEC", "300"))
+
+ECE_BINS = 5  # Same binning as analytics.calibration_drift.compute_ece
+_ECE_EDGES = list(np.linspace(0.0, 1.0, ECE_BINS + 1))
+WINDOW = timedelta(hours=24)
+UTILITY_WINDOW = 15     # Most recent decisions checked for utility instability
+CONSENSUS_WINDOW = 10   # Consensus decisions checked for disagreement
+
+
+class _ModelDriftState:
+    """Rolling 24h drift inputs for one model."""
+    __slots__ = ("failures", "bin_counts", "bin_conf", "bin_outcomes", "decisions", "consensus")
+
+    def __init__(self):
+        self.failures = deque()             # (timestamp, confidence, outcome), time-ordered
+        self.bin_counts = [0] * ECE_BINS    # ECE accumulators over the live failures
+        self.bin_conf = [0.0] * ECE_BINS
+        self.bin_outcomes = [0] * ECE_BINS
+        self.decisions: List[list] = []     # [timestamp, id, utility], last UTILITY_WINDOW by time
+        self.consensus = deque()            # [id, timestamp, consensus_score], insertion order
+
+    @staticmethod
+    def _bin(confidence: float) -> Optional[int]:
+        if confidence < 0.0 or confidence > 1.0:
+            return None  # Counted in N by compute_ece, but in no bin
+        return min(bisect_right(_ECE_EDGES, confidence) - 1, ECE_BINS - 1)
+
+    def _account(self, confidence: float, outcome: int, sign: int):
+        b = self._bin(confidence)
+        if b is not None:
+            self.bin_counts[b] += sign
+            self.bin_conf[b] += sign * confidence
+            self.bin_outcomes[b] += sign * outcome
+
+    def add_failure(self, ts: str, confidence: float, outcome: int):
+        record = (ts, confidence, outcome)
+        if self.failures and ts < self.failures[-1][0]:
+            items = list(self.failures)
+            insort(items, record)
+            self.failures = deque(items)
+        else:
+            self.failures.append(record)
+        self._account(confidence, outcome, 1)
+
+    def expire(self, cutoff: str):
+        while self.failures and self.failures[0][0] < cutoff:
+            _, confidence, outcome = self.failures.popleft()
+            self._account(confidence, outcome, -1)
+        while self.consensus and self.consensus[0][1] < cutoff:
+            self.consensus.popleft()
+
+    def ece(self) -> float:
+        n = len(self.failures)
+        if not n:
+            return 0.0
+        ece = 0.0
+        for count, conf_sum, outcome_sum in zip(self.bin_counts, self.bin_conf, self.bin_outcomes):
+            if count > 0:
+                ece += (count / n) * abs(outcome_sum / count - conf_sum / count)
+        return ece
+
+    def add_decision(self, decision_id: int, ts: str, utility: Optional[float]):
+        insort(self.decisions, [ts, decision_id, utility])
+        if len(self.decisions) > UTILITY_WINDOW:
+            del self.decisions[0]
+
+    def set_utility(self, decision_id: int, utility: Optional[float]):
+        for record in self.decisions:
+            if record[1] == decision_id:
+                record[2] = utility
+
+    def add_consensus(self, decision_id: int, ts: str, score: Optional[float]):
+        self.consensus.append([decision_id, ts, score])
+
+    def set_consensus_score(self, decision_id: int, score: Optional[float]):
+        for record in self.consensus:
+            if record[0] == decision_id:
+                record[2] = score
+
+
+class DriftSignalTable:
+    """
+    Per-model drift signals for SemanticCacheDriftDetector, kept off the cache-hit path.
+    The signals depend only on the model and the 24h window, never on the cache entry, so
+    they are maintained incrementally: rolling failure windows with ECE bin accumulators,
+    the last decisions' utility scores, the window's consensus scores, and the latest
+    governance-mutation (lineage) epoch. ORM writes feed the table through mapper events;
+    write-behind paths that bypass the ORM report their rows explicitly. Evaluating an entry
+    is then O(window) in-memory math, independent of telemetry volume.
+
+    Deletes and DDL against the source tables (resets, test fixtures) invalidate the table,
+    and it is rebuilt from the DB every RECONCILE_INTERVAL_SEC to absorb other out-of-band
+    writers (bulk Core updates, scripts, rolled-back flushes).
+    """
+    SOURCE_TABLES = {RoutingDecision.__tablename__, ModelFailure.__tablename__, TelemetryLineage.__tablename__}
+
+    def __init__(self, reconcile_interval_sec: float = DRIFT_SIGNAL_RECONCILE_SEC):
+        self.reconcile_interval_sec = reconcile_interval_sec
+        self._lock = threading.RLock()
+        self._models: Dict[str, _ModelDriftState] = {}
+        self._lineage_epoch: Optional[str] = None
+        self._decision_models: Dict[int, str] = {}   # decision id -> final_route, for utility updates
+        self._reconciled_at = None
+        self.stats = {"reads": 0, "rebuilds": 0, "invalidations": 0, "events": 0}
+
+    def _state(self, model: str) -> _ModelDriftState:
+        state = self._models.get(model)
+        if state is None:
+            state = self._models[model] = _ModelDriftState()
+        return state
+
+    @staticmethod
+    def _cutoff() -> str:
+        return (datetime.utcnow() - WINDOW).isoformat()
+
+    # ── Writes ────────────────────────────────────────────────────────────────
+
+    def record_failure(self, model: str, ts: str, confidence: Optional[float], failure_reason: Optional[str]):
+        if not model or not ts or confidence is None or ts < self._cutoff():
+            return
+        with self._lock:
+            self.stats["events"] += 1
+            self._state(model).add_failure(ts, confidence, 0 if failure_reason else 1)
+
+    def record_decision(self, decision_id: int, model: str, ts: str, utility: Optional[float],
+                        is_consensus: bool = False, consensus_score: Optional[float] = None):
+        if not model or not ts or decision_id is None:
+            return
+        with self._lock:
+            self.stats["events"] += 1
+            state = self._state(model)
+            self._decision_models[decision_id] = model
+            state.add_decision(decision_id, ts, utility)
+            if is_consensus and ts >= self._cutoff():
+                state.add_consensus(decision_id, ts, consensus_score)
+            if len(self._decision_models) > 4 * UTILITY_WINDOW * max(1, len(self._models)):
+                self._prune_decision_index()
+
+    def record_decision_update(self, decision_id: int, **values):
+        """Applies updated utility_score / consensus_score values of a tracked decision."""
+        with self._lock:
+            model = self._decision_models.get(decision_id)
+            if model is None:
+                return
+            self.stats["events"] += 1
+            state = self._state(model)
+            if "utility_score" in values:
+                state.set_utility(decision_id, values["utility_score"])
+            if "consensus_score" in values:
+                state.set_consensus_score(decision_id, values["consensus_score"])
+
+    def record_lineage(self, ts: Optional[str]):
+        if not ts:
+            return
+        with self._lock:
+            self.stats["events"] += 1
+            if self._lineage_epoch is None or ts > self._lineage_epoch:
+                self._lineage_epoch = ts
+
+    def _prune_decision_index(self):
+        live = {record[1] for state in self._models.values() for record in state.decisions}
+        live.update(record[0] for state in self._models.values() for record in state.consensus)
+        self._decision_models = {i: m for i, m in self._decision_models.items() if i in live}
+
+    def invalidate(self):
+        """Force a rebuild on the next read (e.g. after bulk deletes or table resets)."""
+        self._reconciled_at = None
+        self.stats["invalidations"] += 1
+
+    # ── Rebuild ───────────────────────────────────────────────────────────────
+
+    def reconcile(self, db):
+        """Rebuilds every model's window from the DB (one query per source table)."""
+        cutoff = self._cutoff()
+        models: Dict[str, _ModelDriftState] = {}
+        decision_models: Dict[int, str] = {}
+
+        def state(model):
+            if model not in models:
+                models[model] = _ModelDriftState()
+            return models[model]
+
+        failure_rows = db.query(
+            ModelFailure.model_id, ModelFailure.timestamp, ModelFailure.calibrated_confidence, ModelFailure.failure_reason
+        ).filter(ModelFailure.timestamp >= cutoff).order_by(ModelFailure.timestamp).all()
+        for model, ts, confidence, reason in failure_rows:
+            if model and confidence is not None:
+                state(model).add_failure(ts, confidence, 0 if reason else 1)
+
+        decision_rows = db.query(
+            RoutingDecision.id, RoutingDecision.final_route, RoutingDecision.timestamp,
+            RoutingDecision.utility_score, RoutingDecision.is_consensus, RoutingDecision.consensus_score
+        ).filter(RoutingDecision.timestamp >= cutoff).order_by(RoutingDecision.id).all()
+        for decision_id, model, ts, utility, is_consensus, consensus_score in decision_rows:
+            if not model:
+                continue
+            decision_models[decision_id] = model
+            state(model).add_decision(decision_id, ts, utility)
+            if is_consensus:
+                state(model).add_consensus(decision_id, ts, consensus_score)
+
+        lineage_epoch = db.query(func.max(TelemetryLineage.timestamp)).scalar()
+
+        with self._lock:
+            self._models = models
+            self._decision_models = decision_models
+            self._lineage_epoch = lineage_epoch
+            self._reconciled_at = time.monotonic()
+            self.stats["rebuilds"] += 1
+            self._prune_decision_index()
+
+    def _ensure_fresh(self, db):
+        if self._reconciled_at is None or time.monotonic() - self._reconciled_at > self.reconcile_interval_sec:
+            self.reconcile(db)
+
+    # ── Reads ─────────────────────────────────────────────────────────────────
+
+    def signals(self, db, model: str) -> Dict[str, Any]:
+        """Entry-independent drift inputs for the model over the last 24h."""
+        self._ensure_fresh(db)
+        cutoff = self._cutoff()
+        with self._lock:
+            self.stats["reads"] += 1
+            lineage_epoch = self._lineage_epoch
+            state = self._models.get(model)
+            if state is None:
+                return {"failure_count": 0, "ece": 0.0, "recent_utilities": [], "recent_decisions": 0,
+                        "consensus_scores": [], "consensus_count": 0, "lineage_epoch": lineage_epoch}
+            state.expire(cutoff)
+            recent = [record for record in state.decisions if record[0] >= cutoff]
+            consensus = [record[2] for record in state.consensus if record[1] >= cutoff][:CONSENSUS_WINDOW]
+            return {
+                "failure_count": len(state.failures),
+                "ece": state.ece(),
+                "recent_decisions": len(recent),
+                "recent_utilities": [record[2] for record in recent if record[2] is not None],
+                "consensus_scores": [score for score in consensus if score is not None],
+                "consensus_count": len(consensus),
+                "lineage_epoch": lineage_epoch
+            }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "tracked_models": len(self._models),
+                "lineage_epoch": self._lineage_epoch,
+                "reconcile_interval_sec": self.reconcile_interval_sec
+            }
+
+
+# Global drift signal table shared by every cache lookup
+drift_signals = DriftSignalTable()
+
+
+@event.listens_for(ModelFailure, "after_insert")
+def _on_failure_insert(mapper, connection, target):
+    drift_signals.record_failure(target.model_id, target.timestamp, target.calibrated_confidence, target.failure_reason)
+
+
+@event.listens_for(RoutingDecision, "after_insert")
+def _on_decision_insert(mapper, connection, target):
+    drift_signals.record_decision(
+        target.id, target.final_route, target.timestamp, target.utility_score,
+        bool(target.is_consensus), target.consensus_score
+    )
+
+
+@event.listens_for(RoutingDecision, "after_update")
+def _on_decision_update(mapper, connection, target):
+    drift_signals.record_decision_update(
+        target.id, utility_score=target.utility_score, consensus_score=target.consensus_score
+    )
+
+
+@event.listens_for(TelemetryLineage, "after_insert")
+def _on_lineage_insert(mapper, connection, target):
+    drift_signals.record_lineage(target.timestamp)
+
+
+@event.listens_for(engine, "after_execute")
+def _on_source_reset(conn, clauseelement, multiparams, params, execution_options, result):
+    # Deletes and DDL cannot be replayed incrementally: rebuild on the next read
+    if getattr(clauseelement, "is_delete", False):
+        table = getattr(clauseelement, "table", None)
+    elif isinstance(clauseelement, DDLElement):
+        table = getattr(clauseelement, "element", None)
+    else:
+        return
+    if getattr(table, "name", None) in DriftSignalTable.SOURCE_TABLES:
+        drift_signals.invalidate()
 
 class SemanticCacheDriftDetector:
     """
@@ -28,37 +327,20 @@ class SemanticCacheDriftDetector:
             "consensus_disagreement_increase": False
         }
         
-        now = datetime.utcnow()
-        day_ago = (now - timedelta(hours=24)).isoformat()
-        
+        signals = drift_signals.signals(db, entry.model_id)
+
         # 1. Provider Calibration Drift
-        failures = db.query(ModelFailure).filter(
-            ModelFailure.model_id == entry.model_id,
-            ModelFailure.timestamp >= day_ago
-        ).all()
-        if len(failures) >= 5:
-            confidences = [f.calibrated_confidence for f in failures]
-            outcomes = [0 if f.failure_reason else 1 for f in failures]
-            ece = compute_ece(confidences, outcomes)
-            if ece > 0.45:
-                triggers["provider_calibration_drift"] = True
+        if signals["failure_count"] >= 5 and signals["ece"] > 0.45:
+            triggers["provider_calibration_drift"] = True
                 
         # 2. Governance Mutation
         # Check if there are any newer telemetry lineage records since the entry was cached
-        new_mutations = db.query(TelemetryLineage).filter(
-            TelemetryLineage.timestamp > entry.timestamp
-        ).count()
-        if new_mutations > 0:
+        if signals["lineage_epoch"] is not None and signals["lineage_epoch"] > entry.timestamp:
             triggers["governance_mutation"] = True
             
         # 3. Utility Instability
-        recent_decisions = db.query(RoutingDecision).filter(
-            RoutingDecision.final_route == entry.model_id,
-            RoutingDecision.timestamp >= day_ago
-        ).order_by(RoutingDecision.timestamp.desc()).limit(15).all()
-        if len(recent_decisions) >= 5:
-            avg_util = np.mean([d.utility_score for d in recent_decisions if d.utility_score is not None])
-            if avg_util < 0.80:
+        if signals["recent_decisions"] >= 5 and signals["recent_utilities"]:
+            if np.mean(signals["recent_utilities"]) < 0.80:
                 triggers["utility_instability"] = True
                 
         # 4. Workflow Semantic Divergence
@@ -66,23 +348,19 @@ class SemanticCacheDriftDetector:
         if current_workflow_id and entry.workflow_id == current_workflow_id:
             from infra.calibration import AdvancedCalibrationEngine
             target_emb = AdvancedCalibrationEngine._mock_embedding(current_prompt)
+            from infra.embedding_codec import EmbeddingCodec
             try:
-                entry_emb = np.array(json.loads(entry.embedding))
-                sim = AdvancedCalibrationEngine._cosine_similarity(target_emb, entry_emb)
-                if sim < 0.70:
-                    triggers["workflow_semantic_divergence"] = True
+                entry_emb = EmbeddingCodec.from_entry(entry)
+                if entry_emb is not None:
+                    sim = AdvancedCalibrationEngine._cosine_similarity(target_emb, entry_emb)
+                    if sim < 0.70:
+                        triggers["workflow_semantic_divergence"] = True
             except Exception:
                 pass
                 
         # 5. Consensus Disagreement
-        recent_consensus = db.query(RoutingDecision).filter(
-            RoutingDecision.final_route == entry.model_id,
-            RoutingDecision.is_consensus == True,
-            RoutingDecision.timestamp >= day_ago
-        ).limit(10).all()
-        if len(recent_consensus) >= 3:
-            avg_consensus_score = np.mean([d.consensus_score for d in recent_consensus if d.consensus_score is not None])
-            if avg_consensus_score < 0.70:
+        if signals["consensus_count"] >= 3 and signals["consensus_scores"]:
+            if np.mean(signals["consensus_scores"]) < 0.70:
                 triggers["consensus_disagreement_increase"] = True
 
         # Aggregate Drift Score (fraction of triggers activated)
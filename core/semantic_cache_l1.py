@@ -0,0 +1,254 @@
+import atexit
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event, func, update
+from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.sql.ddl import DDLElement
+
+from infra.database import engine
+from infra.models import SemanticCacheEntry, ModelFailure, TelemetryLineage
+
+# Upper bound on validated hits held in process
+SEMANTIC_L1_MAX_ENTRIES = int(os.getenv("OMI_SEMANTIC_L1_MAX_ENTRIES", "2048"))
+# Seconds an L1 hit is served without re-running drift/CRI evaluation against the DB
+SEMANTIC_L1_TTL_SEC = float(os.getenv("OMI_SEMANTIC_L1_TTL_SEC", "30"))
+# Pending L1 hits that trigger a write-behind flush of the hit/reuse counters
+SEMANTIC_L1_FLUSH_HITS = int(os.getenv("OMI_SEMANTIC_L1_FLUSH_HITS", "64"))
+# Longest pending hit counters wait before being flushed (checked on each hit)
+SEMANTIC_L1_FLUSH_SEC = float(os.getenv("OMI_SEMANTIC_L1_FLUSH_SEC", "5"))
+
+# Entry columns whose change can alter whether (or what) a hit serves
+_WATCHED_COLUMNS = ("is_quarantined", "is_reliable", "utility_score", "confidence", "response",
+                    "timestamp", "workflow_id", "prompt_hash")
+
+
+class CachedHit:
+    """
+    Detached, read-only copy of a served SemanticCacheEntry.
+    Carries the columns the hit consumers read, so an L1 hit never touches a session.
+    """
+    __slots__ = ("id", "prompt_hash", "prompt", "response", "reasoning", "tool_chain", "confidence",
+                 "utility_score", "is_reliable", "workflow_id", "model_id", "input_tokens", "output_tokens",
+                 "cost_usd", "hits", "drift_score", "is_quarantined", "provenance", "provenance_cri",
+                 "timestamp", "must_revalidate", "_created", "_expires_at")
+
+    def __init__(self, entry: SemanticCacheEntry, ttl_sec: float):
+        for name in self.__slots__[:-3]:
+            setattr(self, name, getattr(entry, name))
+        self.must_revalidate = False
+        self._created = datetime.fromisoformat(entry.timestamp)
+        self._expires_at = time.monotonic() + ttl_sec
+
+    def servable(self, min_confidence: float, now: datetime, staleness_window_sec: float) -> bool:
+        if time.monotonic() > self._expires_at:
+            return False
+        if self.confidence < min_confidence:
+            return False
+        return (now - self._created).total_seconds() <= staleness_window_sec
+
+
+class SemanticCacheL1:
+    """
+    In-process first tier in front of SemanticCache.get_entries.
+    Exact-hash hits that passed drift/CRI evaluation, the safeguards and the duplication
+    safeguard with action "keep" are kept as CachedHit snapshots keyed by (prompt hash,
+    workflow scope), size-bounded (LRU) and TTL-bounded. A repeat of a hot prompt is then
+    served from memory: only the per-caller checks (min confidence, staleness window) run.
+
+    The DB stays the source of truth. Entry updates that touch a safeguard column
+    (quarantine, retry downgrade, decay, verification), new governance lineage and new
+    model failures invalidate the affected snapshots through ORM events, so the TTL only
+    bounds slower drift signals and writes from other processes. Hit and reuse counters of
+    L1 hits accumulate in memory and are flushed in batches through the telemetry writer.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = SEMANTIC_L1_MAX_ENTRIES,
+        ttl_sec: float = SEMANTIC_L1_TTL_SEC,
+        flush_hits: int = SEMANTIC_L1_FLUSH_HITS,
+        flush_interval_sec: float = SEMANTIC_L1_FLUSH_SEC
+    ):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.flush_hits = flush_hits
+        self.flush_interval_sec = flush_interval_sec
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, Optional[str]], CachedHit]" = OrderedDict()
+        self._generation = 0
+        self._pending: Dict[int, list] = {}   # entry id -> [hits, last reuse timestamp]
+        self._pending_hits = 0
+        self._last_flush = time.monotonic()
+        self.stats = {"lookups": 0, "hits": 0, "expired": 0, "fills": 0, "evictions": 0,
+                      "invalidations": 0, "flushes": 0, "flushed_hits": 0}
+
+    @property
+    def generation(self) -> int:
+        """Bumped by every invalidation; fills started under an older generation are dropped."""
+        return self._generation
+
+    # ── Lookup / fill ─────────────────────────────────────────────────────────
+
+    def get(self, prompt_hash: str, workflow_id: Optional[str], min_confidence: float,
+            now: datetime, staleness_window_sec: float) -> Optional[CachedHit]:
+        if self.max_entries <= 0:
+            return None
+        key = (prompt_hash, workflow_id)
+        with self._lock:
+            self.stats["lookups"] += 1
+            hit = self._entries.get(key)
+            if hit is None:
+                return None
+            if not hit.servable(min_confidence, now, staleness_window_sec):
+                if time.monotonic() > hit._expires_at:
+                    del self._entries[key]
+                    self.stats["expired"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            pending = self._pending.setdefault(hit.id, [0, None])
+            pending[0] += 1
+            pending[1] = now.isoformat()
+            self._pending_hits += 1
+            due = self._pending_hits >= self.flush_hits or time.monotonic() - self._last_flush >= self.flush_interval_sec
+        if due:
+            self.flush()
+        return hit
+
+    def put(self, prompt_hash: str, workflow_id: Optional[str], entry: SemanticCacheEntry, generation: int):
+        if self.max_entries <= 0:
+            return
+        try:
+            hit = CachedHit(entry, self.ttl_sec)
+        except Exception:
+            return  # Unparseable timestamp: the safeguards would reject it anyway
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[(prompt_hash, workflow_id)] = hit
+            self._entries.move_to_end((prompt_hash, workflow_id))
+            self.stats["fills"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    # ── Invalidation ──────────────────────────────────────────────────────────
+
+    def _drop(self, predicate, deleted: bool = False):
+        """Drops matching snapshots; for deleted rows also their unflushed hit counters (ids may be reused)."""
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, hit in self._entries.items() if predicate(key, hit)]
+            for key in stale:
+                hit = self._entries.pop(key)
+                if deleted and hit.id in self._pending:
+                    self._pending_hits -= self._pending.pop(hit.id)[0]
+            self.stats["invalidations"] += len(stale)
+
+    def invalidate_entry(self, entry_id: int, deleted: bool = False):
+        self.invalidate_entries([entry_id], deleted)
+
+    def invalidate_entries(self, entry_ids, deleted: bool = False):
+        ids = set(entry_ids)
+        self._drop(lambda key, hit: hit.id in ids, deleted)
+        if deleted:
+            with self._lock:
+                for entry_id in ids & self._pending.keys():
+                    self._pending_hits -= self._pending.pop(entry_id)[0]
+
+    def invalidate_hash(self, prompt_hash: str, deleted: bool = False):
+        self._drop(lambda key, hit: key[0] == prompt_hash or hit.prompt_hash == prompt_hash, deleted)
+
+    def invalidate_model(self, model_id: str):
+        self._drop(lambda key, hit: hit.model_id == model_id)
+
+    def clear(self, deleted: bool = False):
+        self._drop(lambda key, hit: True)
+        if deleted:
+            with self._lock:
+                self._pending = {}
+                self._pending_hits = 0
+
+    # ── Hit accounting ────────────────────────────────────────────────────────
+
+    def flush(self):
+        """Hands the accumulated hit/reuse counters to the telemetry writer as one deferred job."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._pending_hits = 0
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        from infra.telemetry_writer import telemetry_writer
+        telemetry_writer.submit(SemanticCacheL1._apply_hits, pending, pass_session=True)
+        self.stats["flushes"] += 1
+        self.stats["flushed_hits"] += sum(count for count, _ in pending.values())
+
+    @staticmethod
+    def _apply_hits(pending: Dict[int, list], db=None):
+        """Adds the L1 hits to each entry's hit and reuse counters (in-DB increments)."""
+        for entry_id, (count, last_reuse) in pending.items():
+            db.execute(
+                update(SemanticCacheEntry).where(SemanticCacheEntry.id == entry_id).values(
+                    hits=func.coalesce(SemanticCacheEntry.hits, 0) + count,
+                    reuse_count=func.coalesce(SemanticCacheEntry.reuse_count, 0) + count,
+                    last_reuse_timestamp=last_reuse
+                )
+            )
+        db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["cached_hits"] = len(self._entries)
+            stats["pending_hits"] = self._pending_hits
+        stats["hit_rate"] = round(stats["hits"] / stats["lookups"], 4) if stats["lookups"] else 0.0
+        stats.update({"max_entries": self.max_entries, "ttl_sec": self.ttl_sec})
+        return stats
+
+
+# Global L1 tier shared by every semantic cache lookup in this process
+semantic_l1 = SemanticCacheL1()
+atexit.register(semantic_l1.flush)  # Registered after the telemetry writer's, so it runs first
+
+
+@event.listens_for(SemanticCacheEntry, "after_update")
+def _on_entry_update(mapper, connection, target):
+    if any(get_history(target, column).has_changes() for column in _WATCHED_COLUMNS):
+        semantic_l1.invalidate_entry(target.id)
+
+
+@event.listens_for(SemanticCacheEntry, "after_delete")
+def _on_entry_delete(mapper, connection, target):
+    semantic_l1.invalidate_entry(target.id, deleted=True)
+
+
+@event.listens_for(TelemetryLineage, "after_insert")
+def _on_governance_mutation(mapper, connection, target):
+    # Every cached entry predates the new lineage record, so drift evaluation would revalidate it
+    semantic_l1.clear()
+
+
+@event.listens_for(ModelFailure, "after_insert")
+def _on_model_failure(mapper, connection, target):
+    semantic_l1.invalidate_model(target.model_id)
+
+
+@event.listens_for(engine, "after_execute")
+def _on_cache_reset(conn, clauseelement, multiparams, params, execution_options, result):
+    # Unfiltered deletes and DDL (resets, migrations); targeted deletes go through invalidate_hash
+    if getattr(clauseelement, "is_delete", False):
+        if clauseelement.whereclause is not None:
+            return
+        table = clauseelement.table
+    elif isinstance(clauseelement, DDLElement):
+        table = getattr(clauseelement, "element", None)
+    else:
+        return
+    if getattr(table, "name", None) == SemanticCacheEntry.__tablename__:
+        semantic_l1.clear(deleted=True)
@@ -0,0 +1,329 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm.attributes import get_history
+from sqlalchemy.sql.ddl import DDLElement
+
+from infra.database import engine
+from infra.embeddings import embedding_provider, WordHashEmbeddingBackend
+from infra.models import SemanticCacheEntry
+
+# Expected number of stored prompt hashes (and distinct prompt words) the filters are sized for
+SEMANTIC_PREFILTER_CAPACITY = int(os.getenv("OMI_SEMANTIC_PREFILTER_CAPACITY", "100000"))
+# Target false-positive rate of each Bloom filter at capacity
+SEMANTIC_PREFILTER_FP_RATE = float(os.getenv("OMI_SEMANTIC_PREFILTER_FP_RATE", "0.01"))
+# Similarity headroom for the random cross terms of the word-hash model (~4 std devs at 128 dims)
+SEMANTIC_PREFILTER_MARGIN = float(os.getenv("OMI_SEMANTIC_PREFILTER_MARGIN", "0.35"))
+# Seconds between catch-ups with rows written outside this process
+SEMANTIC_PREFILTER_REFRESH_SEC = float(os.getenv("OMI_SEMANTIC_PREFILTER_REFRESH_SEC", "300"))
+# Upper bound on remembered miss fingerprints
+SEMANTIC_NEGATIVE_CACHE_MAX_ENTRIES = int(os.getenv("OMI_SEMANTIC_NEGATIVE_CACHE_MAX_ENTRIES", "4096"))
+# Seconds a miss fingerprint short-circuits repeat lookups
+SEMANTIC_NEGATIVE_CACHE_TTL_SEC = float(os.getenv("OMI_SEMANTIC_NEGATIVE_CACHE_TTL_SEC", "30"))
+
+# Entry columns whose change can turn a remembered miss into a hit
+_WATCHED_COLUMNS = ("is_quarantined", "is_reliable", "utility_score", "confidence", "timestamp",
+                    "workflow_id", "prompt_hash", "prompt")
+
+MissKey = Tuple[str, Optional[str], float, float, float]
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings (double hashing on one blake2b digest).
+    No false negatives; removals are not supported, so deleted keys only raise the false-positive rate.
+    """
+
+    def __init__(self, capacity: int, fp_rate: float):
+        self.capacity = max(1, capacity)
+        self.num_bits = max(64, int(math.ceil(-self.capacity * math.log(fp_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / self.capacity * math.log(2))))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, key: str) -> bool:
+        """Adds key; returns True if it was (probably) new."""
+        new = False
+        for pos in self._positions(key):
+            byte, bit = divmod(pos, 8)
+            if not self._bits[byte] & (1 << bit):
+                self._bits[byte] |= 1 << bit
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, key: str) -> bool:
+        for pos in self._positions(key):
+            byte, bit = divmod(pos, 8)
+            if not self._bits[byte] & (1 << bit):
+                return False
+        return True
+
+    def estimated_fp_rate(self) -> float:
+        return (1.0 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+
+class SemanticCachePrefilter:
+    """
+    Miss fast path in front of SemanticCache.get_entries.
+
+    Two Bloom filters cover every stored entry: one over prompt hashes (a lookup whose hash
+    is absent skips the exact-hash query) and one over prompt words, the features of the
+    word-hash embedding model. For that model the cosine between a query and any entry is
+    bounded by sqrt(sum of squared counts of the query words the entry shares / sum of
+    squared counts of all query words), plus random cross terms covered by margin. When even
+    the words the word filter might hold cannot reach similarity_threshold, the vector scan
+    is skipped. Other embedding backends have no lexical bound and always scan.
+
+    Lookups that still miss are remembered as fingerprints (prompt hash, workflow scope,
+    min confidence, threshold, staleness window) for ttl_sec. Entry inserts and updates to
+    a safeguard column drop the fingerprints sharing a word with the entry, so a new entry
+    is never hidden by a remembered miss. Filters follow ORM writes through mapper events and
+    catch up with foreign writers every refresh_sec; table resets trigger a full reload.
+    """
+
+    def __init__(
+        self,
+        capacity: int = SEMANTIC_PREFILTER_CAPACITY,
+        fp_rate: float = SEMANTIC_PREFILTER_FP_RATE,
+        margin: float = SEMANTIC_PREFILTER_MARGIN,
+        refresh_sec: float = SEMANTIC_PREFILTER_REFRESH_SEC,
+        negative_max_entries: int = SEMANTIC_NEGATIVE_CACHE_MAX_ENTRIES,
+        negative_ttl_sec: float = SEMANTIC_NEGATIVE_CACHE_TTL_SEC
+    ):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.margin = margin
+        self.refresh_sec = refresh_sec
+        self.negative_max_entries = negative_max_entries
+        self.negative_ttl_sec = negative_ttl_sec
+        self._lock = threading.RLock()
+        self._hashes = BloomFilter(capacity, fp_rate)
+        self._words = BloomFilter(capacity, fp_rate)
+        self._loaded = False
+        self._max_id = 0
+        self._last_refresh = 0.0
+        self._misses: "OrderedDict[MissKey, Tuple[float, Set[str]]]" = OrderedDict()
+        self._miss_words: Dict[str, Set[MissKey]] = {}
+        self._generation = 0
+        self.stats = {"lookups": 0, "negative_hits": 0, "exact_skips": 0, "exact_queries": 0,
+                      "exact_false_positives": 0, "scan_skips": 0, "scans": 0, "scan_false_positives": 0,
+                      "misses_recorded": 0, "negative_invalidations": 0, "reloads": 0}
+
+    @property
+    def generation(self) -> int:
+        """Bumped by every negative-cache invalidation; misses computed under an older generation are not recorded."""
+        return self._generation
+
+    @staticmethod
+    def _lexical() -> bool:
+        return isinstance(embedding_provider.backend, WordHashEmbeddingBackend)
+
+    @staticmethod
+    def _tokens(text: Optional[str]) -> List[str]:
+        return WordHashEmbeddingBackend.tokenize(text or "")
+
+    # ── Filter maintenance ────────────────────────────────────────────────────
+
+    def _add_locked(self, prompt_hash: Optional[str], prompt: Optional[str]):
+        if prompt_hash:
+            self._hashes.add(prompt_hash)
+        for word in set(self._tokens(prompt)):
+            self._words.add(word)
+        if self._hashes.count > self.capacity or self._words.count > self.capacity:
+            self._loaded = False  # Over capacity: the next lookup reloads into larger filters
+
+    def _load_rows(self, db, min_id: int = 0):
+        rows = db.query(SemanticCacheEntry.id, SemanticCacheEntry.prompt_hash, SemanticCacheEntry.prompt).filter(
+            SemanticCacheEntry.id > min_id).order_by(SemanticCacheEntry.id).all()
+        for row in rows:
+            self._add_locked(row.prompt_hash, row.prompt)
+            self._max_id = max(self._max_id, row.id)
+
+    def ensure_loaded(self, db):
+        """Loads the filters on first use (or after a reset) and periodically picks up foreign writes."""
+        with self._lock:
+            if self._loaded and time.monotonic() - self._last_refresh < self.refresh_sec:
+                return
+            if self._loaded:
+                self._load_rows(db, min_id=self._max_id)
+            else:
+                total = db.query(SemanticCacheEntry.id).count()
+                size = max(self.capacity, 2 * total)
+                self._hashes = BloomFilter(size, self.fp_rate)
+                self._words = BloomFilter(size, self.fp_rate)
+                self.capacity = size
+                self._max_id = 0
+                self._load_rows(db)
+                self._loaded = True
+                self.stats["reloads"] += 1
+            self._last_refresh = time.monotonic()
+
+    def note_entry(self, entry_id: Optional[int], prompt_hash: Optional[str], prompt: Optional[str]):
+        """Adds a written entry to the filters and forgets the misses it could now serve."""
+        with self._lock:
+            self._add_locked(prompt_hash, prompt)
+            if entry_id:
+                self._max_id = max(self._max_id, entry_id)
+        self._drop_misses(prompt_hash, self._tokens(prompt))
+
+    def reset(self):
+        """Table reset or bulk delete: reload the filters and forget every miss."""
+        with self._lock:
+            self._loaded = False
+        self.clear_misses()
+
+    # ── Negative cache ────────────────────────────────────────────────────────
+
+    def _pop_miss_locked(self, key: MissKey):
+        _, words = self._misses.pop(key)
+        for word in words:
+            keys = self._miss_words.get(word)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._miss_words[word]
+
+    def _drop_misses(self, prompt_hash: Optional[str], words: Iterable[str]):
+        with self._lock:
+            self._generation += 1
+            if not self._misses:
+                return
+            if not self._lexical():
+                stale = list(self._misses)
+            else:
+                stale = {key for key in self._misses if key[0] == prompt_hash}
+                for word in set(words):
+                    stale.update(self._miss_words.get(word, ()))
+            for key in stale:
+                self._pop_miss_locked(key)
+            self.stats["negative_invalidations"] += len(stale)
+
+    def clear_misses(self):
+        with self._lock:
+            self._generation += 1
+            self.stats["negative_invalidations"] += len(self._misses)
+            self._misses.clear()
+            self._miss_words.clear()
+
+    def is_known_miss(self, key: MissKey) -> bool:
+        with self._lock:
+            self.stats["lookups"] += 1
+            cached = self._misses.get(key)
+            if cached is None:
+                return False
+            if time.monotonic() > cached[0]:
+                self._pop_miss_locked(key)
+                return False
+            self.stats["negative_hits"] += 1
+            return True
+
+    def record_miss(self, key: MissKey, prompt: str, generation: int):
+        if self.negative_max_entries <= 0 or self.negative_ttl_sec <= 0:
+            return
+        words = set(self._tokens(prompt))
+        with self._lock:
+            if generation != self._generation:
+                return  # An entry was written while this lookup ran
+            if key in self._misses:
+                self._pop_miss_locked(key)
+            self._misses[key] = (time.monotonic() + self.negative_ttl_sec, words)
+            for word in words:
+                self._miss_words.setdefault(word, set()).add(key)
+            self.stats["misses_recorded"] += 1
+            while len(self._misses) > self.negative_max_entries:
+                self._pop_miss_locked(next(iter(self._misses)))
+
+    # ── Prefilters ────────────────────────────────────────────────────────────
+
+    def may_contain_hash(self, prompt_hash: str) -> bool:
+        with self._lock:
+            present = prompt_hash in self._hashes
+            self.stats["exact_queries" if present else "exact_skips"] += 1
+        return present
+
+    def may_reach(self, prompt: str, similarity_threshold: float) -> bool:
+        """False only if no stored entry can reach similarity_threshold under the word-hash model."""
+        reachable = True
+        if self._lexical() and similarity_threshold - self.margin > 0:
+            counts: Dict[str, int] = {}
+            for word in self._tokens(prompt):
+                counts[word] = counts.get(word, 0) + 1
+            total = sum(c * c for c in counts.values())
+            if total:
+                with self._lock:
+                    shared = sum(c * c for word, c in counts.items() if word in self._words)
+                reachable = math.sqrt(shared / total) + self.margin >= similarity_threshold
+        with self._lock:
+            self.stats["scans" if reachable else "scan_skips"] += 1
+        return reachable
+
+    def note_exact_result(self, found: bool):
+        if not found:
+            with self._lock:
+                self.stats["exact_false_positives"] += 1
+
+    def note_scan_result(self, found: bool):
+        if not found:
+            with self._lock:
+                self.stats["scan_false_positives"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats.update({
+                "negative_entries": len(self._misses),
+                "hash_filter_keys": self._hashes.count,
+                "word_filter_keys": self._words.count,
+                "hash_filter_estimated_fp_rate": round(self._hashes.estimated_fp_rate(), 6),
+                "word_filter_estimated_fp_rate": round(self._words.estimated_fp_rate(), 6),
+                "lexical_bound": self._lexical()
+            })
+        stats["negative_hit_rate"] = round(stats["negative_hits"] / stats["lookups"], 4) if stats["lookups"] else 0.0
+        stats["exact_false_positive_rate"] = (
+            round(stats["exact_false_positives"] / stats["exact_queries"], 4) if stats["exact_queries"] else 0.0
+        )
+        stats["scan_false_positive_rate"] = round(stats["scan_false_positives"] / stats["scans"], 4) if stats["scans"] else 0.0
+        stats["scan_skip_rate"] = (
+            round(stats["scan_skips"] / (stats["scans"] + stats["scan_skips"]), 4) if stats["scans"] + stats["scan_skips"] else 0.0
+        )
+        return stats
+
+
+# Global miss prefilter shared by every semantic cache lookup in this process
+semantic_prefilter = SemanticCachePrefilter()
+
+
+@event.listens_for(SemanticCacheEntry, "after_insert")
+def _on_entry_insert(mapper, connection, target):
+    semantic_prefilter.note_entry(target.id, target.prompt_hash, target.prompt)
+
+
+@event.listens_for(SemanticCacheEntry, "after_update")
+def _on_entry_update(mapper, connection, target):
+    if any(get_history(target, column).has_changes() for column in _WATCHED_COLUMNS):
+        semantic_prefilter.note_entry(target.id, target.prompt_hash, target.prompt)
+
+
+@event.listens_for(engine, "after_execute")
+def _on_table_reset(conn, clauseelement, multiparams, params, execution_options, result):
+    # Unfiltered deletes and DDL on any table: the filters reload and remembered misses, which
+    # may also depend on drift telemetry, are dropped
+    if getattr(clauseelement, "is_delete", False):
+        if clauseelement.whereclause is None:
+            semantic_prefilter.reset()
+    elif isinstance(clauseelement, DDLElement):
+        semantic_prefilter.reset()
@@ -0,0 +1,247 @@
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+from infra.models import SemanticCacheEntry
+from infra.embedding_codec import EmbeddingCodec
+from infra.embeddings import embedding_provider
+
+
+def _epoch(value) -> float:
+    """Converts an ISO timestamp (or datetime) to epoch seconds; unparseable values sort as oldest."""
+    try:
+        dt = value if isinstance(value, datetime) else datetime.fromisoformat(value)
+        if dt.tzinfo is not None:
+            dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+        return (dt - datetime(1970, 1, 1)).total_seconds()
+    except Exception:
+        return float("-inf")
+
+
+class _Partition:
+    """Append-only float32 matrix of normalized embeddings for one workflow scope."""
+
+    def __init__(self, dim: int, capacity: int = 64):
+        self.size = 0
+        self.ids: List[int] = []
+        self.hashes: List[str] = []
+        self.matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self.timestamps = np.full(capacity, float("-inf"), dtype=np.float64)
+        self.live = np.zeros(capacity, dtype=bool)
+        self.quarantined = np.zeros(capacity, dtype=bool)
+
+    def append(self, entry_id: int, prompt_hash: str, vec: np.ndarray, ts: float, quarantined: bool) -> int:
+        if self.size == self.matrix.shape[0]:
+            capacity = self.size * 2
+            self.matrix = np.resize(self.matrix, (capacity, self.matrix.shape[1]))
+            self.timestamps = np.resize(self.timestamps, capacity)
+            self.live = np.resize(self.live, capacity)
+            self.quarantined = np.resize(self.quarantined, capacity)
+        row = self.size
+        self.matrix[row] = vec
+        self.timestamps[row] = ts
+        self.live[row] = True
+        self.quarantined[row] = quarantined
+        self.ids.append(entry_id)
+        self.hashes.append(prompt_hash)
+        self.size += 1
+        return row
+
+
+class SemanticVectorIndex:
+    """
+    In-process vector index over SemanticCacheEntry embeddings.
+    Embeddings are stored L2-normalized as float32 and partitioned by workflow scope
+    (workflow_id, or None for global entries), so a fuzzy lookup is one matrix multiply
+    per scope instead of a JSON decode + cosine per row.
+
+    The DB stays the source of truth: the index tracks a (row count, max id, max-id hash)
+    watermark and catches up with out-of-band writers on the next lookup, and callers
+    re-validate every hit against its row before serving it.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._partitions: Dict[Optional[str], _Partition] = {}
+        self._locations: Dict[int, Tuple[Optional[str], int]] = {}
+        self._unindexed: Dict[int, str] = {}  # Rows with unusable embeddings (still counted by the watermark)
+        self._watermark = None
+
+    @staticmethod
+    def _normalize(vec) -> Optional[np.ndarray]:
+        arr = np.asarray(vec, dtype=np.float32).reshape(-1)
+        if arr.shape[0] != embedding_provider.dim:
+            return None
+        norm = np.linalg.norm(arr)
+        return arr / norm if norm > 0 else arr
+
+    def _add_locked(self, entry_id: int, prompt_hash: str, workflow_id: Optional[str], timestamp, vec, quarantined: bool):
+        self._remove_locked(entry_id)
+        normalized = self._normalize(vec) if vec is not None else None
+        if normalized is None:
+            self._unindexed[entry_id] = prompt_hash
+            return
+        partition = self._partitions.get(workflow_id)
+        if partition is None:
+            partition = _Partition(embedding_provider.dim)
+            self._partitions[workflow_id] = partition
+        row = partition.append(entry_id, prompt_hash, normalized, _epoch(timestamp), quarantined)
+        self._locations[entry_id] = (workflow_id, row)
+
+    def _remove_locked(self, entry_id: int) -> bool:
+        if self._unindexed.pop(entry_id, None) is not None:
+            return True
+        location = self._locations.pop(entry_id, None)
+        if location is None:
+            return False
+        workflow_id, row = location
+        self._partitions[workflow_id].live[row] = False
+        return True
+
+    def _max_known_locked(self) -> Tuple[int, Optional[str]]:
+        candidates = [(entry_id, self._partitions[wf].hashes[row]) for entry_id, (wf, row) in self._locations.items()]
+        candidates.extend(self._unindexed.items())
+        return max(candidates) if candidates else (0, None)
+
+    def _indexed_count(self) -> int:
+        return len(self._locations) + len(self._unindexed)
+
+    @staticmethod
+    def _db_watermark(db) -> Tuple[int, int, Optional[str]]:
+        count = db.query(SemanticCacheEntry.id).count()
+        last = db.query(SemanticCacheEntry.id, SemanticCacheEntry.prompt_hash).order_by(SemanticCacheEntry.id.desc()).first()
+        return (count, last[0], last[1]) if last else (0, 0, None)
+
+    def _load_rows(self, db, min_id: int = 0):
+        rows = db.query(
+            SemanticCacheEntry.id,
+            SemanticCacheEntry.prompt_hash,
+            SemanticCacheEntry.workflow_id,
+            SemanticCacheEntry.timestamp,
+            SemanticCacheEntry.is_quarantined,
+            SemanticCacheEntry.embedding,
+            SemanticCacheEntry.embedding_vec,
+            SemanticCacheEntry.embedding_dtype
+        ).filter(SemanticCacheEntry.id > min_id).order_by(SemanticCacheEntry.id).all()
+        for row in rows:
+            self._add_locked(row.id, row.prompt_hash, row.workflow_id, row.timestamp, EmbeddingCodec.from_entry(row), bool(row.is_quarantined))
+
+    def rebuild(self, db):
+        """Reloads the whole index from the DB (startup, or after the table was reset)."""
+        with self._lock:
+            self._reset()
+            self._load_rows(db)
+            self._watermark = self._db_watermark(db)
+
+    def sync(self, db):
+        """Catches up with rows written outside SemanticCache (incrementally when only appends happened)."""
+        db_mark = self._db_watermark(db)
+        with self._lock:
+            if self._watermark == db_mark:
+                return
+            known = self._watermark
+            if known is not None and db_mark[1] > known[1] and self._indexed_count() == known[0]:
+                self._load_rows(db, min_id=known[1])
+                if self._indexed_count() == db_mark[0]:
+                    self._watermark = db_mark
+                    return
+        self.rebuild(db)
+
+    def add(self, entry: SemanticCacheEntry, vec):
+        """Indexes a freshly committed entry and advances the watermark."""
+        with self._lock:
+            self._add_locked(entry.id, entry.prompt_hash, entry.workflow_id, entry.timestamp, vec, bool(entry.is_quarantined))
+            if self._watermark is not None:
+                count, max_id, max_hash = self._watermark
+                if entry.id >= max_id:
+                    max_id, max_hash = entry.id, entry.prompt_hash
+                self._watermark = (count + 1, max_id, max_hash)
+
+    def remove(self, entry_ids: List[int]):
+        """Drops deleted entries from the index and the watermark."""
+        with self._lock:
+            removed = sum(1 for entry_id in entry_ids if self._remove_locked(entry_id))
+            if self._watermark is not None:
+                count, max_id, max_hash = self._watermark
+                if max_id in entry_ids:
+                    max_id, max_hash = self._max_known_locked()
+                self._watermark = (count - removed, max_id, max_hash)
+
+    def set_quarantined(self, entry_id: int, quarantined: bool):
+        with self._lock:
+            location = self._locations.get(entry_id)
+            if location is not None:
+                workflow_id, row = location
+                self._partitions[workflow_id].quarantined[row] = quarantined
+
+    def search(
+        self,
+        query_vec,
+        workflow_id: Optional[str],
+        cutoff: datetime,
+        similarity_threshold: float,
+        top_k: int = 8
+    ) -> List[Tuple[float, int, str]]:
+        """
+        Returns up to top_k (similarity, entry_id, prompt_hash) tuples at or above the threshold,
+        best first. Workflow-scoped lookups search the workflow partition plus global entries;
+        unscoped lookups only see global entries.
+        """
+        return self.search_many([query_vec], [workflow_id], cutoff, similarity_threshold, top_k)[0]
+
+    def search_many(
+        self,
+        query_vecs,
+        workflow_ids: List[Optional[str]],
+        cutoff: datetime,
+        similarity_threshold: float,
+        top_k: int = 8
+    ) -> List[List[Tuple[float, int, str]]]:
+        """
+        Batched search: one result list per query (same contract as search). Each partition is
+        scored with a single matrix product against every query whose scope includes it.
+        """
+        results: List[List[Tuple[float, int, str]]] = [[] for _ in workflow_ids]
+        normalized = [self._normalize(vec) for vec in query_vecs]
+        valid = [i for i, q in enumerate(normalized) if q is not None]
+        if not valid:
+            return results
+        queries = np.stack([normalized[i] for i in valid])
+        cutoff_ts = _epoch(cutoff)
+
+        # Every query searches the global partition; scoped queries also search their own workflow
+        by_scope: Dict[Optional[str], List[int]] = {None: list(range(len(valid)))}
+        for col, i in enumerate(valid):
+            if workflow_ids[i]:
+                by_scope.setdefault(workflow_ids[i], []).append(col)
+
+        with self._lock:
+            for scope, cols in by_scope.items():
+                partition = self._partitions.get(scope)
+                if partition is None or partition.size == 0:
+                    continue
+                n = partition.size
+                eligible = partition.live[:n] & ~partition.quarantined[:n] & (partition.timestamps[:n] >= cutoff_ts)
+                sims = partition.matrix[:n] @ queries[cols].T
+                hits = eligible[:, None] & (sims >= similarity_threshold)
+                for k, col in enumerate(cols):
+                    rows = np.nonzero(hits[:, k])[0]
+                    if rows.size == 0:
+                        continue
+                    col_sims = sims[:, k]
+                    if rows.size > top_k:
+                        rows = rows[np.argpartition(-col_sims[rows], top_k - 1)[:top_k]]
+                    results[valid[col]].extend(
+                        (float(col_sims[row]), partition.ids[row], partition.hashes[row]) for row in rows
+                    )
+        for hits in results:
+            hits.sort(key=lambda r: (-r[0], r[1]))
+            del hits[top_k:]
+        return results
+
+
+# Global index shared by SemanticCache lookups
+semantic_index = SemanticVectorIndex()
@@ -244,13 +244,43 @@ class UtilityIntelligencePlane:
         db.commit()
         return db_est
 
+    @staticmethod
+    def queue_utility_provenance(
+        decision_id: int,
+        signals: List[str],
+        reasoning: str,
+        session_context: Dict[str, Any] = None,
+        update_decision: bool = True
+    ) -> float:
+        """
+        Write-behind variant of record_utility_provenance: the UtilityEstimate insert (and the
+        parent RoutingDecision update) are handed to the TelemetryWriter. Returns the utility score.
+        """
+        from infra.telemetry_writer import telemetry_writer
+        score, confidence, weights = UtilityIntelligencePlane.aggregate_utility_score(signals)
+        telemetry_writer.insert(UtilityEstimate, dict(
+            decision_id=decision_id,
+            timestamp=datetime.utcnow().isoformat(),
+            utility_score=score,
+            confidence=confidence,
+            contributing_signals=json.dumps(signals),
+            signal_weights=json.dumps(weights),
+            session_context=json.dumps(session_context or {}),
+            inference_reasoning=reasoning
+        ))
+        if update_decision:
+            telemetry_writer.update(RoutingDecision, decision_id, {"utility_score": score, "task_success": score >= 0.70})
+            from core.semantic_cache_drift import drift_signals
+            drift_signals.record_decision_update(decision_id, utility_score=score)
+        return score
+
     # --- Task Success & Implicit Retry Predictor ---
 
     @staticmethod
     def detect_implicit_retry(
         db, 
         prompt: str, 
-        recent_prompts: List[Dict[str, Any]],
+        recent_prompts,
         time_window_sec: int = 300,
         workflow_id: str = None
     ) -> Tuple[bool, int, str]:
@@ -259,57 +289,13 @@ class UtilityIntelligencePlane:
         Analyzes recent telemetry to detect if a prompt represents a retry of a previous failed request.
         Uses a combined formulation:
         RetryScore = 0.25 * LexicalOverlap + 0.50 * SemanticSimilarity + 0.15 * WorkflowContext + 0.10 * TemporalProximity
+        `recent_prompts` is a RecentPromptBuffer (no DB access), or a legacy list of
+        {"id", "prompt", "timestamp"[, "workflow_id"]} dicts.
         """
-        now = datetime.utcnow()
-        
-        def calculate_overlap(s1: str, s2: str) -> float:
-            words1 = set(re.findall(r'\w+', s1.lower()))
-            words2 = set(re.findall(r'\w+', s2.lower()))
-            if not words1 or not words2:
-                return 0.0
-            intersection = words1.intersection(words2)
-            union = words1.union(words2)
-            return len(intersection) / len(union)
-
-        emb1 = AdvancedCalibrationEngine._mock_embedding(prompt)
-
-        for entry in reversed(recent_prompts):
-            dt = entry["timestamp"]
-            time_diff = (now - dt).total_seconds()
-                
-            if time_diff <= time_window_sec:
-                dec_id = entry["id"]
-                overlap = calculate_overlap(prompt, entry["prompt"])
-                
-                emb2 = AdvancedCalibrationEngine._mock_embedding(entry["prompt"])
-                sem_sim = AdvancedCalibrationEngine._cosine_similarity(emb1, emb2)
-                
-                # Check workflow context
-                prev_workflow_id = None
-                if "workflow_id" in entry:
-                    prev_workflow_id = entry["workflow_id"]
-                else:
-                    decision = db.query(RoutingDecision).filter(RoutingDecision.id == dec_id).first()
-                    if decision:
-                        prev_workflow_id = decision.workflow_id
-                        
-                wf_ctx = 0.0
-                if workflow_id and prev_workflow_id and workflow_id == prev_workflow_id:
-                    wf_ctx = 1.0
-                    
-                temp_prox = max(0.0, 1.0 - (time_diff / 300.0))
-                
-                retry_score = (
-                    0.25 * overlap + 
-                    0.50 * sem_sim + 
-                    0.15 * wf_ctx + 
-                    0.10 * temp_prox
-                )
-                
-                if retry_score >= 0.45:
-                    return True, dec_id, f"Implicit retry detected: score={retry_score:.2f} (lex={overlap:.2f}, sem={sem_sim:.2f}, wf={wf_ctx:.2f}, temp={temp_prox:.2f}) with decision {dec_id} within {time_diff:.1f}s"
-
-        return False, -1, "No matching retry found"
+        from core.retry_buffer import RecentPromptBuffer
+        if not isinstance(recent_prompts, RecentPromptBuffer):
+            recent_prompts = RecentPromptBuffer.from_entries(recent_prompts, db)
+        return recent_prompts.detect_retry(prompt, workflow_id, time_window_sec)
 
     # --- Utility Preservation Constraints ---
 
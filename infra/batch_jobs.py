@@ -0,0 +1,85 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class BatchJob:
+    """One queued /generate/batch run (mode="batch") and, once finished, its results."""
+
+    def __init__(self, total_items: int):
+        self.id = uuid.uuid4().hex
+        self.status = "queued"  # queued -> running -> completed | failed
+        self.total_items = total_items
+        self.created_at = datetime.utcnow().isoformat()
+        self.finished_at: Optional[str] = None
+        self.created_ts = time.time()
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "total_items": self.total_items,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error
+        }
+
+
+class BatchJobStore:
+    """
+    In-process registry of batch jobs.
+    Jobs are kept for RETENTION_SEC after creation and at most MAX_JOBS are retained
+    (oldest evicted first), so pollers have a window to collect results without the
+    store growing unbounded.
+    """
+    MAX_JOBS = 256
+    RETENTION_SEC = 3600.0
+
+    def __init__(self, max_jobs: int = MAX_JOBS, retention_sec: float = RETENTION_SEC):
+        self.max_jobs = max_jobs
+        self.retention_sec = retention_sec
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, BatchJob]" = OrderedDict()
+
+    def _prune_locked(self):
+        cutoff = time.time() - self.retention_sec
+        while self._jobs:
+            oldest = next(iter(self._jobs.values()))
+            if oldest.created_ts >= cutoff and len(self._jobs) <= self.max_jobs:
+                break
+            self._jobs.popitem(last=False)
+
+    def create(self, total_items: int) -> BatchJob:
+        job = BatchJob(total_items)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune_locked()
+        return job
+
+    def get(self, job_id: str) -> Optional[BatchJob]:
+        with self._lock:
+            self._prune_locked()
+            return self._jobs.get(job_id)
+
+    async def run(self, job: BatchJob, fn: Callable[..., Awaitable[Dict[str, Any]]], *args, **kwargs):
+        """Executes a job's coroutine, recording its result or failure on the job."""
+        job.status = "running"
+        try:
+            job.result = await fn(*args, **kwargs)
+            job.status = "completed"
+        except Exception as e:
+            print(f"[Batch Jobs] Job {job.id} failed: {e}")
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.finished_at = datetime.utcnow().isoformat()
+
+
+# Global registry for mode="batch" jobs
+batch_jobs = BatchJobStore()
@@ -1,5 +1,6 @@
 from typing import List, Dict, Any
 import numpy as np
+from infra.embeddings import embedding_provider
 
 class AdvancedCalibrationEngine:
     """
@@ -13,29 +14,10 @@ class AdvancedCalibrationEngine:
         """
         Simulates generating a text embedding based on word content (bag of words).
         Deterministic based on word hashes to avoid synthetic length coupling.
+        Served by the shared EmbeddingProvider (word-hash backend by default).
         """
-        import hashlib
-        # Clean text and split into words
-        words = [w.strip(".,!?\"'()[]{}").lower() for w in text.split()]
-        words = [w for w in words if w]
-        if not words:
-            rng = np.random.RandomState(0)
-            return rng.rand(128)
-        
-        # Accumulate word vectors
-        vectors = []
-        for word in words:
-            # Hash the word to a 32-bit integer seed
-            h = int(hashlib.md5(word.encode('utf-8')).hexdigest()[:8], 16)
-            rng = np.random.RandomState(h)
-            vectors.append(rng.randn(128))
-            
-        vec = np.sum(vectors, axis=0)
-        norm = np.linalg.norm(vec)
-        if norm > 0:
-            vec = vec / norm
-        return vec
-        
+        return embedding_provider.embed(text)
+
     @staticmethod
     def _cosine_similarity(vec1: np.ndarray, vec2: np.ndarray) -> float:
         """Calculates cosine similarity between two vectors."""
@@ -55,7 +37,7 @@ class AdvancedCalibrationEngine:
         if len(samples) < 2:
             return {"semantic_entropy": 0.0, "cluster_instability": 0.0}
             
-        embeddings = [AdvancedCalibrationEngine._mock_embedding(s) for s in samples]
+        embeddings = embedding_provider.embed_many(samples)
         
         # Calculate pairwise semantic divergence
         divergences = []
@@ -1,6 +1,6 @@
 from typing import Dict, Any
 from sqlalchemy import func
-from infra.database import SessionLocal
+from infra.database import acquire_session, release_session
 from infra.models import RoutingDecision, ModelFailure
 
 class CausalAnalysisLayer:
@@ -14,7 +14,7 @@ class CausalAnalysisLayer:
         """
         Investigates if high latency periods causally correlate with human-reported hallucinations.
         """
-        db = SessionLocal()
+        db = acquire_session()
         try:
             # Get average latency for normal successful requests
             avg_normal = db.query(func.avg(RoutingDecision.latency_ms)).filter(
@@ -40,7 +40,7 @@ class CausalAnalysisLayer:
         except Exception as e:
             return {"error": str(e)}
         finally:
-            db.close()
+            release_session(db)
 
     @staticmethod
     def detect_predictive_failure_signals() -> Dict[str, Any]:
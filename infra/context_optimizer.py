@@ -1,6 +1,14 @@
 import re
 from typing import List, Dict, Any, Optional
 from core.economic_intelligence import EconomicIntelligencePlane
+from infra.pattern_matcher import MultiPatternMatcher
+
+# Generic conversational boilerplate stripped by low_signal_detection (case-insensitive)
+FILLER_MATCHER = MultiPatternMatcher(regexes=[
+    r"basically,?", r"actually,?", r"literally,?",
+    r"in order to", r"as far as i know,?", r"to be honest,?",
+    r"for all intents and purposes", r"needless to say,?"
+])
 
 class ContextOptimizer:
     """
@@ -42,17 +50,9 @@ class ContextOptimizer:
         if not text:
             return ""
         
-        # Strip generic conversational boilerplates
-        fillers = [
-            r"(?i)basically,?", r"(?i)actually,?", r"(?i)literally,?",
-            r"(?i)in order to", r"(?i)as far as I know,?", r"(?i)to be honest,?",
-            r"(?i)for all intents and purposes", r"(?i)needless to say,?"
-        ]
-        
-        cleaned = text
-        for pattern in fillers:
-            cleaned = re.sub(pattern, "", cleaned)
-            
+        # Strip generic conversational boilerplates in one pass
+        cleaned = FILLER_MATCHER.sub("", text)
+
         # Clean extra spaces resulting from substitutions
         cleaned = re.sub(r'\s+', ' ', cleaned).strip()
         return cleaned
@@ -94,7 +94,7 @@ class ContextOptimizer:
         step2 = ContextOptimizer.low_signal_detection(step1)
         
         # Step 3: Semantic redundancy checks using cosine similarity
-        step3 = EconomicIntelligencePlane.semantic_compression(step2, threshold=0.85)
+        step3 = EconomicIntelligencePlane.semantic_compression(step2)
         
         # Step 4: Adaptive windowing for low-complexity requests
         step4 = EconomicIntelligencePlane.adaptive_context_windowing(step3, complexity_score)
@@ -1,6 +1,7 @@
 import os
+from contextvars import ContextVar
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 
 # Phase 6A: PostgreSQL Migration Support
 # We allow falling back to SQLite for local development or sandbox deployments.
@@ -14,13 +15,83 @@ engine = create_engine(
     DATABASE_URL, connect_args=connect_args
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+class UnitOfWorkSession(Session):
+    """
+    Session that can act as a request-scoped unit of work.
+    While `defer_commits` is set, commit() only flushes, so every layer a request passes
+    through (cache, classifier, router, utility, governance) writes into one transaction
+    that is committed once by end_unit_of_work().
+    """
+    defer_commits = False
+    _has_deferred_writes = False
+    _uow_token = None
+
+    def commit(self):
+        if self.defer_commits:
+            self.flush()
+            self._has_deferred_writes = True
+            return
+        super().commit()
+        self._has_deferred_writes = False
+
+    def rollback(self):
+        super().rollback()
+        self._has_deferred_writes = False
+
+    def checkpoint(self):
+        """
+        Commits deferred writes ahead of a long await (provider dispatch, telemetry flush),
+        so the request does not hold the SQLite writer lock across network I/O.
+        No-op when nothing has been written yet.
+        """
+        if self._has_deferred_writes or self.new or self.dirty or self.deleted:
+            Session.commit(self)
+            self._has_deferred_writes = False
+
+
+SessionLocal = sessionmaker(class_=UnitOfWorkSession, autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# Session of the request currently being orchestrated (per asyncio task / thread context)
+_request_session: ContextVar = ContextVar("omi_request_session", default=None)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def begin_unit_of_work() -> UnitOfWorkSession:
+    """Opens the request-scoped session that acquire_session() hands to every layer."""
+    db = SessionLocal()
+    db.defer_commits = True
+    db._uow_token = _request_session.set(db)
+    return db
+
+def end_unit_of_work(db: UnitOfWorkSession):
+    """Commits the request's pending writes once, then releases the session."""
+    try:
+        db.defer_commits = False
+        if db.is_active:
+            db.commit()
+    except Exception as e:
+        print(f"[Unit of Work] Commit failed, rolling back: {e}")
+        db.rollback()
+    finally:
+        if db._uow_token is not None:
+            _request_session.reset(db._uow_token)
+            db._uow_token = None
+        db.close()
+
+def acquire_session() -> Session:
+    """The active request session if one is open, otherwise a fresh session owned by the caller."""
+    db = _request_session.get()
+    return db if db is not None else SessionLocal()
+
+def release_session(db: Session):
+    """Closes a session from acquire_session() unless it belongs to the active unit of work."""
+    if db is not _request_session.get():
+        db.close()
@@ -0,0 +1,67 @@
+import os
+import json
+from typing import Optional, Tuple
+import numpy as np
+
+# Storage precision for new semantic cache embeddings ("float32" or "float16")
+EMBEDDING_STORAGE_DTYPE = os.getenv("OMI_EMBEDDING_DTYPE", "float32")
+
+class EmbeddingCodec:
+    """
+    Packed binary storage for SemanticCacheEntry embeddings.
+    Vectors are stored as raw little-endian float32/float16 bytes in `embedding_vec`
+    (dtype recorded in `embedding_dtype`) and decoded zero-copy with np.frombuffer.
+    Rows written before migration 004 still carry JSON text in `embedding` and are
+    decoded through the legacy path.
+    """
+
+    SUPPORTED_DTYPES = {"float32": np.dtype("<f4"), "float16": np.dtype("<f2")}
+
+    @staticmethod
+    def pack(vec, dtype: Optional[str] = None) -> Tuple[bytes, str]:
+        """Returns (blob, dtype_name) for a vector."""
+        dtype = dtype or EMBEDDING_STORAGE_DTYPE
+        if dtype not in EmbeddingCodec.SUPPORTED_DTYPES:
+            dtype = "float32"
+        arr = np.asarray(vec, dtype=EmbeddingCodec.SUPPORTED_DTYPES[dtype])
+        return arr.tobytes(), dtype
+
+    @staticmethod
+    def unpack(blob: bytes, dtype: Optional[str] = "float32") -> np.ndarray:
+        """
+        Read-only view over the stored bytes (no copy).
+        Raises ValueError for an unknown dtype or a blob that is not a whole number of elements.
+        """
+        np_dtype = EmbeddingCodec.SUPPORTED_DTYPES.get(dtype or "float32")
+        if np_dtype is None:
+            raise ValueError(f"Unsupported embedding dtype: {dtype}")
+        return np.frombuffer(blob, dtype=np_dtype)
+
+    @staticmethod
+    def decode(embedding_vec: Optional[bytes], embedding_dtype: Optional[str], embedding_json: Optional[str]) -> Optional[np.ndarray]:
+        """
+        Decodes a stored embedding, preferring the binary column over legacy JSON text.
+        Corrupt blobs decode to None, like unparseable JSON, so callers treat the row as unindexed.
+        """
+        if embedding_vec:
+            try:
+                return EmbeddingCodec.unpack(embedding_vec, embedding_dtype)
+            except ValueError:
+                return None
+        if embedding_json:
+            try:
+                emb = json.loads(embedding_json)
+            except Exception:
+                return None
+            if isinstance(emb, list) and len(emb) > 0:
+                return np.asarray(emb, dtype=np.float64)
+        return None
+
+    @staticmethod
+    def from_entry(entry) -> Optional[np.ndarray]:
+        """Decodes the embedding of a SemanticCacheEntry (or a row with the same columns)."""
+        return EmbeddingCodec.decode(
+            getattr(entry, "embedding_vec", None),
+            getattr(entry, "embedding_dtype", None),
+            getattr(entry, "embedding", None)
+        )
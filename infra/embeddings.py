@@ -0,0 +1,182 @@
+import os
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Sequence
+import numpy as np
+
+class EmbeddingBackend(ABC):
+    """
+    Embedding backend interface, so the gateway is not locked to the mock word-hash model.
+    Implementations turn a batch of texts into an (n, dim) float matrix.
+    """
+    name: str = "abstract"
+    dim: int = 0
+
+    @abstractmethod
+    def embed_batch(self, texts: Sequence[str]) -> np.ndarray:
+        pass
+
+
+class WordHashEmbeddingBackend(EmbeddingBackend):
+    """
+    Deterministic bag-of-words mock model.
+    Each word maps to RandomState(md5(word)[:8]).randn(128); a text embedding is the
+    normalized sum of its word vectors. Word vectors live in a bounded LRU table.
+    Output is bit-identical to the original per-call implementation.
+    """
+    name = "word_hash"
+    dim = 128
+    STRIP_CHARS = ".,!?\"'()[]{}"
+
+    def __init__(self, max_words: int = 50000):
+        self.max_words = max_words
+        self._words: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._empty = np.random.RandomState(0).rand(self.dim)
+
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        words = [w.strip(cls.STRIP_CHARS).lower() for w in text.split()]
+        return [w for w in words if w]
+
+    def _word_vector_locked(self, word: str) -> np.ndarray:
+        vec = self._words.get(word)
+        if vec is not None:
+            self._words.move_to_end(word)
+            return vec
+        # Hash the word to a 32-bit integer seed
+        h = int(hashlib.md5(word.encode('utf-8')).hexdigest()[:8], 16)
+        vec = np.random.RandomState(h).randn(self.dim)
+        self._words[word] = vec
+        if len(self._words) > self.max_words:
+            self._words.popitem(last=False)
+        return vec
+
+    def embed_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """Gathers one word table for the batch, then reduces each row from it."""
+        out = np.empty((len(texts), self.dim), dtype=np.float64)
+        tokenized = [self.tokenize(t) for t in texts]
+        vocab: Dict[str, int] = {}
+        for words in tokenized:
+            for w in words:
+                if w not in vocab:
+                    vocab[w] = len(vocab)
+        if vocab:
+            with self._lock:
+                table = np.stack([self._word_vector_locked(w) for w in vocab])
+        for i, words in enumerate(tokenized):
+            if not words:
+                out[i] = self._empty
+                continue
+            vec = np.sum(table[[vocab[w] for w in words]], axis=0)
+            norm = np.linalg.norm(vec)
+            if norm > 0:
+                vec = vec / norm
+            out[i] = vec
+        return out
+
+
+class LocalModelEmbeddingBackend(EmbeddingBackend):
+    """
+    Local sentence-embedding model via chromadb's bundled ONNX MiniLM (384-d).
+    Keeps embeddings on-box for sovereign deployments; loaded lazily on first use.
+    """
+    name = "local_minilm"
+    dim = 384
+
+    def __init__(self):
+        self._fn = None
+        self._lock = threading.Lock()
+
+    def embed_batch(self, texts: Sequence[str]) -> np.ndarray:
+        with self._lock:
+            if self._fn is None:
+                from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+                self._fn = DefaultEmbeddingFunction()
+        return np.asarray(self._fn(list(texts)), dtype=np.float64).reshape(len(texts), self.dim)
+
+
+class EmbeddingProvider:
+    """
+    Shared embedding service for every plane (semantic cache, context compression,
+    quality guard, retry detection, consensus).
+    Wraps a swappable backend with a content-addressed LRU of text vectors, so a prompt
+    embedded by one plane is reused by the others within and across requests.
+    """
+
+    def __init__(self, backend: EmbeddingBackend = None, max_texts: int = 4096):
+        self.max_texts = max_texts
+        self._backend = backend or WordHashEmbeddingBackend()
+        self._texts: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0}
+
+    @property
+    def backend(self) -> EmbeddingBackend:
+        return self._backend
+
+    @property
+    def dim(self) -> int:
+        return self._backend.dim
+
+    def set_backend(self, backend: EmbeddingBackend):
+        """Swaps the embedding model; cached vectors from the previous backend are dropped."""
+        with self._lock:
+            self._backend = backend
+            self._texts.clear()
+
+    @staticmethod
+    def _text_key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embedding for a single text (returns a fresh array the caller may mutate)."""
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        """Embeddings for a batch of texts as an (n, dim) matrix; only cache misses reach the backend."""
+        with self._lock:
+            backend = self._backend
+            out = np.empty((len(texts), backend.dim), dtype=np.float64)
+            pending: "OrderedDict[bytes, List[int]]" = OrderedDict()
+            pending_texts = []
+            for i, text in enumerate(texts):
+                key = self._text_key(text)
+                cached = self._texts.get(key)
+                if cached is not None:
+                    self._texts.move_to_end(key)
+                    self.stats["hits"] += 1
+                    out[i] = cached
+                elif key in pending:
+                    pending[key].append(i)
+                else:
+                    self.stats["misses"] += 1
+                    pending[key] = [i]
+                    pending_texts.append(text)
+
+        if pending_texts:
+            vectors = backend.embed_batch(pending_texts)
+            with self._lock:
+                for (key, rows), vec in zip(pending.items(), vectors):
+                    out[rows] = vec
+                    if backend is self._backend:
+                        self._texts[key] = np.array(vec)
+                        if len(self._texts) > self.max_texts:
+                            self._texts.popitem(last=False)
+        return out
+
+    def clear(self):
+        with self._lock:
+            self._texts.clear()
+
+
+def _default_backend() -> EmbeddingBackend:
+    if os.getenv("OMI_EMBEDDING_BACKEND", "word_hash") == "local":
+        return LocalModelEmbeddingBackend()
+    return WordHashEmbeddingBackend()
+
+
+# Global embedding service shared across planes
+embedding_provider = EmbeddingProvider(_default_backend())
@@ -1,6 +1,6 @@
 from typing import Dict, Any, Tuple
 from datetime import datetime, timedelta
-from infra.database import SessionLocal
+from infra.database import acquire_session, release_session
 from infra.models import RoutingDecision, TelemetryLineage
 
 class GovernanceConstraints:
@@ -25,7 +25,7 @@ class GovernanceConstraints:
         """
         Validates if a provider's weight can be decayed based on constraints.
         """
-        db = SessionLocal()
+        db = acquire_session()
         try:
             # Check 1: Minimum Sample Size
             sample_count = db.query(RoutingDecision).filter(RoutingDecision.initial_route == provider).count()
@@ -48,4 +48,4 @@ class GovernanceConstraints:
         except Exception as e:
             return False, f"Constraint evaluation failed: {str(e)}"
         finally:
-            db.close()
+            release_session(db)
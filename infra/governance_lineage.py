@@ -1,7 +1,7 @@
 from typing import List, Dict, Any
 from datetime import datetime
 import json
-from infra.database import SessionLocal
+from infra.database import acquire_session, release_session
 from infra.models import TelemetryLineage
 
 class GovernanceLineage:
@@ -28,7 +28,7 @@ class GovernanceLineage:
         new_json = json.dumps(new_state)
         metadata_hash = f"conf:{confidence_level}|trigger:{trigger_source}|prev:{prev_json}|new:{new_json}"
         
-        db = SessionLocal()
+        db = acquire_session()
         try:
             lineage = TelemetryLineage(
                 timestamp=datetime.utcnow().isoformat(),
@@ -40,16 +40,16 @@ class GovernanceLineage:
             db.add(lineage)
             db.commit()
         finally:
-            db.close()
+            release_session(db)
 
     @staticmethod
     def get_lineage(entity: str) -> List[Dict]:
         """Retrieves the history of mutations for a provider."""
-        db = SessionLocal()
+        db = acquire_session()
         try:
             records = db.query(TelemetryLineage).filter(
                 TelemetryLineage.influenced_entity == entity
             ).order_by(TelemetryLineage.id.desc()).all()
             return [{"timestamp": r.timestamp, "action": r.action_type, "meta": r.metadata_hash} for r in records]
         finally:
-            db.close()
+            release_session(db)
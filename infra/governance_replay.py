@@ -1,5 +1,5 @@
 from typing import Dict, Any
-from infra.database import SessionLocal
+from infra.database import acquire_session, release_session
 from infra.models import RoutingDecision
 
 class GovernanceReplayEngine:
@@ -13,7 +13,7 @@ class GovernanceReplayEngine:
         """
         Replays the last 100 routing decisions assuming the provider's max_complexity was strictly enforced.
         """
-        db = SessionLocal()
+        db = acquire_session()
         try:
             rows = db.query(RoutingDecision.complexity, RoutingDecision.escalated).filter(
                 RoutingDecision.initial_route == provider
@@ -45,4 +45,4 @@ class GovernanceReplayEngine:
         except Exception as e:
             return {"status": "error", "detail": str(e)}
         finally:
-            db.close()
+            release_session(db)
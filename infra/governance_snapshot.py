@@ -0,0 +1,196 @@
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from infra.database import SessionLocal
+
+# Seconds between scheduled background recomputations of the governance snapshot
+GOVERNANCE_SNAPSHOT_REFRESH_SEC = float(os.getenv("OMI_GOVERNANCE_SNAPSHOT_REFRESH_SEC", "60"))
+# Oldest snapshot a /generate gate may act on; older snapshots are rebuilt inline before use
+GOVERNANCE_SNAPSHOT_MAX_STALENESS_SEC = float(os.getenv("OMI_GOVERNANCE_SNAPSHOT_MAX_STALENESS_SEC", "120"))
+# New routing decisions that trigger an early background recomputation
+GOVERNANCE_SNAPSHOT_DECISION_TRIGGER = int(os.getenv("OMI_GOVERNANCE_SNAPSHOT_DECISION_TRIGGER", "500"))
+
+
+class GovernanceSnapshot:
+    """
+    Immutable, versioned set of the ecosystem-wide scores behind the meta-governance and
+    diversity gates. Published whole, so a gate never mixes scores from two builds.
+    """
+    __slots__ = ("version", "built_at", "build_ms", "decisions_since", "_built_monotonic",
+                 "diversity", "meta", "ecosystem", "equilibrium", "inertia")
+
+    def __init__(self, version: int, scores: Dict[str, Dict[str, Any]], build_ms: float = 0.0, decisions_since: int = 0):
+        self.version = version
+        self.built_at = datetime.utcnow().isoformat()
+        self._built_monotonic = time.monotonic()
+        self.build_ms = build_ms
+        self.decisions_since = decisions_since
+        self.diversity = scores["diversity"]
+        self.meta = scores["meta"]
+        self.ecosystem = scores["ecosystem"]
+        self.equilibrium = scores["equilibrium"]
+        self.inertia = scores["inertia"]
+
+    @property
+    def age_sec(self) -> float:
+        return time.monotonic() - self._built_monotonic
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "built_at": self.built_at,
+            "age_sec": round(self.age_sec, 2),
+            "build_ms": round(self.build_ms, 2),
+            "scores": {
+                "provider_distribution": self.diversity.get("provider_distribution"),
+                "governance_overhead_score": self.meta.get("governance_overhead_score"),
+                "recursive_complexity_risk": self.meta.get("recursive_complexity_risk"),
+                "governance_rigidity_score": self.ecosystem.get("governance_rigidity_score"),
+                "governance_inertia_score": self.inertia.get("governance_inertia_score"),
+                "ecosystem_equilibrium_score": self.equilibrium.get("ecosystem_equilibrium_score")
+            }
+        }
+
+
+class GovernanceSnapshotService:
+    """
+    Computes the meta-governance scores off the request path.
+    The five analyses behind the gates (meta-governance audit, ecosystem evaluation,
+    equilibrium, inertia, cognitive diversity) each scan whole telemetry tables, so a daemon
+    worker recomputes them every interval_sec, or early once decision_trigger new routing
+    decisions have been logged, and publishes the result with a single reference swap.
+
+    Gates call current(): a snapshot younger than max_staleness_sec is served as-is; an
+    older (or missing) one is rebuilt inline first, so the bound holds even if the worker
+    falls behind. Rebuilds are serialized, so concurrent gates wait for one build instead of
+    each running their own. The worker starts on first use, so deployments that never
+    enforce the gates never pay for the scans.
+    """
+
+    def __init__(
+        self,
+        interval_sec: float = GOVERNANCE_SNAPSHOT_REFRESH_SEC,
+        max_staleness_sec: float = GOVERNANCE_SNAPSHOT_MAX_STALENESS_SEC,
+        decision_trigger: int = GOVERNANCE_SNAPSHOT_DECISION_TRIGGER
+    ):
+        self.interval_sec = interval_sec
+        self.max_staleness_sec = max_staleness_sec
+        self.decision_trigger = decision_trigger
+        self._snapshot: Optional[GovernanceSnapshot] = None
+        self._pending_decisions = 0
+        self._build_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {"builds": 0, "scheduled_builds": 0, "triggered_builds": 0, "inline_builds": 0,
+                      "reads": 0, "stale_reads": 0, "failures": 0, "last_error": None}
+
+    @staticmethod
+    def _compute(db) -> Dict[str, Dict[str, Any]]:
+        from infra.meta_governance_auditor import MetaGovernanceAuditor
+        from analytics.ecosystem_simulator import EcosystemSimulator
+        from analytics.ecosystem_equilibrium import EcosystemEquilibriumEngine
+        from analytics.governance_inertia import GovernanceInertiaEngine
+        from analytics.cognitive_diversity import CognitiveDiversityPreserver
+        return {
+            "diversity": CognitiveDiversityPreserver.calculate_diversity_metrics(db),
+            "meta": MetaGovernanceAuditor.audit_governance_layers(db),
+            "ecosystem": EcosystemSimulator.evaluate_ecosystem(db),
+            "equilibrium": EcosystemEquilibriumEngine.calculate_equilibrium(db),
+            "inertia": GovernanceInertiaEngine.calculate_inertia_metrics(db)
+        }
+
+    def rebuild(self, reason: str = "scheduled") -> Optional[GovernanceSnapshot]:
+        """Recomputes and publishes a new snapshot; keeps the previous one if the build fails."""
+        with self._build_lock:
+            started = time.perf_counter()
+            decisions_since, self._pending_decisions = self._pending_decisions, 0
+            db = SessionLocal()
+            try:
+                scores = self._compute(db)
+            except Exception as e:
+                self.stats["failures"] += 1
+                self.stats["last_error"] = str(e)
+                version = self._snapshot.version if self._snapshot else None
+                print(f"[Governance Snapshot] Rebuild failed, keeping version {version}: {e}")
+                return self._snapshot
+            finally:
+                db.close()
+            snapshot = GovernanceSnapshot(
+                (self._snapshot.version if self._snapshot else 0) + 1,
+                scores,
+                build_ms=(time.perf_counter() - started) * 1000,
+                decisions_since=decisions_since
+            )
+            self._snapshot = snapshot
+            self.stats["builds"] += 1
+            self.stats[f"{reason}_builds"] += 1
+            return snapshot
+
+    def current(self, max_staleness_sec: Optional[float] = None) -> GovernanceSnapshot:
+        """Snapshot no older than max_staleness_sec (defaults to the service bound)."""
+        self.start()
+        bound = self.max_staleness_sec if max_staleness_sec is None else max_staleness_sec
+        self.stats["reads"] += 1
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.age_sec > bound:
+            self.stats["stale_reads"] += 1
+            with self._build_lock:
+                # Another gate may have rebuilt it while we waited for the lock
+                snapshot = self._snapshot
+                fresh = snapshot is not None and snapshot.age_sec <= bound
+            if not fresh:
+                snapshot = self.rebuild(reason="inline")
+            if snapshot is None:
+                raise RuntimeError(f"Governance snapshot unavailable: {self.stats['last_error']}")
+        return snapshot
+
+    def note_decision(self, count: int = 1):
+        """Counts newly logged routing decisions; wakes the worker once decision_trigger is reached."""
+        self._pending_decisions += count
+        if self._pending_decisions >= self.decision_trigger and self._thread is not None:
+            self._wake.set()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="omi-governance-snapshot", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            triggered = self._wake.wait(self.interval_sec)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            snapshot = self._snapshot
+            if triggered or snapshot is None or snapshot.age_sec >= self.interval_sec:
+                self.rebuild(reason="triggered" if triggered else "scheduled")
+
+    def status(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        status = snapshot.to_dict() if snapshot else {"version": 0}
+        status.update({
+            "refresh_interval_sec": self.interval_sec,
+            "max_staleness_sec": self.max_staleness_sec,
+            "decision_trigger": self.decision_trigger,
+            "pending_decisions": self._pending_decisions,
+            "worker_alive": self._thread is not None and self._thread.is_alive(),
+            **self.stats
+        })
+        return status
+
+
+# Global governance snapshot read by the /generate meta-governance and diversity gates
+governance_snapshots = GovernanceSnapshotService()
@@ -0,0 +1,45 @@
+import json
+import numpy as np
+
+def upgrade(conn):
+    # Add packed binary embedding columns to semantic_cache_entries
+    columns = [
+        ("embedding_vec", "BLOB"),
+        ("embedding_dtype", "TEXT DEFAULT 'float32'")
+    ]
+    for col_name, col_type in columns:
+        try:
+            conn.execute(f"ALTER TABLE semantic_cache_entries ADD COLUMN {col_name} {col_type};")
+        except Exception:
+            pass
+
+    # Convert legacy JSON text embeddings to packed little-endian float32
+    rows = conn.execute(
+        "SELECT id, embedding FROM semantic_cache_entries WHERE embedding_vec IS NULL AND embedding IS NOT NULL;"
+    ).fetchall()
+    for row_id, embedding_json in rows:
+        try:
+            emb = json.loads(embedding_json)
+        except Exception:
+            continue
+        if not isinstance(emb, list) or len(emb) == 0:
+            continue
+        blob = np.asarray(emb, dtype="<f4").tobytes()
+        conn.execute(
+            "UPDATE semantic_cache_entries SET embedding_vec = ?, embedding_dtype = 'float32', embedding = NULL WHERE id = ?;",
+            (blob, row_id)
+        )
+
+def downgrade(conn):
+    # Restore JSON text embeddings; the binary columns stay (SQLite limitation)
+    rows = conn.execute(
+        "SELECT id, embedding_vec, embedding_dtype FROM semantic_cache_entries WHERE embedding_vec IS NOT NULL;"
+    ).fetchall()
+    for row_id, blob, dtype in rows:
+        np_dtype = "<f2" if dtype == "float16" else "<f4"
+        emb = np.frombuffer(blob, dtype=np_dtype).astype(float).tolist()
+        conn.execute(
+            "UPDATE semantic_cache_entries SET embedding = ?, embedding_vec = NULL WHERE id = ?;",
+            (json.dumps(emb), row_id)
+        )
+    print("Downgrade for 004_binary_embeddings column dropping is skipped (SQLite limitation).")
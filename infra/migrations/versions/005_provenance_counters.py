@@ -0,0 +1,71 @@
+import json
+
+# Hot keys already mirrored by the drift_score / provenance_cri columns on every evaluation
+MIRRORED_FIELDS = ("last_drift_score", "last_cri")
+
+
+def upgrade(conn):
+    # Add typed reuse counter columns to semantic_cache_entries
+    columns = [
+        ("reuse_count", "INTEGER DEFAULT 0"),
+        ("last_reuse_timestamp", "TEXT"),
+        ("revalidate_count", "INTEGER DEFAULT 0"),
+        ("drift_triggers", "TEXT"),
+        ("linked_workflows", "TEXT")
+    ]
+    for col_name, col_type in columns:
+        try:
+            conn.execute(f"ALTER TABLE semantic_cache_entries ADD COLUMN {col_name} {col_type};")
+        except Exception:
+            pass
+
+    # Backfill the columns from the provenance JSON and strip the hot keys from it
+    rows = conn.execute("SELECT id, provenance FROM semantic_cache_entries WHERE provenance IS NOT NULL;").fetchall()
+    for row_id, provenance in rows:
+        try:
+            prov = json.loads(provenance)
+        except Exception:
+            continue
+        if not isinstance(prov, dict):
+            continue
+        linked = prov.pop("linked_workflows", None)
+        triggers = prov.pop("drift_triggers", None)
+        for key in MIRRORED_FIELDS:
+            prov.pop(key, None)
+        conn.execute(
+            "UPDATE semantic_cache_entries SET reuse_count = ?, last_reuse_timestamp = ?, revalidate_count = ?, "
+            "drift_triggers = ?, linked_workflows = ?, provenance = ? WHERE id = ?;",
+            (
+                int(prov.pop("reuse_count", 0) or 0),
+                prov.pop("last_reuse_timestamp", None),
+                int(prov.pop("revalidate_count", 0) or 0),
+                ",".join(triggers) if isinstance(triggers, list) else None,
+                json.dumps(linked) if isinstance(linked, list) else None,
+                json.dumps(prov),
+                row_id
+            )
+        )
+
+def downgrade(conn):
+    # Fold the columns back into the provenance JSON; the columns stay (SQLite limitation)
+    rows = conn.execute(
+        "SELECT id, provenance, reuse_count, last_reuse_timestamp, revalidate_count, drift_triggers, "
+        "linked_workflows, drift_score, provenance_cri FROM semantic_cache_entries;"
+    ).fetchall()
+    for row_id, provenance, reuse, last_reuse, revalidations, triggers, linked, drift, cri in rows:
+        try:
+            prov = json.loads(provenance) if provenance else {}
+        except Exception:
+            prov = {}
+        prov["reuse_count"] = reuse or 0
+        if last_reuse:
+            prov["last_reuse_timestamp"] = last_reuse
+            prov["last_drift_score"] = drift
+            prov["last_cri"] = cri
+            prov["drift_triggers"] = triggers.split(",") if triggers else []
+        if revalidations:
+            prov["revalidate_count"] = revalidations
+        if linked:
+            prov["linked_workflows"] = json.loads(linked)
+        conn.execute("UPDATE semantic_cache_entries SET provenance = ? WHERE id = ?;", (json.dumps(prov), row_id))
+    print("Downgrade for 005_provenance_counters column dropping is skipped (SQLite limitation).")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, Text
+from sqlalchemy import Column, Integer, String, Float, Boolean, Text, LargeBinary
 from infra.database import Base
 
 # Phase 6A: Declarative ORM Models mapping to the Data Moat tables
@@ -53,12 +53,20 @@ class SemanticCacheEntry(Base):
     input_tokens = Column(Integer, default=0)
     output_tokens = Column(Integer, default=0)
     cost_usd = Column(Float, default=0.0)
-    embedding = Column(Text)  # JSON-serialized list of floats
+    embedding = Column(Text)  # Legacy JSON-serialized list of floats (pre-migration 004 rows)
+    embedding_vec = Column(LargeBinary, nullable=True)  # Packed float32/float16 vector
+    embedding_dtype = Column(String, default="float32")
     hits = Column(Integer, default=0)
     drift_score = Column(Float, default=0.0)
     is_quarantined = Column(Boolean, default=False)
-    provenance = Column(Text, nullable=True)
-    provenance_cri = Column(Float, default=1.0)
+    provenance = Column(Text, nullable=True)  # Cold lineage (origin, governance/calibration state, history)
+    provenance_cri = Column(Float, default=1.0)  # CRI of the last drift evaluation
+    # Hot reuse counters, updated on every hit (migration 005 moved them out of the provenance JSON)
+    reuse_count = Column(Integer, default=0)
+    last_reuse_timestamp = Column(String, nullable=True)
+    revalidate_count = Column(Integer, default=0)
+    drift_triggers = Column(String, nullable=True)  # Comma-separated triggers of the last drift evaluation
+    linked_workflows = Column(Text, nullable=True)  # JSON list of workflows sharing this entry
 
 
 class ModelFailure(Base):
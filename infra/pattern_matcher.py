@@ -0,0 +1,95 @@
+import re
+from typing import Dict, FrozenSet, Iterable, List, Set
+
+
+def _trie_alternatives(node: Dict[str, dict]) -> List[str]:
+    """Regex alternatives for a character trie; at each position the longest literal wins."""
+    alternatives = []
+    for ch, child in sorted(node.items()):
+        if not ch:
+            continue
+        tail = _trie_alternatives(child)
+        body = (tail[0] if len(tail) == 1 else "(?:" + "|".join(tail) + ")") if tail else ""
+        if body and "" in child:
+            body = "(?:" + body + ")?"
+        alternatives.append(re.escape(ch) + body)
+    return alternatives
+
+
+class MultiPatternMatcher:
+    """
+    Compiled multi-pattern matcher for the keyword heuristics on the hot path.
+    Literals are folded into one prefix-factored regex (a character trie) and extra regex
+    patterns ride along as further alternatives, so the text is scanned once instead of
+    once per keyword (and lower-cased once instead of once per keyword). Build matchers
+    once at import and share them; compiled patterns are immutable and thread-safe.
+
+    findall reports every distinct pattern that occurs in the text, with the same answers
+    as checking each pattern on its own (`kw in text.lower()` / `re.search`). After a hit
+    the scan resumes one character past its start rather than its end, so overlapping hits
+    are kept. Literals that are prefixes of a longer hit at the same position (e.g.
+    "safety" inside "safety_protocol") come from a closure table built at init time.
+
+    With ignore_case, scans run over the lower-cased text (IGNORECASE matching is several
+    times slower in the re engine), so regexes should be written in lower case. The
+    alternation is kept flat and group-free so the engine can still skip ahead on the set
+    of possible first characters.
+    """
+
+    def __init__(self, literals: Iterable[str] = (), regexes: Iterable[str] = (), ignore_case: bool = True):
+        self.ignore_case = ignore_case
+        self.literals: List[str] = list(dict.fromkeys(literals))
+        self.regexes: List[str] = list(dict.fromkeys(regexes))
+
+        trie: Dict[str, dict] = {}
+        originals: Dict[str, List[str]] = {}
+        for literal in self.literals:
+            key = literal.lower() if ignore_case else literal
+            originals.setdefault(key, []).append(literal)
+            node = trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+
+        # key -> every literal that also matches wherever key matches (itself and its prefixes)
+        self._closure: Dict[str, FrozenSet[str]] = {
+            key: frozenset(lit for other, lits in originals.items() if key.startswith(other) for lit in lits)
+            for key in originals
+        }
+
+        combined = "|".join(_trie_alternatives(trie) + self.regexes) or r"(?!)"
+        self._scan = re.compile(combined)
+        self._compiled_regexes = [re.compile(rx) for rx in self.regexes]
+        self._pattern = re.compile(combined, re.IGNORECASE) if ignore_case else self._scan
+
+    def findall(self, text: str) -> Set[str]:
+        """Every distinct pattern (as given at construction) found in the text, in one pass."""
+        found: Set[str] = set()
+        if not text:
+            return found
+        if self.ignore_case:
+            text = text.lower()
+        total = len(self.literals) + len(self.regexes)
+        search = self._scan.search
+        match = search(text)
+        while match is not None:
+            # Literals come first in the alternation, so a literal hit is the longest one here
+            found.update(self._closure.get(match.group(), ()))
+            start = match.start()
+            for rx, compiled in zip(self.regexes, self._compiled_regexes):
+                if rx not in found and compiled.match(text, start):
+                    found.add(rx)
+            if len(found) == total:
+                break
+            match = search(text, start + 1)
+        return found
+
+    def search(self, text: str) -> bool:
+        """True if any pattern occurs in the text (stops at the first hit)."""
+        if not text:
+            return False
+        return self._scan.search(text.lower() if self.ignore_case else text) is not None
+
+    def sub(self, repl: str, text: str) -> str:
+        """Replaces every occurrence of any pattern in a single pass over the original text."""
+        return self._pattern.sub(repl, text) if text else text
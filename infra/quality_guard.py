@@ -1,4 +1,9 @@
 from core.economic_intelligence import EconomicIntelligencePlane
+from infra.context_optimizer import ContextOptimizer
+from infra.embeddings import embedding_provider
+
+# Minimum cosine similarity between the content of the original and the optimized text
+QUALITY_RETENTION_THRESHOLD = 0.95
 
 class QualityGuard:
     """
@@ -8,6 +13,15 @@ class QualityGuard:
     does not degrade reasoning or context fidelity.
     """
 
+    @staticmethod
+    def _content(text: str) -> str:
+        """
+        Text with exact duplicates and filler phrases removed. Those edits lose no content, but under
+        the bag-of-words embedder dropping k of n words scores about sqrt((n-k)/n), so filler-only
+        removal would otherwise fail the floor. Only the lossy steps are judged.
+        """
+        return ContextOptimizer.low_signal_detection(ContextOptimizer.duplicate_removal(text))
+
     @staticmethod
     def evaluate_quality(original: str, optimized: str) -> dict:
         """
@@ -16,24 +30,28 @@ class QualityGuard:
         """
         if not original or not optimized:
             return {"quality_score": 1.0, "quality_retained": True}
-            
+
         if original == optimized:
             return {"quality_score": 1.0, "quality_retained": True}
-            
+
+        original_content = QualityGuard._content(original)
+        optimized_content = QualityGuard._content(optimized)
+        if original_content == optimized_content:
+            return {"quality_score": 1.0, "quality_retained": True}
+
         # Get embeddings
-        orig_emb = EconomicIntelligencePlane._mock_embedding(original)
-        opt_emb = EconomicIntelligencePlane._mock_embedding(optimized)
-        
+        orig_emb, opt_emb = embedding_provider.embed_many([original_content, optimized_content])
+
         # Calculate cosine similarity
         sim = EconomicIntelligencePlane._cosine_similarity(orig_emb, opt_emb)
-        
+
         # Scale similarity to quality percentage (similarity is usually high for pruned text)
         # We ensure a strict bound
         quality_score = float(sim)
-        
+
         # Threshold constraint: >= 0.95
-        quality_retained = (quality_score >= 0.95)
-        
+        quality_retained = (quality_score >= QUALITY_RETENTION_THRESHOLD)
+
         return {
             "quality_score": round(quality_score, 4),
             "quality_retained": quality_retained
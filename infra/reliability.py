@@ -1,6 +1,13 @@
-from typing import Dict, Any
+import os
+import threading
+import time
+from typing import Dict, Any, Tuple
 from enum import Enum
 from core.learning_loop import memory_bank
+from infra.pattern_matcher import MultiPatternMatcher
+
+# Upper bound (seconds) on how stale a cached provider reliability index may be
+RELIABILITY_INDEX_TTL_SEC = float(os.getenv("OMI_RELIABILITY_INDEX_TTL_SEC", "30"))
 
 class FailureTaxonomy(str, Enum):
     HALLUCINATION = "hallucination"
@@ -12,12 +19,71 @@ class FailureTaxonomy(str, Enum):
     POLICY_VIOLATION = "policy_violation"
     SEMANTIC_DRIFT = "semantic_drift"
 
+class ReliabilityIndexCache:
+    """
+    Per-provider cache of the calibration inputs (historical failure rate, ECE).
+    Entries expire after ttl_sec and are invalidated as soon as the learning loop records a
+    new failure or escalation for the provider (or rebuilds its stats), so the judge step
+    is a dict lookup on the hot path. ttl_sec=0 disables caching.
+    """
+
+    def __init__(self, ttl_sec: float = RELIABILITY_INDEX_TTL_SEC):
+        self.ttl_sec = ttl_sec
+        self._entries: Dict[str, tuple] = {}  # model -> (failure_rate, ece, stats_version, expires_at)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "expirations": 0}
+
+    def get(self, model: str) -> Tuple[float, float]:
+        """Returns (historical_failure_rate, provider_ece) for the model."""
+        version = memory_bank.provider_stats.version(model)
+        now = time.monotonic()
+        entry = self._entries.get(model)
+        if entry is not None and entry[2] == version and now < entry[3]:
+            self.stats["hits"] += 1
+            return entry[0], entry[1]
+
+        self.stats["misses"] += 1
+        if entry is not None:
+            self.stats["invalidations" if entry[2] != version else "expirations"] += 1
+        failure_rate = memory_bank.get_escalation_rate(target_model=model, min_complexity=0.0)
+        provider_ece = memory_bank.get_provider_ece(target_model=model)
+        if self.ttl_sec > 0:
+            with self._lock:
+                self._entries[model] = (failure_rate, provider_ece, version, now + self.ttl_sec)
+        return failure_rate, provider_ece
+
+    def invalidate(self, model: str = None):
+        with self._lock:
+            if model is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(model, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0,
+            "ttl_sec": self.ttl_sec,
+            "cached_providers": len(self._entries)
+        }
+
+
+# Global reliability index cache used by the judge
+reliability_index_cache = ReliabilityIndexCache()
+
 class ConfidenceEngine:
     """
     Quantitative Reliability Engine with Cross-Model Calibration.
     Examines responses and assigns a confidence score between 0.0 and 1.0,
     calibrated against the specific model's historical reliability index.
     """
+    LEAK_MARKERS = ["<output_lang>", "System:", "CRITICAL PROTOCOL", "Role:", "Task:"]
+    AMBIGUOUS_TOKENS = ["I think", "might be", "not entirely sure", "assuming"]
+    REFUSAL_TOKENS = ["don't know", "unable to", "cannot answer", "as an ai"]
+    # Leak markers are case-sensitive; ambiguity and refusal tokens share one case-insensitive pass
+    LEAK_MATCHER = MultiPatternMatcher(LEAK_MARKERS, ignore_case=False)
+    HEDGE_MATCHER = MultiPatternMatcher(AMBIGUOUS_TOKENS + REFUSAL_TOKENS)
     
     @staticmethod
     def evaluate_response(response_text: str, complexity_score: float, routed_model: str) -> Dict[str, Any]:
@@ -55,24 +121,20 @@ class ConfidenceEngine:
             failure_reason = FailureTaxonomy.REASONING_FAILURE.value
             
         # 3. Format/Leak heuristics (System prompts leaking into output)
-        leak_markers = ["<output_lang>", "System:", "CRITICAL PROTOCOL", "Role:", "Task:"]
-        for marker in leak_markers:
-            if marker in response_text:
-                score -= 0.5
-                failure_reason = FailureTaxonomy.POLICY_VIOLATION.value
-                break
-                
+        if ConfidenceEngine.LEAK_MATCHER.search(response_text):
+            score -= 0.5
+            failure_reason = FailureTaxonomy.POLICY_VIOLATION.value
+
         # 4. Ambiguity heuristics (Tokens indicating uncertainty in factual output)
-        ambiguous_tokens = ["I think", "might be", "not entirely sure", "assuming"]
-        refusal_tokens = ["don't know", "unable to", "cannot answer", "as an ai"]
-        for marker in ambiguous_tokens:
-            if marker in response_text.lower():
+        hedges = ConfidenceEngine.HEDGE_MATCHER.findall(response_text)
+        for marker in ConfidenceEngine.AMBIGUOUS_TOKENS:
+            if marker in hedges:
                 score -= 0.2
                 if not failure_reason:
                     failure_reason = FailureTaxonomy.HALLUCINATION.value
-                    
-        for marker in refusal_tokens:
-            if marker in response_text.lower():
+
+        for marker in ConfidenceEngine.REFUSAL_TOKENS:
+            if marker in hedges:
                 score -= 0.8  # Heavy penalty for outright refusal
                 failure_reason = FailureTaxonomy.POLICY_VIOLATION.value
 
@@ -81,8 +143,7 @@ class ConfidenceEngine:
         
         # Cross-Model Calibration (Phase 5 ECE Integration)
         # A 0.8 from a historically flaky model is less trustworthy than a 0.8 from GPT-4.
-        historical_failure_rate = memory_bank.get_escalation_rate(target_model=routed_model, min_complexity=0.0)
-        provider_ece = memory_bank.get_provider_ece(target_model=routed_model)
+        historical_failure_rate, provider_ece = reliability_index_cache.get(routed_model)
         
         # We dampen the raw confidence using both the raw escalation rate and the provider's ECE (overconfidence gap)
         reliability_index = 1.0 - (historical_failure_rate * 0.4) - (provider_ece * 0.6)
@@ -103,3 +164,73 @@ class ConfidenceEngine:
             "risk_level": risk_level,
             "failure_reason": failure_reason
         }
+
+
+class StreamingJudge:
+    """
+    Incremental ConfidenceEngine heuristics for streamed responses.
+    Leak markers and refusal tokens are checked on every chunk, so a doomed response can be
+    aborted mid-stream. Any tail that could still grow into a marker is held back until the
+    next chunk resolves it, so no part of a marker reaches the client before it is caught.
+    Emitted text goes through the same sanitization as the buffered path. Truncation and
+    calibration need the full text and are judged by ConfidenceEngine.evaluate_response
+    once the stream ends.
+    """
+    SANITIZE_TOKENS = ["System:", "CRITICAL PROTOCOL", "Role:"]
+
+    def __init__(self, abort_on_violation: bool = True):
+        self.abort_on_violation = abort_on_violation
+        self.text = ""
+        self.abort_reason = None
+        self.violation = None
+        self._emitted = 0
+        self._case_markers = ConfidenceEngine.LEAK_MARKERS + self.SANITIZE_TOKENS
+        self._lower_markers = ConfidenceEngine.REFUSAL_TOKENS
+        self._holdback = max(len(m) for m in self._case_markers + self._lower_markers) - 1
+
+    @staticmethod
+    def sanitize(text: str) -> str:
+        for token in StreamingJudge.SANITIZE_TOKENS:
+            text = text.replace(token, "")
+        return text
+
+    def _scan(self, region: str):
+        if ConfidenceEngine.LEAK_MATCHER.search(region):
+            return f"{FailureTaxonomy.POLICY_VIOLATION.value}:leak_marker"
+        hedges = ConfidenceEngine.HEDGE_MATCHER.findall(region)
+        if any(marker in hedges for marker in ConfidenceEngine.REFUSAL_TOKENS):
+            return f"{FailureTaxonomy.POLICY_VIOLATION.value}:refusal"
+        return None
+
+    def _pending_marker_start(self) -> int:
+        """Start of the earliest tail that could still grow into a marker."""
+        text = self.text
+        lowered = text.lower()
+        for i in range(max(self._emitted, len(text) - self._holdback), len(text)):
+            if any(m.startswith(text[i:]) for m in self._case_markers) or any(m.startswith(lowered[i:]) for m in self._lower_markers):
+                return i
+        return len(text)
+
+    def feed(self, chunk: str) -> str:
+        """Consumes a chunk; returns the sanitized text that is now safe to emit ('' after an abort)."""
+        if self.abort_reason:
+            return ""
+        self.text += chunk
+        violation = self._scan(self.text[self._emitted:])
+        if violation and not self.violation:
+            self.violation = violation
+            if self.abort_on_violation:
+                self.abort_reason = violation
+                return ""
+        safe_end = self._pending_marker_start()
+        out = self.text[self._emitted:safe_end]
+        self._emitted = safe_end
+        return self.sanitize(out)
+
+    def finish(self) -> str:
+        """Releases the held-back tail once the provider stream has ended."""
+        if self.abort_reason:
+            return ""
+        out = self.text[self._emitted:]
+        self._emitted = len(self.text)
+        return self.sanitize(out)
@@ -1,4 +1,3 @@
-import asyncio
 from typing import Dict, Any
 from core.router import router as sovereign_router
 from infra.reliability import ConfidenceEngine
@@ -28,12 +27,7 @@ class ShadowEvaluator:
                 "instruction": "Role: Ground_Truth_Validator. Task: Provide a perfect, highly-accurate response.",
                 "trace": {}
             }
-            # This is synchronous but wrapped in an async background task context
-            # In production, this would use an async HTTP client. We use run_in_executor here to avoid blocking.
-            loop = asyncio.get_event_loop()
-            premium_response = await loop.run_in_executor(
-                None, 
-                sovereign_router.execute_route, 
+            premium_response = await sovereign_router.execute_route_async(
                 prompt, 
                 shadow_config, 
                 clients
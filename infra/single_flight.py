@@ -0,0 +1,84 @@
+import asyncio
+import hashlib
+import json
+import threading
+from typing import Any, Dict, Optional
+
+
+class Flight:
+    """One in-progress provider execution that concurrent duplicates can wait on."""
+
+    def __init__(self, key: str, leader: bool, future: asyncio.Future, loop: asyncio.AbstractEventLoop):
+        self.key = key
+        self.leader = leader
+        self._future = future
+        self._loop = loop
+
+    async def wait(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Leader's shared result, or None if the leader failed (the caller then runs on its own)."""
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._future), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class SingleFlight:
+    """
+    Single-flight coalescing of identical in-flight prompts.
+    The first request for a key becomes the leader and executes the provider path; concurrent
+    duplicates join its flight and await the leader's result instead of paying for their own
+    call. Keys combine the normalized prompt (with injected context), workflow scope, mode
+    and policy, so only requests that would be routed identically are coalesced.
+    """
+    FOLLOWER_TIMEOUT_SEC = 120.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[str, Flight] = {}
+        self.stats = {"leaders": 0, "coalesced": 0, "abandoned": 0}
+
+    @staticmethod
+    def make_key(prompt: str, workflow_id: Optional[str], mode: str, policy: Any = None) -> str:
+        normalized = " ".join((prompt or "").split())
+        if policy is not None and hasattr(policy, "model_dump"):
+            policy = policy.model_dump()
+        material = json.dumps([normalized, workflow_id, mode, policy], sort_keys=True, default=str)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def join(self, key: str) -> Flight:
+        """Returns the existing flight for the key (as a follower), or starts one as its leader."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and flight._loop is loop and not flight._future.done():
+                self.stats["coalesced"] += 1
+                return Flight(key, False, flight._future, loop)
+            flight = Flight(key, True, loop.create_future(), loop)
+            self._flights[key] = flight
+            self.stats["leaders"] += 1
+            return flight
+
+    def resolve(self, flight: Flight, result: Dict[str, Any]):
+        """Publishes the leader's result to every follower and retires the flight."""
+        if not flight.leader:
+            return
+        with self._lock:
+            if self._flights.get(flight.key) is flight:
+                del self._flights[flight.key]
+        if not flight._future.done():
+            flight._future.set_result(result)
+
+    def release(self, flight: Optional[Flight]):
+        """Retires a leader's flight without a result (error paths); followers fall back to executing."""
+        if flight is None or not flight.leader or flight._future.done():
+            return
+        self.stats["abandoned"] += 1
+        self.resolve(flight, None)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._flights)
+
+
+# Global coalescing table for /generate
+single_flight = SingleFlight()
@@ -0,0 +1,327 @@
+import asyncio
+import atexit
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import event, func, insert, text, update
+
+from infra.database import SessionLocal, engine
+
+# Operations held in memory when the queue is full and the producer runs on an event loop
+TELEMETRY_OVERFLOW_MAXSIZE = int(os.getenv("OMI_TELEMETRY_OVERFLOW_MAXSIZE", "50000"))
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+class PrimaryKeyAllocator:
+    """
+    In-process primary key counters for tables written behind (SQLite has no sequences).
+    Once a table has a counter, ORM inserts into it draw their id from the same counter
+    (before_insert), so a synchronous insert can never take an id already handed to a
+    queued row. Counters are reseeded from the DB to stay ahead of other writers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_ids: Dict[Any, int] = {}
+
+    def allocate(self, model) -> int:
+        if engine.dialect.name == "postgresql":
+            with engine.connect() as conn:
+                return conn.execute(
+                    text("SELECT nextval(pg_get_serial_sequence(:table, 'id'))"),
+                    {"table": model.__tablename__}
+                ).scalar()
+        with self._lock:
+            if model not in self._next_ids:
+                self._next_ids[model] = self._db_max_id(model) + 1
+                event.listen(model, "before_insert", self._assign_id)
+            allocated = self._next_ids[model]
+            self._next_ids[model] = allocated + 1
+            return allocated
+
+    def _assign_id(self, mapper, connection, target):
+        if target.id is None:
+            target.id = self.allocate(type(target))
+
+    @staticmethod
+    def _db_max_id(model) -> int:
+        db = SessionLocal()
+        try:
+            return db.query(func.max(model.id)).scalar() or 0
+        except Exception:
+            return 0
+        finally:
+            db.close()
+
+    def reseed(self):
+        """Keeps the in-process counters ahead of rows inserted by other writers."""
+        with self._lock:
+            for model in list(self._next_ids):
+                self._next_ids[model] = max(self._next_ids[model], self._db_max_id(model) + 1)
+
+
+# Global key allocator shared by every write-behind pipeline in this process
+id_allocator = PrimaryKeyAllocator()
+
+
+class TelemetryWriter:
+    """
+    Write-behind telemetry pipeline.
+    Request handlers enqueue row inserts, row updates and deferred jobs onto a bounded
+    queue; a background writer drains it in batches, grouping inserts per table into a
+    single executemany and committing once per batch. Row ids are pre-allocated so the
+    response can reference a decision before it is persisted. Operations are applied in
+    FIFO order (pending inserts are flushed before any update or job that follows them).
+
+    Overflow policy when the queue is full:
+    - Producers on an event loop never block: the operation spills into an in-memory
+      overflow list that the writer drains after the queue (later operations follow it
+      there, so FIFO order holds). Past overflow_maxsize the operation is dropped and
+      counted in stats["dropped"], with a log line.
+    - Producers on worker threads block for backpressure_timeout_sec and then write the
+      operation inline rather than dropping telemetry.
+    """
+    QUEUE_MAXSIZE = 10000
+    BATCH_SIZE = 500
+    BACKPRESSURE_TIMEOUT_SEC = 2.0
+    OVERFLOW_POLL_SEC = 0.05
+
+    def __init__(
+        self,
+        queue_maxsize: int = QUEUE_MAXSIZE,
+        batch_size: int = BATCH_SIZE,
+        backpressure_timeout_sec: float = BACKPRESSURE_TIMEOUT_SEC,
+        overflow_maxsize: int = TELEMETRY_OVERFLOW_MAXSIZE
+    ):
+        self.batch_size = batch_size
+        self.backpressure_timeout_sec = backpressure_timeout_sec
+        self.overflow_maxsize = overflow_maxsize
+        self._queue = queue.Queue(maxsize=queue_maxsize)
+        self._overflow = deque()
+        self._overflow_lock = threading.Lock()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {"enqueued": 0, "rows_written": 0, "batches": 0, "backpressure_events": 0,
+                      "overflowed": 0, "dropped": 0, "flush_timeouts": 0, "errors": 0}
+
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats["queued"] = self._queue.qsize()
+        stats["overflow"] = len(self._overflow)
+        return stats
+
+    # ── ID pre-allocation ─────────────────────────────────────────────────────
+
+    def allocate_id(self, model) -> int:
+        """Reserves a primary key for a row that will be written behind."""
+        return id_allocator.allocate(model)
+
+    # ── Producer API ──────────────────────────────────────────────────────────
+
+    def insert(self, model, row: Dict[str, Any]):
+        self._enqueue(("insert", model, row))
+
+    def update(self, model, row_id: int, fields: Dict[str, Any]):
+        self._enqueue(("update", model, row_id, fields))
+
+    def submit(self, fn: Callable, *args, pass_session: bool = False, **kwargs):
+        """Defers an arbitrary write (runs on the writer thread, after everything queued before it)."""
+        self._enqueue(("job", fn, args, kwargs, pass_session))
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """
+        Blocks until everything enqueued so far has been committed, for at most timeout seconds.
+        Returns False on timeout. Async handlers must use flush_async instead.
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        deadline = time.monotonic() + timeout
+        done = threading.Event()
+        try:
+            self._put(("flush", done), block=True, timeout=timeout)
+            flushed = done.wait(max(0.0, deadline - time.monotonic()))
+        except queue.Full:
+            flushed = False
+        if not flushed:
+            self._count("flush_timeouts")
+            print(f"[Telemetry Writer] Flush timed out after {timeout}s ({self._queue.qsize()} queued, {len(self._overflow)} overflowed)")
+        return flushed
+
+    async def flush_async(self, timeout: float = 10.0) -> bool:
+        """flush() on a worker thread, so waiting for the writer does not stall the event loop."""
+        return await asyncio.to_thread(self.flush, timeout)
+
+    def stop(self):
+        self.flush()
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="omi-telemetry-writer", daemon=True)
+                self._thread.start()
+
+    def _put(self, op: tuple, block: bool, timeout: float = None):
+        """
+        Queues op, or appends it to the overflow while earlier operations are parked there.
+        Blocking callers wait up to timeout for room; raises queue.Full otherwise.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._overflow_lock:
+                if not self._overflow:
+                    try:
+                        self._queue.put_nowait(op)
+                        return
+                    except queue.Full:
+                        if block:
+                            break  # Wait on the queue, outside the lock
+                        if self.overflow_maxsize <= 0:
+                            raise
+                        self._overflow.append(op)
+                        self._count("overflowed")
+                        return
+                if len(self._overflow) < self.overflow_maxsize:
+                    self._overflow.append(op)
+                    self._count("overflowed")
+                    return
+                if not block:
+                    raise queue.Full
+            # Overflow at its bound: queueing now would overtake the parked operations
+            if deadline is not None and time.monotonic() >= deadline:
+                raise queue.Full
+            time.sleep(self.OVERFLOW_POLL_SEC)
+        self._queue.put(op, timeout=None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def _enqueue(self, op: tuple):
+        self._ensure_started()
+        self._count("enqueued")
+        if _on_event_loop():
+            try:
+                self._put(op, block=False)
+            except queue.Full:
+                self._count("dropped")
+                print(f"[Telemetry Writer] Overflow full ({self.overflow_maxsize}); dropped a {op[0]} operation")
+            return
+        try:
+            self._put(op, block=True, timeout=self.backpressure_timeout_sec)
+        except queue.Full:
+            # Backpressure: the writer is saturated, so pay for this write on the caller's thread
+            self._count("backpressure_events")
+            self._apply_batch([op])
+
+    # ── Writer ────────────────────────────────────────────────────────────────
+
+    def _take_batch(self) -> List[tuple]:
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=self.OVERFLOW_POLL_SEC if self._overflow else None))
+        except queue.Empty:
+            pass
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if len(batch) < self.batch_size:
+            with self._overflow_lock:
+                # Overflowed operations follow everything still in the queue
+                if self._queue.empty():
+                    while self._overflow and len(batch) < self.batch_size:
+                        batch.append(self._overflow.popleft())
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch:
+                self._apply_batch(batch)
+
+    def _apply_batch(self, ops: List[tuple]):
+        waiters = [op[1] for op in ops if op[0] == "flush"]
+        ops = [op for op in ops if op[0] != "flush"]
+        with self._write_lock:
+            try:
+                committed = self._write(ops) if ops else 0
+                if committed < len(ops):
+                    # Isolate the poison operation instead of losing the rest of the batch
+                    for op in ops[committed:]:
+                        self._write([op])
+            finally:
+                id_allocator.reseed()
+                for waiter in waiters:
+                    waiter.set()
+
+    def _write(self, ops: List[tuple]) -> int:
+        """Applies ops in one transaction (split at deferred jobs); returns how many were committed."""
+        db = SessionLocal()
+        pending: "OrderedDict[Any, List[Dict[str, Any]]]" = OrderedDict()
+        written = 0
+        committed = 0
+
+        def flush_inserts():
+            nonlocal written
+            for model, rows in pending.items():
+                db.execute(insert(model), rows)
+                written += len(rows)
+            pending.clear()
+
+        try:
+            for index, op in enumerate(ops):
+                kind = op[0]
+                if kind == "insert":
+                    pending.setdefault(op[1], []).append(op[2])
+                elif kind == "update":
+                    _, model, row_id, fields = op
+                    flush_inserts()
+                    db.execute(update(model).where(model.id == row_id).values(**fields))
+                elif kind == "job":
+                    _, fn, args, kwargs, pass_session = op
+                    flush_inserts()
+                    db.commit()
+                    try:
+                        if pass_session:
+                            fn(*args, db=db, **kwargs)
+                        else:
+                            fn(*args, **kwargs)
+                    except Exception as e:
+                        self._count("errors")
+                        print(f"[Telemetry Writer] Deferred write failed: {e}")
+                        db.rollback()
+                    committed = index + 1
+            flush_inserts()
+            db.commit()
+            self._count("rows_written", written)
+            self._count("batches")
+            return len(ops)
+        except Exception as e:
+            db.rollback()
+            self._count("errors")
+            print(f"[Telemetry Writer] Failed to flush batch of {len(ops) - committed} operations: {e}")
+            return committed if len(ops) > 1 else len(ops)
+        finally:
+            db.close()
+
+
+# Global write-behind pipeline
+telemetry_writer = TelemetryWriter()
+atexit.register(telemetry_writer.stop)
@@ -42,8 +42,7 @@ def run_adversarial_simulation() -> dict:
             
             prov = {
                 "cache_origin": "adversarial_payload",
-                "quarantine_history": [],
-                "reuse_count": 0
+                "quarantine_history": []
             }
             
             entry = SemanticCacheEntry(
@@ -61,7 +60,8 @@ def run_adversarial_simulation() -> dict:
                 drift_score=0.80,   # High drift
                 is_quarantined=False,
                 provenance=json.dumps(prov),
-                provenance_cri=0.10 # Low CRI
+                provenance_cri=0.10, # Low CRI
+                reuse_count=0
             )
             db.add(entry)
         db.commit()
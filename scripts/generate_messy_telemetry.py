@@ -328,9 +328,9 @@ def generate_cognitive_efficiency_telemetry():
             "governance_state": {"min_confidence": 0.88},
             "calibration_state": {"confidence": 0.88},
             "reuse_confidence": 0.88,
-            "utility_preservation": 0.90,
-            "reuse_count": random.randint(1, 5)
+            "utility_preservation": 0.90
         }
+        reuse_count = random.randint(1, 5)
 
         entry = SemanticCacheEntry(
             timestamp=(start_time + timedelta(days=i * 14 // 15)).isoformat(),
@@ -352,7 +352,8 @@ def generate_cognitive_efficiency_telemetry():
             drift_score=drift_val,
             is_quarantined=is_quar,
             provenance=json.dumps(prov_dict),
-            provenance_cri=cri_val
+            provenance_cri=cri_val,
+            reuse_count=reuse_count
         )
         db.add(entry)
         total_cache_entries += 1
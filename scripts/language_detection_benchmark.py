@@ -0,0 +1,85 @@
+import glob
+import json
+import os
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from langdetect import detect
+from core.language_detector import ScriptLanguageDetector
+
+# Pre-flight language detection latency: langdetect on every prompt vs. the script-aware detector.
+# Replays every prompt in benchmarks/datasets (plus script samples for the router's Indic codes)
+# and reports per-call latency, memoized latency and agreement on the Indic routing decision.
+
+INDIC_CODES = ["hi", "ta", "te", "bn", "mr", "gu", "ur", "ml", "kn"]
+SCRIPT_SAMPLES = [
+    "भारत के संविधान के अनुच्छेद 21 का संक्षेप में अनुवाद करें",
+    "मला या अर्जाचा सारांश मराठीत हवा आहे",
+    "இந்த ஒப்பந்தத்தின் முக்கிய விதிகளை சுருக்கமாக கூறுங்கள்",
+    "ఈ ఒప్పందంలోని ముఖ్యమైన నిబంధనలను వివరించండి",
+    "এই চুক্তির প্রধান শর্তগুলি সংক্ষেপে বলুন",
+    "આ કરારની મુખ્ય શરતો સમજાવો",
+    "ഈ കരാറിലെ പ്രധാന വ്യവസ്ഥകൾ വിശദീകരിക്കുക",
+    "ಈ ಒಪ್ಪಂದದ ಮುಖ್ಯ ಷರತ್ತುಗಳನ್ನು ವಿವರಿಸಿ",
+    "اس معاہدے کی اہم شرائط کی وضاحت کریں",
+    "mujhe batao yeh policy kaise kaam karti hai",
+]
+
+
+def load_prompts():
+    prompts = list(SCRIPT_SAMPLES)
+    for path in sorted(glob.glob(os.path.join("benchmarks", "datasets", "*.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            prompts.extend(item["prompt"] for item in json.load(f) if item.get("prompt"))
+    return prompts
+
+
+def timed(fn, prompts):
+    results = []
+    start = time.perf_counter()
+    for prompt in prompts:
+        try:
+            results.append(fn(prompt))
+        except Exception:
+            results.append("en")
+    return results, (time.perf_counter() - start) * 1000 / len(prompts)
+
+
+def run_benchmark():
+    print("Initiating language detection benchmark...")
+    prompts = load_prompts()
+    detect(prompts[0])  # Load langdetect's profiles outside the timed loop
+
+    baseline, baseline_ms = timed(detect, prompts)
+    detector = ScriptLanguageDetector()
+    fast, cold_ms = timed(detector.detect, prompts)
+    _, warm_ms = timed(detector.detect, prompts)
+    stats = detector.get_stats()
+
+    is_indic = lambda code: code in INDIC_CODES
+    routing_agreement = sum(is_indic(a) == is_indic(b) for a, b in zip(baseline, fast)) / len(prompts)
+    code_agreement = sum(a == b for a, b in zip(baseline, fast)) / len(prompts)
+
+    report = "# Language Detection Latency\n\n"
+    report += f"**Timestamp:** {time.strftime('%Y-%m-%d %H:%M:%S UTC', time.gmtime())}\n\n"
+    report += f"Prompts: {len(prompts)} (all `benchmarks/datasets/*.json` prompts plus {len(SCRIPT_SAMPLES)} Indic script samples)\n\n"
+    report += "| Detector | Mean latency / prompt (ms) | Speedup |\n"
+    report += "|----------|----------------------------|---------|\n"
+    report += f"| `langdetect.detect` | {baseline_ms:.3f} | 1.0x |\n"
+    report += f"| Script-aware (cold) | {cold_ms:.3f} | {baseline_ms / cold_ms:.1f}x |\n"
+    report += f"| Script-aware (memoized) | {warm_ms:.4f} | {baseline_ms / warm_ms:.0f}x |\n"
+    report += "\n## Agreement with langdetect\n"
+    report += f"- **Indic vs. non-Indic routing decision:** {routing_agreement * 100:.1f}%\n"
+    report += f"- **Exact ISO 639-1 code:** {code_agreement * 100:.1f}%\n"
+    report += f"- **Decided by script / Latin heuristics / langdetect fallback:** {stats['script']} / {stats['latin']} / {stats['fallbacks']}\n"
+
+    report_path = os.path.join("benchmarks", "results", "language_detection_latency.md")
+    os.makedirs(os.path.dirname(report_path), exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write(report)
+    print(report)
+    print(f"[SUCCESS] Report saved to {report_path}")
+
+
+if __name__ == "__main__":
+    run_benchmark()
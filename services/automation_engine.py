@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from infra.database import SessionLocal
 from infra.models import RoutingDecision, SemanticCacheEntry, ModelFailure, PilotApplication
 from infra.benchmark import benchmark_engine
+from core.semantic_index import semantic_index
 
 class AutomationEngine:
     _instance = None
@@ -80,6 +81,7 @@ class AutomationEngine:
             for entry in drifted:
                 if not entry.is_quarantined:
                     entry.is_quarantined = True
+                    semantic_index.set_quarantined(entry.id, True)
             db.commit()
             print(f"Daily Telemetry Audit complete: {len(drifted)} drifted cache nodes quarantined.")
             
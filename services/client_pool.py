@@ -0,0 +1,124 @@
+import asyncio
+import hashlib
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import h2  # noqa: F401  (optional: enables HTTP/2 on the shared transports)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Upper bound on pooled SDK clients (distinct provider / key / base_url combinations)
+CLIENT_POOL_MAX_CLIENTS = int(os.getenv("OMI_CLIENT_POOL_MAX_CLIENTS", "64"))
+
+
+class ProviderClientPool:
+    """
+    Long-lived provider SDK clients, keyed by (provider, hashed API key, base_url, sync/async).
+    SDK clients built on the same transport factory share one keep-alive HTTP client (HTTP/2
+    when h2 is installed), so BYOK tenants reuse warm connections instead of paying TCP+TLS
+    setup per request. The SDKs attach credentials per request, which is what makes sharing
+    safe. Transports are per factory because each SDK pins its own httpx flavour.
+
+    Async transports are bound to the event loop that created them, so async clients are
+    pooled per loop, keyed by a weak reference to it (a dead loop's id can be reused by a
+    new loop; its weakref never compares equal to the new one). Clients and transports of
+    closed loops are pruned on the next async lookup. Evicted clients are dropped, not
+    closed, since closing an SDK client would close the shared transport.
+    """
+
+    def __init__(self, max_clients: int = CLIENT_POOL_MAX_CLIENTS):
+        self.max_clients = max_clients
+        self._lock = threading.Lock()
+        self._clients: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._transports: Dict[Callable, Any] = {}
+        self._async_transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Callable, Any]]" = weakref.WeakKeyDictionary()
+        self.stats = {"requests": 0, "hits": 0, "misses": 0, "evictions": 0, "closed_loop_evictions": 0}
+
+    @staticmethod
+    def _key_fingerprint(api_key: str) -> str:
+        # Raw keys never sit in the pool's index
+        return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+    def _prune_closed_loops_locked(self):
+        for pool_key in [k for k in self._clients if k[4] is not None and self._loop_closed(k[4]())]:
+            del self._clients[pool_key]
+            self.stats["closed_loop_evictions"] += 1
+        for loop in [loop for loop in list(self._async_transports.keys()) if loop.is_closed()]:
+            self._async_transports.pop(loop, None)
+
+    @staticmethod
+    def _loop_closed(loop) -> bool:
+        return loop is None or loop.is_closed()
+
+    def _transport_locked(self, transport_factory: Callable, is_async: bool):
+        transports = self._transports
+        if is_async:
+            transports = self._async_transports.setdefault(asyncio.get_running_loop(), {})
+        http_client = transports.get(transport_factory)
+        if http_client is None:
+            http_client = transport_factory(http2=HTTP2_AVAILABLE) if HTTP2_AVAILABLE else transport_factory()
+            transports[transport_factory] = http_client
+        return http_client
+
+    def get(
+        self,
+        provider: str,
+        api_key: str,
+        factory: Callable[[Any], Any],
+        transport_factory: Callable,
+        base_url: Optional[str] = None,
+        is_async: bool = False
+    ):
+        """
+        Returns the pooled client for this provider/key/base_url, building it with
+        factory(shared_http_client) on a miss. transport_factory builds the shared HTTP
+        client (e.g. the SDK's DefaultHttpxClient) the first time it is needed.
+        """
+        loop_ref = weakref.ref(asyncio.get_running_loop()) if is_async else None
+        pool_key = (provider, self._key_fingerprint(api_key), base_url, is_async, loop_ref)
+        with self._lock:
+            if is_async:
+                self._prune_closed_loops_locked()
+            self.stats["requests"] += 1
+            client = self._clients.get(pool_key)
+            if client is not None:
+                self._clients.move_to_end(pool_key)
+                self.stats["hits"] += 1
+                return client
+            self.stats["misses"] += 1
+            client = factory(self._transport_locked(transport_factory, is_async))
+            self._clients[pool_key] = client
+            while len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+                self.stats["evictions"] += 1
+            return client
+
+    @staticmethod
+    def _open_connections(http_client) -> int:
+        try:
+            return len(http_client._transport._pool.connections)
+        except Exception:
+            return 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["pooled_clients"] = len(self._clients)
+            transports = list(self._transports.values())
+            for per_loop in list(self._async_transports.values()):
+                transports.extend(per_loop.values())
+        stats["shared_transports"] = len(transports)
+        stats["open_connections"] = sum(self._open_connections(t) for t in transports)
+        stats["reuse_ratio"] = round(stats["hits"] / stats["requests"], 4) if stats["requests"] else 0.0
+        stats["max_clients"] = self.max_clients
+        stats["http2"] = HTTP2_AVAILABLE
+        return stats
+
+
+# Global provider client pool used by ModelRegistry
+client_pool = ProviderClientPool()
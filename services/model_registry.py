@@ -1,9 +1,11 @@
 import os
-from openai import OpenAI
-from anthropic import Anthropic
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient as OpenAIHttpClient, DefaultAsyncHttpxClient as OpenAIAsyncHttpClient
+from anthropic import Anthropic, AsyncAnthropic, DefaultHttpxClient as AnthropicHttpClient, DefaultAsyncHttpxClient as AnthropicAsyncHttpClient
 import google.generativeai as genai
 from dotenv import load_dotenv
-from typing import Any
+from typing import Any, Optional
+
+from services.client_pool import client_pool
 
 load_dotenv()
 
@@ -20,43 +22,78 @@ HOUSE_KEYS = {
     "omi_secret": os.getenv("OMI_ADMIN_KEY")
 }
 
+DEEPSEEK_BASE_URL = "https://api.deepseek.com"
+
 # Configure Gemini Globally
 if HOUSE_KEYS["google"]:
     genai.configure(api_key=HOUSE_KEYS["google"])
 
+def _byok(user_key) -> Optional[str]:
+    # Direct endpoint invocations can pass unresolved Header defaults; only real strings are BYOK keys
+    return user_key if isinstance(user_key, str) else None
+
 class ModelRegistry:
     """
     Centralized model registry supporting BYOK (Bring Your Own Key) overrides
     and abstracting all provider-specific HTTP clients.
+    SDK clients are served from the shared ProviderClientPool, so repeated requests with
+    the same key reuse one client and its warm connections.
     """
     @staticmethod
     def get_openai_client(user_key: str = None) -> OpenAI:
-        key = user_key or HOUSE_KEYS.get("openai") or ("MOCK_KEY" if USE_MOCK_PROVIDERS else None)
+        key = _byok(user_key) or HOUSE_KEYS.get("openai") or ("MOCK_KEY" if USE_MOCK_PROVIDERS else None)
         if not key:
             raise ValueError("OpenAI key not configured.")
-        return OpenAI(api_key=key)
+        return client_pool.get("openai", key, lambda http: OpenAI(api_key=key, http_client=http), OpenAIHttpClient)
 
     @staticmethod
     def get_anthropic_client(user_key: str = None) -> Anthropic:
-        key = user_key or HOUSE_KEYS.get("anthropic") or ("MOCK_KEY" if USE_MOCK_PROVIDERS else None)
+        key = _byok(user_key) or HOUSE_KEYS.get("anthropic") or ("MOCK_KEY" if USE_MOCK_PROVIDERS else None)
         if not key:
             raise ValueError("Anthropic key not configured.")
-        return Anthropic(api_key=key)
+        return client_pool.get("anthropic", key, lambda http: Anthropic(api_key=key, http_client=http), AnthropicHttpClient)
+
+    @staticmethod
+    def get_async_openai_client(user_key: str = None) -> AsyncOpenAI:
+        key = _byok(user_key) or HOUSE_KEYS.get("openai") or ("MOCK_KEY" if USE_MOCK_PROVIDERS else None)
+        if not key:
+            raise ValueError("OpenAI key not configured.")
+        return client_pool.get("openai", key, lambda http: AsyncOpenAI(api_key=key, http_client=http), OpenAIAsyncHttpClient, is_async=True)
+
+    @staticmethod
+    def get_async_anthropic_client(user_key: str = None) -> AsyncAnthropic:
+        key = _byok(user_key) or HOUSE_KEYS.get("anthropic") or ("MOCK_KEY" if USE_MOCK_PROVIDERS else None)
+        if not key:
+            raise ValueError("Anthropic key not configured.")
+        return client_pool.get("anthropic", key, lambda http: AsyncAnthropic(api_key=key, http_client=http), AnthropicAsyncHttpClient, is_async=True)
 
     @staticmethod
     def get_sarvam_client(user_key: str = None) -> Any:
         # Sarvam typically uses standard REST, returning an initialized session or mock
-        key = user_key or HOUSE_KEYS.get("sarvam") or ("MOCK_KEY" if USE_MOCK_PROVIDERS else None)
+        key = _byok(user_key) or HOUSE_KEYS.get("sarvam") or ("MOCK_KEY" if USE_MOCK_PROVIDERS else None)
         if not key:
             raise ValueError("Sarvam key not configured.")
         return {"api_key": key, "base_url": "https://api.sarvam.ai"}
 
     @staticmethod
     def get_deepseek_client(user_key: str = None) -> OpenAI:
-        key = user_key or HOUSE_KEYS.get("deepseek") or ("MOCK_KEY" if USE_MOCK_PROVIDERS else None)
+        key = _byok(user_key) or HOUSE_KEYS.get("deepseek") or ("MOCK_KEY" if USE_MOCK_PROVIDERS else None)
+        if not key:
+            raise ValueError("DeepSeek key not configured.")
+        return client_pool.get(
+            "deepseek", key, lambda http: OpenAI(api_key=key, base_url=DEEPSEEK_BASE_URL, http_client=http),
+            OpenAIHttpClient, base_url=DEEPSEEK_BASE_URL
+        )
+
+    @staticmethod
+    def get_async_deepseek_client(user_key: str = None) -> AsyncOpenAI:
+        key = _byok(user_key) or HOUSE_KEYS.get("deepseek") or ("MOCK_KEY" if USE_MOCK_PROVIDERS else None)
         if not key:
             raise ValueError("DeepSeek key not configured.")
-        return OpenAI(api_key=key, base_url="https://api.deepseek.com")
+        return client_pool.get(
+            "deepseek", key, lambda http: AsyncOpenAI(api_key=key, base_url=DEEPSEEK_BASE_URL, http_client=http),
+            OpenAIAsyncHttpClient, base_url=DEEPSEEK_BASE_URL, is_async=True
+        )
 
     @staticmethod
     def get_gemini_model(model_name: str = "gemini-2.0-flash-exp"):